@@ -0,0 +1,146 @@
+# bench_artifacts.py
+"""
+Startup benchmark: pickled model artifacts vs the memory-mapped artifact format.
+
+Builds synthetic engine parameters (--items questions, stored as the legacy
+Q_ID -> (a, b, c) dict) and a random-forest job-fit model (--trees trees), writes both as
+pickles and as artifacts (see scripts/artifact_format.py), and loads each form in a
+fresh interpreter. Reported per form: load time, and the resident memory it adds, split
+into anonymous memory (private to each worker process) and file-backed pages (shared
+through the page cache). Artifacts are measured as servers open them and with checksum
+verification (as train.py opens them).
+
+Usage:
+    python bench_artifacts.py                         # 1M items, 300 trees
+    python bench_artifacts.py --items 5000000 --trees 500
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from synthetic_bank import SCRIPTS_DIR
+
+# Executed in a child interpreter: load one artifact, report time and RSS growth
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+from adaptive_logic import EngineParameters
+from jobfit_predictor import JobFitPredictor, load_exported_model
+import pickle, sklearn.ensemble
+
+def rss_kb():
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon:', 'RssFile:')):
+                key, value = line.split()[:2]
+                values[key[:-1]] = int(value)
+    return values
+
+kind, path, verify = sys.argv[2], sys.argv[3], sys.argv[4] == '1'
+before = rss_kb()
+t = time.perf_counter()
+if kind == 'engine-pickle':
+    loaded = EngineParameters.load(path)
+elif kind == 'engine-artifact':
+    loaded = EngineParameters.read_artifact(path, verify=verify)
+elif kind == 'jobfit-pickle':
+    with open(path, 'rb') as f:
+        loaded = pickle.load(f)
+else:
+    loaded = load_exported_model(path, verify=verify)
+load_s = time.perf_counter() - t
+after = rss_kb()
+print(json.dumps({
+    'load_s': load_s,
+    'anon_mb': (after['RssAnon'] - before['RssAnon']) / 1024,
+    'mapped_mb': (after['RssFile'] - before['RssFile']) / 1024,
+}))
+"""
+
+
+def run_child(kind: str, path: str, verify: bool = False) -> dict:
+    out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, kind, path, '1' if verify else '0'],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def best_of(kind: str, path: str, repeat: int, verify: bool = False) -> dict:
+    runs = [run_child(kind, path, verify) for _ in range(repeat)]
+    return min(runs, key=lambda r: r['load_s'])
+
+
+def write_engine_files(tmp: str, items: int) -> tuple[str, str]:
+    from adaptive_logic import AdaptiveEngine
+    from artifact_format import write_artifact
+
+    rng = np.random.default_rng(0)
+    q_ids = np.arange(items, dtype=np.int64)
+    a, b, c = np.exp(rng.normal(0, 0.3, items)), rng.normal(0, 1, items), np.zeros(items)
+
+    pickle_path = os.path.join(tmp, AdaptiveEngine.MODEL_FILE_NAME)
+    with open(pickle_path, 'wb') as f:
+        pickle.dump({'max_questions': 10, 'initial_ability': 0.0,
+                     'item_parameters': dict(zip(q_ids.tolist(), zip(a.tolist(), b.tolist(), c.tolist())))}, f)
+    artifact_path = os.path.join(tmp, AdaptiveEngine.TRAINED_FILE_NAME)
+    write_artifact(artifact_path, AdaptiveEngine.PARAMETERS_KIND, {'Q_ID': q_ids, 'a': a, 'b': b, 'c': c},
+                   {'max_questions': 10, 'initial_ability': 0.0})
+    return pickle_path, artifact_path
+
+
+def write_jobfit_files(tmp: str, trees: int) -> tuple[str, str]:
+    from sklearn.ensemble import RandomForestClassifier
+    from jobfit_predictor import FitLookupTable, JobFitPredictor, export_model, save_exported_model
+
+    rng = np.random.default_rng(0)
+    features = np.column_stack((rng.uniform(0, 100, 50_000), rng.uniform(0, 100, 50_000)))
+    labels = (0.57 * features[:, 0] + 0.23 * features[:, 1] - 53.7 + rng.logistic(size=len(features)) > 0)
+    model = RandomForestClassifier(trees, min_samples_leaf=5, n_jobs=-1, random_state=0).fit(features, labels)
+
+    pickle_path = os.path.join(tmp, JobFitPredictor.MODEL_FILE)
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(model, f)
+    artifact_path = os.path.join(tmp, JobFitPredictor.MODEL_EXPORT_FILE)
+    save_exported_model(export_model(model), artifact_path, FitLookupTable.build(model))
+    return pickle_path, artifact_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1_000_000)
+    parser.add_argument('--trees', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine_pickle, engine_artifact = write_engine_files(tmp, args.items)
+        jobfit_pickle, jobfit_artifact = write_jobfit_files(tmp, args.trees)
+
+        cases = [
+            ('engine params', 'pickle', best_of('engine-pickle', engine_pickle, args.repeat), engine_pickle),
+            ('engine params', 'artifact', best_of('engine-artifact', engine_artifact, args.repeat), engine_artifact),
+            ('engine params', 'verified', best_of('engine-artifact', engine_artifact, args.repeat, True), engine_artifact),
+            ('job-fit model', 'pickle', best_of('jobfit-pickle', jobfit_pickle, args.repeat), jobfit_pickle),
+            ('job-fit model', 'artifact', best_of('jobfit-artifact', jobfit_artifact, args.repeat), jobfit_artifact),
+            ('job-fit model', 'verified', best_of('jobfit-artifact', jobfit_artifact, args.repeat, True), jobfit_artifact),
+        ]
+
+        print(f"{args.items:,} items, {args.trees} trees")
+        print(f"{'artifact':<15}{'form':<11}{'file MB':>9}{'load s':>9}{'anon MB':>9}{'file-backed MB':>16}")
+        results = []
+        for artifact, form, r, path in cases:
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{artifact:<15}{form:<11}{size_mb:>9.1f}{r['load_s']:>9.3f}{r['anon_mb']:>9.1f}{r['mapped_mb']:>16.1f}")
+            results.append(dict(r, artifact=artifact, form=form, size_mb=size_mb))
+        print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+# bench_assessment.py
+"""
+Throughput and latency benchmark for full adaptive assessments.
+
+For each bank size a synthetic bank is generated (data/assessment_data.csv scaled up across
+many roles) and complete assessments are simulated twice:
+    engine  AdaptiveEngine.start_session / advance + JobFitPredictor.predict_fit
+    http    POST /start_assessment + /submit_answer through the Flask test client
+Each size runs in a fresh interpreter; the report lists ops/sec, p50/p95/p99 latency
+and the peak RSS for each size.
+
+The early-stopping report simulates candidates of known ability (standard normal,
+answering by the default IRT item model) through the rule and IRT engines, once at fixed
+length and once with early stopping, and lists the items per assessment saved and how
+often both runs reach the same job-fit category.
+
+Usage:
+    python bench_assessment.py                          # 10k, 100k, 1M rows
+    python bench_assessment.py --sizes 10000 --assessments 200
+    python bench_assessment.py --save-baseline          # write baseline.json
+    python bench_assessment.py --check                  # fail on regressions vs baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from synthetic_bank import BENCH_DIR, SCRIPTS_DIR, make_bank_frame, peak_rss_mb
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+# --check fails when throughput drops, or p99 latency grows, by more than this fraction
+REGRESSION_TOLERANCE = 0.25
+
+
+def summarize(latencies_ns: list, elapsed_s: float) -> dict:
+    lat_us = np.asarray(latencies_ns, dtype=np.float64) / 1000.0
+    p50, p95, p99 = np.percentile(lat_us, [50, 95, 99])
+    return {
+        'ops': len(lat_us),
+        'ops_per_sec': len(lat_us) / elapsed_s if elapsed_s > 0 else 0.0,
+        'p50_us': float(p50),
+        'p95_us': float(p95),
+        'p99_us': float(p99),
+    }
+
+
+def bench_engine(engine, predictor, roles: list, assessments: int) -> dict:
+    """Drives complete assessments through the engine API, timing each call."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(assessments):
+        t = time.perf_counter_ns()
+        state, question = engine.start_session(random.choice(roles))
+        latencies.append(time.perf_counter_ns() - t)
+        while question is not None:
+            t = time.perf_counter_ns()
+            question, score = engine.advance(state, question['Q_ID'], random.random() < 0.6, state.raw_score)
+            if question is None:
+                predictor.predict_fit(engine.get_final_skill_score(score), trust_score=85)
+            latencies.append(time.perf_counter_ns() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_http(client, roles: list, assessments: int) -> dict:
+    """Drives complete assessments through the Flask endpoints."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(assessments):
+        t = time.perf_counter_ns()
+        body = client.post('/start_assessment', json={'role': random.choice(roles)}).get_json()
+        latencies.append(time.perf_counter_ns() - t)
+        session_id, question = body['session_id'], body['question']
+        while True:
+            t = time.perf_counter_ns()
+            body = client.post('/submit_answer', json={
+                'session_id': session_id, 'q_id': question['Q_ID'], 'is_correct': random.random() < 0.6
+            }).get_json()
+            latencies.append(time.perf_counter_ns() - t)
+            if body.get('status') != 'in_progress':
+                break
+            question = body['question']
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def simulate_assessments(engine, predictor, roles: list, assessments: int, seed: int) -> tuple[float, list]:
+    """Runs simulated candidates; returns mean items per assessment and each final category."""
+    abilities = np.random.default_rng(seed).standard_normal(assessments)
+    items, categories = 0, []
+    for i, theta in enumerate(abilities.tolist()):
+        # Candidate i sees the same draws in every run until one of the runs stops
+        random.seed(seed * 1_000_003 + i)
+        state, question = engine.start_session(random.choice(roles))
+        while question is not None:
+            b = question['Difficulty'] - 2
+            correct = random.random() < 1.0 / (1.0 + math.exp(-(theta - b)))
+            question, _ = engine.advance(state, question['Q_ID'], correct, state.raw_score)
+        items += state.q_count
+        categories.append(predictor.predict_fit(engine.final_skill_score(state), trust_score=85)['Category'])
+    return items / assessments, categories
+
+
+def bench_early_stop(bank, predictor, roles: list, assessments: int) -> dict:
+    """Items per assessment with and without early stopping, per engine mode."""
+    from adaptive_logic import AdaptiveEngine, StoppingRules
+    from irt_engine import IRTAdaptiveEngine
+
+    cutpoints = predictor.skill_cutpoints(85)
+    modes = {
+        'rule': (AdaptiveEngine, StoppingRules(skill_cutpoints=cutpoints)),
+        'irt': (IRTAdaptiveEngine, StoppingRules(se_threshold=0.5, skill_cutpoints=cutpoints)),
+    }
+    result = {}
+    for mode, (engine_cls, rules) in modes.items():
+        fixed, fixed_categories = simulate_assessments(engine_cls(bank), predictor, roles, assessments, seed=1)
+        early, early_categories = simulate_assessments(engine_cls(bank, stopping=rules), predictor, roles,
+                                                       assessments, seed=1)
+        result[mode] = {
+            'items_fixed': fixed,
+            'items_early_stop': early,
+            'items_saved': fixed - early,
+            'same_category': float(np.mean([a == b for a, b in zip(fixed_categories, early_categories)])),
+        }
+    return result
+
+
+def run_size(rows: int, roles: int, assessments: int) -> dict:
+    """Benchmarks one bank size in the current process."""
+    sys.path.insert(0, SCRIPTS_DIR)
+    import api_model
+    from adaptive_logic import AdaptiveEngine
+    from artifact_registry import ArtifactGeneration, ArtifactRegistry
+    from assessment_service import AssessmentService, predictor_model_dir
+    from jobfit_predictor import JobFitPredictor
+    from prediction_batcher import PredictionBatcher
+    from question_bank import QuestionBank
+    from session_store import InMemorySessionStore
+
+    random.seed(0)
+    frame = make_bank_frame(rows, roles=roles)
+    t = time.perf_counter()
+    bank = QuestionBank(frame)
+    build_s = time.perf_counter() - t
+    del frame
+
+    engine = AdaptiveEngine(bank)
+    predictor = JobFitPredictor(model_dir=predictor_model_dir, precompile=True)
+    role_names = bank.roles
+
+    result = {'rows': rows, 'roles': len(role_names), 'bank_build_s': build_s}
+    result['engine'] = bench_engine(engine, predictor, role_names, assessments)
+    result['early_stop'] = bench_early_stop(bank, predictor, role_names, max(1, assessments // 4))
+
+    generation = ArtifactGeneration('bench', bank, engine, predictor, PredictionBatcher(predictor, max_wait_ms=0))
+    api_model.service = AssessmentService(ArtifactRegistry(initial=generation), InMemorySessionStore())
+    result['http'] = bench_http(api_model.app.test_client(), role_names, max(1, assessments // 4))
+    api_model.service.close()
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_size_isolated(rows: int, roles: int, assessments: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', str(rows), '--roles', str(roles),
+         '--assessments', str(assessments)],
+        check=True, capture_output=True, text=True, cwd=BENCH_DIR
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(results: list, baseline: dict) -> list:
+    """Returns human-readable regressions of `results` against `baseline`."""
+    regressions = []
+    by_rows = {r['rows']: r for r in baseline.get('results', [])}
+    for r in results:
+        base = by_rows.get(r['rows'])
+        if base is None:
+            continue
+        for mode in ('engine', 'http'):
+            now, then = r[mode], base[mode]
+            if now['ops_per_sec'] < then['ops_per_sec'] * (1 - REGRESSION_TOLERANCE):
+                regressions.append(f"{r['rows']} rows {mode}: ops/sec {now['ops_per_sec']:.0f} < baseline {then['ops_per_sec']:.0f}")
+            if now['p99_us'] > then['p99_us'] * (1 + REGRESSION_TOLERANCE):
+                regressions.append(f"{r['rows']} rows {mode}: p99 {now['p99_us']:.1f}us > baseline {then['p99_us']:.1f}us")
+    return regressions
+
+
+def print_report(results: list) -> None:
+    print(f"{'rows':>9} {'mode':<7}{'ops/sec':>11}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'RSS MB':>9}")
+    for r in results:
+        for mode in ('engine', 'http'):
+            m = r[mode]
+            print(f"{r['rows']:>9} {mode:<7}{m['ops_per_sec']:>11.0f}{m['p50_us']:>10.1f}"
+                  f"{m['p95_us']:>10.1f}{m['p99_us']:>10.1f}{r['peak_rss_mb']:>9.0f}")
+
+    print(f"\n{'rows':>9} {'engine':<7}{'fixed':>9}{'early':>9}{'saved':>9}{'same cat':>10}")
+    for r in results:
+        for mode, m in r.get('early_stop', {}).items():
+            print(f"{r['rows']:>9} {mode:<7}{m['items_fixed']:>9.2f}{m['items_early_stop']:>9.2f}"
+                  f"{m['items_saved']:>9.2f}{m['same_category']:>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--roles', type=int, default=60)
+    parser.add_argument('--assessments', type=int, default=2000, help="Engine assessments per size (HTTP runs a quarter).")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help="Exit non-zero on regressions vs baseline.json.")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.child, args.roles, args.assessments)))
+        return
+
+    results = [run_size_isolated(rows, args.roles, args.assessments) for rows in args.sizes]
+    print_report(results)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'assessments': args.assessments, 'results': results}, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            raise SystemExit("No baseline.json; run with --save-baseline first.")
+        with open(BASELINE_PATH) as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# bench_bank_load.py
+"""
+Cold-start benchmark: CSV question bank vs compiled, memory-mapped bank.
+
+Each load runs in a fresh interpreter so import and parse costs are measured cold.
+With --rows the bundled assessment_data.csv is replicated to a larger synthetic bank.
+
+Usage:
+    python bench_bank_load.py                 # bundled dataset
+    python bench_bank_load.py --rows 500000   # synthetic 500k-question bank
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic_bank import DEFAULT_CSV, SCRIPTS_DIR, make_bank_frame
+
+# Executed in a child interpreter: load the bank, touch one question per role, report timings
+CHILD = r"""
+import json, resource, sys, time
+
+def peak_rss_mb():
+    # VmHWM resets on exec; ru_maxrss would report the (larger) parent's peak
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from question_bank import QuestionBank
+t_import = time.perf_counter()
+bank = QuestionBank.load(sys.argv[2])
+for role, buckets in bank.buckets.items():
+    bank.question_at(int(next(iter(buckets.values()))[0]))
+t_ready = time.perf_counter()
+print(json.dumps({
+    'import_s': t_import - t0,
+    'load_s': t_ready - t_import,
+    'total_s': t_ready - t0,
+    'peak_rss_mb': peak_rss_mb(),
+}))
+"""
+
+
+def scale_csv(csv_path: str, rows: int, out_path: str) -> None:
+    """Replicates `csv_path` to `rows` rows, spreading copies over distinct role names."""
+    make_bank_frame(rows, roles=300, csv_path=csv_path).to_csv(out_path, index=False)
+
+
+def run_child(path: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def best_of(path: str, repeat: int) -> dict:
+    runs = [run_child(path) for _ in range(repeat)]
+    return min(runs, key=lambda r: r['total_s'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--rows', type=int, default=0, help="Synthesize a bank with this many rows.")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    from bank_format import compile_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if args.rows:
+            csv_path = os.path.join(tmp, 'bank.csv')
+            scale_csv(args.csv, args.rows, csv_path)
+        bank_dir = os.path.join(tmp, 'bank.bank')
+        meta = compile_csv(csv_path, bank_dir)
+
+        print(f"Bank: {meta['rows']} questions, {len(meta['roles'])} roles")
+        print(f"{'format':<10}{'import s':>10}{'load s':>10}{'total s':>10}{'peak RSS MB':>14}")
+        results = {'csv': best_of(csv_path, args.repeat), 'compiled': best_of(bank_dir, args.repeat)}
+        for name, r in results.items():
+            print(f"{name:<10}{r['import_s']:>10.3f}{r['load_s']:>10.3f}{r['total_s']:>10.3f}{r['peak_rss_mb']:>14.1f}")
+        print(f"Speed-up (load): {results['csv']['load_s'] / max(results['compiled']['load_s'], 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# bench_bundles.py
+"""
+Server cost of an assessment run online vs from an offline bundle (scripts/offline_bundle.py).
+
+    online   POST /start_assessment + one /submit_answer per question
+    bundle   POST /assessment_bundle, the client answers every question of the bundle,
+             POST /submit_bundle with the chosen options
+Both go through the Flask test client on a synthetic bank, in one interpreter. Reported per
+assessment: requests, server time (time spent inside the app, client-side work
+excluded), response bytes, and for bundles the graph size (nodes, and distinct
+questions, all of which the client answers). Answers are correct with a
+per-assessment probability; the benchmark reads the bank's answer key to pick them.
+
+Usage:
+    python bench_bundles.py
+    python bench_bundles.py --rows 1000000 --assessments 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame
+
+os.environ.setdefault('BUNDLE_SECRET', 'bench-secret')
+sys.path.insert(0, SCRIPTS_DIR)
+import api_model  # noqa: E402
+import assessment_service  # noqa: E402
+
+
+def run_online(client, role: str, p_correct: float) -> dict:
+    server = 0.0
+    size = requests = 0
+    t = time.perf_counter()
+    r = client.post('/start_assessment', json={'role': role})
+    server += time.perf_counter() - t
+    body = r.json
+    size += len(r.data)
+    requests += 1
+    session_id = body['session_id']
+    while body.get('question'):
+        payload = {'session_id': session_id, 'q_id': body['question']['Q_ID'], 'is_correct': random.random() < p_correct}
+        t = time.perf_counter()
+        r = client.post('/submit_answer', json=payload)
+        server += time.perf_counter() - t
+        body = r.json
+        size += len(r.data)
+        requests += 1
+    assert body['status'] == 'complete', body
+    return {'requests': requests, 'server_s': server, 'bytes': size}
+
+
+def run_bundle(client, role: str, p_correct: float) -> dict:
+    t = time.perf_counter()
+    r = client.post('/assessment_bundle', json={'role': role})
+    server = time.perf_counter() - t
+    data = r.json
+    bundle = data['bundle']
+    questions = {q['Q_ID']: q for q in bundle.pop('questions')}
+
+    # Client side: answer every question of the bundle
+    bank = api_model.service.bank
+    answers = []
+    for q_id in bundle['q_ids']:
+        right = bank.answers[bank.position(q_id)]
+        wrong = [o for o in questions[q_id]['Options'] if o != right]
+        answers.append(right if random.random() < p_correct else random.choice(wrong))
+
+    t = time.perf_counter()
+    r2 = client.post('/submit_bundle', json={'session_id': data['session_id'], 'bundle': bundle, 'answers': answers})
+    server += time.perf_counter() - t
+    assert r2.json['status'] == 'complete', r2.json
+    return {'requests': 2, 'server_s': server, 'bytes': len(r.data) + len(r2.data),
+            'nodes': len(bundle['nodes']), 'questions': len(bundle['q_ids'])}
+
+
+def mean(rows: list, key: str) -> float:
+    return sum(r[key] for r in rows) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--assessments', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'bank.csv')
+        make_bank_frame(args.rows).to_csv(csv_path, index=False)
+        assessment_service.data_path = csv_path
+        assessment_service.bank_path = os.path.join(tmp, 'missing.bank')
+        api_model.initialize_app()
+    client = api_model.app.test_client()
+    roles = api_model.service.bank.roles
+
+    random.seed(0)
+    results = {}
+    for name, run in (('online', run_online), ('bundle', run_bundle)):
+        # Warm up (question fragments, information tables, predictor)
+        for _ in range(20):
+            run(client, random.choice(roles), 0.6)
+        rows = [run(client, random.choice(roles), random.random()) for _ in range(args.assessments)]
+        results[name] = {key: mean(rows, key) for key in rows[0]}
+
+    print(f"{'mode':<8} {'requests':>9} {'server time':>12} {'response bytes':>15}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['requests']:9.1f} {r['server_s'] * 1000:9.2f} ms {r['bytes']:15.0f}")
+    b = results['bundle']
+    print(f"bundle graph: {b['nodes']:.1f} nodes, {b['questions']:.1f} distinct questions answered per assessment")
+    print(f"server time per assessment: {results['online']['server_s'] / b['server_s']:.1f}x less with bundles")
+    print(json.dumps({'rows': args.rows, 'results': results}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# bench_desktop.py
+"""
+Responsiveness of the Tk desktop client (scripts/interactive_assessment.py).
+
+The app is started in a fresh interpreter on a synthetic compiled --rows bank and
+driven through --assessments assessments by `after()` callbacks: a random role, then
+a random option for every question. Reported: seconds from startup until a role can
+be picked, the time to render a question and to compute it (engine call, worker
+thread), and the longest gap between ticks of a 10 ms heartbeat on the Tk thread,
+i.e. the longest time the window could not redraw or respond.
+
+Needs a display; on a headless machine run it under xvfb-run.
+
+Usage:
+    python bench_desktop.py
+    xvfb-run python bench_desktop.py --rows 1000000 --assessments 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame
+
+# Executed in a child interpreter: start the app and drive it
+CHILD = r"""
+import json, random, sys, time
+sys.path.insert(0, sys.argv[1])
+import tkinter as tk
+import interactive_assessment as ia
+
+ia.bank_path = sys.argv[2]
+assessments = int(sys.argv[3])
+random.seed(0)
+root = tk.Tk()
+root.geometry("600x500")
+app = ia.AdaptiveApp(root)
+report = {'render_ms': [], 'engine_ms': [], 'heartbeat_ms': []}
+last = [time.perf_counter()]
+done = [0]
+
+def heartbeat():
+    now = time.perf_counter()
+    report['heartbeat_ms'].append((now - last[0]) * 1000)
+    last[0] = now
+    root.after(10, heartbeat)
+
+def drive():
+    if app.timings['interactive_s'] is not None and not app._busy:
+        if app._screen is app.start_frame:
+            app.role.set(random.choice(ia.bank.catalog.roles))
+            app.start_assessment()
+        elif app._screen is app.question_frame:
+            options = [b.cget('value') for b in app.option_buttons if b.winfo_manager()]
+            app.selected_option.set(random.choice(options))
+            app.check_and_get_next()
+        elif app._screen is app.result_frame:
+            report['render_ms'] += app.timings['render_ms']
+            report['engine_ms'] += app.timings['engine_ms']
+            done[0] += 1
+            if done[0] == assessments:
+                report['interactive_s'] = app.timings['interactive_s']
+                print(json.dumps(report))
+                app.close()
+                return
+            app.setup_start_ui()
+    root.after(5, drive)
+
+root.after(10, heartbeat)
+root.after(5, drive)
+root.mainloop()
+"""
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--assessments', type=int, default=20)
+    args = parser.parse_args()
+
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        sys.exit("bench_desktop.py needs a display; run it under xvfb-run.")
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    from bank_format import write_compiled_bank
+    with tempfile.TemporaryDirectory() as tmp:
+        bank_dir = os.path.join(tmp, 'bank.bank')
+        write_compiled_bank(make_bank_frame(args.rows), bank_dir)
+        out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, bank_dir, str(args.assessments)],
+                             check=True, capture_output=True, text=True).stdout
+    r = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{args.rows:,} questions, {args.assessments} assessments, {len(r['render_ms'])} questions shown")
+    print(f"interactive after startup: {r['interactive_s']:.2f} s")
+    for name in ('render_ms', 'engine_ms'):
+        print(f"{name[:-3]:<8} p50 {percentile(r[name], 0.5):6.2f} ms   p95 {percentile(r[name], 0.95):6.2f} ms   "
+              f"max {max(r[name], default=0.0):6.2f} ms")
+    print(f"longest Tk heartbeat gap (10 ms period): {max(r['heartbeat_ms'], default=0.0):.1f} ms")
+    print(json.dumps({'rows': args.rows, 'assessments': args.assessments, 'interactive_s': r['interactive_s'],
+                      **{f'{name}_p95': percentile(r[name], 0.95) for name in ('render_ms', 'engine_ms')},
+                      'max_heartbeat_gap_ms': max(r['heartbeat_ms'], default=0.0)}))
+
+
+if __name__ == '__main__':
+    main()
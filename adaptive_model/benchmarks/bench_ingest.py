@@ -0,0 +1,121 @@
+# bench_ingest.py
+"""
+Throughput, memory and duplicate detection of bank ingestion (scripts/ingest_bank.py).
+
+A synthetic CSV bank of --rows questions is generated: every question of
+data/assessment_data.csv with a unique tail of random words, plus injected rows:
+
+    exact     an earlier question re-cased and re-spaced
+    near      an earlier question with one character of its tail changed
+    invalid   an Answer that is not among the Options
+
+Ingestion runs in a fresh interpreter per --workers value. Reported: rows/s, peak RSS
+of the main process, and how many injected rows were dropped with the expected reason
+(recall) next to how many unique questions were dropped (false positives).
+
+Usage:
+    python bench_ingest.py
+    python bench_ingest.py --rows 2000000 --workers 1 4 8
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from synthetic_bank import DEFAULT_CSV, SCRIPTS_DIR
+
+# Executed in a child interpreter: ingest the bank, report timing and dropped rows
+CHILD = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+import ingest_bank
+from synthetic_bank import peak_rss_mb
+
+source, out, rejects, workers = sys.argv[3], sys.argv[4], sys.argv[5], int(sys.argv[6])
+report = ingest_bank.ingest([source], out, workers=workers, rejects_path=rejects)
+print(json.dumps({**report, 'peak_rss_mb': peak_rss_mb()}))
+"""
+
+
+def make_ingest_frame(rows: int, duplicate_share: float, seed: int = 0) -> tuple[pd.DataFrame, dict]:
+    """Synthetic bank with injected exact/near duplicates and invalid rows; (frame, row -> injected kind)."""
+    rng = random.Random(seed)
+    base = pd.read_csv(DEFAULT_CSV, quotechar='"')
+    base = base[base['Difficulty_Level'] <= 3].reset_index(drop=True)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 8))) for _ in range(5000)]
+
+    records, originals, injected = [], [], {}
+    for i in range(rows):
+        roll = rng.random()
+        # Duplicates copy unique, valid questions, so each injected row has one expected reason
+        if originals and roll < duplicate_share:
+            record = dict(rng.choice(originals))
+            record['Question'] = '  ' + record['Question'].upper().replace(' ', '   ')
+            injected[i + 1] = 'duplicate'
+        elif originals and roll < 2 * duplicate_share:
+            record = dict(rng.choice(originals))
+            question = record['Question']
+            at = rng.randrange(len(question) - 12, len(question) - 1)
+            record['Question'] = question[:at] + ('x' if question[at] != 'x' else 'y') + question[at + 1:]
+            injected[i + 1] = 'near_duplicate'
+        else:
+            record = base.iloc[rng.randrange(len(base))].to_dict()
+            record['Question'] = f"{record['Question']} ({' '.join(rng.choices(words, k=6))})"
+            if roll < 2.5 * duplicate_share:
+                record['Answer'] = 'not an option'
+                injected[i + 1] = 'answer_not_in_options'
+            else:
+                originals.append(record)
+        records.append(record)
+    return pd.DataFrame(records), injected
+
+
+def run_child(source: str, out: str, rejects: str, workers: int) -> dict:
+    out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, os.path.dirname(os.path.abspath(__file__)),
+                          source, out, rejects, str(workers)], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--duplicate-share', type=float, default=0.02, help="share of exact and of near duplicates")
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'bank.csv')
+        frame, injected = make_ingest_frame(args.rows, args.duplicate_share)
+        frame.to_csv(source, index=False)
+        expected = pd.Series(injected).value_counts().to_dict()
+        print(f"{args.rows:,} rows, {os.path.getsize(source) / 1e6:.1f} MB; injected: "
+              + ", ".join(f"{kind} {n:,}" for kind, n in expected.items()))
+
+        print(f"{'workers':>7} {'rows/s':>10} {'peak RSS':>10}")
+        for workers in args.workers:
+            rejects = os.path.join(tmp, f'rejects-{workers}.csv')
+            r = run_child(source, os.path.join(tmp, 'bank.bank'), rejects, workers)
+            report[workers] = r
+            print(f"{workers:7d} {r['rows'] / r['seconds']:10,.0f} {r['peak_rss_mb']:7.0f} MB")
+
+        dropped = pd.read_csv(rejects)
+        caught = dropped['reason'].to_numpy() == dropped['row'].map(injected).to_numpy()
+        false_positives = int((~dropped['row'].isin(list(injected))).sum())
+        detection = {kind: float(caught[dropped['row'].map(injected).to_numpy() == kind].sum() / n)
+                     for kind, n in expected.items()}
+        print("detected: " + ", ".join(f"{kind} {share:.1%}" for kind, share in detection.items())
+              + f"; unique questions dropped: {false_positives:,}")
+
+    print(json.dumps({'rows': args.rows, 'injected': expected, 'detection': detection,
+                      'false_positives': false_positives, 'results': report}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# bench_metrics.py
+"""
+Overhead of the timing metrics (scripts/metrics.py).
+
+Micro: cost of one span (`with series.time(): pass`) with a pre-bound series, through
+`labels(...)` on every call, and with METRICS_ENABLED=0, net of an empty `with` loop;
+also one `render()` of a populated registry.
+
+Engine: complete rule-mode assessments on a synthetic bank, run in fresh interpreters
+with METRICS_ENABLED=1 and 0. The difference per question is the instrumentation cost of
+the selection and score-update spans on the real hot path.
+
+Usage:
+    python bench_metrics.py
+    python bench_metrics.py --rows 100000 --assessments 20000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from synthetic_bank import SCRIPTS_DIR
+
+# Executed in a child interpreter: span micro-benchmarks and an engine run
+CHILD = r"""
+import json, random, sys, time
+sys.path.insert(0, sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+import metrics
+from adaptive_logic import AdaptiveEngine, EngineParameters
+from synthetic_bank import make_bank_frame
+
+rows, assessments, n = int(sys.argv[3]), int(sys.argv[4]), 1_000_000
+
+class Empty:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+def per_call_ns(make):
+    t = time.perf_counter_ns()
+    for _ in range(n):
+        with make():
+            pass
+    return (time.perf_counter_ns() - t) / n
+
+hist = metrics.Histogram('bench_seconds', 'Benchmark spans.', ('engine',))
+series = hist.labels('rule')
+empty = Empty()
+baseline = per_call_ns(lambda: empty)
+result = {
+    'bound_ns': per_call_ns(series.time) - baseline,
+    'labels_ns': per_call_ns(lambda: hist.time('rule')) - baseline,
+}
+t = time.perf_counter()
+body = metrics.render()
+result['render_ms'] = (time.perf_counter() - t) * 1000
+
+engine = AdaptiveEngine(make_bank_frame(rows), EngineParameters())
+roles = engine.bank.roles
+random.seed(0)
+questions = 0
+t = time.perf_counter()
+for _ in range(assessments):
+    state, question = engine.start_session(random.choice(roles))
+    score = 0.0
+    while question is not None:
+        questions += 1
+        question, score = engine.advance(state, question['Q_ID'], random.random() < 0.6, score)
+result['engine_us_per_question'] = (time.perf_counter() - t) / questions * 1e6
+print(json.dumps(result))
+"""
+
+
+def run_child(enabled: bool, rows: int, assessments: int) -> dict:
+    env = dict(os.environ, METRICS_ENABLED='1' if enabled else '0')
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, bench_dir, str(rows), str(assessments)],
+                         check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--assessments', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    runs = {}
+    for enabled in (True, False):
+        results = [run_child(enabled, args.rows, args.assessments) for _ in range(args.repeat)]
+        runs[enabled] = {key: min(r[key] for r in results) for key in results[0]}
+
+    on, off = runs[True], runs[False]
+    print(f"span, bound series        {on['bound_ns']:8.0f} ns")
+    print(f"span, labels() per call   {on['labels_ns']:8.0f} ns")
+    print(f"span, METRICS_ENABLED=0   {off['bound_ns']:8.0f} ns")
+    print(f"render()                  {on['render_ms']:8.2f} ms")
+    overhead = on['engine_us_per_question'] - off['engine_us_per_question']
+    print(f"engine, per question      {off['engine_us_per_question']:8.2f} us without metrics, "
+          f"{on['engine_us_per_question']:.2f} us with ({overhead:+.2f} us for 2 spans)")
+    print(json.dumps({'enabled': on, 'disabled': off}))
+
+
+if __name__ == '__main__':
+    main()
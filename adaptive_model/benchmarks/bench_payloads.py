@@ -0,0 +1,111 @@
+# bench_payloads.py
+"""
+Per-response cost of building the session endpoints' question responses.
+
+    dict     the previous path: question_at() dict, client payload dict (Options split,
+             int casts), envelope dict, json.dumps
+    cached   the serialized fragment cached per bank (scripts/payloads.py) spliced into
+             the envelope
+Each is measured bare (the service's share of a response) and as a Flask response
+(jsonify(dict) vs Response(bytes)). Reported per response: CPU time and the peak
+transient memory allocated while building it (tracemalloc). Fragments are warmed
+first; the one-time cost of serializing a fragment is reported separately.
+
+Usage:
+    python bench_payloads.py
+    python bench_payloads.py --rows 1000000 --responses 200000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame
+
+sys.path.insert(0, SCRIPTS_DIR)
+from flask import Flask, Response, jsonify  # noqa: E402
+
+import payloads  # noqa: E402
+from question_bank import QuestionBank  # noqa: E402
+
+
+def dict_body(bank, session_id: str, pos: int) -> dict:
+    question = bank.question_at(pos)
+    return {
+        "session_id": session_id,
+        "question": {
+            "Q_ID": int(question['Q_ID']),
+            "Question": question['Question'],
+            "Options": question['Options'].split(';'),
+            "Difficulty": int(question['Difficulty'])
+        }
+    }
+
+
+def per_response_us(build, args: list) -> float:
+    t = time.perf_counter()
+    for a in args:
+        build(*a)
+    return (time.perf_counter() - t) / len(args) * 1e6
+
+
+def peak_alloc_bytes(build, args: list) -> float:
+    """Mean peak memory allocated while building one response."""
+    total = 0
+    tracemalloc.start()
+    for a in args:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        build(*a)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--responses', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    bank = QuestionBank(make_bank_frame(args.rows))
+    random.seed(0)
+    sample = [(str(uuid.uuid4()), random.randrange(len(bank))) for _ in range(args.responses)]
+    cache = bank.payloads
+    t = time.perf_counter()
+    for _, pos in sample:
+        cache.fragment(pos)
+    first_us = (time.perf_counter() - t) / len(cache) * 1e6
+    fragment_bytes = sum(map(len, cache._fragments.values())) / len(cache)
+
+    app = Flask(__name__)
+    builds = {
+        'dict': lambda sid, pos: json.dumps(dict_body(bank, sid, pos)).encode('utf-8'),
+        'cached': cache.start_body,
+        'dict+flask': lambda sid, pos: jsonify(dict_body(bank, sid, pos)),
+        'cached+flask': lambda sid, pos: Response(cache.start_body(sid, pos), mimetype='application/json'),
+    }
+    encoder = 'orjson' if payloads.orjson is not None else 'json'
+    print(f"{args.rows:,} questions, {len(cache):,} distinct fragments of {fragment_bytes:.0f} bytes "
+          f"(first serialization {first_us:.2f} us, encoder: {encoder})")
+    print(f"{'path':<14} {'CPU/response':>13} {'peak alloc':>11}")
+    results = {}
+    alloc_sample = sample[:min(len(sample), 20_000)]
+    with app.app_context():
+        for name, build in builds.items():
+            us = min(per_response_us(build, sample) for _ in range(args.repeat))
+            alloc = peak_alloc_bytes(build, alloc_sample)
+            results[name] = {'us': us, 'peak_alloc_bytes': alloc}
+            print(f"{name:<14} {us:10.2f} us {alloc:9.0f} B")
+    for base, fast in (('dict', 'cached'), ('dict+flask', 'cached+flask')):
+        print(f"{fast} vs {base}: {results[base]['us'] / results[fast]['us']:.1f}x less CPU, "
+              f"{results[base]['peak_alloc_bytes'] / max(results[fast]['peak_alloc_bytes'], 1):.1f}x less allocated")
+    print(json.dumps({'rows': args.rows, 'encoder': encoder, 'results': results}))
+
+
+if __name__ == '__main__':
+    main()
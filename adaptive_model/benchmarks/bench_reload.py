@@ -0,0 +1,125 @@
+# bench_reload.py
+"""
+Hot-reload benchmark: reload duration, memory overhead and request latency during reloads.
+
+A synthetic bank is compiled into a temporary directory and served by an
+AssessmentService. Worker threads run complete assessments through the service while
+the main thread recompiles the bank (alternating between two contents) and reloads it.
+The report lists each reload's duration and RSS growth, request latency percentiles
+and the number of failed requests, which must stay 0: sessions started before a reload
+finish on the version they started on.
+
+Usage:
+    python bench_reload.py                        # 100k questions, 3 reloads
+    python bench_reload.py --rows 1000000 --reloads 5 --threads 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame, peak_rss_mb
+
+
+def drive(service, roles: list, stop: threading.Event, latencies: list, failures: list) -> None:
+    """Runs complete assessments until `stop` is set, recording per-request latency."""
+    while not stop.is_set():
+        t = time.perf_counter_ns()
+        body, status = service.start_assessment({'role': random.choice(roles)})
+        latencies.append(time.perf_counter_ns() - t)
+        if status != 200:
+            failures.append((status, body))
+            continue
+        session_id, question = body['session_id'], body['question']
+        while True:
+            t = time.perf_counter_ns()
+            body, status = service.submit_answer({
+                'session_id': session_id, 'q_id': question['Q_ID'], 'is_correct': random.random() < 0.6
+            })
+            latencies.append(time.perf_counter_ns() - t)
+            if status != 200:
+                failures.append((status, body))
+                break
+            if body['status'] != 'in_progress':
+                break
+            question = body['question']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--roles', type=int, default=60)
+    parser.add_argument('--reloads', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    import assessment_service
+    from bank_format import write_compiled_bank
+
+    random.seed(0)
+    frame = make_bank_frame(args.rows, roles=args.roles)
+    # Two alternating bank contents, so every reload publishes a new version
+    variants = [frame, frame.assign(Question=frame['Question'] + ' (v2)')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bank_dir = os.path.join(tmp, 'bench.bank')
+        write_compiled_bank(variants[0], bank_dir)
+        assessment_service.bank_path = bank_dir
+        assessment_service.SESSION_STORE_URL = 'memory://'
+
+        service = assessment_service.AssessmentService.create()
+        roles = service.bank.catalog.roles
+
+        stop = threading.Event()
+        latencies, failures = [], []
+        workers = [threading.Thread(target=drive, args=(service, roles, stop, latencies, failures))
+                   for _ in range(args.threads)]
+        for worker in workers:
+            worker.start()
+
+        reports = []
+        for i in range(args.reloads):
+            time.sleep(1.0)
+            write_compiled_bank(variants[(i + 1) % 2], bank_dir)
+            reports.append(service.registry.reload())
+        time.sleep(1.0)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        service.close()
+
+    lat_us = np.asarray(latencies, dtype=np.float64) / 1000.0
+    p50, p99, worst = np.percentile(lat_us, [50, 99, 100])
+    result = {
+        'rows': args.rows,
+        'requests': len(lat_us),
+        'failed_requests': len(failures),
+        'p50_us': float(p50),
+        'p99_us': float(p99),
+        'max_us': float(worst),
+        'reloads': [{k: r[k] for k in ('status', 'version', 'reload_seconds', 'memory_overhead_mb',
+                                       'active_versions')} for r in reports],
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    print(f"\n{args.rows:,} questions, {args.threads} threads, {len(lat_us):,} requests, "
+          f"{len(failures)} failed")
+    print(f"latency  p50 {p50:8.1f} us   p99 {p99:8.1f} us   max {worst:10.1f} us")
+    for r in result['reloads']:
+        print(f"reload   {r['status']:<9} {r['reload_seconds']:6.2f} s   +{r['memory_overhead_mb']} MB RSS   "
+              f"{len(r['active_versions'])} version(s) active")
+    print(json.dumps(result))
+    if failures:
+        print(f"first failure: {failures[0]}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# bench_speculation.py
+"""
+Submit latency with and without speculative next-question precomputation
+(scripts/speculation.py, SPECULATE_NEXT=1).
+
+Complete assessments are driven through AssessmentService on a synthetic bank, with
+--think-ms of simulated reading time between receiving a question and answering it.
+Each engine mode runs in a fresh interpreter with SPECULATE_NEXT=0 and 1; reported are
+the p50/p95/p99 latency of /submit_answer and, with speculation, the hit rate and the
+mean score update and selection time taken off each hit.
+
+Usage:
+    python bench_speculation.py
+    python bench_speculation.py --rows 1000000 --assessments 500 --think-ms 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame
+
+# Executed in a child interpreter: drive assessments through the service
+CHILD = r"""
+import json, random, sys, time
+import numpy as np
+sys.path.insert(0, sys.argv[1])
+import assessment_service
+import metrics
+
+assessment_service.data_path = assessment_service.bank_path = sys.argv[2]
+assessments, think_s = int(sys.argv[3]), float(sys.argv[4]) / 1000
+service = assessment_service.AssessmentService.create()
+roles = service.bank.roles
+random.seed(0)
+latencies = []
+for _ in range(assessments):
+    body, _ = service.start_assessment({'role': random.choice(roles)})
+    session_id = body['session_id']
+    while body.get('question'):
+        time.sleep(think_s)
+        payload = {'session_id': session_id, 'q_id': body['question']['Q_ID'], 'is_correct': random.random() < 0.6}
+        t = time.perf_counter_ns()
+        body, _ = service.submit_answer(payload)
+        latencies.append(time.perf_counter_ns() - t)
+service.close()
+
+p50, p95, p99 = np.percentile(np.asarray(latencies) / 1000.0, [50, 95, 99])
+results = {r: metrics.SPECULATIONS.labels(r).value for r in ('hit', 'wait', 'miss')}
+saved = metrics.SPECULATION_SAVED_SECONDS.labels()
+print(json.dumps({'submits': len(latencies), 'p50_us': p50, 'p95_us': p95, 'p99_us': p99, **results,
+                  'saved_us': saved.sum / max(sum(saved.counts), 1) * 1e6}))
+"""
+
+
+def run_child(bank: str, mode: str, speculate: bool, assessments: int, think_ms: float) -> dict:
+    env = dict(os.environ, ENGINE_MODE=mode, SPECULATE_NEXT='1' if speculate else '0')
+    out = subprocess.run([sys.executable, '-c', CHILD, SCRIPTS_DIR, bank, str(assessments), str(think_ms)],
+                         check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--assessments', type=int, default=300)
+    parser.add_argument('--think-ms', type=float, default=2.0, help="simulated reading time per question")
+    parser.add_argument('--modes', nargs='+', default=['rule', 'irt'])
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    from bank_format import compile_csv
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'bank.csv')
+        make_bank_frame(args.rows).to_csv(csv_path, index=False)
+        bank_dir = os.path.join(tmp, 'bank.bank')
+        compile_csv(csv_path, bank_dir)
+
+        print(f"{'mode':<5} {'speculation':<12} {'p50':>9} {'p95':>9} {'p99':>9}   hit rate   saved/hit")
+        for mode in args.modes:
+            for speculate in (False, True):
+                r = run_child(bank_dir, mode, speculate, args.assessments, args.think_ms)
+                report[f"{mode}-{'on' if speculate else 'off'}"] = r
+                line = (f"{mode:<5} {'on' if speculate else 'off':<12} {r['p50_us']:7.1f}us {r['p95_us']:7.1f}us "
+                        f"{r['p99_us']:7.1f}us")
+                if speculate:
+                    line += f"   {r['hit'] / max(r['submits'], 1):7.1%}   {r['saved_us']:7.1f}us"
+                print(line)
+
+    print(json.dumps({'rows': args.rows, 'think_ms': args.think_ms, 'results': report}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# bench_startup.py
+"""
+Startup benchmark: import time of the entry points, service boot time, and memory of
+preforked workers.
+
+Imports: each entry module is imported in a fresh interpreter; reported per module are
+the import time and which heavy packages (pandas, sklearn, flask) it pulled in.
+
+Boot: AssessmentService.create() on a synthetic --rows bank, from the CSV and from the
+compiled bank, each in a fresh interpreter.
+
+Prefork: a master forks --workers workers that each create their service and serve
+--assessments assessments, then report their boot time and memory from
+/proc/self/smaps_rollup. Run twice: with the master preloading the artifacts
+(assessment_service.preload(), as gunicorn.conf.py does) and with every worker loading
+its own. Pss is proportional set size (shared pages split between the processes sharing
+them); the sum of Pss over master and workers is the memory the server really uses.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --rows 1000000 --workers 8
+    python bench_startup.py --check          # fail if an entry point imports pandas/sklearn
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic_bank import SCRIPTS_DIR, make_bank_frame
+
+ENTRY_MODULES = ('scripts', 'api_model', 'asgi_app', 'assessment_service', 'simulate', 'train', 'bulk_score',
+                 'results_report')
+HEAVY_PACKAGES = ('pandas', 'sklearn', 'flask')
+# Entry points that serve requests; --check fails if one of these imports pandas or sklearn
+SERVING_MODULES = ('scripts', 'api_model', 'asgi_app', 'assessment_service')
+
+# Executed in a child interpreter: import one module
+IMPORT_CHILD = r"""
+import importlib, json, sys, time
+scripts_dir, name = sys.argv[1], sys.argv[2]
+sys.path.insert(0, scripts_dir)
+sys.path.insert(0, scripts_dir + '/..')
+t = time.perf_counter()
+importlib.import_module(name)
+elapsed = time.perf_counter() - t
+print(json.dumps({'import_ms': elapsed * 1000, 'loaded': [p for p in sys.argv[3:] if p in sys.modules]}))
+"""
+
+# Executed in a child interpreter: import the service and boot it on the given bank
+BOOT_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import assessment_service
+t_import = time.perf_counter()
+assessment_service.data_path = assessment_service.bank_path = sys.argv[2]
+service = assessment_service.AssessmentService.create()
+t_boot = time.perf_counter()
+service.close()
+print(json.dumps({'import_s': t_import - t0, 'create_s': t_boot - t_import}))
+"""
+
+# Executed in a child interpreter: the master of a preforking server
+PREFORK_CHILD = r"""
+import json, os, random, sys, time
+sys.path.insert(0, sys.argv[1])
+import assessment_service
+
+def memory_kb():
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+assessment_service.data_path = assessment_service.bank_path = sys.argv[2]
+preload, workers, assessments = sys.argv[3] == '1', int(sys.argv[4]), int(sys.argv[5])
+t = time.perf_counter()
+if preload:
+    assessment_service.preload()
+preload_s = time.perf_counter() - t
+
+children = []
+for i in range(workers):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            random.seed(i)
+            t = time.perf_counter()
+            service = assessment_service.AssessmentService.create()
+            create_s = time.perf_counter() - t
+            roles = service.bank.roles
+            for _ in range(assessments):
+                body, _ = service.start_assessment({'role': random.choice(roles)})
+                session_id = body['session_id']
+                while body.get('question'):
+                    body, _ = service.submit_answer({'session_id': session_id,
+                                                     'q_id': body['question']['Q_ID'],
+                                                     'is_correct': random.random() < 0.6})
+            os.write(write_fd, json.dumps(dict(memory_kb(), create_s=create_s)).encode())
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    children.append((pid, read_fd))
+
+reports = []
+for pid, read_fd in children:
+    with os.fdopen(read_fd) as f:
+        reports.append(json.loads(f.read()))
+    os.waitpid(pid, 0)
+print(json.dumps({'preload_s': preload_s, 'master': memory_kb(), 'workers': reports}))
+"""
+
+
+def run(code: str, *args) -> dict:
+    out = subprocess.run([sys.executable, '-c', code, SCRIPTS_DIR, *map(str, args)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench_imports(repeat: int) -> dict:
+    results = {}
+    for name in ENTRY_MODULES:
+        runs = [run(IMPORT_CHILD, name, *HEAVY_PACKAGES) for _ in range(repeat)]
+        results[name] = {'import_ms': min(r['import_ms'] for r in runs), 'loaded': runs[0]['loaded']}
+    return results
+
+
+def bench_prefork(bank: str, preload: bool, workers: int, assessments: int) -> dict:
+    result = run(PREFORK_CHILD, bank, int(preload), workers, assessments)
+    reports = result['workers']
+    return {
+        'preload_s': result['preload_s'],
+        'worker_create_s': max(r['create_s'] for r in reports),
+        'worker_private_mb': sum(r['Private_Clean'] + r['Private_Dirty'] for r in reports) / len(reports) / 1024,
+        'worker_pss_mb': sum(r['Pss'] for r in reports) / len(reports) / 1024,
+        'total_pss_mb': (result['master']['Pss'] + sum(r['Pss'] for r in reports)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--assessments', type=int, default=50, help="assessments served by each worker")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true',
+                        help="Exit non-zero if a serving entry point imports pandas or sklearn.")
+    args = parser.parse_args()
+
+    imports = bench_imports(args.repeat)
+    print(f"{'module':<20} {'import':>9}  heavy packages loaded")
+    for name, r in imports.items():
+        print(f"{name:<20} {r['import_ms']:7.1f}ms  {', '.join(r['loaded']) or '-'}")
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    from bank_format import compile_csv
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'bank.csv')
+        make_bank_frame(args.rows).to_csv(csv_path, index=False)
+        bank_dir = os.path.join(tmp, 'bank.bank')
+        compile_csv(csv_path, bank_dir)
+
+        print(f"\nBoot, {args.rows:,} questions")
+        boot = {}
+        for label, source in (('csv', csv_path), ('compiled', bank_dir)):
+            runs = [run(BOOT_CHILD, source) for _ in range(args.repeat)]
+            boot[label] = {key: min(r[key] for r in runs) for key in runs[0]}
+            print(f"{label:<10} import {boot[label]['import_s'] * 1000:7.1f}ms   "
+                  f"create() {boot[label]['create_s'] * 1000:8.1f}ms")
+
+        print(f"\nPrefork, {args.workers} workers, compiled bank")
+        prefork = {}
+        for label, preload in (('preloaded', True), ('per-worker', False)):
+            r = prefork[label] = bench_prefork(bank_dir, preload, args.workers, args.assessments)
+            print(f"{label:<11} master load {r['preload_s'] * 1000:7.1f}ms   worker create() "
+                  f"{r['worker_create_s'] * 1000:7.1f}ms   private/worker {r['worker_private_mb']:6.1f}MB   "
+                  f"Pss/worker {r['worker_pss_mb']:6.1f}MB   total Pss {r['total_pss_mb']:7.1f}MB")
+
+    print(json.dumps({'rows': args.rows, 'imports': imports, 'boot': boot, 'prefork': prefork}))
+
+    if args.check:
+        offenders = [f"{name} imports {', '.join(p for p in r['loaded'] if p != 'flask')}"
+                     for name, r in imports.items()
+                     if name in SERVING_MODULES and set(r['loaded']) & {'pandas', 'sklearn'}]
+        if offenders:
+            print("Eager imports on the serving path:")
+            for line in offenders:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("No serving entry point imports pandas or sklearn.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# synthetic_bank.py
+"""Synthetic question banks for benchmarks, scaled up from data/assessment_data.csv."""
+import os
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BENCH_DIR, '..', 'scripts')
+DEFAULT_CSV = os.path.join(BENCH_DIR, '..', 'data', 'assessment_data.csv')
+
+
+def make_bank_frame(rows: int, roles: int = 60, csv_path: str = DEFAULT_CSV):
+    """
+    Replicates the bundled bank to `rows` questions spread over about `roles` roles.
+    Copies of each original role are renamed 'Role #k' and Q_IDs are unique.
+    """
+    df = pd.read_csv(csv_path, quotechar='"')
+    base_roles = df['Job_Role'].nunique()
+    role_copies = max(1, roles // base_roles)
+    copies = -(-rows // len(df))
+
+    frames = []
+    for i in range(copies):
+        part = df.copy()
+        part['Job_Role'] = part['Job_Role'] + f' #{i % role_copies}'
+        frames.append(part)
+    big = pd.concat(frames, ignore_index=True).iloc[:rows].copy()
+    big['Q_ID'] = range(len(big))
+    return big
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (VmHWM, which resets on exec)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
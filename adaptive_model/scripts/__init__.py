@@ -0,0 +1,49 @@
+# __init__.py
+"""
+HireLedger adaptive assessment package.
+
+The modules in this directory import each other as top-level siblings
+(`from adaptive_logic import ...`), so importing the package puts the directory on
+sys.path. Public names are resolved lazily (PEP 562): `import scripts` costs nothing,
+and `scripts.AdaptiveEngine` imports only the module that defines it, on first access.
+Each name is the same object as in its defining module (`adaptive_logic.AdaptiveEngine`).
+"""
+import importlib
+import os
+import sys
+
+_scripts_dir = os.path.dirname(os.path.abspath(__file__))
+if _scripts_dir not in sys.path:
+    sys.path.append(_scripts_dir)
+
+# Public name -> defining sibling module
+_EXPORTS = {
+    'AdaptiveEngine': 'adaptive_logic',
+    'EngineParameters': 'adaptive_logic',
+    'SessionState': 'adaptive_logic',
+    'StoppingRules': 'adaptive_logic',
+    'IRTAdaptiveEngine': 'irt_engine',
+    'ExposureControl': 'exposure_control',
+    'QuestionBank': 'question_bank',
+    'JobFitPredictor': 'jobfit_predictor',
+    'PredictionBatcher': 'prediction_batcher',
+    'Speculator': 'speculation',
+    'AssessmentService': 'assessment_service',
+    'create_session_store': 'session_store',
+    'create_results_sink': 'results_sink',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,2 +0,0 @@
-from scripts.adaptive_logic import AdaptiveEngine
-from scripts.jobfit_predictor import JobFitPredictor
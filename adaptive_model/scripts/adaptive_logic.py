@@ -1,97 +1,341 @@
 # adaptive_logic.py
-import pandas as pd
+import copy
 import random
 import os
 import pickle
 import math
+import threading
+import time
+from bisect import bisect_right
 
-class AdaptiveEngine:
-    """
-    Core logic for Adaptive Skill Assessment Model (Model-Driven CAT).
+from artifact_format import open_artifact
+from exposure_control import ExposureControl
+from metrics import NULL_SERIES, QUESTION_SELECTION_SECONDS, SCORE_UPDATE_SECONDS
+from question_bank import QuestionBank
 
-    Loads parameters from 'adaptive_engine.pkl' to drive question selection and scoring.
+
+class EngineParameters:
     """
+    Adaptive parameters loaded from 'adaptive_engine.artifact' (written by train.py) or the
+    legacy 'adaptive_engine.pkl'.
 
-    MODEL_FILE_NAME = 'adaptive_engine.pkl'
-    MIN_DIFFICULTY = 1
-    MAX_DIFFICULTY = 3  # Hard cap set to 3 to match current dataset
+    Loaded once per process (see `load_engine_parameters`) and shared read-only by all sessions.
+    """
 
-    def __init__(self, df):
+    def __init__(self, model_data: dict | None = None):
+        model_data = model_data if isinstance(model_data, dict) else {}
 
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(script_dir, self.MODEL_FILE_NAME)
+        self.max_questions = model_data.get('max_questions', 10)
+        self.item_parameters = model_data.get('item_parameters', None)
+        self.initial_ability = model_data.get('initial_ability', 0.0)
 
-        # --- Initialize model_data safely ---
+    @classmethod
+    def load(cls, model_path: str) -> "EngineParameters":
+        """Loads the parameter file, falling back to rule-based defaults on failure."""
         model_data = None
+        model_file = os.path.basename(model_path)
 
-        # --- 1. Load the Trained Model/Parameters ---
         try:
-            with open(model_path, 'rb') as f:
-                model_data = pickle.load(f)
-            print(f"INFO: Adaptive parameters loaded successfully from {self.MODEL_FILE_NAME}")
+            if model_path.endswith('.artifact'):
+                model_data = cls.read_artifact(model_path)
+            else:
+                with open(model_path, 'rb') as f:
+                    model_data = pickle.load(f)
+            print(f"INFO: Adaptive parameters loaded successfully from {model_file}")
 
         except FileNotFoundError:
-            print(f"WARNING: Model file {self.MODEL_FILE_NAME} not found. Using rule-based defaults.")
+            print(f"WARNING: Model file {model_file} not found. Using rule-based defaults.")
 
         except Exception as e:
             print(f"ERROR: Failed to load/unpickle model file. Error: {e}. Using rule-based defaults.")
 
-        # --- 2. Use Loaded Data or Fallback to Defaults ---
-        model_data = model_data if isinstance(model_data, dict) else {}
+        return cls(model_data)
 
-        self.MAX_QUESTIONS = model_data.get('max_questions', 10)
-        self.ITEM_PARAMETERS = model_data.get('item_parameters', None)
-        self.INITIAL_ABILITY = model_data.get('initial_ability', 0.0)
-        self.ability_score = self.INITIAL_ABILITY
+    @staticmethod
+    def read_artifact(model_path: str, verify: bool = False) -> dict:
+        """
+        Opens the trained parameter artifact. Item parameters stay columnar (Q_ID, a, b, c)
+        memory-mapped views, read from disk only when the IRT engine first uses them.
+        """
+        artifact = open_artifact(model_path, kind=AdaptiveEngine.PARAMETERS_KIND, verify=verify)
+        model_data = {'item_parameters': {name: artifact[name] for name in ('Q_ID', 'a', 'b', 'c')}}
+        model_data.update(artifact.metadata)
+        return model_data
 
-        if 'Q_ID' not in df.columns:
-            df['Q_ID'] = df.index
 
-        # --- Determine difficulty column dynamically ---
-        if 'Difficulty_Level' in df.columns:
-            self.difficulty_col = 'Difficulty_Level'
-        elif 'Difficulty' in df.columns:
-            self.difficulty_col = 'Difficulty'
-        else:
-            raise ValueError("Dataset must have either 'Difficulty' or 'Difficulty_Level' column.")
+def engine_parameters_path(directory: str) -> str:
+    """The parameter file in `directory`: the trained artifact when present, else the legacy pickle."""
+    trained_path = os.path.join(directory, AdaptiveEngine.TRAINED_FILE_NAME)
+    if os.path.exists(trained_path):
+        return trained_path
+    return os.path.join(directory, AdaptiveEngine.MODEL_FILE_NAME)
 
-        self.df = df
-        self.administered_q_ids = set()
-        self.current_difficulty = self.MIN_DIFFICULTY + 2
-        self.q_count = 0
-        self.role_filter = None
 
-    # --- Public Methods ---
-    def get_initial_question(self, role: str) -> dict | None:
-        """Initializes state and returns the first question."""
-        self.administered_q_ids = set()
-        self.current_difficulty = self.MIN_DIFFICULTY + 2
+class StoppingRules:
+    """
+    Early-stopping rules: a session ends before MAX_QUESTIONS as soon as any enabled rule
+    holds, once at least `min_items` questions were answered.
+
+        se_threshold      ability standard error is at most this (IRT mode)
+        delta_threshold   the last answer moved the ability by less than this (IRT mode)
+        skill_cutpoints   SkillScores at which the job-fit category changes (see
+                          JobFitPredictor.skill_cutpoints); stop once the category is
+                          decided with probability >= `confidence`. The rule-based engine
+                          stops only when the raw-score bounds make it certain.
+    """
+
+    def __init__(self, min_items: int = 3, se_threshold: float | None = None, delta_threshold: float | None = None,
+                 skill_cutpoints: list | None = None, confidence: float = 0.95):
+        self.min_items = min_items
+        self.se_threshold = se_threshold
+        self.delta_threshold = delta_threshold
+        self.skill_cutpoints = skill_cutpoints
+        self.confidence = confidence
+
+
+_parameters_cache = {}
+_parameters_lock = threading.Lock()
+
+
+def load_engine_parameters(model_path: str | None = None) -> EngineParameters:
+    """Returns the process-wide EngineParameters for `model_path`, loading them on first use."""
+    if model_path is None:
+        model_path = engine_parameters_path(os.path.dirname(os.path.abspath(__file__)))
+
+    params = _parameters_cache.get(model_path)
+    if params is None:
+        with _parameters_lock:
+            params = _parameters_cache.get(model_path)
+            if params is None:
+                params = EngineParameters.load(model_path)
+                _parameters_cache[model_path] = params
+    return params
+
+
+class SessionState:
+    """
+    Minimal mutable state of a single assessment session.
+
+    `administered` holds bank row positions already asked; `taken` counts how many of
+    them fall in each of the role's difficulty buckets ("remaining" tracking).
+    `responses` lists the answered (position, is_correct) pairs in order; `se` is the
+    standard error of `ability` when the engine estimates one, and `posterior` an
+    engine-private cache for updating it (never persisted). `version` names the
+    artifact version the session started on, when the caller tracks one.
+    """
+
+    __slots__ = ('role', 'administered', 'taken', 'difficulty', 'ability', 'se', 'q_count', 'raw_score',
+                 'responses', 'posterior', 'version')
+
+    def __init__(self, role: str, difficulty: int, ability: float = 0.0):
+        self.role = role
+        self.administered = set()
+        self.taken = {}
+        self.difficulty = difficulty
+        self.ability = ability
         self.q_count = 0
-        self.role_filter = role
+        self.raw_score = 0.0
+        self.responses = []
+        self.se = None
+        self.posterior = None
+        self.version = None
+
+    def copy(self) -> "SessionState":
+        """Independent copy (the posterior cache is replaced, never mutated, so it is shared)."""
+        clone = SessionState.__new__(SessionState)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.administered = set(self.administered)
+        clone.taken = dict(self.taken)
+        clone.responses = list(self.responses)
+        return clone
 
-        return self._select_next_question()
 
-    def update_and_get_next(self, q_id: int, is_correct: bool, current_score: float) -> tuple[dict | None, float]:
-        """Updates score, adjusts difficulty, and selects the next question."""
-        self.q_count += 1
-        self.administered_q_ids.add(q_id)
+class AdaptiveEngine:
+    """
+    Core logic for Adaptive Skill Assessment Model (Model-Driven CAT).
+
+    Loads parameters from 'adaptive_engine.artifact' or 'adaptive_engine.pkl' to drive question selection and scoring.
+    The engine itself only holds shared read-only data (QuestionBank, EngineParameters);
+    everything that changes during an assessment lives in a SessionState, so a single
+    engine can serve any number of concurrent sessions.
+    """
+
+    MODEL_FILE_NAME = 'adaptive_engine.pkl'
+    TRAINED_FILE_NAME = 'adaptive_engine.artifact'
+    PARAMETERS_KIND = 'engine.item_parameters'
+    MIN_DIFFICULTY = 1
+    MAX_DIFFICULTY = 3  # Hard cap set to 3 to match current dataset
+    # ENGINE_MODE name, used as the `engine` label of the timing metrics
+    MODE = 'rule'
+
+    def __init__(self, bank, params: EngineParameters | None = None, stopping: StoppingRules | None = None,
+                 exposure: ExposureControl | None = None):
+        # Accept a raw DataFrame for backwards compatibility with older callers
+        self.bank = bank if isinstance(bank, QuestionBank) else QuestionBank(bank)
+        self.params = params if params is not None else load_engine_parameters()
+        self.stopping = stopping
+        # Exposure control and content balancing (see exposure_control.py); None draws uniformly
+        self.exposure = exposure
+        self._selection_time = QUESTION_SELECTION_SECONDS.labels(self.MODE)
+        self._update_time = SCORE_UPDATE_SECONDS.labels(self.MODE)
+
+        self.MAX_QUESTIONS = self.params.max_questions
+        self.ITEM_PARAMETERS = self.params.item_parameters
+        self.INITIAL_ABILITY = self.params.initial_ability
+        self.difficulty_col = self.bank.difficulty_col
+
+        # State used by the single-session convenience methods below
+        self.state = None
+
+    # --- Session API ---
+    def start_session(self, role: str) -> tuple[SessionState, dict | None]:
+        """Creates a fresh session state for `role` and selects its first question."""
+        state, pos = self.start_position(role)
+        return state, self.commit_question(pos)
+
+    def start_position(self, role: str) -> tuple[SessionState, int | None]:
+        """`start_session` without serving the first question: returns its bank position."""
+        state = self._new_state(role)
+        if self.exposure is not None:
+            self.exposure.start_session(role)
+        with self._selection_time.time():
+            return state, self._select_next_position(state)
+
+    def advance(self, state: SessionState, q_id: int, is_correct: bool, current_score: float) -> tuple[dict | None, float]:
+        """Updates score, adjusts difficulty, and selects the next question for `state`."""
+        next_pos, new_score = self.advance_position(state, q_id, is_correct, current_score)
+        return self.commit_question(next_pos), new_score
+
+    def advance_position(self, state: SessionState, q_id: int, is_correct: bool,
+                         current_score: float) -> tuple[int | None, float]:
+        """
+        `advance` without serving the next question: returns its bank position (None when
+        the assessment is complete) and the new score. Records no exposure.
+        """
+        pos = self.bank.position(q_id)
+        if pos is None:
+            raise ValueError(f"Unknown Q_ID: {q_id}")
 
         # 1. Update Score
-        q_difficulty = self.df.loc[self.df['Q_ID'] == q_id, self.difficulty_col].iloc[0]
-        score_gain = 2 * q_difficulty if is_correct else 0
-        new_score = current_score + score_gain
+        previous_ability = self.record_response(state, pos, is_correct, current_score)
+        new_score = state.raw_score
 
         # 2. Check for assessment completion
-        if self.q_count >= self.MAX_QUESTIONS:
+        if state.q_count >= self.MAX_QUESTIONS:
+            return None, new_score
+        if self.stopping is not None and self.stop_reason(state, previous_ability) is not None:
             return None, new_score
 
         # 3. Adjust Difficulty for next question
-        self.current_difficulty = self._adjust_difficulty(self.current_difficulty, is_correct)
+        state.difficulty = self._adjust_difficulty(state.difficulty, is_correct)
 
         # 4. Select Next Question
-        next_q_data = self._select_next_question()
+        with self._selection_time.time():
+            next_pos = self._select_next_position(state)
 
-        return next_q_data, new_score
+        return next_pos, new_score
+
+    def record_response(self, state: SessionState, pos: int, is_correct: bool, current_score: float) -> float:
+        """
+        Applies one answer to the question at row `pos`: count, administered set, ability
+        and raw score. Returns the ability before the answer.
+        """
+        with self._update_time.time():
+            state.q_count += 1
+            self._mark_administered(state, pos)
+            state.responses.append((pos, bool(is_correct)))
+            previous_ability = state.ability
+            self._update_ability(state)
+
+            q_difficulty = int(self.bank.difficulty[pos])
+            score_gain = 2 * q_difficulty if is_correct else 0
+            state.raw_score = current_score + score_gain
+        return previous_ability
+
+    def score_responses(self, role: str, responses: list) -> SessionState:
+        """
+        Session state after the given (position, is_correct) answers, without selecting any
+        questions (scores assessments run elsewhere, such as offline bundles).
+        """
+        state = self._new_state(role)
+        for pos, is_correct in responses:
+            self.record_response(state, pos, is_correct, state.raw_score)
+        return state
+
+    def commit_question(self, pos: int | None) -> dict | None:
+        """Records the exposure of the question at `pos`, which is about to be served, and returns it."""
+        if pos is None:
+            return None
+        self.record_exposure(pos)
+        return self.bank.question_at(pos)
+
+    def record_exposure(self, pos: int) -> None:
+        """Counts the question at `pos` as served (for exposure control)."""
+        if self.exposure is not None:
+            self.exposure.record(pos)
+
+    def speculate(self, state: SessionState, q_id: int) -> dict:
+        """
+        Both possible outcomes of answering `q_id`, computed on copies of `state` before the
+        answer arrives: {is_correct: (state after the answer, next position, new score,
+        seconds taken)}. `state` itself is not changed and nothing is recorded, not even
+        the selection and update timings, since one of the two outcomes is thrown away; the
+        outcome that happens is served with `commit_question`.
+        """
+        # Draws still go through the shared exposure control, which a draw does not change
+        engine = self.detached(self.exposure)
+        outcomes = {}
+        for is_correct in (True, False):
+            started = time.perf_counter()
+            branch = state.copy()
+            next_pos, new_score = engine.advance_position(branch, q_id, is_correct, branch.raw_score)
+            outcomes[is_correct] = (branch, next_pos, new_score, time.perf_counter() - started)
+        return outcomes
+
+    def detached(self, exposure=None) -> "AdaptiveEngine":
+        """
+        Copy of the engine for planning sessions ahead (offline bundles, speculation). It draws through
+        `exposure` (None: uniformly) instead of the shared exposure control and records no
+        timing metrics; the bank, parameters and caches stay shared.
+        """
+        clone = copy.copy(self)
+        clone.exposure = exposure
+        clone._selection_time = clone._update_time = NULL_SERIES
+        return clone
+
+    # --- Public Methods ---
+    def get_initial_question(self, role: str) -> dict | None:
+        """Initializes state and returns the first question."""
+        self.state, question = self.start_session(role)
+        return question
+
+    def update_and_get_next(self, q_id: int, is_correct: bool, current_score: float) -> tuple[dict | None, float]:
+        """Updates score, adjusts difficulty, and selects the next question."""
+        return self.advance(self.state, q_id, is_correct, current_score)
+
+    def stop_reason(self, state: SessionState, previous_ability: float) -> str | None:
+        """Name of the first early-stopping rule that ends `state` now, or None."""
+        rules = self.stopping
+        if rules is None or state.q_count < rules.min_items:
+            return None
+        if rules.skill_cutpoints is not None and self._category_decided(state):
+            return 'classification'
+        return None
+
+    def _category_decided(self, state: SessionState) -> bool:
+        """True if every possible outcome of the remaining questions gives the same category."""
+        left_in_role = sum(self._remaining(state, diff, bucket)
+                           for diff, bucket in self.bank.buckets.get(state.role, {}).items())
+        remaining = min(self.MAX_QUESTIONS - state.q_count, left_in_role)
+        lowest = self.get_final_skill_score(state.raw_score)
+        highest = self.get_final_skill_score(state.raw_score + remaining * 2 * self.MAX_DIFFICULTY)
+        cutpoints = self.stopping.skill_cutpoints
+        return bisect_right(cutpoints, lowest) == bisect_right(cutpoints, highest)
+
+    def final_skill_score(self, state: SessionState) -> float:
+        """0-100 SkillScore of a finished session."""
+        return self.get_final_skill_score(state.raw_score)
 
     def get_final_skill_score(self, final_raw_score: float) -> float:
         """
@@ -109,46 +353,77 @@ class AdaptiveEngine:
         return round(min(skill_score, 100.0), 2)
 
     # --- Private Helper Methods ---
-    def _select_next_question(self) -> dict | None:
-        """Selects a unique, unadministered question matching current criteria."""
+    def _new_state(self, role: str) -> SessionState:
+        return SessionState(role, self.MIN_DIFFICULTY + 2, self.INITIAL_ABILITY)
+
+    def _select_next_position(self, state: SessionState) -> int | None:
+        """Selects a unique, unadministered question matching current criteria (its bank position)."""
         search_difficulties = [
-            self.current_difficulty,
-            max(self.MIN_DIFFICULTY, self.current_difficulty - 1),
-            min(self.MAX_DIFFICULTY, self.current_difficulty + 1)
+            state.difficulty,
+            max(self.MIN_DIFFICULTY, state.difficulty - 1),
+            min(self.MAX_DIFFICULTY, state.difficulty + 1)
         ]
         search_difficulties = sorted(list(set(search_difficulties)))
 
-        subset = pd.DataFrame()
+        role_buckets = self.bank.buckets.get(state.role)
+        if not role_buckets:
+            return None
 
+        pos = None
         for diff in search_difficulties:
-            subset = self.df[
-                (self.df['Job_Role'] == self.role_filter) &
-                (self.df[self.difficulty_col] == diff) &
-                (~self.df['Q_ID'].isin(self.administered_q_ids))
-            ]
-            if not subset.empty:
+            bucket = role_buckets.get(diff)
+            if bucket is not None and self._remaining(state, diff, bucket) > 0:
+                pos = self._draw_from_bucket(state, diff, bucket)
                 break
 
         # Fallback 1: Any unadministered question for the Role
-        if subset.empty:
-            subset = self.df[
-                (self.df['Job_Role'] == self.role_filter) &
-                (~self.df['Q_ID'].isin(self.administered_q_ids))
-            ]
-
-        # Fallback 2: No more questions
-        if subset.empty:
-            return None
-
-        question = subset.sample(1, random_state=random.randint(1, 10000)).iloc[0]
-
-        return {
-            "Q_ID": int(question['Q_ID']),
-            "Question": question['Question'],
-            "Options": question['Options'],
-            "Answer": question['Answer'],
-            "Difficulty": int(question[self.difficulty_col])
-        }
+        if pos is None:
+            remaining = {diff: self._remaining(state, diff, bucket) for diff, bucket in role_buckets.items()}
+            total = sum(remaining.values())
+
+            # Fallback 2: No more questions
+            if total == 0:
+                return None
+
+            # Pick a bucket proportionally to its remaining size (uniform over the role)
+            pick = random.randrange(total)
+            for diff, count in remaining.items():
+                if pick < count:
+                    pos = self._draw_from_bucket(state, diff, role_buckets[diff])
+                    break
+                pick -= count
+
+        return pos
+
+    @staticmethod
+    def _remaining(state: SessionState, diff: int, bucket) -> int:
+        return len(bucket) - state.taken.get(diff, 0)
+
+    def _draw_from_bucket(self, state: SessionState, diff: int, bucket) -> int:
+        """Uniformly draws an unadministered row position from a difficulty bucket."""
+        if self.exposure is not None:
+            return self.exposure.draw(state, diff, bucket)
+        # Sessions only ever administer MAX_QUESTIONS items, so on realistic buckets a
+        # couple of rejection draws suffice; near-exhausted (tiny) buckets are filtered.
+        if self._remaining(state, diff, bucket) * 2 >= len(bucket):
+            while True:
+                pos = int(bucket[random.randrange(len(bucket))])
+                if pos not in state.administered:
+                    return pos
+
+        candidates = [pos for pos in bucket.tolist() if pos not in state.administered]
+        return random.choice(candidates)
+
+    def _update_ability(self, state: SessionState) -> None:
+        """Re-estimates `state.ability` after a response (the rule-based engine keeps it fixed)."""
+
+    def _mark_administered(self, state: SessionState, pos: int) -> None:
+        if pos in state.administered:
+            return
+        state.administered.add(pos)
+        if self.bank.role_at(pos) == state.role:
+            diff = int(self.bank.difficulty[pos])
+            state.taken[diff] = state.taken.get(diff, 0) + 1
 
     def _adjust_difficulty(self, current_diff: int, correct: bool) -> int:
         """Adjust difficulty for the next question (simple rule-based adjustment)."""
@@ -0,0 +1,167 @@
+# artifact_format.py
+"""
+Versioned single-file format for model artifacts (engine item parameters, job-fit model).
+
+    magic  b'HLARTF' + uint16 format version + uint32 header length   (12 bytes)
+    header UTF-8 JSON: kind, metadata, array table, checksum           (padded to 64 bytes)
+    arrays raw little-endian array payloads, each 64-byte aligned
+
+The header lists each array's dtype, shape and offset. `open_artifact` reads the header
+and memory-maps the payload: arrays become read-only views of the page cache, pages are
+read when first touched, and every worker process shares one copy. Loading never
+executes code from the file, unlike pickle.
+
+The checksum is a BLAKE2b digest over the header (without the checksum) and the payload.
+Hashing the payload reads every page of the file, which would defeat lazy mapping, so it
+is verified once, when `write_artifact` has written the file, and on open only with
+`verify=True` (offline tools such as train.py). Every open checks that the file is long
+enough for the arrays its header lists, which catches truncation without reading them.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from bank_format import replace_file
+
+FORMAT_VERSION = 1
+MAGIC = b'HLARTF'
+_PREAMBLE = struct.Struct('<6sHI')
+ALIGNMENT = 64
+# Bytes hashed per update when verifying
+_HASH_BLOCK = 16 << 20
+
+
+class ArtifactError(ValueError):
+    """The file is not a readable artifact: bad magic, unknown version or checksum mismatch."""
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _digest(header: dict, payload) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps({k: v for k, v in header.items() if k != 'checksum'}, sort_keys=True).encode('utf-8'))
+    view = memoryview(payload)
+    for start in range(0, len(view), _HASH_BLOCK):
+        digest.update(view[start:start + _HASH_BLOCK])
+    return digest.hexdigest()
+
+
+def write_artifact(path: str, kind: str, arrays: dict, metadata: dict | None = None) -> dict:
+    """Writes `arrays` (name -> array) with `metadata` to `path` atomically; returns the header."""
+    table = {}
+    chunks = []
+    offset = 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+        if values.dtype.hasobject:
+            raise TypeError(f"array '{name}' has dtype object; artifacts hold plain numeric arrays only")
+        start = _aligned(offset)
+        chunks.append(b'\0' * (start - offset))
+        chunks.append(values.tobytes())
+        table[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': start}
+        offset = start + values.nbytes
+    payload = b''.join(chunks)
+
+    header = {'format_version': FORMAT_VERSION, 'kind': kind, 'metadata': metadata or {}, 'arrays': table}
+    header['checksum'] = {'algorithm': 'blake2b-128', 'digest': _digest(header, payload)}
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (_aligned(_PREAMBLE.size + len(header_bytes)) - _PREAMBLE.size - len(header_bytes))
+
+    def write(f):
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(payload)
+
+    replace_file(path, write)
+    # Read back once, so a bad write fails here rather than on a server
+    open_artifact(path, kind, verify=True)
+    return header
+
+
+class Artifact:
+    """An opened artifact: `kind`, `metadata` and lazily mapped arrays (`artifact[name]`)."""
+
+    def __init__(self, path: str, header: dict, buffer, payload_offset: int):
+        self.path = path
+        self.header = header
+        self.kind = header['kind']
+        self.metadata = header['metadata']
+        self._buffer = buffer
+        self._payload_offset = payload_offset
+        self._arrays = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.header['arrays']
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        values = self._arrays.get(name)
+        if values is None:
+            entry = self.header['arrays'][name]
+            dtype = np.dtype(entry['dtype'])
+            count = int(np.prod(entry['shape'], dtype=np.int64))
+            values = np.frombuffer(self._buffer, dtype=dtype, count=count,
+                                   offset=self._payload_offset + entry['offset']).reshape(entry['shape'])
+            self._arrays[name] = values
+        return values
+
+    @property
+    def names(self) -> list:
+        return list(self.header['arrays'])
+
+    def verify(self) -> None:
+        expected = self.header.get('checksum', {}).get('digest')
+        actual = _digest(self.header, memoryview(self._buffer)[self._payload_offset:])
+        if actual != expected:
+            raise ArtifactError(f"{os.path.basename(self.path)}: checksum mismatch (file is corrupt or truncated)")
+
+
+def is_artifact(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def open_artifact(path: str, kind: str | None = None, verify: bool = False) -> Artifact:
+    """
+    Opens and memory-maps the artifact at `path`, checking its kind, its length and, with
+    `verify`, its checksum (which reads the whole file).
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ArtifactError(f"{os.path.basename(path)}: not an artifact file")
+        magic, version, header_size = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ArtifactError(f"{os.path.basename(path)}: not an artifact file")
+        if version != FORMAT_VERSION:
+            raise ArtifactError(f"{os.path.basename(path)}: unsupported artifact format version {version}")
+        header_bytes = f.read(header_size)
+        if len(header_bytes) < header_size:
+            raise ArtifactError(f"{os.path.basename(path)}: truncated (header ends early)")
+        try:
+            header = json.loads(header_bytes)
+        except ValueError:
+            raise ArtifactError(f"{os.path.basename(path)}: unreadable header") from None
+        size = os.fstat(f.fileno()).st_size
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    if kind is not None and header.get('kind') != kind:
+        raise ArtifactError(f"{os.path.basename(path)}: expected a '{kind}' artifact, found '{header.get('kind')}'")
+    payload_offset = _PREAMBLE.size + header_size
+    payload_size = max((entry['offset'] + np.dtype(entry['dtype']).itemsize * int(np.prod(entry['shape'], dtype=np.int64))
+                        for entry in header['arrays'].values()), default=0)
+    if size < payload_offset + payload_size:
+        raise ArtifactError(f"{os.path.basename(path)}: truncated ({size} of {payload_offset + payload_size} bytes)")
+    artifact = Artifact(path, header, buffer, payload_offset)
+    if verify:
+        artifact.verify()
+    return artifact
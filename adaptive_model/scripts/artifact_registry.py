@@ -0,0 +1,243 @@
+# artifact_registry.py
+"""
+Versioned registry of the serving artifacts (question bank, engine, job-fit predictor).
+
+Each load produces an ArtifactGeneration. `reload()` builds the next generation off the
+request path and publishes it with a single reference swap, so requests never see a
+half-built bank or model. Superseded generations stay registered until the sessions
+that started on them can no longer be alive (the session TTL), so an in-flight
+assessment finishes against the version it started on.
+"""
+import hashlib
+import os
+import threading
+import time
+
+from metrics import ARTIFACT_VERSIONS, RELOAD_SECONDS, RELOADS
+
+
+def _rss_mb() -> float | None:
+    """Current resident set size in MB (Linux only)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def file_digest(paths: list) -> str:
+    """Short hash of the contents of `paths` (missing files hash as absent)."""
+    digest = hashlib.blake2b(digest_size=4)
+    for path in paths:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        except FileNotFoundError:
+            digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def source_fingerprint(paths: list) -> tuple:
+    """Cheap change detector over `paths`: (path, mtime, size) of each existing file."""
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append((path, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+class ArtifactGeneration:
+    """One loaded, immutable version of the serving artifacts."""
+
+    def __init__(self, version: str, bank, engine, predictor, batcher):
+        self.version = version
+        self.bank = bank
+        self.engine = engine
+        self.predictor = predictor
+        self.batcher = batcher
+        self.loaded_at = time.time()
+        self.retired_at = None  # monotonic time this generation stopped being current
+
+    def close(self) -> None:
+        # Requests that resolved this generation before it was dropped may still be
+        # scoring on it; a closed batcher serves them synchronously
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+class ArtifactRegistry:
+    """
+    Holds the current ArtifactGeneration plus the superseded ones still serving sessions.
+
+    `loader()` builds a complete generation; `fingerprint()` (optional) cheaply reports
+    whether the artifact files changed, for the background watcher.
+    """
+
+    def __init__(self, loader=None, fingerprint=None, retain_seconds: float = 3600,
+                 max_generations: int = 3, initial: ArtifactGeneration | None = None):
+        self.loader = loader
+        self.fingerprint = fingerprint
+        self.retain_seconds = retain_seconds
+        self.max_generations = max_generations
+        self.last_reload = None
+
+        self._generations = {}  # version -> generation, oldest first
+        self._current = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._source = fingerprint() if fingerprint else None
+        self._watcher = None
+        self._stop = threading.Event()
+        if initial is not None:
+            self._publish(initial)
+
+    @property
+    def current(self) -> ArtifactGeneration:
+        return self._current
+
+    @property
+    def versions(self) -> list:
+        return list(self._generations)
+
+    def get(self, version: str | None = None) -> ArtifactGeneration | None:
+        """Returns the generation for `version` (None: the current one), if still registered."""
+        if version is None:
+            return self._current
+        return self._generations.get(version)
+
+    def bank_for(self, version: str | None = None):
+        generation = self.get(version)
+        return generation.bank if generation is not None else None
+
+    # --- Reload ---
+    def reload(self) -> dict:
+        """
+        Builds a new generation and swaps it in. Returns a report with the outcome
+        ('reloaded', 'unchanged' or 'busy'), the versions involved, the build time and
+        the resident memory added by the new generation.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            RELOADS.labels('busy').inc()
+            return {"status": "busy", "version": self._current.version if self._current else None}
+        try:
+            return self._reload()
+        finally:
+            self._reload_lock.release()
+
+    def refresh(self) -> bool:
+        """
+        Reloads now if the artifact files changed since the last reload, waiting for a
+        reload already running; returns whether a new generation was published. Workers
+        reload on their own, so a session started on a version another worker already
+        loaded can reach one that has not yet.
+        """
+        if self.fingerprint is None:
+            return False
+        with self._reload_lock:
+            if self.fingerprint() == self._source:
+                return False
+            return self._reload()["status"] == "reloaded"
+
+    def _reload(self) -> dict:
+        try:
+            source = self.fingerprint() if self.fingerprint else None
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            generation = self.loader()
+            reload_seconds = time.perf_counter() - started
+            RELOAD_SECONDS.labels().observe(reload_seconds)
+            rss_after = _rss_mb()
+            self._source = source
+
+            previous = self._current
+            existing = self._generations.get(generation.version)
+            if existing is not None:
+                # Same content as a loaded generation: keep that one (and its sessions)
+                generation.close()
+                generation = existing
+            status = "unchanged" if generation is previous else "reloaded"
+            if status == "reloaded":
+                self._publish(generation)
+
+            report = {
+                "status": status,
+                "version": self._current.version,
+                "previous_version": previous.version if previous is not None else None,
+                "reload_seconds": round(reload_seconds, 3),
+                "memory_overhead_mb": round(rss_after - rss_before, 1) if rss_before is not None else None,
+                "rss_mb": round(rss_after, 1) if rss_after is not None else None,
+                "active_versions": self.versions,
+            }
+            self.last_reload = report
+            RELOADS.labels(status).inc()
+            print(f"INFO: Artifact reload {status}: version {report['version']} "
+                  f"in {reload_seconds:.2f}s, +{report['memory_overhead_mb']} MB RSS, "
+                  f"{len(report['active_versions'])} version(s) active.")
+            return report
+        except Exception:
+            RELOADS.labels('failed').inc()
+            raise
+
+    def _publish(self, generation: ArtifactGeneration) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._current is not None:
+                self._current.retired_at = now
+            generation.retired_at = None
+            generations = dict(self._generations)
+            generations.pop(generation.version, None)
+            generations[generation.version] = generation
+            # Publish with plain reference assignments; readers never take the lock
+            self._generations = generations
+            self._current = generation
+        self.prune()
+
+    def prune(self) -> list:
+        """Drops superseded generations older than the session TTL or beyond `max_generations`."""
+        now = time.monotonic()
+        dropped = []
+        with self._lock:
+            generations = dict(self._generations)
+            for version, generation in list(generations.items()):
+                if generation is self._current:
+                    continue
+                expired = now - generation.retired_at >= self.retain_seconds
+                if expired or len(generations) > self.max_generations:
+                    dropped.append(generations.pop(version))
+            self._generations = generations
+        ARTIFACT_VERSIONS.labels().set(len(generations))
+        for generation in dropped:
+            generation.close()
+        return [generation.version for generation in dropped]
+
+    # --- Background watcher ---
+    def start_watcher(self, interval_seconds: float) -> None:
+        """Polls `fingerprint()` every `interval_seconds` and reloads when the files change."""
+        if self.fingerprint is None or interval_seconds <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval_seconds):
+                try:
+                    if self.fingerprint() != self._source:
+                        self.reload()
+                    else:
+                        self.prune()
+                except Exception as e:
+                    print(f"ERROR: Artifact reload failed; keeping version {self._current.version}. Error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='artifact-watcher', daemon=True)
+        self._watcher.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        for generation in list(self._generations.values()):
+            generation.close()
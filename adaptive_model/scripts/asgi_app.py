@@ -0,0 +1,183 @@
+# asgi_app.py
+"""
+ASGI serving mode for the assessment API.
+
+Exposes the same endpoints and JSON contract as api_model.py (/roles, /catalog,
+/start_assessment, /submit_answer, /assessment_bundle, /submit_bundle, /admin/reload,
+/metrics) as a dependency-free ASGI application. Requests are parsed on the event loop; CPU-bound work (question selection,
+scoring, prediction) runs on a bounded thread pool, so one process holds thousands of
+in-flight assessments while only ASGI_WORKER_THREADS requests compute at a time. At most ASGI_MAX_PENDING requests wait
+for a worker; further requests wait on the event loop instead of piling up in the pool.
+
+Production launch profile (from adaptive_model/scripts):
+    SESSION_STORE_URL=sqlite:////var/lib/hireledger/sessions.db \\
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000 --workers 4 \\
+        --loop uvloop --http httptools --backlog 4096 \\
+        --timeout-keep-alive 5 --no-access-log
+
+or behind gunicorn:
+    gunicorn asgi_app:app -k uvicorn.workers.UvicornWorker -w 4 -b 0.0.0.0:5000
+
+Use one worker process per core and a shared session store (sqlite:// or redis://)
+whenever there is more than one worker, so any worker can serve any session.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from assessment_service import AssessmentService
+from payloads import dumps
+
+# Threads running engine/predictor work, and requests allowed to queue for them
+ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', str(min(32, (os.cpu_count() or 1) * 4))))
+ASGI_MAX_PENDING = int(os.environ.get('ASGI_MAX_PENDING', str(ASGI_WORKER_THREADS * 4)))
+# Request bodies larger than this are rejected with 413
+MAX_BODY_BYTES = 64 * 1024
+
+
+class AssessmentASGIApp:
+    """ASGI application delegating to a process-wide AssessmentService."""
+
+    ROUTES = {
+        '/roles': ('GET', 'roles'),
+        '/catalog': ('GET', 'catalog'),
+        '/start_assessment': ('POST', 'start_assessment'),
+        '/submit_answer': ('POST', 'submit_answer'),
+        '/assessment_bundle': ('POST', 'assessment_bundle'),
+        '/submit_bundle': ('POST', 'submit_bundle'),
+        '/admin/reload': ('POST', 'reload_artifacts'),
+        '/metrics': ('GET', 'metrics'),
+    }
+
+    def __init__(self, worker_threads: int = ASGI_WORKER_THREADS, max_pending: int = ASGI_MAX_PENDING):
+        self.service = None
+        self.executor = ThreadPoolExecutor(max_workers=worker_threads, thread_name_prefix='assessment')
+        self.max_pending = max_pending
+        self._slots = None
+        self._init_lock = threading.Lock()
+
+    # --- Lifecycle ---
+    def _initialize(self) -> AssessmentService:
+        with self._init_lock:
+            if self.service is None:
+                self.service = AssessmentService.create()
+            return self.service
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, self._initialize)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.service is not None:
+                    self.service.close()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # --- HTTP ---
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        route = self.ROUTES.get(scope['path'])
+        if route is None:
+            await self._respond(send, {"error": "Not found"}, 404)
+            return
+        method, handler_name = route
+        if scope['method'] != method:
+            await self._respond(send, {"error": "Method not allowed"}, 405, [(b'allow', method.encode())])
+            return
+
+        if method == 'GET':
+            await self._respond_catalog(scope, send, handler_name)
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond(send, {"error": "Request body too large"}, 413)
+            return
+        if handler_name == 'reload_artifacts':
+            # Admin requests authenticate with a header instead of a JSON body
+            payload = self._header(scope, b'x-admin-token')
+        else:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+
+        body, status = await self._run(handler_name, payload)
+        await self._respond(send, body, status)
+
+    async def _run(self, handler_name: str, payload) -> tuple[dict, int]:
+        """Runs a service handler on the worker pool, bounded by `max_pending`."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        loop = asyncio.get_running_loop()
+
+        async with self._slots:
+            service = self.service or await loop.run_in_executor(self.executor, self._initialize)
+            return await loop.run_in_executor(self.executor, getattr(service, handler_name), payload)
+
+    async def _respond_catalog(self, scope, send, name: str) -> None:
+        """Catalog and metrics responses are cheap to build, so they are answered on the event loop."""
+        service = self.service or await asyncio.get_running_loop().run_in_executor(self.executor, self._initialize)
+        if name == 'metrics':
+            body, status, headers = service.metrics_response()
+        else:
+            body, status, headers = service.catalog_response(name, self._header(scope, b'if-none-match'))
+        await self._send(send, body, status, [(k.lower().encode(), v.encode()) for k, v in headers.items()])
+
+    @staticmethod
+    def _header(scope, name: bytes) -> str | None:
+        for key, value in scope.get('headers', []):
+            if key == name:
+                return value.decode('latin-1')
+        return None
+
+    @staticmethod
+    async def _read_body(receive) -> bytes | None:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    @classmethod
+    async def _respond(cls, send, body: dict | bytes, status: int, extra_headers: list | None = None) -> None:
+        # Responses serving a question arrive as ready JSON bytes (see payloads.py)
+        data = body if isinstance(body, bytes) else dumps(body)
+        await cls._send(send, data, status, extra_headers)
+
+    @staticmethod
+    async def _send(send, data: bytes, status: int, extra_headers: list | None = None) -> None:
+        extra_headers = extra_headers or []
+        headers = [(b'content-length', str(len(data)).encode())]
+        if not any(key == b'content-type' for key, _ in extra_headers):
+            headers.append((b'content-type', b'application/json'))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers + extra_headers})
+        await send({'type': 'http.response.body', 'body': data})
+
+
+app = AssessmentASGIApp()
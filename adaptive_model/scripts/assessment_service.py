@@ -0,0 +1,492 @@
+# assessment_service.py
+"""
+Framework-independent implementation of the assessment API.
+
+Both the Flask app (api_model.py) and the ASGI app (asgi_app.py) delegate to an
+AssessmentService, so the two serving modes share one JSON contract. Session handlers
+take the parsed JSON body (or None) and return a (response_body, http_status) tuple,
+where the body is a dict to encode or, for questions served, ready JSON bytes (see
+payloads.py); catalog endpoints return pre-serialized bytes with caching headers.
+
+In a preforking server (gunicorn.conf.py), `preload()` loads the artifacts once in the
+master; every worker's `AssessmentService.create()` then starts from that registry and
+shares its bank and models copy-on-write instead of loading its own.
+"""
+import gc
+import hmac
+import os
+import uuid
+
+import offline_bundle
+
+from adaptive_logic import AdaptiveEngine, EngineParameters, StoppingRules, engine_parameters_path
+from irt_engine import IRTAdaptiveEngine
+from artifact_registry import ArtifactGeneration, ArtifactRegistry, file_digest, source_fingerprint
+from question_bank import QuestionBank
+from bank_format import META_FILE, is_compiled_bank
+from exposure_control import ExposureControl
+import metrics
+from metrics import REQUEST_SECONDS, SESSION_STORE_SECONDS, RequestProfiler
+from jobfit_predictor import JobFitPredictor # Final consolidated predictor
+from prediction_batcher import PredictionBatcher
+from results_sink import create_results_sink
+from session_store import create_session_store
+from speculation import Speculator
+
+# --- Configuration ---
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+# Question bank CSV, loaded when no compiled bank exists at bank_path
+data_path = os.path.join(scripts_dir, '..', 'data', 'assessment_data.csv')
+# Compiled, memory-mapped bank (see bank_format.py); preferred over the CSV when present
+bank_path = os.path.join(scripts_dir, '..', 'data', 'assessment_data.bank')
+# Assumes the 'models' directory is at the root level (../models)
+predictor_model_dir = os.path.join(scripts_dir, '..', 'models')
+
+# Job-fit predictions from concurrent requests are coalesced for up to this many
+# milliseconds (or until this many are queued) into one model call
+PREDICT_BATCH_WAIT_MS = float(os.environ.get('PREDICT_BATCH_WAIT_MS', '2'))
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get('PREDICT_BATCH_MAX_SIZE', '256'))
+# Serve job-fit scores from a validated lookup table over the (skill, trust) grid; set to 0 to call the model directly
+JOBFIT_LOOKUP_TABLE = os.environ.get('JOBFIT_LOOKUP_TABLE', '1') == '1'
+# Session storage backend (memory://, sqlite:///path/sessions.db, redis://host:6379/0) and idle timeout
+SESSION_STORE_URL = os.environ.get('SESSION_STORE_URL', 'memory://')
+SESSION_TTL_SECONDS = float(os.environ.get('SESSION_TTL_SECONDS', '3600'))
+# Seconds clients may cache /roles and /catalog before revalidating with If-None-Match
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', '300'))
+# Token required by POST /admin/reload (X-Admin-Token header); the endpoint is disabled when unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+# Key signing offline assessment bundles (see offline_bundle.py); the bundle endpoints are
+# disabled when unset. Every worker needs the same key.
+BUNDLE_SECRET = os.environ.get('BUNDLE_SECRET', '')
+# Check the bank and model files for changes this often and reload automatically; 0 disables
+RELOAD_POLL_SECONDS = float(os.environ.get('RELOAD_POLL_SECONDS', '0'))
+# Artifact versions kept loaded at once (current plus superseded ones finishing their sessions)
+RELOAD_MAX_VERSIONS = int(os.environ.get('RELOAD_MAX_VERSIONS', '3'))
+# Engine mode: 'rule' (difficulty steps, raw-score SkillScore) or 'irt' (EAP ability
+# estimate, maximum-information selection; see irt_engine.py)
+ENGINE_MODE = os.environ.get('ENGINE_MODE', 'rule')
+# Early stopping (see adaptive_logic.StoppingRules); each rule is off unless its variable is set.
+# EARLY_STOP_CONFIDENCE enables stopping once the job-fit category is decided.
+EARLY_STOP_MIN_ITEMS = int(os.environ.get('EARLY_STOP_MIN_ITEMS', '3'))
+EARLY_STOP_SE = os.environ.get('EARLY_STOP_SE')
+EARLY_STOP_DELTA = os.environ.get('EARLY_STOP_DELTA')
+EARLY_STOP_CONFIDENCE = os.environ.get('EARLY_STOP_CONFIDENCE')
+# Exposure control and content balancing (see exposure_control.py); off unless set.
+# EXPOSURE_MAX_RATE caps the share of sessions that see any one question.
+EXPOSURE_MAX_RATE = os.environ.get('EXPOSURE_MAX_RATE')
+CONTENT_BALANCING = os.environ.get('CONTENT_BALANCING', '0') == '1'
+EXPOSURE_RANDOMESQUE = int(os.environ.get('EXPOSURE_RANDOMESQUE', '5'))
+# Completed results sink (see results_sink.py): sqlite:///path.db or parquet:///dir; unset disables
+RESULTS_SINK_URL = os.environ.get('RESULTS_SINK_URL', '')
+RESULTS_FLUSH_SECONDS = float(os.environ.get('RESULTS_FLUSH_SECONDS', '1'))
+# Precompute both outcomes of every served question in the background (see speculation.py).
+# Trades extra CPU (two selections per answer, one of them discarded) for submit latency.
+SPECULATE_NEXT = os.environ.get('SPECULATE_NEXT', '0') == '1'
+SPECULATION_THREADS = int(os.environ.get('SPECULATION_THREADS', '2'))
+SPECULATION_MAX_SESSIONS = int(os.environ.get('SPECULATION_MAX_SESSIONS', '10000'))
+# Trust score used for every job-fit prediction
+TRUST_SCORE = 85
+# Directory of the adaptive engine parameters (trained adaptive_engine.artifact, else the legacy
+# adaptive_engine.pkl), reloaded together with the bank and the job-fit model
+engine_params_dir = scripts_dir
+
+
+def _bank_source() -> str:
+    return bank_path if is_compiled_bank(bank_path) else data_path
+
+
+def _artifact_files() -> list:
+    # Both formats of each artifact, so a first training run is picked up by the watcher
+    return [os.path.join(engine_params_dir, AdaptiveEngine.TRAINED_FILE_NAME),
+            os.path.join(engine_params_dir, AdaptiveEngine.MODEL_FILE_NAME),
+            os.path.join(predictor_model_dir, JobFitPredictor.MODEL_EXPORT_FILE),
+            os.path.join(predictor_model_dir, JobFitPredictor.MODEL_FILE)]
+
+
+def artifact_fingerprint() -> tuple:
+    """Modification times and sizes of every file a generation is built from."""
+    source = _bank_source()
+    bank_file = os.path.join(source, META_FILE) if os.path.isdir(source) else source
+    return source_fingerprint([bank_file] + _artifact_files())
+
+
+def stopping_rules(predictor: JobFitPredictor) -> StoppingRules | None:
+    """Early-stopping rules from the EARLY_STOP_* settings, or None when all are off."""
+    if EARLY_STOP_SE is None and EARLY_STOP_DELTA is None and EARLY_STOP_CONFIDENCE is None:
+        return None
+    return StoppingRules(
+        min_items=EARLY_STOP_MIN_ITEMS,
+        se_threshold=float(EARLY_STOP_SE) if EARLY_STOP_SE is not None else None,
+        delta_threshold=float(EARLY_STOP_DELTA) if EARLY_STOP_DELTA is not None else None,
+        skill_cutpoints=predictor.skill_cutpoints(TRUST_SCORE) if EARLY_STOP_CONFIDENCE is not None else None,
+        confidence=float(EARLY_STOP_CONFIDENCE or 0.95),
+    )
+
+
+def exposure_control(bank: QuestionBank) -> ExposureControl | None:
+    """Exposure control from the EXPOSURE_* / CONTENT_BALANCING settings, or None when both are off."""
+    if EXPOSURE_MAX_RATE is None and not CONTENT_BALANCING:
+        return None
+    return ExposureControl(
+        bank,
+        max_rate=float(EXPOSURE_MAX_RATE) if EXPOSURE_MAX_RATE is not None else None,
+        content_balancing=CONTENT_BALANCING,
+        randomesque=EXPOSURE_RANDOMESQUE,
+    )
+
+
+def load_generation() -> ArtifactGeneration:
+    """Builds a complete generation (bank, catalog, engine, predictor) from the configured files."""
+    # Initialize the final ML predictor instance (early stopping derives its category cutpoints from it)
+    predictor = JobFitPredictor(model_dir=predictor_model_dir, precompile=JOBFIT_LOOKUP_TABLE)
+    print("Job Fit Predictor initialized and ML model parameters loaded.")
+
+    try:
+        source_path = _bank_source()
+        bank = QuestionBank.load(source_path)
+        # Derive the catalog up front so catalog requests never compute it
+        bank.catalog
+        params = EngineParameters.load(engine_parameters_path(engine_params_dir))
+        if ENGINE_MODE == 'irt':
+            engine = IRTAdaptiveEngine(bank, params, stopping_rules(predictor), exposure=exposure_control(bank))
+            engine.build_information_tables()
+        else:
+            engine = AdaptiveEngine(bank, params, stopping_rules(predictor), exposure=exposure_control(bank))
+        print(f"Dataset Loaded Successfully from {source_path}!")
+    except Exception as e:
+        print(f"CRITICAL ERROR: Application failed to load data: {e}")
+        raise RuntimeError("Application failed to initialize: Assessment data is missing.")
+
+    batcher = PredictionBatcher(predictor, max_wait_ms=PREDICT_BATCH_WAIT_MS,
+                                max_batch_size=PREDICT_BATCH_MAX_SIZE)
+
+    version = f"{bank.version}-{file_digest(_artifact_files())}"
+    return ArtifactGeneration(version, bank, engine, predictor, batcher)
+
+
+def _new_registry() -> ArtifactRegistry:
+    return ArtifactRegistry(load_generation, fingerprint=artifact_fingerprint,
+                            retain_seconds=SESSION_TTL_SECONDS, max_generations=RELOAD_MAX_VERSIONS)
+
+
+# Registry loaded by preload() in a preforking master, adopted by the first create()
+_preloaded_registry = None
+
+
+def preload() -> ArtifactRegistry:
+    """
+    Loads the current artifacts before workers are forked. Starts no threads (they would
+    not survive the fork). Objects that exist afterwards are frozen out of the cyclic
+    garbage collector, so collections in the workers do not write to, and thereby copy,
+    the shared pages.
+    """
+    global _preloaded_registry
+    if _preloaded_registry is None:
+        registry = _new_registry()
+        registry.reload()
+        _preloaded_registry = registry
+        gc.collect()
+        gc.freeze()
+    return _preloaded_registry
+
+
+class AssessmentService:
+    """
+    Holds the process-wide components (artifact registry, session store) and implements
+    the /roles, /catalog, /start_assessment, /submit_answer, /admin/reload and /metrics
+    endpoints.
+
+    The bank, engine and predictor come from the registry's current generation; each
+    session records the version it started on and is served by that generation until
+    it completes, even if a reload publishes a newer one meanwhile.
+    """
+
+    def __init__(self, registry: ArtifactRegistry, sessions, results=None, speculator: Speculator | None = None):
+        self.registry = registry
+        self.sessions = sessions
+        self.results = results
+        self.speculator = speculator
+        self.profiler = RequestProfiler()
+        # Metric series bound once, so request handling only starts and stops spans
+        self._request_time = {name: REQUEST_SECONDS.labels(name)
+                              for name in ('start_assessment', 'submit_answer', 'assessment_bundle', 'submit_bundle')}
+        self._store_time = {op: SESSION_STORE_SECONDS.labels(sessions.BACKEND, op) for op in ('get', 'put', 'delete', 'pop')}
+
+    @classmethod
+    def create(cls) -> "AssessmentService":
+        """Loads the dataset and initializes global components (AdaptiveEngine parameters, ML Predictor)."""
+        registry = _preloaded_registry
+        if registry is None:
+            registry = _new_registry()
+            registry.reload()
+        sessions = create_session_store(SESSION_STORE_URL, ttl_seconds=SESSION_TTL_SECONDS,
+                                        resolve=registry.bank_for)
+        registry.start_watcher(RELOAD_POLL_SECONDS)
+        results = create_results_sink(RESULTS_SINK_URL, flush_seconds=RESULTS_FLUSH_SECONDS)
+        speculator = Speculator(SPECULATION_THREADS, SPECULATION_MAX_SESSIONS) if SPECULATE_NEXT else None
+        return cls(registry, sessions, results, speculator)
+
+    @property
+    def bank(self) -> QuestionBank:
+        return self.registry.current.bank
+
+    def close(self) -> None:
+        self.registry.close()
+        if self.results is not None:
+            self.results.close()
+        if self.speculator is not None:
+            self.speculator.close()
+
+    # --- Endpoints ---
+    def catalog_response(self, name: str, if_none_match: str | None = None) -> tuple[bytes, int, dict]:
+        """
+        Pre-serialized body of the 'roles' or 'catalog' endpoint with caching headers.
+        Returns an empty 304 when `if_none_match` already names the current version.
+        """
+        catalog = self.registry.current.bank.catalog
+        headers = {"ETag": catalog.etag, "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}"}
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            if catalog.etag in tags or '*' in tags:
+                return b'', 304, headers
+        body = catalog.roles_json if name == 'roles' else catalog.catalog_json
+        return body, 200, headers
+
+    def metrics_response(self) -> tuple[bytes, int, dict]:
+        """Prometheus text exposition of this process's metrics."""
+        return metrics.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+    def start_assessment(self, payload) -> tuple[dict, int]:
+        """Initializes a new adaptive assessment session and returns the first question."""
+        with self._request_time['start_assessment'].time(), self.profiler.profile('start_assessment'):
+            return self._start_assessment(payload)
+
+    def submit_answer(self, payload) -> tuple[dict, int]:
+        """Submits an answer, updates the score, and returns the next question or the final result."""
+        with self._request_time['submit_answer'].time(), self.profiler.profile('submit_answer'):
+            return self._submit_answer(payload)
+
+    def _start_assessment(self, payload) -> tuple[dict, int]:
+        if not isinstance(payload, dict):
+            return {"error": "Invalid JSON format in request body"}, 400
+
+        role = payload.get("role")
+        if not role:
+            return {"error": "Role is required"}, 400
+
+        session_id = str(uuid.uuid4())
+
+        generation = self.registry.current
+        try:
+            # Only a small SessionState is allocated per session; no I/O happens here
+            session_state, pos = generation.engine.start_position(role)
+            session_state.version = generation.version
+        except Exception as e:
+            # Log unexpected errors to the console
+            print(f"RUNTIME ERROR during get_initial_question: {e}")
+            return {"error": f"Error starting assessment: {e}"}, 500
+
+        if pos is None:
+            return {"error": f"No questions available for role: {role}"}, 404
+        generation.engine.record_exposure(pos)
+
+        # Store the session state (it also tracks the raw score)
+        with self._store_time['put'].time():
+            self.sessions.put(session_id, session_state)
+        if self.speculator is not None:
+            self.speculator.schedule(session_id, generation.engine, session_state, int(generation.bank.q_ids[pos]))
+
+        # The client-facing question is served from its cached, serialized fragment
+        return generation.bank.payloads.start_body(session_id, pos), 200
+
+    def _submit_answer(self, payload) -> tuple[dict, int]:
+        if not isinstance(payload, dict):
+            return {"error": "Invalid JSON format in request body"}, 400
+
+        session_id = payload.get("session_id")
+        q_id = payload.get("q_id")
+        is_correct = payload.get("is_correct")
+
+        if not all([session_id, q_id is not None, is_correct is not None]):
+            return {"error": "Missing required fields (session_id, q_id, is_correct)"}, 400
+
+        with self._store_time['get'].time():
+            session_state = self.sessions.get(session_id)
+        if session_state is None:
+            if self.speculator is not None:
+                self.speculator.discard(session_id)
+            return {"error": "Invalid or expired session_id"}, 404
+
+        # Finish on the artifact version the session started on
+        generation = self.registry.get(session_state.version)
+        if generation is None and self.registry.refresh():
+            # Started on a version another worker loaded first. The store decoded the
+            # state without its questions while the version was unknown here
+            generation = self.registry.get(session_state.version)
+            with self._store_time['get'].time():
+                session_state = self.sessions.get(session_id)
+            if session_state is None:
+                return {"error": "Invalid or expired session_id"}, 404
+        if generation is None:
+            # Left in the store: the session may still complete on a worker that has the version
+            return {"error": "Assessment version is no longer available; please start a new assessment."}, 409
+
+        try:
+            # Served from the precomputed outcome when there is one
+            speculated = None
+            if self.speculator is not None:
+                speculated = self.speculator.take(session_id, generation.engine, session_state, q_id, is_correct)
+            if speculated is not None:
+                session_state, next_pos, new_raw_score = speculated
+            else:
+                # The engine also records the new raw score on the session state
+                next_pos, new_raw_score = generation.engine.advance_position(
+                    session_state,
+                    q_id=q_id,
+                    is_correct=is_correct,
+                    current_score=session_state.raw_score
+                )
+            if next_pos is None:
+                # --- Assessment Complete ---
+                return self._complete(session_id, session_state, generation)
+
+            # --- Continue Assessment ---
+            generation.engine.record_exposure(next_pos)
+            with self._store_time['put'].time():
+                self.sessions.put(session_id, session_state)
+            if self.speculator is not None:
+                self.speculator.schedule(session_id, generation.engine, session_state,
+                                         int(generation.bank.q_ids[next_pos]))
+            return generation.bank.payloads.progress_body(new_raw_score, next_pos), 200
+
+        except Exception as e:
+            print(f"RUNTIME ERROR during submit_answer for session {session_id}: {e}")
+            return {"error": f"An unexpected error occurred during processing: {str(e)}"}, 500
+
+    def _complete(self, session_id: str, session_state, generation: ArtifactGeneration,
+                  claimed: bool = False) -> tuple[dict, int]:
+        """Scores a finished session; `claimed`: the caller already removed it from the store."""
+        final_skill_score = generation.engine.final_skill_score(session_state)
+
+        # Predict JobFit using the ML Predictor (batched with concurrent completions)
+        final_result = generation.batcher.predict_fit(final_skill_score, trust_score=TRUST_SCORE)
+
+        # Clean up the session state
+        if not claimed:
+            self._delete_session(session_id)
+        if self.results is not None:
+            self.results.record(session_id, session_state, generation.bank, generation.engine.MODE, final_result)
+
+        return {
+            "status": "complete",
+            "JobFitScore": final_result['JobFitScore'],
+            "SkillScore": final_result['SkillScore'],
+            "Category": final_result['Category'],
+            "message": "Assessment completed successfully."
+        }, 200
+
+    def _delete_session(self, session_id: str) -> None:
+        """Removes a finished or rejected session, with any outcomes precomputed for it."""
+        with self._store_time['delete'].time():
+            self.sessions.delete(session_id)
+        if self.speculator is not None:
+            self.speculator.discard(session_id)
+
+    # --- Offline bundles ---
+    def assessment_bundle(self, payload) -> tuple[dict, int]:
+        """Issues a signed bundle for running a whole assessment on the client (see offline_bundle.py)."""
+        with self._request_time['assessment_bundle'].time(), self.profiler.profile('assessment_bundle'):
+            return self._assessment_bundle(payload)
+
+    def submit_bundle(self, payload) -> tuple[dict, int]:
+        """Verifies and scores the answers of an offline bundle and returns the final result."""
+        with self._request_time['submit_bundle'].time(), self.profiler.profile('submit_bundle'):
+            return self._submit_bundle(payload)
+
+    def _assessment_bundle(self, payload) -> tuple[dict, int]:
+        if not BUNDLE_SECRET:
+            return {"error": "Offline bundles are disabled (BUNDLE_SECRET is not set)."}, 403
+        if not isinstance(payload, dict):
+            return {"error": "Invalid JSON format in request body"}, 400
+        role = payload.get("role")
+        if not role:
+            return {"error": "Role is required"}, 400
+
+        generation = self.registry.current
+        engine = generation.engine
+        if engine.MODE != 'rule':
+            return {"error": "Offline bundles are only available with ENGINE_MODE=rule."}, 409
+
+        session_id = str(uuid.uuid4())
+        try:
+            issued = offline_bundle.issue(engine, generation.bank, role, session_id, generation.version,
+                                          BUNDLE_SECRET, SESSION_TTL_SECONDS)
+        except Exception as e:
+            print(f"RUNTIME ERROR during assessment_bundle: {e}")
+            return {"error": f"Error starting assessment: {e}"}, 500
+        if issued is None:
+            return {"error": f"No questions available for role: {role}"}, 404
+        body, positions = issued
+
+        # The stored session makes the bundle single-use and expire with SESSION_TTL_SECONDS
+        session_state = engine._new_state(role)
+        session_state.version = generation.version
+        with self._store_time['put'].time():
+            self.sessions.put(session_id, session_state)
+        if engine.exposure is not None:
+            engine.exposure.start_session(role)
+        # The client is shown every question of the bundle, not only those on its path
+        for pos in positions:
+            engine.record_exposure(pos)
+        return body, 200
+
+    def _submit_bundle(self, payload) -> tuple[dict, int]:
+        if not BUNDLE_SECRET:
+            return {"error": "Offline bundles are disabled (BUNDLE_SECRET is not set)."}, 403
+        if not isinstance(payload, dict):
+            return {"error": "Invalid JSON format in request body"}, 400
+        session_id = payload.get("session_id")
+        try:
+            bundle = offline_bundle.verify(payload.get("bundle"), BUNDLE_SECRET)
+            if bundle['session_id'] != session_id:
+                raise offline_bundle.BundleError("Bundle belongs to another session.", 403)
+        except offline_bundle.BundleError as e:
+            return {"error": str(e)}, e.status
+
+        generation = self.registry.get(bundle['version'])
+        if generation is None and self.registry.refresh():
+            generation = self.registry.get(bundle['version'])
+        if generation is None:
+            return {"error": "Assessment version is no longer available; please start a new assessment."}, 409
+        try:
+            responses = offline_bundle.replay(bundle, generation.bank, payload.get("answers"))
+        except offline_bundle.BundleError as e:
+            return {"error": str(e)}, e.status
+
+        # Claiming the session atomically makes the bundle single-use: of concurrent
+        # submits, only one gets the state; the others answer 404
+        with self._store_time['pop'].time():
+            session_state = self.sessions.pop(session_id)
+        if session_state is None:
+            return {"error": "Invalid, expired or already submitted session_id"}, 404
+
+        try:
+            scored = generation.engine.score_responses(session_state.role, responses)
+            scored.version = session_state.version
+            return self._complete(session_id, scored, generation, claimed=True)
+        except Exception as e:
+            print(f"RUNTIME ERROR during submit_bundle for session {session_id}: {e}")
+            return {"error": f"An unexpected error occurred during processing: {str(e)}"}, 500
+
+    def reload_artifacts(self, admin_token: str | None) -> tuple[dict, int]:
+        """Rebuilds the bank, engine and predictor from disk and swaps them in."""
+        if not ADMIN_TOKEN:
+            return {"error": "Reload endpoint is disabled (ADMIN_TOKEN is not set)."}, 403
+        if not admin_token or not hmac.compare_digest(admin_token, ADMIN_TOKEN):
+            return {"error": "Invalid admin token."}, 403
+        try:
+            report = self.registry.reload()
+        except Exception as e:
+            print(f"ERROR: Artifact reload failed; keeping version {self.registry.current.version}. Error: {e}")
+            return {"error": f"Reload failed: {e}", "version": self.registry.current.version}, 500
+        return report, 409 if report["status"] == "busy" else 200
@@ -0,0 +1,380 @@
+# bank_format.py
+"""
+Compiled, memory-mapped question bank format.
+
+A compiled bank is a directory of plain `.npy` arrays plus a `meta.json` header:
+
+    meta.json                  format version, content version, row count, role/skill names
+    q_id.npy                   int64 Q_IDs (row order)
+    q_id_sorted.npy            Q_IDs sorted ascending, for O(log n) Q_ID lookups
+    q_id_order.npy             row positions matching q_id_sorted
+    difficulty.npy             int8 difficulty level per row
+    role.npy / skill.npy       int32 codes into the names listed in meta.json
+    bucket_order.npy           row positions grouped by (role, difficulty)
+    question.{offsets,blob}.npy
+    answer.{offsets,blob}.npy  UTF-8 strings stored as one byte blob + (n + 1) offsets
+    options.{index,offsets,blob}.npy
+                               options pre-split: row i owns options index[i]:index[i + 1]
+
+Arrays are opened with `np.load(..., mmap_mode='r')`, so every worker process maps the
+same page-cache copy of the bank instead of parsing the CSV into private memory.
+
+The bank path is a symlink to a hidden sibling directory, `.<name>.<random>`, holding
+one complete bank. A recompile writes a new sibling and then flips the link with one
+rename, so readers open either the old bank or the new one, never a mix of both.
+
+Usage:
+    python bank_format.py compile ../data/assessment_data.csv ../data/assessment_data.bank
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+
+
+class StringColumn:
+    """Read-only sequence of strings backed by an offsets array and a UTF-8 blob."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+    def tolist(self) -> list:
+        return [self[i] for i in range(len(self))]
+
+
+class OptionsColumn:
+    """Pre-split answer options; `split_at(i)` returns the option list of row i."""
+
+    def __init__(self, index, offsets, blob):
+        self.index = index
+        self.values = StringColumn(offsets, blob)
+
+    def __len__(self) -> int:
+        return len(self.index) - 1
+
+    def split_at(self, i: int) -> list:
+        return [self.values[j] for j in range(self.index[i], self.index[i + 1])]
+
+    def __getitem__(self, i: int) -> str:
+        # Same ';'-joined layout as the CSV column
+        return ';'.join(self.split_at(i))
+
+
+# --- Writing ---
+def _string_hashes(values) -> np.ndarray:
+    """Per-row uint64 hashes of `values` as strings (the string part of content_version)."""
+    import pandas as pd
+
+    return pd.util.hash_array(np.asarray([str(v) for v in values], dtype=object))
+
+
+def _version_digest(int_columns, string_hashes, names: list) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for values in int_columns:
+        digest.update(np.asarray(values, dtype=np.int64).tobytes())
+    for hashes in string_hashes:
+        digest.update(np.asarray(hashes, dtype=np.uint64).tobytes())
+    digest.update('\x1f'.join(names).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def content_version(q_ids, difficulty, role_codes, skill_codes, questions, options, answers,
+                    names: list) -> str:
+    """
+    Short content hash identifying one version of a bank's data. A CSV bank and the
+    compiled bank built from it get the same version.
+    """
+    return _version_digest((q_ids, difficulty, role_codes, skill_codes),
+                           [_string_hashes(values) for values in (questions, options, answers)], names)
+
+
+def bucket_order(role_codes: np.ndarray, difficulty: np.ndarray) -> np.ndarray:
+    """Row positions sorted by (role, difficulty); rows keep their order within a bucket."""
+    return np.lexsort((difficulty, role_codes)).astype(np.int64)
+
+
+def _offsets(lengths: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+class BankWriter:
+    """
+    Writes a compiled bank from batches of rows. Batches are spilled to a scratch
+    directory as they arrive; `close()` turns them into the bank's arrays in a new
+    version directory and points `out_dir` at it (see `publish_bank`), and `discard()`
+    drops them, leaving any bank already at `out_dir` untouched. Only the fixed-width
+    columns are read back into memory, the string blobs are copied through, so text
+    never accumulates in the process.
+    """
+
+    BLOBS = ('question.blob', 'answer.blob', 'options.blob')
+
+    def __init__(self, out_dir: str, difficulty_col: str = 'Difficulty_Level'):
+        self.out_dir = out_dir
+        self.version_dir = _new_version_dir(out_dir)
+        self.difficulty_col = difficulty_col
+        self.rows = 0
+        self._scratch = tempfile.mkdtemp(prefix='.bank-', dir=self.version_dir)
+        self._files = {}
+        # name -> code, assigned in order of first appearance like pd.factorize
+        self._codes = {'role': {}, 'skill': {}}
+
+    def _spill(self, name: str, data) -> None:
+        f = self._files.get(name)
+        if f is None:
+            f = self._files[name] = open(os.path.join(self._scratch, name), 'wb')
+        f.write(data if isinstance(data, bytes) else data.tobytes())
+
+    def _encode(self, kind: str, values) -> np.ndarray:
+        import pandas as pd
+
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        known = self._codes[kind]
+        # The trailing -1 keeps missing values (code -1) at -1
+        mapping = np.array([known.setdefault(str(u), len(known)) for u in uniques] + [-1], dtype=np.int32)
+        return mapping[codes]
+
+    def append(self, q_ids, difficulty, roles, skills, questions, options: list, answers) -> None:
+        """Appends a batch of rows; `options` holds each row's list of options."""
+        q_ids = np.asarray(q_ids, dtype=np.int64)
+        self._spill('q_id', q_ids)
+        self._spill('difficulty', np.asarray(difficulty, dtype=np.int8))
+        self._spill('role', self._encode('role', roles))
+        self._spill('skill', self._encode('skill', skills))
+        for name, values in (('question', questions), ('answer', answers)):
+            encoded = [str(v).encode('utf-8') for v in values]
+            self._spill(f'{name}.lengths', np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+            self._spill(f'{name}.blob', b''.join(encoded))
+        flat = [str(opt).encode('utf-8') for opts in options for opt in opts]
+        self._spill('options.counts', np.fromiter(map(len, options), dtype=np.int64, count=len(options)))
+        self._spill('options.lengths', np.fromiter(map(len, flat), dtype=np.int64, count=len(flat)))
+        self._spill('options.blob', b''.join(flat))
+        # Options are hashed in their ';'-joined CSV layout, as content_version does
+        for name, values in (('question', questions), ('options', [';'.join(map(str, o)) for o in options]),
+                             ('answer', answers)):
+            self._spill(f'{name}.hash', _string_hashes(values))
+        self.rows += len(q_ids)
+
+    def close(self) -> dict:
+        """Writes the arrays and meta.json, publishes the bank at `out_dir`; returns the meta header."""
+        for f in self._files.values():
+            f.close()
+        try:
+            meta = self._write()
+        except BaseException:
+            shutil.rmtree(self.version_dir, ignore_errors=True)
+            raise
+        finally:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+        publish_bank(self.out_dir, self.version_dir)
+        return meta
+
+    def discard(self) -> None:
+        """Removes the scratch files and the unpublished version directory."""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self.version_dir, ignore_errors=True)
+
+    def _load(self, name: str, dtype) -> np.ndarray:
+        path = os.path.join(self._scratch, name)
+        return np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype=dtype)
+
+    def _write(self) -> dict:
+        q_ids = self._load('q_id', np.int64)
+        if len(np.unique(q_ids)) != len(q_ids):
+            raise ValueError("Q_ID values must be unique.")
+        difficulty = self._load('difficulty', np.int8)
+        role_codes = self._load('role', np.int32)
+        skill_codes = self._load('skill', np.int32)
+
+        arrays = {
+            'q_id': q_ids,
+            'q_id_sorted': np.sort(q_ids),
+            'q_id_order': np.argsort(q_ids, kind='stable').astype(np.int64),
+            'difficulty': difficulty,
+            'role': role_codes,
+            'skill': skill_codes,
+            'bucket_order': bucket_order(role_codes, difficulty),
+            'question.offsets': _offsets(self._load('question.lengths', np.int64)),
+            'answer.offsets': _offsets(self._load('answer.lengths', np.int64)),
+            'options.index': _offsets(self._load('options.counts', np.int64)),
+            'options.offsets': _offsets(self._load('options.lengths', np.int64)),
+        }
+        for name, values in arrays.items():
+            replace_file(os.path.join(self.version_dir, f'{name}.npy'), lambda f: np.save(f, values))
+        for name in self.BLOBS:
+            replace_file(os.path.join(self.version_dir, f'{name}.npy'),
+                         lambda f: _copy_as_npy(os.path.join(self._scratch, name), f))
+
+        role_names, skill_names = list(self._codes['role']), list(self._codes['skill'])
+        hashes = [self._load(f'{name}.hash', np.uint64) for name in ('question', 'options', 'answer')]
+        meta = {
+            'format_version': FORMAT_VERSION,
+            'version': _version_digest((q_ids, difficulty, role_codes, skill_codes), hashes,
+                                       role_names + skill_names),
+            'rows': int(len(q_ids)),
+            'difficulty_col': self.difficulty_col,
+            'roles': role_names,
+            'skills': skill_names,
+        }
+        # meta.json is written last: its presence marks a complete bank
+        replace_file(os.path.join(self.version_dir, META_FILE),
+                     lambda f: f.write(json.dumps(meta, indent=2).encode('utf-8')))
+        return meta
+
+
+def _copy_as_npy(raw_path: str, f) -> None:
+    """Writes the bytes of `raw_path` to `f` as a uint8 .npy array, in blocks."""
+    size = os.path.getsize(raw_path) if os.path.exists(raw_path) else 0
+    header = np.lib.format.header_data_from_array_1_0(np.empty(0, dtype=np.uint8))
+    header['shape'] = (size,)
+    np.lib.format.write_array_header_1_0(f, header)
+    if size:
+        with open(raw_path, 'rb') as src:
+            shutil.copyfileobj(src, f, 1 << 20)
+
+
+def _new_version_dir(out_dir: str) -> str:
+    parent, name = os.path.split(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f'.{name}.', dir=parent)
+
+
+def publish_bank(out_dir: str, version_dir: str) -> None:
+    """
+    Points `out_dir` at the complete bank in `version_dir` by renaming a new symlink over
+    it. The previous version directory is kept, since a reader may have just resolved the
+    link to it; older ones are removed (workers that still map their files keep them).
+    """
+    out_dir = os.path.abspath(out_dir)
+    parent, name = os.path.split(out_dir)
+    previous = os.path.realpath(out_dir) if os.path.islink(out_dir) else None
+    if os.path.isdir(out_dir) and previous is None:
+        # A bank compiled before banks were published by symlink: move it aside once.
+        # Until the link below exists, readers find no bank at out_dir.
+        previous = _new_version_dir(out_dir)
+        os.replace(out_dir, previous)
+
+    link = f'{out_dir}.tmp{os.getpid()}'
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, out_dir)
+
+    keep = {os.path.basename(version_dir), os.path.basename(previous or '')}
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        # Unfinished version directories (no meta.json yet) may belong to a running writer
+        if entry.startswith(f'.{name}.') and entry not in keep and is_compiled_bank(path) \
+                and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_compiled_bank(df, out_dir: str, difficulty_col: str | None = None) -> dict:
+    """Writes DataFrame `df` (assessment_data.csv layout) as a compiled bank into `out_dir`."""
+    if difficulty_col is None:
+        difficulty_col = 'Difficulty_Level' if 'Difficulty_Level' in df.columns else 'Difficulty'
+    if difficulty_col not in df.columns:
+        raise ValueError("Dataset must have either 'Difficulty' or 'Difficulty_Level' column.")
+
+    q_ids = df['Q_ID'].to_numpy(dtype=np.int64) if 'Q_ID' in df.columns else np.arange(len(df), dtype=np.int64)
+    if len(np.unique(q_ids)) != len(q_ids):
+        raise ValueError("Q_ID values must be unique.")
+    skills = df['Skill'].fillna('') if 'Skill' in df.columns else [''] * len(df)
+
+    writer = BankWriter(out_dir, difficulty_col)
+    writer.append(q_ids, df[difficulty_col].to_numpy(dtype=np.int8), df['Job_Role'], skills,
+                  df['Question'].tolist(), [str(raw).split(';') for raw in df['Options'].tolist()],
+                  df['Answer'].tolist())
+    return writer.close()
+
+
+def replace_file(path: str, write) -> None:
+    """
+    Writes `path` through a temporary file and renames it into place. Processes that
+    still memory-map the old file keep reading the old contents.
+    """
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def compile_csv(csv_path: str, out_dir: str) -> dict:
+    """Converts an `assessment_data.csv`-style file into a compiled bank."""
+    import pandas as pd
+
+    return write_compiled_bank(pd.read_csv(csv_path, quotechar='"'), out_dir)
+
+
+# --- Reading ---
+def is_compiled_bank(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def open_compiled_bank(path: str) -> dict:
+    """
+    Memory-maps a compiled bank. Returns the meta header plus typed arrays and lazily
+    decoded string columns; nothing is copied into process-private memory.
+    """
+    # Resolve the link once, so every file comes from the same version directory
+    version_dir = os.path.realpath(path)
+    try:
+        return _open_version(version_dir)
+    except FileNotFoundError:
+        # Two recompiles removed the version while it was being opened: open the current one
+        if os.path.realpath(path) == version_dir:
+            raise
+        return open_compiled_bank(path)
+
+
+def _open_version(path: str) -> dict:
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bank format version: {meta.get('format_version')}")
+
+    def load(name):
+        return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+    return {
+        'meta': meta,
+        'q_id': load('q_id'),
+        'q_id_sorted': load('q_id_sorted'),
+        'q_id_order': load('q_id_order'),
+        'difficulty': load('difficulty'),
+        'role': load('role'),
+        'skill': load('skill'),
+        'bucket_order': load('bucket_order'),
+        'question': StringColumn(load('question.offsets'), load('question.blob')),
+        'answer': StringColumn(load('answer.offsets'), load('answer.blob')),
+        'options': OptionsColumn(load('options.index'), load('options.offsets'), load('options.blob')),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compiled question bank tools.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    compile_cmd = sub.add_parser('compile', help="Convert a CSV question bank into the compiled format.")
+    compile_cmd.add_argument('csv_path')
+    compile_cmd.add_argument('out_dir')
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        meta = compile_csv(args.csv_path, args.out_dir)
+        print(f"Compiled {meta['rows']} questions across {len(meta['roles'])} roles into {args.out_dir}")
@@ -0,0 +1,118 @@
+# bulk_score.py
+"""
+Bulk job-fit scoring for a cohort of candidates.
+
+Streams a CSV or Parquet file in chunks, scores every row with
+JobFitPredictor.predict_fit_many and writes the input columns plus
+JobFitScore and Category to a CSV or Parquet output.
+
+Usage:
+    python bulk_score.py candidates.csv scored.csv
+    python bulk_score.py candidates.parquet scored.parquet --skill-col skill --trust-col trust
+    python bulk_score.py candidates.csv scored.csv --trust-score 85   # fixed trust score
+
+Parquet input/output requires pyarrow.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from jobfit_predictor import JobFitPredictor
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def iter_chunks(path: str, chunk_rows: int):
+    """Yields DataFrames of at most `chunk_rows` rows from a CSV or Parquet file."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet input requires pyarrow (pip install pyarrow).")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet_writer = None
+        self.wrote_header = False
+
+    def write(self, df) -> None:
+        if _is_parquet(self.path):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("Parquet output requires pyarrow (pip install pyarrow).")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self.wrote_header else 'w',
+                      header=not self.wrote_header, index=False)
+            self.wrote_header = True
+
+    def close(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def score_file(predictor: JobFitPredictor, in_path: str, out_path: str, skill_col: str,
+               trust_col: str | None, trust_score: float | None, chunk_rows: int) -> int:
+    """Scores `in_path` into `out_path`; returns the number of rows scored."""
+    writer = ChunkWriter(out_path)
+    total = 0
+    try:
+        for chunk in iter_chunks(in_path, chunk_rows):
+            trust = trust_score if trust_score is not None else chunk[trust_col].to_numpy()
+            result = predictor.predict_fit_many(chunk[skill_col].to_numpy(), trust)
+            chunk['JobFitScore'] = result['JobFitScore']
+            chunk['Category'] = result['Category']
+            writer.write(chunk)
+            total += len(chunk)
+    finally:
+        writer.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="CSV or Parquet file with one candidate per row.")
+    parser.add_argument('output', help="Destination CSV or Parquet file.")
+    parser.add_argument('--skill-col', default='SkillScore')
+    parser.add_argument('--trust-col', default='TrustScore')
+    parser.add_argument('--trust-score', type=float, default=None,
+                        help="Use this trust score for every row instead of --trust-col.")
+    parser.add_argument('--chunk-rows', type=int, default=500_000)
+    parser.add_argument('--model-dir', default=os.path.join(current_dir, '..', 'models'))
+    args = parser.parse_args()
+
+    predictor = JobFitPredictor(model_dir=args.model_dir)
+
+    start = time.perf_counter()
+    rows = score_file(predictor, args.input, args.output, args.skill_col,
+                      args.trust_col, args.trust_score, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+
+    rate = rows / elapsed * 60 if elapsed > 0 else float('inf')
+    print(f"Scored {rows} candidates in {elapsed:.2f}s ({rate:,.0f} rows/minute) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
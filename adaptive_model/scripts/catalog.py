@@ -0,0 +1,54 @@
+# catalog.py
+import json
+
+import numpy as np
+
+
+class BankCatalog:
+    """
+    Derived catalog data for one version of the question bank.
+
+    Computed once when first requested: the role list, per-role question counts by
+    difficulty and per-role skill lists, plus their pre-serialized JSON responses and
+    an ETag. A reloaded bank gets a fresh catalog; the catalog itself never changes,
+    so serving it is constant-time and clients can cache it until the version changes.
+    """
+
+    def __init__(self, bank):
+        self.version = bank.version
+        self.etag = f'"{self.version}"'
+        self.roles = list(bank.roles)
+
+        skills_by_role = self._skills_by_role(bank)
+        self.role_details = []
+        for role in self.roles:
+            buckets = bank.buckets[role]
+            by_difficulty = {str(diff): len(buckets[diff]) for diff in sorted(buckets)}
+            self.role_details.append({
+                "role": role,
+                "questions": sum(by_difficulty.values()),
+                "by_difficulty": by_difficulty,
+                "skills": skills_by_role.get(role, []),
+            })
+
+        # Pre-serialized response bodies
+        self.roles_json = json.dumps({"roles": self.roles}).encode('utf-8')
+        self.catalog_json = json.dumps({"version": self.version, "roles": self.role_details}).encode('utf-8')
+
+    @staticmethod
+    def _skills_by_role(bank) -> dict:
+        """Role name -> skill names in order of first appearance (one vectorized pass)."""
+        role_codes = np.asarray(bank.role_codes, dtype=np.int64)
+        skill_codes = np.asarray(bank.skill_codes, dtype=np.int64)
+        if len(role_codes) == 0:
+            return {}
+
+        pairs = role_codes * len(bank.skill_names) + skill_codes
+        unique_pairs, first_seen = np.unique(pairs, return_index=True)
+        skills_by_role = {}
+        for pair in unique_pairs[np.argsort(first_seen)].tolist():
+            role_code, skill_code = divmod(pair, len(bank.skill_names))
+            skill = bank.skill_names[skill_code]
+            if skill:
+                skills_by_role.setdefault(bank.role_names[role_code], []).append(skill)
+        return skills_by_role
@@ -0,0 +1,220 @@
+# exposure_control.py
+"""
+Item exposure control and per-Skill content balancing for the adaptive engines.
+
+Exposure control follows Sympson-Hetter with online estimates: every item has an
+acceptance weight K = min(1, (max_rate / exposure rate) ** K_EXPONENT). The exposure rate
+is the share of the role's sessions that were served the item, read from counters shared
+by all sessions of the engine. The steep exponent keeps an over-exposed item's rate close
+to `max_rate` (a plain ratio would settle at sqrt(selection rate * max_rate)). Weights
+only reorder choices among eligible items, so no session is ever left without a question.
+
+Content balancing draws the next question from the Skill that lags its target share the
+most. The target share is the Skill's share of the role's questions.
+
+Rule mode draws from (role, difficulty, Skill) groups through Vose alias tables, which
+cost O(1) per draw. A table is rebuilt from the current counters once its group has
+served a quarter of its size in draws, so rebuilds add O(1) amortized. IRT mode keeps
+maximum-information selection, made randomesque: it walks the bin's ranked items in
+windows of `randomesque`, in random order within a window, and accepts each with
+probability K; this touches at most the bin's TOP_K items.
+
+Counters are per process. With several workers, each one bounds exposure on its own
+traffic, which bounds the overall rate when load is spread evenly.
+"""
+import random
+import threading
+
+import numpy as np
+
+# Rejection draws of an administered item before falling back to filtering the group
+MAX_REJECTIONS = 32
+# Exponent of the acceptance weight K
+K_EXPONENT = 8
+
+
+class AliasTable:
+    """Vose alias table: O(1) draws of an index in proportion to `weights`."""
+
+    def __init__(self, weights: np.ndarray):
+        n = len(weights)
+        scaled = np.asarray(weights, dtype=np.float64) * n / weights.sum()
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = np.flatnonzero(scaled < 1.0).tolist()
+        large = np.flatnonzero(scaled >= 1.0).tolist()
+        scaled = scaled.tolist()
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.prob = prob.tolist()
+        self.alias = alias.tolist()
+
+    def sample(self) -> int:
+        i = random.randrange(len(self.prob))
+        return i if random.random() < self.prob[i] else self.alias[i]
+
+
+class _Group:
+    """Questions of one (role, difficulty, Skill) group and the alias table drawing from them."""
+
+    __slots__ = ('positions', 'table', 'draws_left')
+
+    def __init__(self, positions: np.ndarray):
+        self.positions = positions
+        self.table = None       # None: draw uniformly
+        self.draws_left = 0     # draws until the table is rebuilt
+
+
+class ExposureControl:
+    """
+    Shared exposure counters plus the samplers built on them, for one engine.
+
+        max_rate            target ceiling on any item's exposure rate; None disables
+                            exposure weighting
+        content_balancing   draw from the Skill furthest below its target share
+        randomesque         IRT mode: eligible items drawn among, most informative first
+    """
+
+    REBUILD_FRACTION = 0.25
+    MIN_REBUILD_DRAWS = 32
+
+    def __init__(self, bank, max_rate: float | None = None, content_balancing: bool = False,
+                 randomesque: int = 5):
+        self.bank = bank
+        self.max_rate = max_rate
+        self.content_balancing = content_balancing
+        self.randomesque = max(1, randomesque)
+        self.exposures = np.zeros(len(bank), dtype=np.int64)
+        self.sessions = {}
+        self._groups = {}   # role -> difficulty -> {skill code (-1: all): _Group}
+        self._targets = {}  # role -> skill code -> target share
+        self._lock = threading.Lock()
+
+    # --- Counters ---
+    def start_session(self, role: str) -> None:
+        with self._lock:
+            self.sessions[role] = self.sessions.get(role, 0) + 1
+
+    def record(self, pos: int) -> None:
+        """Counts one exposure of row `pos`."""
+        with self._lock:
+            self.exposures[pos] += 1
+
+    def exposure_rate(self, role: str, positions) -> np.ndarray:
+        return self.exposures[positions] / max(self.sessions.get(role, 0), 1)
+
+    def weights(self, role: str, positions) -> np.ndarray:
+        """Sympson-Hetter acceptance weights K of `positions`."""
+        rate = self.exposure_rate(role, positions)
+        if self.max_rate is None:
+            return np.ones(len(rate))
+        return np.minimum(1.0, (self.max_rate / np.maximum(rate, 1e-12)) ** K_EXPONENT)
+
+    # --- Content balancing ---
+    def skill_order(self, state, candidates_by_skill: dict) -> list:
+        """Skills of `candidates_by_skill`, furthest below their target share first."""
+        if len(candidates_by_skill) <= 1:
+            return list(candidates_by_skill)
+        targets = self._skill_targets(state.role)
+        counts = {}
+        for pos in state.administered:
+            skill = int(self.bank.skill_codes[pos])
+            counts[skill] = counts.get(skill, 0) + 1
+        n = len(state.administered) + 1
+        deficit = {skill: targets.get(skill, 0.0) * n - counts.get(skill, 0) for skill in candidates_by_skill}
+        # Random tie-break, so equally lagging Skills take turns
+        return sorted(candidates_by_skill, key=lambda skill: (-deficit[skill], random.random()))
+
+    def _skill_targets(self, role: str) -> dict:
+        targets = self._targets.get(role)
+        if targets is None:
+            positions = np.concatenate(list(self.bank.buckets.get(role, {}).values()) or [np.empty(0, dtype=np.int64)])
+            counts = np.bincount(np.asarray(self.bank.skill_codes)[positions])
+            targets = {int(skill): count / len(positions) for skill, count in enumerate(counts.tolist()) if count}
+            self._targets[role] = targets
+        return targets
+
+    # --- Rule-mode draws ---
+    def draw(self, state, diff: int, bucket) -> int | None:
+        """Draws an unadministered row position from `state.role`'s difficulty `diff` bucket."""
+        groups = self._groups_of(state.role, diff, bucket)
+        taken = {}
+        for pos in state.administered:
+            if int(self.bank.difficulty[pos]) == diff and self.bank.role_at(pos) == state.role:
+                key = self._group_key(pos)
+                taken[key] = taken.get(key, 0) + 1
+        remaining = {key: group for key, group in groups.items() if taken.get(key, 0) < len(group.positions)}
+        for key in self.skill_order(state, remaining):
+            return self._draw_group(state, remaining[key])
+        return None
+
+    def _group_key(self, pos: int) -> int:
+        return int(self.bank.skill_codes[pos]) if self.content_balancing else -1
+
+    def _groups_of(self, role: str, diff: int, bucket) -> dict:
+        role_groups = self._groups.setdefault(role, {})
+        groups = role_groups.get(diff)
+        if groups is None:
+            with self._lock:
+                groups = role_groups.get(diff)
+                if groups is None:
+                    bucket = np.asarray(bucket, dtype=np.int64)
+                    if self.content_balancing:
+                        skills = np.asarray(self.bank.skill_codes)[bucket]
+                        groups = {int(skill): _Group(bucket[skills == skill]) for skill in np.unique(skills).tolist()}
+                    else:
+                        groups = {-1: _Group(bucket)}
+                    role_groups[diff] = groups
+        return groups
+
+    def _draw_group(self, state, group: _Group) -> int:
+        # Sessions (and speculation threads) draw concurrently: one rebuild per interval
+        with self._lock:
+            group.draws_left -= 1
+            if group.draws_left <= 0:
+                self._rebuild(state.role, group)
+            table = group.table
+        positions = group.positions
+        administered = state.administered
+        for _ in range(MAX_REJECTIONS):
+            i = table.sample() if table is not None else random.randrange(len(positions))
+            pos = int(positions[i])
+            if pos not in administered:
+                return pos
+
+        # Nearly exhausted group: weighted choice among what is left
+        candidates = np.array([pos for pos in positions.tolist() if pos not in administered], dtype=np.int64)
+        weights = self.weights(state.role, candidates)
+        return int(random.choices(candidates.tolist(), weights=weights.tolist())[0])
+
+    def _rebuild(self, role: str, group: _Group) -> None:
+        """Rebuilds `group`'s alias table from the current counters; called with the lock held."""
+        weights = self.weights(role, group.positions)
+        group.table = None if weights.min() == weights.max() else AliasTable(weights)
+        group.draws_left = max(self.MIN_REBUILD_DRAWS, int(len(group.positions) * self.REBUILD_FRACTION))
+
+    # --- IRT-mode choice ---
+    def choose(self, state, ranked: list) -> int:
+        """
+        Randomesque Sympson-Hetter choice from `ranked` (eligible row positions, most
+        informative first), restricted to the most lagging Skill when balancing.
+        """
+        if self.content_balancing:
+            by_skill = {}
+            for pos in ranked:
+                by_skill.setdefault(int(self.bank.skill_codes[pos]), []).append(pos)
+            ranked = by_skill[self.skill_order(state, by_skill)[0]]
+        weights = self.weights(state.role, np.array(ranked, dtype=np.int64)).tolist()
+        order = list(range(len(ranked)))
+        for start in range(0, len(order), self.randomesque):
+            window = order[start:start + self.randomesque]
+            random.shuffle(window)
+            for i in window:
+                if random.random() < weights[i]:
+                    return ranked[i]
+        # Every candidate rejected: the least over-exposed one
+        return ranked[max(order, key=weights.__getitem__)]
@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+"""
+Preforking launch profile for the ASGI app (run from adaptive_model/scripts):
+
+    gunicorn -c gunicorn.conf.py asgi_app:app
+
+The master loads the question bank, engine and job-fit model once (assessment_service.
+preload) and forks the workers from it, so they share those pages copy-on-write:
+worker boot skips artifact loading and resident memory per extra worker stays small.
+Each worker still builds its own session store connection, results sink and threads.
+Workers reload artifacts on their own (RELOAD_POLL_SECONDS / POST /admin/reload); a
+reloaded generation is private to the worker that built it.
+
+Settings: BIND (default 0.0.0.0:5000), WEB_CONCURRENCY (workers, default one per core).
+"""
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 1)))
+worker_class = 'uvicorn.workers.UvicornWorker'
+backlog = 4096
+keepalive = 5
+# Import the app in the master, so the preloaded artifacts are inherited by every worker
+preload_app = True
+
+
+def on_starting(server):
+    import assessment_service
+    assessment_service.preload()
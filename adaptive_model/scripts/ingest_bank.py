@@ -0,0 +1,484 @@
+# ingest_bank.py
+"""
+Streaming ingestion of question banks into the compiled bank format (bank_format.py).
+
+Sources are CSV files in the assessment_data.csv layout or JSON Lines files (.jsonl,
+.ndjson) with the same fields, one question per line. They are read in chunks of
+--chunksize rows, so memory does not grow with the size of the files. Each chunk is
+prepared on one of --workers processes:
+
+- validation, vectorized over the chunk: Job_Role, Question, Options and Answer are
+  present; the difficulty is an integer in [MIN_DIFFICULTY, MAX_DIFFICULTY]; Options
+  splits into at least two distinct, non-empty options and contains the Answer; a
+  given Q_ID is an integer in [0, 2**53)
+- a content hash of (Job_Role, normalized Question), where normalizing folds case and
+  collapses whitespace
+- a MinHash signature of the question's character 4-grams (punctuation removed) and
+  its LSH band keys
+
+Chunks come back in input order and are deduplicated against everything accepted
+before them. Within a role, a question with the content hash of an earlier one is an
+exact duplicate. One that shares an LSH band with an earlier question and whose
+signatures agree on at least --near-threshold of their values (an estimate of the
+Jaccard similarity of the 4-gram sets) is a near duplicate. Dropped and invalid rows
+are counted per reason and, with --rejects, written to a CSV with their source row.
+
+Rows without a Q_ID get a stable one: 52 bits of the content hash, so re-ingesting an
+edited bank keeps the Q_IDs (and the item parameters and results recorded against
+them) of questions whose text did not change. 52-bit IDs are also exact as JSON
+numbers in browsers. --q-ids row numbers the rows by position instead, as the CSV
+loader does, for banks whose Q_IDs must match existing response logs.
+
+Usage:
+    python ingest_bank.py ../data/assessment_data.csv --out ../data/assessment_data.bank
+    python ingest_bank.py bank_part1.csv bank_part2.jsonl --out ../data/assessment_data.bank \\
+        --workers 8 --rejects rejects.csv
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from adaptive_logic import AdaptiveEngine
+from bank_format import BankWriter
+
+BANK_COLUMNS = ('Q_ID', 'Job_Role', 'Skill', 'Question', 'Options', 'Answer', 'Difficulty_Level', 'Difficulty')
+REQUIRED_COLUMNS = ('Job_Role', 'Question', 'Options', 'Answer')
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+# Explicit Q_IDs must be exact as JSON numbers; derived ones use Q_ID_BITS bits
+MAX_Q_ID = 2 ** 53 - 1
+Q_ID_BITS = 52
+
+# MinHash: PERMUTATIONS hash functions, in BANDS bands of BAND_ROWS for LSH
+SHINGLE_BYTES = 4
+BANDS = 8
+BAND_ROWS = 4
+PERMUTATIONS = BANDS * BAND_ROWS
+MINHASH_BATCH = 512
+# Multiply-shift hash functions, h(x) = (a * x + b) mod 2**64 >> 32 with odd a. The seed
+# is fixed: signatures must agree across worker processes and ingestion runs.
+_rng = np.random.default_rng(0x5EED)
+MINHASH_A = _rng.integers(0, 2 ** 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+MINHASH_B = _rng.integers(0, 2 ** 63, PERMUTATIONS, dtype=np.uint64)
+FNV_PRIME = np.uint64(0x100000001B3)
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+# --- Chunk preparation (worker processes) ---
+def _text(chunk: pd.DataFrame, column: str) -> pd.Series:
+    """Column as stripped strings, '' where missing."""
+    if column not in chunk.columns:
+        return pd.Series('', index=chunk.index, dtype=object)
+    values = chunk[column]
+    return values.where(values.notna(), '').astype(str).str.strip()
+
+
+def _string_keys(values) -> np.ndarray:
+    """8-byte hashes of strings that agree across processes (unlike hash()), one per distinct value."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    keys = np.array([int.from_bytes(hashlib.blake2b(str(v).encode('utf-8'), digest_size=8).digest(), 'little')
+                     for v in uniques] + [0], dtype=np.uint64)
+    return keys[codes]
+
+
+def minhash(texts: list) -> np.ndarray:
+    """(len(texts), PERMUTATIONS) MinHash signatures of the texts' UTF-8 4-grams."""
+    signatures = np.empty((len(texts), PERMUTATIONS), dtype=np.uint32)
+    for start in range(0, len(texts), MINHASH_BATCH):
+        encoded = [t.encode('utf-8').ljust(SHINGLE_BYTES) for t in texts[start:start + MINHASH_BATCH]]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        # Every 4-gram of the joined batch; keep those that do not cross into the next text
+        grams = blob[:-3] << np.uint64(24) | blob[1:-2] << np.uint64(16) | blob[2:-1] << np.uint64(8) | blob[3:]
+        ends = np.cumsum(lengths)
+        row_of = np.repeat(np.arange(len(encoded)), lengths)[:len(grams)]
+        grams = grams[np.arange(len(grams)) + SHINGLE_BYTES <= ends[row_of]]
+        first_gram = np.concatenate(([0], np.cumsum(lengths - SHINGLE_BYTES + 1)[:-1]))
+        hashed = np.multiply.outer(MINHASH_A, grams)
+        hashed += MINHASH_B[:, None]
+        hashed >>= np.uint64(32)
+        signatures[start:start + len(encoded)] = np.minimum.reduceat(hashed, first_gram, axis=1).T
+    return signatures
+
+
+def band_keys(signatures: np.ndarray, role_keys: np.ndarray) -> np.ndarray:
+    """(rows, BANDS) LSH keys; each covers one band of the signature and the role."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, BAND_ROWS)
+    keys = role_keys[:, None] ^ np.arange(BANDS, dtype=np.uint64)[None, :]
+    for i in range(BAND_ROWS):
+        keys = (keys ^ bands[:, :, i]) * FNV_PRIME
+    return keys
+
+
+def prepare_chunk(chunk: pd.DataFrame, source: str, first_record: int, first_position: int,
+                  q_id_mode: str, near_dedup: bool) -> dict:
+    """
+    Process-pool task: validates a chunk and computes the keys deduplication needs.
+    `first_record` is the 1-based row of the chunk in its source and `first_position`
+    its 0-based position across all sources.
+    """
+    chunk = chunk.reset_index(drop=True)
+    n = len(chunk)
+    text = {column: _text(chunk, column) for column in REQUIRED_COLUMNS + ('Skill', 'Q_ID')}
+    reasons = np.full(n, '', dtype=object)
+
+    def reject(mask, reason: str) -> None:
+        reasons[np.asarray(mask, dtype=bool) & (reasons == '')] = reason
+
+    reject(np.logical_or.reduce([(text[c] == '').to_numpy() for c in REQUIRED_COLUMNS]), 'missing_field')
+
+    difficulty_col = 'Difficulty_Level' if 'Difficulty_Level' in chunk.columns else 'Difficulty'
+    if difficulty_col in chunk.columns:
+        difficulty = pd.to_numeric(chunk[difficulty_col], errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        difficulty = np.full(n, np.nan)
+    reject(np.isnan(difficulty) | (difficulty != np.floor(difficulty)), 'invalid_difficulty')
+    reject((difficulty < AdaptiveEngine.MIN_DIFFICULTY) | (difficulty > AdaptiveEngine.MAX_DIFFICULTY),
+           'difficulty_out_of_range')
+
+    given = (text['Q_ID'] != '').to_numpy()
+    q_id_values = pd.to_numeric(text['Q_ID'].where(given, None), errors='coerce').to_numpy(dtype=np.float64)
+    reject(given & ~((q_id_values >= 0) & (q_id_values <= MAX_Q_ID) & (q_id_values == np.floor(q_id_values))),
+           'invalid_q_id')
+
+    split_options = [[opt.strip() for opt in raw.split(';')] for raw in text['Options'].tolist()]
+    options = pd.Series([opt for opts in split_options for opt in opts],
+                        index=np.repeat(np.arange(n), [len(opts) for opts in split_options]), dtype=object)
+    per_row = options.groupby(level=0)
+    count = per_row.size().to_numpy()
+    reject((options == '').groupby(level=0).any().to_numpy(), 'empty_option')
+    reject(count < 2, 'too_few_options')
+    reject(per_row.nunique().to_numpy() < count, 'duplicate_options')
+    answer_found = (options == text['Answer'].reindex(options.index)).groupby(level=0).any().to_numpy()
+    reject(~answer_found, 'answer_not_in_options')
+
+    records = first_record + np.arange(n)
+    bad = reasons != ''
+    invalid = pd.DataFrame({'source': source, 'row': records[bad], 'reason': reasons[bad], 'detail': '',
+                            'Job_Role': text['Job_Role'][bad].to_numpy(),
+                            'Question': text['Question'][bad].to_numpy()})
+
+    rows = np.flatnonzero(~bad)
+    roles = text['Job_Role'].to_numpy()[rows]
+    questions = text['Question'].to_numpy()[rows].tolist()
+    normalized = [' '.join(question.casefold().split()) for question in questions]
+    content = np.empty(len(rows), dtype=np.uint64)
+    derived = np.empty(len(rows), dtype=np.int64)
+    for i, (role, question) in enumerate(zip(roles, normalized)):
+        digest = hashlib.blake2b(f'{role}\x1f{question}'.encode('utf-8'), digest_size=16).digest()
+        derived[i] = int.from_bytes(digest[:8], 'little') >> (64 - Q_ID_BITS)
+        content[i] = int.from_bytes(digest[8:], 'little')
+    if q_id_mode == 'row':
+        derived = first_position + rows.astype(np.int64)
+    q_ids = np.where(given[rows], np.nan_to_num(q_id_values[rows]).astype(np.int64), derived)
+
+    prepared = {
+        'source': source,
+        'records': n,
+        'invalid': invalid,
+        'row': records[rows],
+        'q_id': q_ids,
+        'content': content,
+        'difficulty': difficulty[rows].astype(np.int8),
+        'role': roles,
+        'skill': text['Skill'].to_numpy()[rows],
+        'question': questions,
+        'options': [split_options[row] for row in rows],
+        'answer': text['Answer'].to_numpy()[rows],
+        'difficulty_col': difficulty_col,
+        'signatures': None,
+        'bands': None,
+    }
+    if near_dedup:
+        shingle_text = [' '.join(PUNCTUATION.sub(' ', question).split()) for question in normalized]
+        signatures = minhash(shingle_text)
+        prepared['bands'] = band_keys(signatures, _string_keys(roles))
+        # Candidates are verified on the top 16 bits of each value; a chance match of
+        # two different values (1 in 65536) barely moves the similarity estimate
+        prepared['signatures'] = (signatures >> 16).astype(np.uint16)
+    return prepared
+
+
+# --- Deduplication (main process) ---
+class KeyIndex:
+    """
+    uint64 key -> int64 value map for the dedup state of an ingestion run. Keys are
+    kept in sorted numpy runs, merged as they pile up, so an entry costs 16 bytes
+    instead of a Python dict entry. The first value added for a key wins.
+    """
+
+    def __init__(self, value_dtype=np.int64):
+        self.value_dtype = value_dtype
+        self._runs = []
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys, _ in self._runs)
+
+    def add(self, keys, values) -> None:
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return
+        order = np.argsort(keys, kind='stable')
+        self._runs.append((keys[order], np.asarray(values, dtype=self.value_dtype)[order]))
+        # Older runs stay first, so the stable merge keeps their values ahead of newer ones
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            (old_keys, old_values), (new_keys, new_values) = self._runs[-2], self._runs.pop()
+            keys = np.concatenate((old_keys, new_keys))
+            order = np.argsort(keys, kind='stable')
+            self._runs[-1] = (keys[order], np.concatenate((old_values, new_values))[order])
+
+    def lookup(self, keys) -> np.ndarray:
+        """Values of `keys`, -1 where a key is absent."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.full(len(keys), -1, dtype=np.int64)
+        for run_keys, run_values in self._runs:
+            i = np.minimum(np.searchsorted(run_keys, keys), len(run_keys) - 1)
+            hit = (found < 0) & (run_keys[i] == keys)
+            found[hit] = run_values[i[hit]]
+        return found
+
+
+def _first_earlier(keys: np.ndarray) -> np.ndarray:
+    """For each key, the index of its first occurrence in `keys`."""
+    if not len(keys):
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+    first = np.empty(len(keys), dtype=np.int64)
+    first[order] = order[np.maximum.accumulate(np.where(starts, np.arange(len(keys)), 0))]
+    return first
+
+
+class Deduplicator:
+    """Exact and near-duplicate detection against every question accepted so far."""
+
+    def __init__(self, near_threshold: float | None):
+        self.near_threshold = near_threshold
+        self.contents = KeyIndex()  # content hash -> Q_ID
+        self.q_ids = KeyIndex()     # Q_ID -> Q_ID
+        # Per band: LSH band key -> accepted row, the row indexing the arrays below
+        self.bands = [KeyIndex(np.int32) for _ in range(BANDS)]
+        self._signatures = np.empty((1024, PERMUTATIONS), dtype=np.uint16)
+        self._signature_q_ids = np.empty(1024, dtype=np.int64)
+        self.accepted = 0
+
+    def filter(self, prepared: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(reasons, details, accepted mask) for the valid rows of a prepared chunk, in order."""
+        q_ids, content = prepared['q_id'], prepared['content']
+        n = len(q_ids)
+        reasons = np.full(n, '', dtype=object)
+        details = np.full(n, '', dtype=object)
+
+        def reject(rows, earlier_q_ids, reason: str, describe) -> None:
+            for row, earlier in zip(rows, earlier_q_ids):
+                reasons[row] = reason
+                details[row] = describe(earlier)
+
+        # Exact duplicates: earlier chunks first, then earlier rows of this chunk
+        previous = self.contents.lookup(content)
+        hit = np.flatnonzero(previous >= 0)
+        reject(hit, previous[hit], 'duplicate', lambda q: f"same question as Q_ID {q}")
+        self._reject_within(content, q_ids, reasons, details, 'duplicate', lambda q: f"same question as Q_ID {q}")
+
+        open_rows = np.flatnonzero(reasons == '')
+        previous = self.q_ids.lookup(q_ids[open_rows].view(np.uint64))
+        hit = previous >= 0
+        reject(open_rows[hit], previous[hit], 'duplicate_q_id', lambda q: f"Q_ID {q} is already used")
+        self._reject_within(q_ids.view(np.uint64), q_ids, reasons, details, 'duplicate_q_id',
+                            lambda q: f"Q_ID {q} is already used")
+
+        if self.near_threshold is not None:
+            self._reject_near(prepared, reasons, details)
+
+        accepted = reasons == ''
+        self._accept(prepared, accepted)
+        return reasons, details, accepted
+
+    @staticmethod
+    def _reject_within(keys, q_ids, reasons, details, reason: str, describe) -> None:
+        open_rows = np.flatnonzero(reasons == '')
+        first = _first_earlier(keys[open_rows])
+        for i in np.flatnonzero(first != np.arange(len(open_rows))):
+            reasons[open_rows[i]] = reason
+            details[open_rows[i]] = describe(q_ids[open_rows[first[i]]])
+
+    def _reject_near(self, prepared: dict, reasons, details) -> None:
+        signatures, bands, q_ids = prepared['signatures'], prepared['bands'], prepared['q_id']
+        open_rows = np.flatnonzero(reasons == '')
+        best = np.zeros(len(open_rows))
+        best_q_id = np.full(len(open_rows), -1, dtype=np.int64)
+        for band in range(BANDS):
+            keys = bands[open_rows, band]
+            # Candidates: the first accepted question and the first earlier row of this chunk in the bucket
+            found = self.bands[band].lookup(keys)
+            has = np.flatnonzero(found >= 0)
+            similarity = (signatures[open_rows[has]] == self._signatures[found[has]]).mean(axis=1)
+            better = similarity > best[has]
+            best[has[better]] = similarity[better]
+            best_q_id[has[better]] = self._signature_q_ids[found[has[better]]]
+
+            first = _first_earlier(keys)
+            has = np.flatnonzero(first != np.arange(len(open_rows)))
+            similarity = (signatures[open_rows[has]] == signatures[open_rows[first[has]]]).mean(axis=1)
+            better = similarity > best[has]
+            best[has[better]] = similarity[better]
+            best_q_id[has[better]] = q_ids[open_rows[first[has[better]]]]
+
+        for i in np.flatnonzero(best >= self.near_threshold):
+            reasons[open_rows[i]] = 'near_duplicate'
+            details[open_rows[i]] = f"{best[i]:.0%} similar to Q_ID {best_q_id[i]}"
+
+    def _accept(self, prepared: dict, accepted: np.ndarray) -> None:
+        q_ids = prepared['q_id'][accepted]
+        self.contents.add(prepared['content'][accepted], q_ids)
+        self.q_ids.add(q_ids.view(np.uint64), q_ids)
+        if self.near_threshold is not None:
+            end = self.accepted + len(q_ids)
+            for band in range(BANDS):
+                self.bands[band].add(prepared['bands'][accepted, band], np.arange(self.accepted, end))
+            if end > len(self._signatures):
+                capacity = max(end, 2 * len(self._signatures))
+                self._signatures = np.resize(self._signatures, (capacity, PERMUTATIONS))
+                self._signature_q_ids = np.resize(self._signature_q_ids, capacity)
+            self._signatures[self.accepted:end] = prepared['signatures'][accepted]
+            self._signature_q_ids[self.accepted:end] = q_ids
+        self.accepted += len(q_ids)
+
+
+# --- Pipeline ---
+def read_chunks(path: str, chunksize: int):
+    """Yields DataFrame chunks of a CSV or JSON Lines bank file."""
+    if path.endswith(JSON_LINES_SUFFIXES):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, dtype=False, convert_dates=False)
+    else:
+        columns = pd.read_csv(path, nrows=0).columns
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing or not {'Difficulty_Level', 'Difficulty'} & set(columns):
+            raise ValueError(f"{path}: needs the columns {', '.join(REQUIRED_COLUMNS)} and "
+                             f"Difficulty_Level or Difficulty")
+        # Text stays text: 'None' or 'NA' are valid options and answers
+        reader = pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False, na_values=[''],
+                             usecols=lambda column: column in BANK_COLUMNS)
+    with reader:
+        yield from reader
+
+
+def chunk_tasks(paths: list, chunksize: int, q_id_mode: str, near_dedup: bool):
+    """prepare_chunk arguments for every chunk of `paths`, in order."""
+    position = 0
+    for path in paths:
+        record = 1
+        for chunk in read_chunks(path, chunksize):
+            yield chunk, os.path.basename(path), record, position, q_id_mode, near_dedup
+            record += len(chunk)
+            position += len(chunk)
+
+
+def prepared_chunks(tasks, workers: int):
+    """Runs prepare_chunk over `tasks`, yielding results in order; at most 2 x workers chunks are in flight."""
+    if workers <= 1:
+        for args in tasks:
+            yield prepare_chunk(*args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for args in tasks:
+            pending.append(pool.submit(prepare_chunk, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def ingest(paths: list, out_dir: str, chunksize: int = 50_000, workers: int = 1, q_id_mode: str = 'hash',
+           near_threshold: float | None = 0.8, rejects_path: str | None = None) -> dict:
+    """Ingests `paths` into a compiled bank at `out_dir`; returns row counts per outcome."""
+    start = time.perf_counter()
+    dedup = Deduplicator(near_threshold)
+    counts = Counter()
+    rows_per_source = Counter()
+    writer = None
+    if rejects_path and os.path.exists(rejects_path):
+        os.remove(rejects_path)
+
+    tasks = chunk_tasks(paths, chunksize, q_id_mode, near_threshold is not None)
+    try:
+        for prepared in prepared_chunks(tasks, workers):
+            if writer is None:
+                writer = BankWriter(out_dir, prepared['difficulty_col'])
+            rows_per_source[prepared['source']] += prepared['records']
+            reasons, details, accepted = dedup.filter(prepared)
+            writer.append(prepared['q_id'][accepted], prepared['difficulty'][accepted], prepared['role'][accepted],
+                          prepared['skill'][accepted], [q for q, keep in zip(prepared['question'], accepted) if keep],
+                          [o for o, keep in zip(prepared['options'], accepted) if keep], prepared['answer'][accepted])
+
+            dropped = ~accepted
+            duplicates = pd.DataFrame({
+                'source': prepared['source'], 'row': prepared['row'][dropped], 'reason': reasons[dropped],
+                'detail': details[dropped], 'Job_Role': prepared['role'][dropped],
+                'Question': [q for q, drop in zip(prepared['question'], dropped) if drop]})
+            frames = [frame for frame in (prepared['invalid'], duplicates) if len(frame)]
+            if not frames:
+                continue
+            rejected = pd.concat(frames, ignore_index=True)
+            counts.update(rejected['reason'].tolist())
+            if rejects_path:
+                rejected.sort_values('row').to_csv(rejects_path, mode='a', index=False,
+                                                   header=not os.path.exists(rejects_path))
+        if writer is None:
+            raise ValueError("No rows to ingest.")
+        # An empty bank would replace the one at out_dir (and servers would reload it)
+        if dedup.accepted == 0:
+            dropped = ", ".join(f"{reason} {n:,}" for reason, n in counts.most_common())
+            raise ValueError(f"No valid rows to ingest (dropped: {dropped}); {out_dir} was left unchanged.")
+    except BaseException:
+        if writer is not None:
+            writer.discard()
+        raise
+    # The dedup indexes are no longer needed while the bank's arrays are written
+    del dedup
+    meta = writer.close()
+    seconds = time.perf_counter() - start
+    for source, rows in rows_per_source.items():
+        print(f"INFO: Read {rows:,} rows from {source}.")
+    total = sum(rows_per_source.values())
+    print(f"INFO: {meta['rows']:,} of {total:,} rows ingested into {out_dir} in {seconds:.2f}s "
+          f"({total / max(seconds, 1e-9):,.0f} rows/s); version {meta['version']}.")
+    if counts:
+        print("INFO: Dropped: " + ", ".join(f"{reason} {n:,}" for reason, n in counts.most_common()) + ".")
+    return {'rows': total, 'ingested': meta['rows'], 'dropped': dict(counts), 'seconds': round(seconds, 3),
+            'version': meta['version']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='+', help="Bank files: CSV, or JSON Lines (.jsonl/.ndjson).")
+    parser.add_argument('--out', required=True, help="Compiled bank directory to write (replaced in place).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    parser.add_argument('--q-ids', choices=('hash', 'row'), default='hash',
+                        help="How rows without a Q_ID are numbered: content hash (stable) or row position.")
+    parser.add_argument('--near-threshold', type=float, default=0.8,
+                        help="Estimated 4-gram Jaccard similarity from which a question is a near duplicate.")
+    parser.add_argument('--no-near-dedup', action='store_true', help="Only drop exact duplicates.")
+    parser.add_argument('--rejects', help="CSV file listing every dropped row and why.")
+    args = parser.parse_args()
+
+    ingest(args.sources, args.out, args.chunksize, args.workers, args.q_ids,
+           None if args.no_near_dedup else args.near_threshold, args.rejects)
+
+
+if __name__ == '__main__':
+    main()
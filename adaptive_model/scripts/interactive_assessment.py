@@ -1,189 +1,355 @@
 # interactive_assessment.py
-import tkinter as tk
-from tkinter import messagebox
-import pandas as pd
+"""
+Desktop client: runs an adaptive assessment locally in a Tk window.
+
+The window opens at once on a progress bar while the question bank, engine and
+job-fit predictor load on a background thread. Engine and predictor calls then run on
+that same worker thread too. Their results come back to the Tk thread through a queue
+polled with `after()`, so the window keeps redrawing and responding while they run.
+The screens are built once and switched, and the question screen updates its labels
+and option buttons in place.
+
+Timings are printed: the time from startup until a role can be picked, and for each
+assessment the mean and maximum time to render a question (updating the widgets until
+Tk has laid them out) and to compute it (the engine call).
+"""
 import os
+import queue
 import sys
-import importlib.util
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, ttk
 
-# --- FIX START: Define current_script_dir globally and use it consistently ---
-# Define current_script_dir outside the try/except block to ensure global scope
-current_script_dir = os.path.dirname(os.path.abspath(__file__))
-if os.getcwd() != current_script_dir:
-    # Temporarily change directory to handle relative data paths later
-    os.chdir(current_script_dir)
-# --- FIX END ---
-
-# --- FORCE MODULE LOADING VIA EXECUTION (Robust Fix for Sibling Imports) ---
-# This block should be used only if standard 'from module import Class' fails.
-try:
-    def load_sibling_module(module_name):
-        file_path = os.path.join(current_script_dir, f"{module_name}.py")
-        
-        # Load the module directly from the file path
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        if spec is None:
-            raise FileNotFoundError(f"Could not find module file: {file_path}")
-            
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-        return module
-
-    # Load the classes
-    adaptive_logic_module = load_sibling_module('adaptive_logic')
-    jobfit_predictor_module = load_sibling_module('jobfit_predictor')
-    
-    AdaptiveEngine = adaptive_logic_module.AdaptiveEngine
-    JobFitPredictor = jobfit_predictor_module.JobFitPredictor
-
-except Exception as e:
-    messagebox.showerror("CRITICAL IMPORT ERROR", 
-                         f"Failed to load sibling modules. Details: {e}")
-    sys.exit(1)
+STARTED = time.perf_counter()
 
+current_script_dir = os.path.dirname(os.path.abspath(__file__))
+if current_script_dir not in sys.path:
+    sys.path.append(current_script_dir)
 
 # --- Global Initialization & Data Loading ---
-# FIX 2: Use current_script_dir (now correctly defined) for data path
 csv_path = os.path.join(current_script_dir, '..', 'data', 'assessment_data.csv')
-try:
-    # NOTE: pd.read_csv will use the correct relative path from the current working directory
-    df = pd.read_csv(csv_path, quotechar='"')
-    if df.empty:
-        raise ValueError("The dataset is empty.")
-except Exception as e:
-    messagebox.showerror("Initialization Error", f"Dataset loading failed: {e}. Check path.")
-    df = pd.DataFrame({'Job_Role': ['No Data'], 'Question': ['Error'], 'Options': ['A;B'], 'Answer': ['A'], 'Q_ID': [0], 'Difficulty_Level': [3]})
-
-# Initialize adaptive engine and ML predictor
-engine = AdaptiveEngine(df)
-# FIX 3: Locate the 'models' directory one level up
+# Compiled, memory-mapped bank (see bank_format.py); preferred over the CSV when present
+bank_path = os.path.join(current_script_dir, '..', 'data', 'assessment_data.bank')
 predictor_model_dir = os.path.join(current_script_dir, '..', 'models')
-predictor = JobFitPredictor(model_dir=predictor_model_dir)
+
+# Loaded by load_components() when the app starts, not at import time
+bank = None
+engine = None
+predictor = None
+
+
+def load_components(progress=None) -> str | None:
+    """
+    Loads the question bank, adaptive engine and ML predictor used by the app.
+    `progress(fraction, message)` is called before each step. Returns an error message
+    if the dataset could not be loaded, in which case a placeholder bank is used.
+    """
+    global bank, engine, predictor
+    report = progress or (lambda fraction, message: None)
+
+    report(0.0, "Loading modules...")
+    from adaptive_logic import AdaptiveEngine
+    from jobfit_predictor import JobFitPredictor
+    from question_bank import QuestionBank
+
+    error = None
+    report(0.2, "Loading question bank...")
+    try:
+        bank = QuestionBank.load(bank_path if os.path.isdir(bank_path) else csv_path)
+        if len(bank) == 0:
+            raise ValueError("The dataset is empty.")
+    except Exception as e:
+        import pandas as pd
+        error = f"Dataset loading failed: {e}. Check path."
+        bank = QuestionBank(pd.DataFrame({'Job_Role': ['No Data'], 'Question': ['Error'], 'Options': ['A;B'], 'Answer': ['A'], 'Q_ID': [0], 'Difficulty_Level': [3]}))
+
+    report(0.6, "Preparing adaptive engine...")
+    engine = AdaptiveEngine(bank)
+    # Computed here so the start screen does not build it on the Tk thread
+    bank.catalog.roles
+    report(0.8, "Loading job-fit model...")
+    predictor = JobFitPredictor(model_dir=predictor_model_dir)
+    report(1.0, "Ready.")
+    return error
+
+
+def _summary(values: list) -> str:
+    if not values:
+        return "n/a"
+    return f"mean {sum(values) / len(values):.1f} ms, max {max(values):.1f} ms"
+
 
 class AdaptiveApp:
+    POLL_MS = 15
+    FONT = "Helvetica"
+
     def __init__(self, master):
         self.master = master
         self.master.title("Adaptive Skill Assessment")
         self.role = tk.StringVar()
+        self.selected_option = tk.StringVar()
+        self.state = None
         self.current_q_data = None
         self.score = 0
         self.q_count = 0
-        
-        self.setup_start_ui()
+        # Seconds from startup to the role picker; per-question times of the current assessment
+        self.timings = {'interactive_s': None, 'render_ms': [], 'engine_ms': []}
 
-    def setup_start_ui(self):
-        for widget in self.master.winfo_children():
-            widget.destroy()
+        # One worker thread: engine calls of a session never overlap
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='assessment')
+        self._results = queue.Queue()
+        self._last_call_ms = 0.0
+        self._busy = False
+        self._closed = False
+        self._screen = None
 
-        self.score = 0
-        self.q_count = 0
+        self._build_loading_screen()
+        self._build_start_screen()
+        self._build_question_screen()
+        self._build_result_screen()
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.show_screen(self.loading_frame)
+        self._poll_id = self.master.after(self.POLL_MS, self._poll)
+        self._run(lambda: load_components(self._report_progress), self._on_loaded, self._on_load_error)
+
+    # --- Background work ---
+    def _run(self, fn, on_done, on_error) -> None:
+        """Runs `fn` on the worker thread; `on_done(result)` or `on_error(exc)` then runs on the Tk thread."""
+        self._set_busy(True)
+
+        def task():
+            started = time.perf_counter()
+            try:
+                result, callback = fn(), on_done
+            except Exception as e:
+                result, callback = e, on_error
+            self._results.put((callback, result, (time.perf_counter() - started) * 1000))
+
+        self._worker.submit(task)
+
+    def _report_progress(self, fraction: float, message: str) -> None:
+        # Called on the worker thread: hand the update to the Tk thread
+        self._results.put((self._set_progress, (fraction, message), None))
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                callback, result, elapsed_ms = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if elapsed_ms is not None:
+                self._last_call_ms = elapsed_ms
+                self._set_busy(False)
+            callback(result)
+            if self._closed:
+                return
+        self._poll_id = self.master.after(self.POLL_MS, self._poll)
+
+    def _set_busy(self, busy: bool) -> None:
+        self._busy = busy
+        state = 'disabled' if busy else 'normal'
+        self.start_button.config(state=state)
+        self.submit_button.config(state=state)
+        self.status_label.config(text="Loading next question..." if busy else "")
 
-        tk.Label(self.master, text="Select Job Role:", font=("Helvetica", 12)).pack(pady=10)
-        
-        roles = df['Job_Role'].unique().tolist()
-        
+    # --- Screens (built once) ---
+    def _build_loading_screen(self):
+        self.loading_frame = tk.Frame(self.master)
+        self.loading_label = tk.Label(self.loading_frame, text="Starting...", font=(self.FONT, 11))
+        self.loading_label.pack(pady=(120, 10))
+        self.progress_bar = ttk.Progressbar(self.loading_frame, mode='determinate', maximum=100, length=300)
+        self.progress_bar.pack()
+
+    def _build_start_screen(self):
+        self.start_frame = tk.Frame(self.master)
+        tk.Label(self.start_frame, text="Select Job Role:", font=(self.FONT, 12)).pack(pady=10)
+        self.role_menu = tk.OptionMenu(self.start_frame, self.role, '')
+        self.role_menu.config(width=20)
+        self.start_button = tk.Button(self.start_frame, text="Start Assessment", command=self.start_assessment,
+                                      font=(self.FONT, 10, "bold"))
+        self.no_roles_label = tk.Label(self.start_frame, text="No job roles available. Check data.", fg="red")
+
+    def _build_question_screen(self):
+        self.question_frame = tk.Frame(self.master)
+        self.score_label = tk.Label(self.question_frame, anchor='e')
+        self.score_label.pack(fill='x', padx=20, pady=(5, 0))
+        self.question_label = tk.Label(self.question_frame, wraplength=550, justify="left",
+                                       font=(self.FONT, 11, "bold"))
+        self.question_label.pack(pady=10, padx=20)
+        self.options_frame = tk.Frame(self.question_frame)
+        self.options_frame.pack(fill='x')
+        # Grown to the largest option count seen, then reused
+        self.option_buttons = []
+        self.submit_button = tk.Button(self.question_frame, text="Submit Answer", font=(self.FONT, 10, "bold"),
+                                       command=self.check_and_get_next)
+        self.submit_button.pack(pady=20)
+        self.status_label = tk.Label(self.question_frame, fg='gray', font=(self.FONT, 9))
+        self.status_label.pack()
+
+    def _build_result_screen(self):
+        self.result_frame = tk.Frame(self.master)
+        tk.Label(self.result_frame, text="Assessment Completed!", font=(self.FONT, 16, "bold")).pack(pady=20)
+        self.count_label = tk.Label(self.result_frame, font=(self.FONT, 11))
+        self.count_label.pack()
+        self.skill_label = tk.Label(self.result_frame, font=(self.FONT, 12))
+        self.skill_label.pack(pady=(10, 5))
+        self.fit_label = tk.Label(self.result_frame, font=(self.FONT, 12, "bold"), fg="blue")
+        self.fit_label.pack(pady=5)
+        self.category_label = tk.Label(self.result_frame, font=(self.FONT, 12))
+        self.category_label.pack(pady=(5, 5))
+        tk.Label(self.result_frame, text="(Prediction uses a trained ML model)", font=(self.FONT, 9), fg='gray').pack()
+        tk.Button(self.result_frame, text="Start New Assessment", command=self.setup_start_ui,
+                  font=(self.FONT, 10)).pack(pady=10)
+        tk.Button(self.result_frame, text="Exit", command=self.close, font=(self.FONT, 10)).pack(pady=5)
+
+    def show_screen(self, frame) -> None:
+        if self._screen is frame:
+            return
+        if self._screen is not None:
+            self._screen.pack_forget()
+        frame.pack(fill='both', expand=True)
+        self._screen = frame
+
+    # --- Loading ---
+    def _set_progress(self, update: tuple) -> None:
+        fraction, message = update
+        self.progress_bar['value'] = fraction * 100
+        self.loading_label.config(text=message)
+
+    def _on_loaded(self, error: str | None) -> None:
+        if error:
+            messagebox.showerror("Initialization Error", error)
+        roles = bank.catalog.roles
         if roles and roles != ['No Data']:
-            self.role.set(roles[0]) 
-            self.role_menu = tk.OptionMenu(self.master, self.role, *roles)
-            self.role_menu.config(width=20)
+            menu = self.role_menu['menu']
+            menu.delete(0, 'end')
+            for role in roles:
+                menu.add_command(label=role, command=tk._setit(self.role, role))
+            self.role.set(roles[0])
             self.role_menu.pack(pady=5)
-            tk.Button(self.master, text="Start Assessment", command=self.start_assessment, font=("Helvetica", 10, "bold")).pack(pady=15)
+            self.start_button.pack(pady=15)
         else:
-            tk.Label(self.master, text="No job roles available. Check data.", fg="red").pack(pady=20)
+            self.no_roles_label.pack(pady=20)
+        self.setup_start_ui()
+        self.master.update_idletasks()
+        self.timings['interactive_s'] = time.perf_counter() - STARTED
+        print(f"INFO: Interactive {self.timings['interactive_s']:.2f}s after startup.")
 
+    def _on_load_error(self, e: Exception) -> None:
+        messagebox.showerror("CRITICAL IMPORT ERROR", f"Failed to load the assessment components. Details: {e}")
+        self.close()
+
+    # --- Assessment flow ---
+    def setup_start_ui(self):
+        self.score = 0
+        self.q_count = 0
+        self.state = None
+        self.show_screen(self.start_frame)
 
     def start_assessment(self):
         role_name = self.role.get()
+        if self._busy:
+            return
         if not role_name or role_name == 'No Data':
             messagebox.showwarning("Warning", "Please select a valid job role")
             return
-        
+
         self.score = 0
         self.q_count = 0
-        
-        try:
-            self.current_q_data = engine.get_initial_question(role_name)
-        except Exception as e:
-            messagebox.showerror("Engine Error", f"Failed to start assessment: {e}")
-            return
+        self.timings['render_ms'], self.timings['engine_ms'] = [], []
+        self._run(lambda: engine.start_session(role_name), self._on_started, self._on_start_error)
 
+    def _on_started(self, started: tuple) -> None:
+        self.state, self.current_q_data = started
         if self.current_q_data is None:
-             messagebox.showerror("Error", "No starting question available for this role.")
-             return
-            
+            messagebox.showerror("Error", "No starting question available for this role.")
+            return
         self.show_question()
 
-    def show_question(self):
-        for widget in self.master.winfo_children():
-            widget.destroy()
+    def _on_start_error(self, e: Exception) -> None:
+        messagebox.showerror("Engine Error", f"Failed to start assessment: {e}")
 
+    def show_question(self):
         if self.current_q_data is None:
-            self.show_result()
+            self.finish_assessment()
             return
 
+        started = time.perf_counter()
         q = self.current_q_data
         self.q_count += 1
-        
-        tk.Label(self.master, text=f"Current Raw Score: {round(self.score, 2)}", anchor='e').pack(fill='x', padx=20, pady=(5, 0))
-        tk.Label(self.master, text=f"Q{self.q_count} (Difficulty: {q.get('Difficulty', 'N/A')}): {q['Question']}", 
-                 wraplength=550, justify="left", font=("Helvetica", 11, "bold")).pack(pady=10, padx=20)
+        self.score_label.config(text=f"Current Raw Score: {round(self.score, 2)}")
+        self.question_label.config(text=f"Q{self.q_count} (Difficulty: {q.get('Difficulty', 'N/A')}): {q['Question']}")
 
-        self.selected_option = tk.StringVar()
-        
         options_list = [opt.strip() for opt in q['Options'].split(';') if opt.strip()]
-        
-        if options_list:
-            self.selected_option.set(options_list[0]) 
-
-        for opt in options_list:
-            tk.Radiobutton(self.master, text=opt, variable=self.selected_option, value=opt, 
-                           font=("Helvetica", 10)).pack(anchor='w', padx=30)
+        while len(self.option_buttons) < len(options_list):
+            self.option_buttons.append(tk.Radiobutton(self.options_frame, variable=self.selected_option,
+                                                      font=(self.FONT, 10)))
+        for i, button in enumerate(self.option_buttons):
+            if i < len(options_list):
+                button.config(text=options_list[i], value=options_list[i])
+                button.pack(anchor='w', padx=30)
+            else:
+                button.pack_forget()
+        self.selected_option.set(options_list[0] if options_list else '')
 
-        tk.Button(self.master, text="Submit Answer", font=("Helvetica", 10, "bold"),
-                  command=lambda: self.check_and_get_next(q.get('Q_ID'), q['Answer'])).pack(pady=20)
+        self.show_screen(self.question_frame)
+        self.master.update_idletasks()
+        self.timings['render_ms'].append((time.perf_counter() - started) * 1000)
+        self.timings['engine_ms'].append(self._last_call_ms)
 
-    def check_and_get_next(self, q_id, correct_answer):
+    def check_and_get_next(self):
         selected = self.selected_option.get()
-        
+        if self._busy:
+            return
         if not selected:
-             messagebox.showwarning("Warning", "Please select an answer.")
-             return
-
-        is_correct = (selected == correct_answer)
-        
-        try:
-            next_q_data, new_score = engine.update_and_get_next(q_id, is_correct, self.score)
-            self.score = new_score
-            self.current_q_data = next_q_data
-        except Exception as e:
-            messagebox.showerror("Adaptive Engine Error", f"An error occurred: {e}")
-            self.current_q_data = None 
-            
+            messagebox.showwarning("Warning", "Please select an answer.")
+            return
+
+        q = self.current_q_data
+        is_correct = (selected == q['Answer'])
+        state, score = self.state, self.score
+        self._run(lambda: engine.advance(state, q.get('Q_ID'), is_correct, score), self._on_answered,
+                  self._on_answer_error)
+
+    def _on_answered(self, answered: tuple) -> None:
+        self.current_q_data, self.score = answered
         self.show_question()
 
-    def show_result(self):
-        for widget in self.master.winfo_children():
-            widget.destroy()
+    def _on_answer_error(self, e: Exception) -> None:
+        messagebox.showerror("Adaptive Engine Error", f"An error occurred: {e}")
+        self.current_q_data = None
+        self.show_question()
 
-        final_skill_score = engine.get_final_skill_score(self.score)
+    def finish_assessment(self):
+        score = self.score
+        self._run(lambda: predictor.predict_fit(engine.get_final_skill_score(score), trust_score=85),
+                  self.show_result, self._on_score_error)
 
-        result = predictor.predict_fit(final_skill_score, trust_score=85)
+    def _on_score_error(self, e: Exception) -> None:
+        messagebox.showerror("Prediction Error", f"Failed to score the assessment: {e}")
+        self.setup_start_ui()
 
-        tk.Label(self.master, text=f"Assessment Completed!", font=("Helvetica", 16, "bold")).pack(pady=20)
-        tk.Label(self.master, text=f"Total Questions Answered: {self.q_count}", font=("Helvetica", 11)).pack()
-        tk.Label(self.master, text=f"SkillScore: {result['SkillScore']}%", font=("Helvetica", 12)).pack(pady=(10, 5))
-        tk.Label(self.master, text=f"JobFitScore: {result['JobFitScore']}%", font=("Helvetica", 12, "bold"), fg="blue").pack(pady=5)
-        tk.Label(self.master, text=f"Category: {result['Category']}", font=("Helvetica", 12)).pack(pady=(5, 5))
-        tk.Label(self.master, text="(Prediction uses a trained ML model)", font=("Helvetica", 9), fg='gray').pack()
+    def show_result(self, result: dict):
+        self.count_label.config(text=f"Total Questions Answered: {self.q_count}")
+        self.skill_label.config(text=f"SkillScore: {result['SkillScore']}%")
+        self.fit_label.config(text=f"JobFitScore: {result['JobFitScore']}%")
+        self.category_label.config(text=f"Category: {result['Category']}")
+        self.show_screen(self.result_frame)
+        print(f"INFO: {self.q_count} question(s): render {_summary(self.timings['render_ms'])}; "
+              f"engine {_summary(self.timings['engine_ms'])}.")
 
+    def close(self):
+        self._closed = True
+        self.master.after_cancel(self._poll_id)
+        self._worker.shutdown(wait=False, cancel_futures=True)
+        self.master.destroy()
 
-        tk.Button(self.master, text="Start New Assessment", command=self.setup_start_ui, font=("Helvetica", 10)).pack(pady=10)
-        tk.Button(self.master, text="Exit", command=self.master.quit, font=("Helvetica", 10)).pack(pady=5)
 
 # --- Launch App ---
 if __name__ == '__main__':
     root = tk.Tk()
+    root.geometry("600x500")
     app = AdaptiveApp(root)
-    root.geometry("600x500") 
     root.mainloop()
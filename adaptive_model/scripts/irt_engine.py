@@ -0,0 +1,319 @@
+# irt_engine.py
+"""
+Item response theory (IRT) mode of the adaptive engine.
+
+Items follow the three-parameter logistic model
+    P(correct | theta) = c + (1 - c) / (1 + exp(-a * (theta - b)))
+with parameters from `item_parameters` in adaptive_engine.pkl where present and
+otherwise derived from the difficulty level (b = -1 / 0 / +1 for levels 1 / 2 / 3,
+a = 1, c = 0).
+
+After every response the ability estimate is the EAP (posterior mean) over a fixed
+quadrature grid, with its posterior standard deviation as the standard error. The
+next item is the unadministered one with maximum Fisher information at the current
+estimate, read from a per-role table of the top items for each ability bin.
+"""
+import math
+import random
+import threading
+from statistics import NormalDist
+
+import numpy as np
+
+from adaptive_logic import AdaptiveEngine, EngineParameters, SessionState, StoppingRules
+from exposure_control import ExposureControl
+
+# P(correct) is clipped to [PROBABILITY_EPS, 1 - PROBABILITY_EPS] before taking logs or
+# dividing by it: at extreme theta or large a it saturates to 0 or 1 in float64, and a
+# single -inf or nan would otherwise poison the whole posterior
+PROBABILITY_EPS = 1e-12
+# Logistic exponents are clipped to this magnitude before exp(): it would overflow past
+# about 709, and at 35 the probability is already within 1e-15 of 0 or 1
+LOGIT_LIMIT = 35.0
+
+
+def logistic(z: np.ndarray) -> np.ndarray:
+    """1 / (1 + exp(-z)), without overflow warnings for large |z|."""
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -LOGIT_LIMIT, LOGIT_LIMIT)))
+
+
+class ItemParameters:
+    """3PL item parameters (a, b, c) as arrays aligned with bank row positions."""
+
+    def __init__(self, a: np.ndarray, b: np.ndarray, c: np.ndarray):
+        self.a = a
+        self.b = b
+        self.c = c
+
+    @classmethod
+    def from_bank(cls, bank, item_parameters=None, min_difficulty: int = 1, max_difficulty: int = 3) -> "ItemParameters":
+        """
+        Default parameters from each question's difficulty level, overridden per Q_ID by
+        `item_parameters`: a mapping Q_ID -> (a, b[, c]) or {'a', 'b'[, 'c']}, a
+        DataFrame with Q_ID, a, b[, c] columns, or the same columns as a dict of arrays
+        (the trained adaptive_engine.artifact layout).
+        """
+        difficulty = np.asarray(bank.difficulty, dtype=np.float64)
+        b = difficulty - (min_difficulty + max_difficulty) / 2
+        a = np.ones(len(b))
+        c = np.zeros(len(b))
+
+        if isinstance(item_parameters, dict) and 'Q_ID' in item_parameters:
+            pos = bank.positions(item_parameters['Q_ID'])
+            known = pos >= 0
+            a[pos[known]] = np.asarray(item_parameters['a'])[known]
+            b[pos[known]] = np.asarray(item_parameters['b'])[known]
+            if 'c' in item_parameters:
+                c[pos[known]] = np.asarray(item_parameters['c'])[known]
+        elif item_parameters is not None:
+            if hasattr(item_parameters, 'to_dict') and hasattr(item_parameters, 'columns'):
+                item_parameters = {
+                    row['Q_ID']: row for row in item_parameters.to_dict('records')
+                }
+            for q_id, values in dict(item_parameters).items():
+                pos = bank.position(int(q_id))
+                if pos is None:
+                    continue
+                if isinstance(values, dict):
+                    a[pos], b[pos], c[pos] = values['a'], values['b'], values.get('c', 0.0)
+                else:
+                    a[pos], b[pos] = values[0], values[1]
+                    c[pos] = values[2] if len(values) > 2 else 0.0
+        return cls(a, b, c)
+
+    def probability(self, theta: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """P(correct) of items `positions` at each theta; shape broadcast from (items, 1) x theta."""
+        a = self.a[positions][:, None]
+        b = self.b[positions][:, None]
+        c = self.c[positions][:, None]
+        return c + (1.0 - c) * logistic(a * (theta - b))
+
+    def clipped_probability(self, theta: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """`probability` clipped away from 0 and 1 (see PROBABILITY_EPS)."""
+        return np.clip(self.probability(theta, positions), PROBABILITY_EPS, 1.0 - PROBABILITY_EPS)
+
+    def information(self, theta: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Fisher information of items `positions` at each theta; shape (items, len(theta))."""
+        a = self.a[positions][:, None]
+        c = self.c[positions][:, None]
+        p = self.clipped_probability(theta, positions)
+        return a * a * ((p - c) / (1.0 - c)) ** 2 * (1.0 - p) / p
+
+
+class InformationTable:
+    """
+    For one role: the TOP_K most informative items at each ability bin, best first.
+    `positions[k]` and `information[k]` are the items and their information at bin k;
+    `tie_end[k][i]` is the end of the run of items as informative as item i (within
+    `tie_tolerance`), so equally good items can be drawn without scanning the row.
+    """
+
+    def __init__(self, positions: np.ndarray, information: np.ndarray, role_positions: np.ndarray,
+                 tie_tolerance: float):
+        self.positions = positions
+        self.information = information
+        self.role_positions = role_positions
+        self.rows = positions.tolist()
+        self.tie_end = [
+            np.searchsorted(-row, -row * (1.0 - tie_tolerance), side='right').tolist() for row in information
+        ]
+
+    @classmethod
+    def build(cls, items: ItemParameters, role_positions: np.ndarray, bins: np.ndarray, top_k: int,
+              tie_tolerance: float = 1e-9, chunk_size: int = 65536) -> "InformationTable":
+        """Streams the role's items in chunks, keeping a running top-k per bin."""
+        k = min(top_k, len(role_positions))
+        best_pos = np.empty((len(bins), 0), dtype=np.int64)
+        best_info = np.empty((len(bins), 0))
+        for start in range(0, len(role_positions), chunk_size):
+            chunk = role_positions[start:start + chunk_size]
+            info = items.information(bins, chunk).T
+            cand_pos = np.concatenate((best_pos, np.broadcast_to(chunk, info.shape)), axis=1)
+            cand_info = np.concatenate((best_info, info), axis=1)
+            if cand_info.shape[1] > k:
+                keep = np.argpartition(-cand_info, k - 1, axis=1)[:, :k]
+                cand_pos = np.take_along_axis(cand_pos, keep, axis=1)
+                cand_info = np.take_along_axis(cand_info, keep, axis=1)
+            best_pos, best_info = cand_pos, cand_info
+
+        # Best first; equally informative items by position
+        order = np.lexsort((best_pos, -best_info)) if best_pos.size else np.empty_like(best_pos)
+        return cls(np.take_along_axis(best_pos, order, axis=1),
+                   np.take_along_axis(best_info, order, axis=1), role_positions, tie_tolerance)
+
+
+class IRTAdaptiveEngine(AdaptiveEngine):
+    """
+    AdaptiveEngine mode with EAP ability estimation and maximum-information selection.
+
+    Shares the session API (start_session / advance) and SessionState with the
+    rule-based engine; the session's `ability` and `se` carry the running estimate.
+    """
+
+    # Quadrature grid for the EAP estimate, and prior standard deviation around INITIAL_ABILITY
+    THETA_GRID = np.linspace(-4.0, 4.0, 81)
+    PRIOR_SD = 1.0
+    # Ability bins of the precomputed information tables, and items kept per bin
+    INFO_BINS = np.linspace(-4.0, 4.0, 33)
+    TOP_K = 64
+    # Items within this relative margin of the best information count as equally good
+    INFO_TIE_TOLERANCE = 1e-9
+    MODE = 'irt'
+
+    def __init__(self, bank, params: EngineParameters | None = None, stopping: StoppingRules | None = None,
+                 item_parameters=None, exposure: ExposureControl | None = None):
+        super().__init__(bank, params, stopping, exposure)
+        if item_parameters is None:
+            item_parameters = self.ITEM_PARAMETERS
+        self.items = ItemParameters.from_bank(self.bank, item_parameters, self.MIN_DIFFICULTY, self.MAX_DIFFICULTY)
+        self.log_prior = -0.5 * ((self.THETA_GRID - self.INITIAL_ABILITY) / self.PRIOR_SD) ** 2
+        self._bin_step = self.INFO_BINS[1] - self.INFO_BINS[0]
+        self._info_tables = {}
+        self._tables_lock = threading.Lock()
+        self._grid_segments = None
+        if stopping is not None and stopping.skill_cutpoints is not None:
+            self._grid_segments = self._segments_of_grid(stopping.skill_cutpoints)
+
+    # --- Session API ---
+    def _new_state(self, role: str) -> SessionState:
+        state = super()._new_state(role)
+        state.se = self.PRIOR_SD
+        return state
+
+    def final_skill_score(self, state: SessionState) -> float:
+        return self.skill_score_of(state.ability)
+
+    def skill_score_of(self, ability: float) -> float:
+        """SkillScore as the percentile of `ability` under the prior (0-100)."""
+        z = (ability - self.INITIAL_ABILITY) / self.PRIOR_SD
+        return round(50.0 * (1.0 + math.erf(z / math.sqrt(2.0))), 2)
+
+    def build_information_tables(self) -> None:
+        """Precomputes the information tables of every role (otherwise built on first use)."""
+        for role in self.bank.buckets:
+            self._information_table(role)
+
+    # --- Early stopping ---
+    def stop_reason(self, state: SessionState, previous_ability: float) -> str | None:
+        rules = self.stopping
+        if rules is None or state.q_count < rules.min_items:
+            return None
+        if rules.se_threshold is not None and state.se <= rules.se_threshold:
+            return 'standard_error'
+        if rules.delta_threshold is not None and abs(state.ability - previous_ability) < rules.delta_threshold:
+            return 'convergence'
+        if self._grid_segments is not None and self.category_confidence(state) >= rules.confidence:
+            return 'classification'
+        return None
+
+    def _segments_of_grid(self, skill_cutpoints: list) -> np.ndarray:
+        """Job-fit category segment of each THETA_GRID point, via the SkillScore percentile mapping."""
+        prior = NormalDist(self.INITIAL_ABILITY, self.PRIOR_SD)
+        theta_cuts = [prior.inv_cdf(min(max(s / 100.0, 1e-12), 1 - 1e-12)) for s in skill_cutpoints]
+        return np.searchsorted(theta_cuts, self.THETA_GRID, side='right')
+
+    def category_confidence(self, state: SessionState) -> float:
+        """Posterior probability of the most likely job-fit category segment."""
+        log_post = state.posterior[1] if state.posterior is not None else self.log_posterior(state.responses)
+        weights = np.exp(log_post - log_post.max())
+        mass = np.bincount(self._grid_segments, weights)
+        return float(mass.max() / mass.sum())
+
+    # --- Estimation ---
+    def log_posterior(self, responses: list) -> np.ndarray:
+        """Unnormalized log posterior of ability over THETA_GRID given (position, is_correct) responses."""
+        if not responses:
+            return self.log_prior
+        positions = np.array([pos for pos, _ in responses], dtype=np.int64)
+        correct = np.array([c for _, c in responses], dtype=bool)
+        p = self.items.clipped_probability(self.THETA_GRID, positions)
+        return self.log_prior + np.where(correct[:, None], np.log(p), np.log1p(-p)).sum(axis=0)
+
+    def estimate_ability(self, responses: list) -> tuple[float, float]:
+        """EAP estimate and posterior SD of ability given (position, is_correct) responses."""
+        return self._summarize(self.log_posterior(responses))
+
+    def _summarize(self, log_post: np.ndarray) -> tuple[float, float]:
+        weights = np.exp(log_post - log_post.max())
+        weights /= weights.sum()
+        theta = float(weights @ self.THETA_GRID)
+        se = math.sqrt(float(weights @ (self.THETA_GRID - theta) ** 2))
+        return theta, se
+
+    def _update_ability(self, state: SessionState) -> None:
+        # Add the newest response to the cached posterior; rebuild it after a session
+        # was restored from a store (the cache is not persisted)
+        cached = state.posterior
+        if cached is not None and cached[0] == len(state.responses) - 1:
+            pos, correct = state.responses[-1]
+            a, b, c = self.items.a[pos], self.items.b[pos], self.items.c[pos]
+            p = c + (1.0 - c) * logistic(a * (self.THETA_GRID - b))
+            p = np.clip(p, PROBABILITY_EPS, 1.0 - PROBABILITY_EPS)
+            log_post = cached[1] + (np.log(p) if correct else np.log1p(-p))
+        else:
+            log_post = self.log_posterior(state.responses)
+        state.posterior = (len(state.responses), log_post)
+        state.ability, state.se = self._summarize(log_post)
+
+    # --- Selection ---
+    def _information_table(self, role: str) -> InformationTable | None:
+        table = self._info_tables.get(role)
+        if table is None:
+            buckets = self.bank.buckets.get(role)
+            if not buckets:
+                return None
+            with self._tables_lock:
+                table = self._info_tables.get(role)
+                if table is None:
+                    role_positions = np.sort(np.concatenate(list(buckets.values()))).astype(np.int64)
+                    table = InformationTable.build(self.items, role_positions, self.INFO_BINS, self.TOP_K,
+                                                   self.INFO_TIE_TOLERANCE)
+                    self._info_tables[role] = table
+        return table
+
+    def _select_next_position(self, state: SessionState) -> int | None:
+        """Selects the unadministered item with maximum information at the current ability."""
+        table = self._information_table(state.role)
+        if table is None:
+            return None
+
+        k = int(round((state.ability - self.INFO_BINS[0]) / self._bin_step))
+        k = min(max(k, 0), len(self.INFO_BINS) - 1)
+        row = table.rows[k]
+        administered = state.administered
+
+        if self.exposure is not None:
+            # Randomesque, exposure-weighted choice among the bin's eligible items
+            ranked = [pos for pos in row if pos not in administered]
+            pos = self.exposure.choose(state, ranked) if ranked else self._select_exhaustive(state, table)
+            if pos is None:
+                return None
+        else:
+            for i, pos in enumerate(row):
+                if pos not in administered:
+                    end = table.tie_end[k][i]
+                    # Equally informative items (e.g. default parameters) are drawn uniformly;
+                    # row[i] is unadministered, so the rejection loop terminates
+                    while end - i > 1:
+                        candidate = row[random.randrange(i, end)]
+                        if candidate not in administered:
+                            pos = candidate
+                            break
+                    break
+            else:
+                pos = self._select_exhaustive(state, table)
+                if pos is None:
+                    return None
+
+        state.difficulty = int(self.bank.difficulty[pos])
+        return pos
+
+    def _select_exhaustive(self, state: SessionState, table: InformationTable) -> int | None:
+        """Fallback once a bin's top items are all administered: scores every remaining item."""
+        candidates = table.role_positions
+        if state.administered:
+            candidates = candidates[~np.isin(candidates, np.fromiter(state.administered, dtype=np.int64))]
+        if len(candidates) == 0:
+            return None
+        information = self.items.information(np.array([state.ability]), candidates)[:, 0]
+        return int(candidates[int(np.argmax(information))])
@@ -2,11 +2,221 @@
 import numpy as np
 import os
 import pickle
+import time
 import warnings # For managing scikit-learn warnings
 
+from artifact_format import ArtifactError, open_artifact, write_artifact
+
 # Suppress warnings that occur when predicting with a numpy array instead of a DataFrame
 warnings.filterwarnings("ignore", category=UserWarning, module='sklearn')
 
+# Model inputs, in column order
+FEATURES = ['SkillScore', 'TrustScore']
+
+
+def round_scores(values: np.ndarray) -> np.ndarray:
+    """
+    np.round(values, 2), agreeing with the built-in round() that predict_fit uses. They
+    differ only on values within float error of a half-hundredth (np.round rounds the
+    scaled value half to even), so those few are rounded by round() itself.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
+
+
+class FitLookupTable:
+    """
+    Precomputed JobFitScores over the model's quantized input space.
+
+    SkillScores are rounded to 2 decimals by AdaptiveEngine.get_final_skill_score and trust
+    scores are whole numbers, so every real input lies on a 10001 x 101 grid over 0-100.
+    The table stores the JobFitScore predict_fit would return at each grid point as uint16
+    hundredths (about 2 MB); lookups of off-grid inputs return None so callers can fall
+    back to the model.
+    """
+
+    SKILL_STEPS = 100  # grid points per skill unit (2 decimals)
+    TRUST_STEPS = 1    # grid points per trust unit (whole numbers)
+    MAX_SCORE = 100
+
+    def __init__(self, scores: np.ndarray):
+        # scores[trust_index, skill_index] = JobFitScore * 100
+        self.scores = scores
+        self.n_trust, self.n_skill = scores.shape
+        # Flat memoryview: scalar indexing returns plain ints much faster than NumPy indexing
+        self._flat = memoryview(np.ascontiguousarray(scores).reshape(-1))
+
+    @classmethod
+    def build(cls, model) -> "FitLookupTable":
+        """Evaluates `model` over every grid point, one predict_proba call per trust value."""
+        skill = np.arange(cls.MAX_SCORE * cls.SKILL_STEPS + 1) / cls.SKILL_STEPS
+        trust = np.arange(cls.MAX_SCORE * cls.TRUST_STEPS + 1) / cls.TRUST_STEPS
+        scores = np.empty((len(trust), len(skill)), dtype=np.uint16)
+        for j, trust_value in enumerate(trust):
+            features = np.column_stack((skill, np.full(len(skill), trust_value)))
+            probability_of_fit = model.predict_proba(features)[:, 1]
+            scores[j] = np.rint(round_scores(probability_of_fit * 100) * 100)
+        return cls(scores)
+
+    def lookup(self, skill_score: float, trust_score: float) -> float | None:
+        """Returns the tabulated JobFitScore, or None if the input is not on the grid."""
+        i = skill_score * self.SKILL_STEPS
+        j = trust_score * self.TRUST_STEPS
+        if not (0 <= i < self.n_skill and 0 <= j < self.n_trust):
+            return None
+        ii = int(i + 0.5)
+        jj = int(j + 0.5)
+        if abs(i - ii) > 1e-6 or abs(j - jj) > 1e-6 or ii >= self.n_skill or jj >= self.n_trust:
+            return None
+        return self._flat[jj * self.n_skill + ii] / 100
+
+    def lookup_many(self, skill_scores: np.ndarray, trust_scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized lookup: returns (scores, on_grid mask); off-grid scores are NaN."""
+        i = skill_scores * self.SKILL_STEPS
+        j = trust_scores * self.TRUST_STEPS
+        ii = np.rint(i)
+        jj = np.rint(j)
+        on_grid = ((np.abs(i - ii) <= 1e-6) & (np.abs(j - jj) <= 1e-6) &
+                   (ii >= 0) & (ii < self.n_skill) & (jj >= 0) & (jj < self.n_trust))
+        scores = np.full(len(skill_scores), np.nan)
+        scores[on_grid] = self.scores[jj[on_grid].astype(np.intp), ii[on_grid].astype(np.intp)] / 100
+        return scores, on_grid
+
+
+class LogisticFitModel:
+    """Binary logistic regression over (SkillScore, TrustScore); matches scikit-learn's predict_proba."""
+
+    KIND = 'job_fit.logistic_regression'
+
+    def __init__(self, coef, intercept: float):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.lookup_scores = None  # precomputed FitLookupTable scores stored with the artifact
+
+    @classmethod
+    def from_estimator(cls, model) -> "LogisticFitModel":
+        return cls(model.coef_[0], model.intercept_[0])
+
+    @classmethod
+    def from_artifact(cls, artifact) -> "LogisticFitModel":
+        return cls(artifact['coef'], artifact.metadata['intercept'])
+
+    def artifact_contents(self) -> tuple[dict, dict]:
+        return {'coef': self.coef}, {'intercept': self.intercept}
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        p = 1.0 / (1.0 + np.exp(-(np.asarray(features, dtype=np.float64) @ self.coef + self.intercept)))
+        return np.column_stack((1.0 - p, p))
+
+
+class TreeEnsembleFitModel:
+    """
+    Averaged decision trees (scikit-learn RandomForest/ExtraTrees classifiers) as flat
+    node arrays: all trees' nodes concatenated, children as absolute node indexes
+    (-1 for leaves) and `roots[t]` the first node of tree t. `value` holds each node's
+    probability of the positive class. predict_proba walks all trees for all rows
+    together, one level per step.
+    """
+
+    KIND = 'job_fit.tree_ensemble'
+
+    def __init__(self, roots, left, right, feature, threshold, value):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.lookup_scores = None
+
+    @classmethod
+    def from_estimator(cls, model) -> "TreeEnsembleFitModel":
+        roots, left, right, feature, threshold, value = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            counts = tree.value[:, 0, :]
+            roots.append(offset)
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value.append(counts[:, 1] / counts.sum(axis=1))
+            offset += tree.node_count
+        return cls(np.array(roots, dtype=np.int64), np.concatenate(left).astype(np.int64),
+                   np.concatenate(right).astype(np.int64), np.concatenate(feature).astype(np.int8),
+                   np.concatenate(threshold).astype(np.float64), np.concatenate(value).astype(np.float64))
+
+    @classmethod
+    def from_artifact(cls, artifact) -> "TreeEnsembleFitModel":
+        return cls(*(artifact[name] for name in ('roots', 'left', 'right', 'feature', 'threshold', 'value')))
+
+    def artifact_contents(self) -> tuple[dict, dict]:
+        return {
+            'roots': self.roots, 'left': self.left, 'right': self.right,
+            'feature': self.feature, 'threshold': self.threshold, 'value': self.value,
+        }, {'trees': len(self.roots)}
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        # scikit-learn compares float32 inputs against the thresholds
+        features = np.asarray(features, dtype=np.float32).astype(np.float64)
+        n_trees = len(self.roots)
+        # One (row, tree) walker per pair; walkers that reach a leaf drop out of `active`
+        node = np.tile(np.asarray(self.roots, dtype=np.int64), len(features))
+        row = np.repeat(np.arange(len(features)), n_trees)
+        active = np.arange(len(node))
+        while len(active):
+            current = node[active]
+            left = self.left[current]
+            inner = left >= 0
+            active, current, left = active[inner], current[inner], left[inner]
+            go_left = features[row[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, left, self.right[current])
+        p = self.value[node].reshape(len(features), n_trees).sum(axis=1) / n_trees
+        return np.column_stack((1.0 - p, p))
+
+
+EXPORTED_MODELS = {model.KIND: model for model in (LogisticFitModel, TreeEnsembleFitModel)}
+
+
+def export_model(model):
+    """The artifact-backed equivalent of a fitted scikit-learn job-fit estimator, or None."""
+    if hasattr(model, 'coef_') and np.shape(model.coef_) == (1, 2):
+        return LogisticFitModel.from_estimator(model)
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is not None and all(hasattr(e, 'tree_') for e in estimators) and len(getattr(model, 'classes_', ())) == 2:
+        return TreeEnsembleFitModel.from_estimator(model)
+    return None
+
+
+def save_exported_model(model, path: str, lookup_table: FitLookupTable | None = None) -> None:
+    """
+    Writes an exported model as an artifact. A `lookup_table` built from the original
+    estimator is stored with it, so servers map it instead of tabulating the model.
+    """
+    arrays, metadata = model.artifact_contents()
+    if lookup_table is not None:
+        arrays['lookup'] = lookup_table.scores
+    write_artifact(path, model.KIND, arrays, dict(metadata, features=FEATURES))
+
+
+def load_exported_model(path: str, verify: bool = False):
+    """Opens a job-fit model artifact written by train.py."""
+    artifact = open_artifact(path, verify=verify)
+    model_class = EXPORTED_MODELS.get(artifact.kind)
+    if model_class is None:
+        raise ArtifactError(f"{os.path.basename(path)}: unknown job-fit model kind '{artifact.kind}'")
+    model = model_class.from_artifact(artifact)
+    if 'lookup' in artifact:
+        model.lookup_scores = artifact['lookup']
+    return model
+
+
 class JobFitPredictor:
     """
     Final ML-BASED Predictor. 
@@ -14,17 +224,35 @@ class JobFitPredictor:
     """
     
     MODEL_FILE = 'job_fit_classifier.pkl' 
+    # Exported by train.py (see artifact_format.py); loaded instead of the pickle when present
+    MODEL_EXPORT_FILE = 'job_fit_model.artifact'
+
+    # Lower JobFitScore bounds of each category above 'Low Fit' (ascending), and the labels
+    CATEGORY_THRESHOLDS = (45, 65, 80)
+    CATEGORY_LABELS = ('Low Fit', 'Moderate Fit', 'High Fit', 'Excellent Fit')
+
+    # Rows per predict_proba call in predict_fit_many
+    BATCH_CHUNK_SIZE = 65536
+
+    # Grid points compared against the real model before a lookup table is used
+    LOOKUP_VALIDATION_SAMPLES = 2000
     
-    def __init__(self, model_dir: str = 'models'):
+    def __init__(self, model_dir: str = 'models', precompile: bool = False):
         
         model_path = os.path.join(model_dir, self.MODEL_FILE)
+        export_path = os.path.join(model_dir, self.MODEL_EXPORT_FILE)
         self.model = None
+        self.lookup_table = None
 
         # --- ACTUAL MODEL LOADING ---
         try:
-            with open(model_path, 'rb') as f:
-                # Load the XGBoost model trained in your separate script
-                self.model = pickle.load(f)
+            if os.path.exists(export_path):
+                model_path = export_path
+                self.model = load_exported_model(export_path)
+            else:
+                with open(model_path, 'rb') as f:
+                    # Load the XGBoost model trained in your separate script
+                    self.model = pickle.load(f)
             print(f"INFO: Trained ML model loaded successfully from {model_path}.")
             
             # Note: Feature importance/weights are more complex in XGBoost, but we keep
@@ -39,17 +267,52 @@ class JobFitPredictor:
             self.ml_skill_weight = 0.65
             self.ml_trust_weight = 0.35
 
+        # --- OPTIONAL PRECOMPILED MODE ---
+        if precompile and self.model is not None:
+            self.lookup_table = self._build_lookup_table()
+
+    def _build_lookup_table(self) -> FitLookupTable | None:
+        """Tabulates the model over its input grid and validates it against predict_proba."""
+        start = time.perf_counter()
+        stored = getattr(self.model, 'lookup_scores', None)
+        table = FitLookupTable(stored) if stored is not None else FitLookupTable.build(self.model)
+        build_seconds = time.perf_counter() - start
+
+        # Validate on random grid points against the model's own single-row predictions
+        rng = np.random.default_rng(0)
+        skill = rng.integers(0, table.n_skill, self.LOOKUP_VALIDATION_SAMPLES) / table.SKILL_STEPS
+        trust = rng.integers(0, table.n_trust, self.LOOKUP_VALIDATION_SAMPLES) / table.TRUST_STEPS
+        max_error = 0.0
+        for s, t in zip(skill.tolist(), trust.tolist()):
+            expected = round(self.model.predict_proba(np.array([[s, t]]))[:, 1][0] * 100, 2)
+            max_error = max(max_error, abs(table.lookup(s, t) - expected))
+
+        if max_error > 0.01:
+            print(f"WARNING: Job fit lookup table rejected (max error {max_error:.4f} vs model). Using the model directly.")
+            return None
+        print(f"INFO: Job fit lookup table {'mapped' if stored is not None else 'built'} in {build_seconds:.2f}s "
+              f"({table.scores.nbytes / 1e6:.1f} MB, max validation error {max_error:.4f}).")
+        return table
+
     def predict_fit(self, skill_score: float, trust_score: float) -> dict:
         """
         Calculates prediction using either the loaded XGBoost model or simulation weights.
         """
         
-        # Prepare input data: The model expects a 2D array of features.
-        # This aligns with the 'SkillScore' and 'TrustScore' inputs used during training.
-        input_data = np.array([[skill_score, trust_score]])
+        # 0. Serve from the precompiled lookup table when the input lies on its grid
+        ml_job_fit_score = None
+        if self.lookup_table is not None:
+            ml_job_fit_score = self.lookup_table.lookup(skill_score, trust_score)
+
+        if ml_job_fit_score is not None:
+            weights_source = "XGBoost Model"
 
         # 1. Use Loaded XGBoost Model (if available)
-        if self.model is not None:
+        elif self.model is not None:
+            # Prepare input data: The model expects a 2D array of features.
+            # This aligns with the 'SkillScore' and 'TrustScore' inputs used during training.
+            input_data = np.array([[skill_score, trust_score]])
+
             # XGBoost Classifiers use predict_proba() to get the probability of the positive class (Job Fit Success = 1)
             probability_of_fit = self.model.predict_proba(input_data)[:, 1][0] 
             ml_job_fit_score = round(probability_of_fit * 100, 2)
@@ -80,4 +343,57 @@ class JobFitPredictor:
             "TrustScore": round(trust_score, 2),
             "JobFitScore": ml_job_fit_score,
             "Category": category
-        }
\ No newline at end of file
+        }
+
+    def skill_cutpoints(self, trust_score: float) -> list:
+        """
+        SkillScores (0.01 steps) at which the predicted category changes for `trust_score`,
+        ascending. Scores between two consecutive cutpoints share one category.
+        """
+        skill = np.arange(100 * 100 + 1) / 100
+        codes = self.predict_fit_many(skill, trust_score)['CategoryCode']
+        return skill[1:][np.diff(codes) != 0].tolist()
+
+    def predict_fit_many(self, skill_scores, trust_scores, chunk_size: int | None = None) -> dict:
+        """
+        Vectorized predict_fit for many candidates.
+
+        `skill_scores` and `trust_scores` are array-likes of equal length (a scalar trust
+        score is broadcast). Runs one predict_proba call per chunk and returns columnar
+        results: NumPy arrays keyed like predict_fit's dict, plus integer 'CategoryCode'
+        indexes into CATEGORY_LABELS.
+        """
+        skill = np.asarray(skill_scores, dtype=np.float64).ravel()
+        trust = np.broadcast_to(np.asarray(trust_scores, dtype=np.float64), skill.shape)
+        chunk_size = chunk_size or self.BATCH_CHUNK_SIZE
+
+        if self.model is not None:
+            if self.lookup_table is not None:
+                ml_job_fit_score, on_grid = self.lookup_table.lookup_many(skill, trust)
+                pending = np.flatnonzero(~on_grid)
+            else:
+                ml_job_fit_score = np.empty(len(skill), dtype=np.float64)
+                pending = np.arange(len(skill))
+
+            # Rows not served by the lookup table go through the model, one call per chunk
+            for start in range(0, len(pending), chunk_size):
+                rows = pending[start:start + chunk_size]
+                features = np.column_stack((skill[rows], trust[rows]))
+                ml_job_fit_score[rows] = round_scores(self.model.predict_proba(features)[:, 1] * 100)
+            weights_source = "XGBoost Model"
+        else:
+            ml_linear_score = (skill / 100.0) * self.ml_skill_weight + (trust / 100.0) * self.ml_trust_weight
+            ml_job_fit_score = round_scores(ml_linear_score * 100)
+            weights_source = "Simulation"
+
+        # Same thresholds as predict_fit: a score equal to a bound belongs to the higher category
+        category_code = np.searchsorted(self.CATEGORY_THRESHOLDS, ml_job_fit_score, side='right')
+        labels = np.array([f"{label} ({weights_source})" for label in self.CATEGORY_LABELS], dtype=object)
+
+        return {
+            "SkillScore": round_scores(skill),
+            "TrustScore": round_scores(trust),
+            "JobFitScore": ml_job_fit_score,
+            "CategoryCode": category_code,
+            "Category": labels[category_code]
+        }
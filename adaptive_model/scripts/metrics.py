@@ -0,0 +1,304 @@
+# metrics.py
+"""
+Hot-path timing metrics in the Prometheus text format, plus an opt-in request profiler.
+
+Dependency-free: histograms, counters and gauges are plain Python objects, rendered by
+`render()` for the /metrics endpoint. Values are per process, so scrape every worker
+(or put the workers behind one scrape target per process).
+
+Spans time a block with perf_counter and add it to a histogram:
+
+    with QUESTION_SELECTION_SECONDS.labels('rule').time():
+        ...
+
+Bind `labels(...)` once, outside the hot path, where possible; a span then costs about a
+microsecond (see benchmarks/bench_metrics.py). METRICS_ENABLED=0 turns every span into
+a shared no-op.
+
+PROFILE_SAMPLE_RATE > 0 profiles that fraction of API requests with cProfile and writes
+each profile to PROFILE_DIR as <endpoint>-<time>-<pid>.prof (open with pstats or
+snakeviz). One request is profiled at a time per process; others run unprofiled.
+"""
+import cProfile
+import os
+import random
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'hireledger-profiles'))
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram upper bounds in seconds: 5 us to 10 s
+DEFAULT_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class _NullSpan:
+    """Span used while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _NullSeries:
+    """Histogram series that records nothing, for work that must stay out of the metrics."""
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def time(self):
+        return NULL_SPAN
+
+
+NULL_SERIES = _NullSeries()
+
+
+class Span:
+    """Times a `with` block into a histogram series."""
+
+    __slots__ = ('series', 'started')
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramSeries:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return Span(self) if METRICS_ENABLED else NULL_SPAN
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip([*self.bounds, float('inf')], counts):
+            cumulative += count
+            yield '_bucket', {'le': _format_value(bound)}, cumulative
+        yield '_sum', {}, total
+        yield '_count', {}, cumulative
+
+
+class _CounterSeries:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield '_total', {}, self.value
+
+
+class _GaugeSeries:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def samples(self):
+        yield '', {}, self.value
+
+
+class _Metric:
+    """A named metric family: one series per combination of label values."""
+
+    TYPE = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """The series for these label values (created on first use)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for key, series in sorted(self._series.items()):
+            labels = dict(zip(self.labelnames, key))
+            for suffix, extra, value in series.samples():
+                lines.append(f"{self.name}{suffix}{_format_labels({**labels, **extra})} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS,
+                 registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def time(self, *values):
+        return self.labels(*values).time()
+
+
+class Counter(_Metric):
+    TYPE = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+
+class Gauge(_Metric):
+    TYPE = 'gauge'
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def render() -> bytes:
+    """All metrics of this process in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+# --- Metrics ---
+REQUEST_SECONDS = Histogram('hireledger_request_seconds', 'API request handling time.', ('endpoint',))
+BANK_LOAD_SECONDS = Histogram('hireledger_bank_load_seconds', 'Question bank load time.', ('format',),
+                              buckets=LOAD_BUCKETS)
+QUESTION_SELECTION_SECONDS = Histogram('hireledger_question_selection_seconds',
+                                       'Time to select the next question.', ('engine',))
+SCORE_UPDATE_SECONDS = Histogram('hireledger_score_update_seconds',
+                                 'Time to record an answer and update the score and ability.', ('engine',))
+PREDICTION_SECONDS = Histogram('hireledger_prediction_seconds', 'Job-fit model call time per batch.')
+PREDICTION_BATCH_SIZE = Histogram('hireledger_prediction_batch_size', 'Predictions per batched model call.',
+                                  buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+PREDICTION_QUEUE_WAIT_SECONDS = Histogram('hireledger_prediction_queue_wait_seconds',
+                                          'Time a prediction waits for its batch.')
+SESSION_STORE_SECONDS = Histogram('hireledger_session_store_seconds', 'Session store operation time.',
+                                  ('backend', 'operation'))
+RELOADS = Counter('hireledger_artifact_reloads', 'Artifact reloads by outcome.', ('status',))
+RELOAD_SECONDS = Histogram('hireledger_artifact_reload_seconds', 'Time to build a new artifact generation.',
+                           buckets=LOAD_BUCKETS)
+ARTIFACT_VERSIONS = Gauge('hireledger_artifact_versions', 'Artifact generations currently loaded.')
+SPECULATIONS = Counter('hireledger_speculations', 'Submitted answers by use of the precomputed next question.',
+                       ('result',))
+SPECULATION_SECONDS = Histogram('hireledger_speculation_seconds',
+                                'Time to precompute both outcomes of a question in the background.')
+SPECULATION_SAVED_SECONDS = Histogram('hireledger_speculation_saved_seconds',
+                                      'Score update and selection time a precomputed outcome took off a submit.')
+
+
+# --- Request profiler ---
+class RequestProfiler:
+    """Profiles a sampled fraction of requests with cProfile (see the module docstring)."""
+
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE, out_dir: str = PROFILE_DIR):
+        self.sample_rate = sample_rate
+        self.out_dir = out_dir
+        self._busy = threading.Lock()
+
+    def profile(self, endpoint: str):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+            return NULL_SPAN
+        return _ProfiledRequest(self, endpoint)
+
+
+class _ProfiledRequest:
+    def __init__(self, owner: RequestProfiler, endpoint: str):
+        self.owner = owner
+        self.endpoint = endpoint
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        try:
+            os.makedirs(self.owner.out_dir, exist_ok=True)
+            name = f"{self.endpoint}-{time.time_ns()}-{os.getpid()}.prof"
+            self.profiler.dump_stats(os.path.join(self.owner.out_dir, name))
+        except OSError as e:
+            print(f"WARNING: Could not write request profile: {e}")
+        finally:
+            self.owner._busy.release()
+        return False
@@ -0,0 +1,216 @@
+# offline_bundle.py
+"""
+Signed offline assessment bundles.
+
+A bundle lets a client run a whole rule-mode assessment without a request per answer.
+It holds every question the session can reach and the engine's decision graph between
+them, but no answers: the answer key never leaves the server.
+
+    {"session_id": ..., "role": ..., "version": ..., "expires_at": <unix time>,
+     "q_ids": [...], "questions": [{Q_ID, Question, Options, Difficulty}],
+     "nodes": [[question, next if wrong, next if correct], ...], "signature": <hex>}
+
+The client shows every question in `questions` and posts one chosen option per entry
+of `q_ids`, in the same order. On submit the server checks the HMAC signature, then
+walks the graph from node 0 using the bank's answers: node[0] is the question asked
+there, node[1] (wrong) or node[2] (correct) the next node, and -1 ends the assessment.
+Only the answers on that path are scored, exactly as an online session with the same
+answers would be; the others are ignored. Since the client cannot tell which questions
+are on its path, every question must be answered, so a candidate answers all reachable
+questions (about 18 for a 10-question assessment) instead of ten. The signature covers
+everything except `questions`, so posting the bundle back without them is enough.
+
+Building: each difficulty bucket of the role gets a pool of questions pre-drawn by the
+engine's own draw (exposure weighting included). The k-th question asked from a bucket
+is the k-th of its pool, so the engine state at a node is fully described by the
+difficulty, the count taken from each bucket and (with early stopping) the raw score.
+Paths that reach the same state share a node, which keeps a 10-question assessment to
+around a hundred nodes instead of a 1023-node tree. The graph is built on a detached
+copy of the engine (`AdaptiveEngine.detached`), which records no timing metrics and no
+exposures; the service records the exposure of every question shipped. IRT mode is not
+supported: its ability estimate depends on exactly which questions were answered, so
+no two paths would share a node.
+"""
+import hashlib
+import hmac
+import json
+import random
+import time
+from collections import deque
+
+from adaptive_logic import SessionState
+from payloads import dumps
+
+BUNDLE_FORMAT = 2
+
+
+class BundleError(ValueError):
+    """An invalid bundle submission; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class PooledDraws:
+    """
+    Draw source used while a bundle is built, in place of the engine's exposure control:
+    a bucket's draws are taken in order from its pre-drawn pool. Records nothing.
+    """
+
+    def __init__(self, pools: dict):
+        self.pools = pools  # difficulty -> row positions, in draw order
+
+    @classmethod
+    def draw_pools(cls, engine, role: str) -> "PooledDraws":
+        """Pre-draws up to MAX_QUESTIONS questions per difficulty bucket with the engine's draw."""
+        pools = {}
+        for diff, bucket in engine.bank.buckets.get(role, {}).items():
+            size = min(len(bucket), engine.MAX_QUESTIONS)
+            if engine.exposure is None:
+                pools[diff] = [int(bucket[i]) for i in random.sample(range(len(bucket)), size)]
+                continue
+            scratch = engine._new_state(role)
+            pool = []
+            for _ in range(size):
+                pos = engine.exposure.draw(scratch, diff, bucket)
+                pool.append(pos)
+                scratch.administered.add(pos)
+            pools[diff] = pool
+        return cls(pools)
+
+    def start_session(self, role: str) -> None:
+        pass
+
+    def record(self, pos: int) -> None:
+        pass
+
+    def draw(self, state, diff: int, bucket) -> int | None:
+        for pos in self.pools[diff]:
+            if pos not in state.administered:
+                return pos
+        return None
+
+
+def _state_key(state: SessionState, with_score: bool) -> tuple:
+    taken = tuple(sorted(state.taken.items()))
+    # The raw score only steers the path through early stopping
+    return (state.difficulty, taken, state.q_count, state.raw_score) if with_score else (state.difficulty, taken, state.q_count)
+
+
+def build_graph(engine, role: str) -> tuple[list, list] | None:
+    """
+    Decision graph of a rule-mode assessment for `role`: (nodes, positions), where each
+    node is [index into positions, next node if wrong, next node if correct] and -1 ends
+    the assessment. None when the role has no questions.
+    """
+    graph_engine = engine.detached(PooledDraws.draw_pools(engine, role))
+
+    state, pos = graph_engine.start_position(role)
+    if pos is None:
+        return None
+    positions, question_index = [], {}
+    nodes, node_index = [], {}
+    pending = deque()
+    with_score = engine.stopping is not None
+
+    def node_of(state: SessionState, pos: int) -> int:
+        key = _state_key(state, with_score)
+        i = node_index.get(key)
+        if i is None:
+            q = question_index.get(pos)
+            if q is None:
+                q = question_index[pos] = len(positions)
+                positions.append(pos)
+            i = node_index[key] = len(nodes)
+            nodes.append([q, -1, -1])
+            pending.append((i, state))
+        return i
+
+    node_of(state, pos)
+    bank = engine.bank
+    while pending:
+        i, state = pending.popleft()
+        q_id = int(bank.q_ids[positions[nodes[i][0]]])
+        for is_correct in (False, True):
+            branch = state.copy()
+            next_pos, _ = graph_engine.advance_position(branch, q_id, is_correct, branch.raw_score)
+            if next_pos is not None:
+                nodes[i][1 + is_correct] = node_of(branch, next_pos)
+    return nodes, positions
+
+
+def _signed_message(bundle: dict) -> bytes:
+    fields = [BUNDLE_FORMAT, bundle['session_id'], bundle['role'], bundle['version'], bundle['expires_at'],
+              bundle['q_ids'], bundle['nodes']]
+    return json.dumps(fields, separators=(',', ':')).encode('utf-8')
+
+
+def sign(bundle: dict, secret: str) -> str:
+    return hmac.new(secret.encode('utf-8'), _signed_message(bundle), hashlib.sha256).hexdigest()
+
+
+def issue(engine, bank, role: str, session_id: str, version: str, secret: str,
+          ttl_seconds: float) -> tuple[bytes, list] | None:
+    """
+    Serialized, signed bundle of a new session for `role` and the bank positions of its
+    questions, or None when the role has no questions.
+    """
+    graph = build_graph(engine, role)
+    if graph is None:
+        return None
+    nodes, positions = graph
+    bundle = {
+        'session_id': session_id,
+        'role': role,
+        'version': version,
+        'expires_at': int(time.time() + ttl_seconds),
+        'q_ids': [int(bank.q_ids[pos]) for pos in positions],
+        'nodes': nodes,
+    }
+    bundle['signature'] = sign(bundle, secret)
+    # Questions are spliced in from the per-bank fragment cache
+    questions = b','.join(bank.payloads.fragment(pos) for pos in positions)
+    body = b'{"session_id":"%s","bundle":%s,"questions":[%s]}}' % (
+        session_id.encode('ascii'), dumps(bundle)[:-1], questions)
+    return body, positions
+
+
+def verify(bundle, secret: str) -> dict:
+    """Checks the structure, signature and expiry of a posted bundle; returns it."""
+    if not isinstance(bundle, dict):
+        raise BundleError("Missing bundle.")
+    try:
+        signature = bundle['signature']
+        expected = sign(bundle, secret)
+    except (KeyError, TypeError, ValueError):
+        raise BundleError("Malformed bundle.")
+    if not isinstance(signature, str) or not hmac.compare_digest(signature, expected):
+        raise BundleError("Invalid bundle signature.", 403)
+    if bundle['expires_at'] < time.time():
+        raise BundleError("Bundle has expired; please start a new assessment.", 410)
+    return bundle
+
+
+def replay(bundle: dict, bank, answers) -> list:
+    """
+    (position, is_correct) responses along the path a verified bundle's graph takes for
+    `answers` (one chosen option per question of the bundle, in `q_ids` order), checked
+    against the bank's answers.
+    """
+    q_ids = bundle['q_ids']
+    if (not isinstance(answers, list) or len(answers) != len(q_ids)
+            or not all(isinstance(a, str) for a in answers)):
+        raise BundleError("answers must list one chosen option per question of the bundle.")
+    nodes = bundle['nodes']
+    responses = []
+    node = 0
+    while node != -1:
+        q = nodes[node][0]
+        pos = bank.position(q_ids[q])
+        if pos is None:
+            raise BundleError("Bundle does not match the question bank.", 409)
+        is_correct = answers[q] == bank.answers[pos]
+        responses.append((pos, is_correct))
+        node = nodes[node][2 if is_correct else 1]
+    return responses
@@ -0,0 +1,64 @@
+# payloads.py
+"""
+Pre-serialized question payloads for the session endpoints.
+
+The client-facing JSON of a question (Q_ID, Question, Options, Difficulty; never the
+answer) is serialized the first time the question is served and kept as bytes for the
+lifetime of its bank. A reloaded bank gets its own cache, so a cached fragment always
+matches the version the session runs on. /start_assessment and /submit_answer bodies
+are then assembled by splicing the fragment into a fixed envelope; no per-response
+dict, Options split or JSON encoding of the question happens.
+
+Everything else is encoded with `dumps`, which uses orjson when it is installed and
+the standard library's json otherwise.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON encoding of `obj` as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class QuestionPayloads:
+    """Per-bank cache of serialized question fragments, filled on first use."""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self._fragments = {}
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def fragment(self, pos: int) -> bytes:
+        """JSON object of the question at row position `pos`, without the answer."""
+        fragment = self._fragments.get(pos)
+        if fragment is None:
+            bank = self.bank
+            fragment = dumps({
+                "Q_ID": int(bank.q_ids[pos]),
+                "Question": str(bank.questions[pos]),
+                "Options": bank.options_at(pos),
+                "Difficulty": int(bank.difficulty[pos]),
+            })
+            # Concurrent first uses serialize the same bytes; either copy may be kept
+            self._fragments[pos] = fragment
+        return fragment
+
+    # --- Response bodies ---
+    def start_body(self, session_id: str, pos: int) -> bytes:
+        """Body of a /start_assessment response serving the question at `pos`."""
+        # Session ids are generated UUIDs, so they need no escaping
+        return b'{"session_id":"%s","question":%s}' % (session_id.encode('ascii'), self.fragment(pos))
+
+    def progress_body(self, new_raw_score: float, pos: int) -> bytes:
+        """Body of an in-progress /submit_answer response serving the question at `pos`."""
+        return b'{"status":"in_progress","new_raw_score":%s,"question":%s}' % (
+            dumps(round(float(new_raw_score), 2)), self.fragment(pos))
@@ -0,0 +1,130 @@
+# prediction_batcher.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import PREDICTION_BATCH_SIZE, PREDICTION_QUEUE_WAIT_SECONDS, PREDICTION_SECONDS
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent job-fit predictions into batched model calls.
+
+    Callers block in `predict_fit` (or get a Future from `submit`); a single background
+    thread collects requests for up to `max_wait_ms` after the first one arrives, or until
+    `max_batch_size` are queued, scores them with one `JobFitPredictor.predict_fit_many`
+    call and fans the per-candidate results back out. Batch sizes, queue waits and model
+    call times go to the prediction histograms in metrics.py.
+
+    The thread starts on the first `submit` in each process, so a batcher built in a
+    preforking master works in every forked worker. After `close`, predictions are made
+    synchronously on the calling thread, so requests still holding a dropped artifact
+    generation (see artifact_registry.py) complete instead of failing.
+    """
+
+    def __init__(self, predictor, max_wait_ms: float = 2.0, max_batch_size: int = 256):
+        self.predictor = predictor
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        self._closed = False
+        # Makes the closed check and the enqueue atomic, so nothing is queued behind the stop sentinel
+        self._submit_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    # --- Public Methods ---
+    def submit(self, skill_score: float, trust_score: float) -> Future:
+        """Queues one prediction; the Future resolves to the same dict predict_fit returns."""
+        future = Future()
+        with self._submit_lock:
+            if not self._closed:
+                if self._pid != os.getpid():
+                    self._start()
+                self._queue.put((skill_score, trust_score, future, time.perf_counter()))
+                return future
+
+        # Closed: score on the calling thread
+        try:
+            future.set_result(self.predictor.predict_fit(skill_score, trust_score))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def predict_fit(self, skill_score: float, trust_score: float, timeout: float | None = None) -> dict:
+        """Blocking, drop-in replacement for JobFitPredictor.predict_fit."""
+        return self.submit(skill_score, trust_score).result(timeout=timeout)
+
+    def close(self) -> None:
+        """
+        Stops the worker after draining requests that are already queued; later
+        predictions run synchronously.
+        """
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+
+    # --- Worker ---
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Queue and thread of a parent process (if any) did not survive the fork
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _collect(self, first) -> tuple[list, bool]:
+        """Gathers a batch starting with `first`; returns (batch, stop_requested)."""
+        batch = [first]
+        deadline = first[3] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._score(batch)
+
+    def _score(self, batch: list) -> None:
+        started = time.perf_counter()
+        PREDICTION_BATCH_SIZE.labels().observe(len(batch))
+        queue_wait = PREDICTION_QUEUE_WAIT_SECONDS.labels()
+        for item in batch:
+            queue_wait.observe(started - item[3])
+
+        try:
+            with PREDICTION_SECONDS.time():
+                result = self.predictor.predict_fit_many([item[0] for item in batch], [item[1] for item in batch])
+        except Exception as e:
+            for item in batch:
+                item[2].set_exception(e)
+            return
+
+        for i, item in enumerate(batch):
+            item[2].set_result({
+                "SkillScore": float(result['SkillScore'][i]),
+                "TrustScore": float(result['TrustScore'][i]),
+                "JobFitScore": float(result['JobFitScore'][i]),
+                "Category": result['Category'][i]
+            })
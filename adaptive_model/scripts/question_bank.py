@@ -0,0 +1,182 @@
+# question_bank.py
+from functools import cached_property
+
+import numpy as np
+
+import bank_format
+from catalog import BankCatalog
+from metrics import BANK_LOAD_SECONDS
+from payloads import QuestionPayloads
+
+
+class QuestionBank:
+    """
+    Process-wide, read-only question bank.
+
+    Built once per loaded dataset and shared by every assessment session. Holds the
+    question columns plus an index grouping row positions by role and difficulty
+    (role -> difficulty -> array of positions) and a Q_ID -> row position lookup, so
+    question selection and score updates never scan the full dataset.
+
+    Banks come either from a DataFrame (CSV path) or from a compiled, memory-mapped
+    bank directory (see bank_format.py). The source DataFrame is never modified.
+    """
+
+    def __init__(self, df):
+        # pandas is only needed for DataFrame (CSV) banks; compiled banks never import it
+        import pandas as pd
+
+        # --- Determine difficulty column dynamically ---
+        if 'Difficulty_Level' in df.columns:
+            self.difficulty_col = 'Difficulty_Level'
+        elif 'Difficulty' in df.columns:
+            self.difficulty_col = 'Difficulty'
+        else:
+            raise ValueError("Dataset must have either 'Difficulty' or 'Difficulty_Level' column.")
+
+        # Row positions double as Q_IDs when the dataset does not provide them
+        if 'Q_ID' in df.columns:
+            self.q_ids = df['Q_ID'].to_numpy()
+        else:
+            self.q_ids = np.arange(len(df))
+
+        role_codes, role_names = pd.factorize(df['Job_Role'])
+        self.role_codes = role_codes.astype(np.int32)
+        self.role_names = list(role_names)
+        skills = df['Skill'].fillna('') if 'Skill' in df.columns else pd.Series([''] * len(df))
+        skill_codes, skill_names = pd.factorize(skills)
+        self.skill_codes = skill_codes.astype(np.int32)
+        self.skill_names = list(skill_names)
+        self.difficulty = df[self.difficulty_col].to_numpy(dtype=np.int64)
+        self.questions = df['Question'].tolist()
+        self.options = df['Options'].tolist()
+        self.answers = df['Answer'].tolist()
+        self._position_of = {int(q_id): pos for pos, q_id in enumerate(self.q_ids.tolist())}
+        self._build_buckets(bank_format.bucket_order(self.role_codes, self.difficulty))
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "QuestionBank":
+        """Loads a bank from a CSV file in the `assessment_data.csv` layout."""
+        import pandas as pd
+        return cls(pd.read_csv(csv_path, quotechar='"'))
+
+    @classmethod
+    def from_compiled(cls, bank_dir: str) -> "QuestionBank":
+        """Memory-maps a compiled bank directory produced by `bank_format.py compile`."""
+        data = bank_format.open_compiled_bank(bank_dir)
+        bank = cls.__new__(cls)
+        bank.difficulty_col = data['meta']['difficulty_col']
+        bank.q_ids = data['q_id']
+        bank.role_codes = data['role']
+        bank.role_names = data['meta']['roles']
+        bank.skill_codes = data['skill']
+        bank.skill_names = data['meta']['skills']
+        if data['meta'].get('version'):
+            bank.version = data['meta']['version']
+        bank.difficulty = data['difficulty']
+        bank.questions = data['question']
+        bank.options = data['options']
+        bank.answers = data['answer']
+        # Q_ID lookups binary-search the sorted copy instead of building a dict
+        bank._position_of = None
+        bank._q_id_sorted = data['q_id_sorted']
+        bank._q_id_order = data['q_id_order']
+        bank._build_buckets(data['bucket_order'])
+        return bank
+
+    @classmethod
+    def load(cls, path: str) -> "QuestionBank":
+        """Loads a compiled bank directory or, failing that, a CSV file."""
+        if bank_format.is_compiled_bank(path):
+            with BANK_LOAD_SECONDS.time('compiled'):
+                return cls.from_compiled(path)
+        with BANK_LOAD_SECONDS.time('csv'):
+            return cls.from_csv(path)
+
+    def _build_buckets(self, order) -> None:
+        """Splits `order` (positions sorted by role, then difficulty) into per-bucket views."""
+        # role -> difficulty -> sorted array of row positions
+        self.buckets = {}
+        if len(order) == 0:
+            return
+        roles = self.role_codes[order]
+        diffs = self.difficulty[order]
+        starts = np.flatnonzero((roles[1:] != roles[:-1]) | (diffs[1:] != diffs[:-1])) + 1
+        starts = np.concatenate(([0], starts, [len(order)]))
+        for start, end in zip(starts[:-1].tolist(), starts[1:].tolist()):
+            role = self.role_names[int(roles[start])]
+            self.buckets.setdefault(role, {})[int(diffs[start])] = order[start:end]
+
+    def __len__(self) -> int:
+        return len(self.q_ids)
+
+    @cached_property
+    def version(self) -> str:
+        """Content hash of the bank; compiled banks carry it precomputed in meta.json."""
+        return bank_format.content_version(self.q_ids, self.difficulty, self.role_codes, self.skill_codes,
+                                           self.questions, self.options, self.answers,
+                                           [str(n) for n in self.role_names + self.skill_names])
+
+    @cached_property
+    def catalog(self) -> BankCatalog:
+        """Derived catalog data (roles, counts, skills), computed once per bank."""
+        return BankCatalog(self)
+
+    @cached_property
+    def payloads(self) -> QuestionPayloads:
+        """Serialized client-facing question fragments, cached per bank."""
+        return QuestionPayloads(self)
+
+    @property
+    def roles(self) -> list:
+        return list(self.buckets)
+
+    def position(self, q_id) -> int | None:
+        """Returns the row position of `q_id`, or None if the bank does not contain it."""
+        # Coerced the same way for both backends, so position("5") finds Q_ID 5 in either
+        try:
+            q_id = int(q_id)
+        except (TypeError, ValueError):
+            return None
+        if self._position_of is not None:
+            return self._position_of.get(q_id)
+        i = int(np.searchsorted(self._q_id_sorted, q_id))
+        if i < len(self._q_id_sorted) and self._q_id_sorted[i] == q_id:
+            return int(self._q_id_order[i])
+        return None
+
+    @cached_property
+    def _q_id_index(self) -> tuple:
+        """(Q_IDs sorted ascending, their row positions) for vectorized lookups."""
+        if self._position_of is None:
+            return self._q_id_sorted, self._q_id_order
+        order = np.argsort(self.q_ids, kind='stable')
+        return np.asarray(self.q_ids, dtype=np.int64)[order], order
+
+    def positions(self, q_ids) -> np.ndarray:
+        """Vectorized `position`: row positions of `q_ids`, -1 where the bank lacks the Q_ID."""
+        q_ids = np.asarray(q_ids, dtype=np.int64)
+        q_id_sorted, order = self._q_id_index
+        if not len(q_id_sorted):
+            return np.full(len(q_ids), -1, dtype=np.int64)
+        i = np.minimum(np.searchsorted(q_id_sorted, q_ids), len(q_id_sorted) - 1)
+        return np.where(q_id_sorted[i] == q_ids, np.asarray(order, dtype=np.int64)[i], -1)
+
+    def role_at(self, pos: int) -> str:
+        return self.role_names[self.role_codes[pos]]
+
+    def options_at(self, pos: int) -> list:
+        """Returns the answer options of row `pos` as a list."""
+        if isinstance(self.options, bank_format.OptionsColumn):
+            return self.options.split_at(pos)
+        return self.options[pos].split(';')
+
+    def question_at(self, pos: int) -> dict:
+        """Returns the question stored at row position `pos`."""
+        return {
+            "Q_ID": int(self.q_ids[pos]),
+            "Question": self.questions[pos],
+            "Options": self.options[pos],
+            "Answer": self.answers[pos],
+            "Difficulty": int(self.difficulty[pos])
+        }
@@ -0,0 +1,278 @@
+# results_report.py
+"""
+Streaming per-role and per-question statistics over recorded assessment results.
+
+Reads what results_sink.py wrote (a SQLite database or a directory of Parquet files) in
+batches of --batch-size sessions. Each batch is reduced into running sums per role and
+per question, so memory depends on the number of roles and questions, not on the number
+of results.
+
+    role_stats.csv   sessions, mean/std SkillScore and JobFitScore, mean items and raw
+                     score, sessions per job-fit category
+    item_stats.csv   per Q_ID: exposures, share correct, mean position in the sequence,
+                     mean SkillScore of the candidates who saw it, and the point-biserial
+                     correlation between answering it correctly and the SkillScore
+
+--responses-out also writes every response of IRT-mode sessions as a (Q_ID,
+Correctness, Ability) row, the response-log layout train.py calibrates from. Ability is
+the session's recorded final ability estimate. Rule-mode sessions are left out: their
+engine keeps no ability estimate, and their SkillScore comes from the raw score.
+
+Usage:
+    python results_report.py /var/lib/hireledger/results.db --out-dir report
+    python results_report.py /var/lib/hireledger/results/ --since 2026-10-01 --responses-out responses.csv
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from irt_engine import IRTAdaptiveEngine
+
+SESSION_COLUMNS = ('role', 'engine', 'q_count', 'raw_score', 'ability', 'skill_score', 'job_fit_score', 'category')
+
+
+class ResultBatch:
+    """
+    A batch of sessions: per-session columns in `sessions` (a DataFrame of
+    SESSION_COLUMNS), plus every response flattened into `q_ids` / `correct`, with
+    `lengths` responses per session.
+    """
+
+    def __init__(self, sessions: pd.DataFrame, lengths: np.ndarray, q_ids: np.ndarray, correct: np.ndarray):
+        self.sessions = sessions.reset_index(drop=True)
+        self.lengths = lengths
+        self.q_ids = q_ids
+        self.correct = correct
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def session_index(self) -> np.ndarray:
+        """Session (row of `sessions`) of each flattened response."""
+        return np.repeat(np.arange(len(self.lengths)), self.lengths)
+
+    @property
+    def position(self) -> np.ndarray:
+        """1-based position of each flattened response in its session's sequence."""
+        starts = np.repeat(np.cumsum(self.lengths) - self.lengths, self.lengths)
+        return np.arange(len(self.q_ids)) - starts + 1
+
+
+# --- Readers ---
+def read_sqlite(path: str, batch_size: int, since: float | None) -> iter:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        query = f"SELECT {', '.join(SESSION_COLUMNS)}, q_ids, correct FROM results"
+        params = ()
+        if since is not None:
+            query += " WHERE completed_at >= ?"
+            params = (since,)
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=batch_size):
+            q_blobs = chunk.pop('q_ids').tolist()
+            correct_blobs = chunk.pop('correct').tolist()
+            lengths = np.fromiter(map(len, correct_blobs), dtype=np.int64, count=len(correct_blobs))
+            yield ResultBatch(chunk, lengths,
+                              np.frombuffer(b''.join(q_blobs), dtype='<i8'),
+                              np.frombuffer(b''.join(correct_blobs), dtype=np.uint8).astype(bool))
+    finally:
+        conn.close()
+
+
+def read_parquet(directory: str, batch_size: int, since: float | None) -> iter:
+    try:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Reading Parquet results requires the 'pyarrow' package.")
+    columns = [*SESSION_COLUMNS, 'completed_at', 'q_ids', 'correct']
+    for path in sorted(glob.glob(os.path.join(directory, 'results-*.parquet'))):
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            if since is not None:
+                record_batch = record_batch.filter(pc.greater_equal(record_batch.column('completed_at'), since))
+            q_ids = record_batch.column('q_ids')
+            yield ResultBatch(record_batch.select(list(SESSION_COLUMNS)).to_pandas(),
+                              pc.list_value_length(q_ids).to_numpy(zero_copy_only=False).astype(np.int64),
+                              q_ids.flatten().to_numpy(zero_copy_only=False).astype(np.int64),
+                              record_batch.column('correct').flatten().to_numpy(zero_copy_only=False).astype(bool))
+
+
+def read_results(source: str, batch_size: int, since: float | None = None) -> iter:
+    """Yields ResultBatches from a results database file or Parquet directory."""
+    if source.startswith(('sqlite://', 'parquet://')):
+        path = source.partition('://')[2]
+        source = path[1:] if path.startswith('//') else path
+    if os.path.isdir(source):
+        return read_parquet(source, batch_size, since)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"No results at {source}")
+    return read_sqlite(source, batch_size, since)
+
+
+# --- Aggregation ---
+class RoleStatistics:
+    """Running per-role sums; `table()` turns them into means and standard deviations."""
+
+    SUMS = ('sessions', 'items', 'raw_score', 'skill_score', 'skill_score_sq', 'job_fit_score', 'job_fit_score_sq')
+
+    def __init__(self):
+        self.sums = pd.DataFrame(columns=self.SUMS, dtype=np.float64)
+        self.categories = pd.DataFrame(dtype=np.float64)
+
+    def add(self, batch: ResultBatch) -> None:
+        s = batch.sessions
+        frame = pd.DataFrame({
+            'role': s['role'],
+            'sessions': 1.0,
+            'items': batch.lengths,
+            'raw_score': s['raw_score'],
+            'skill_score': s['skill_score'],
+            'skill_score_sq': s['skill_score'] ** 2,
+            'job_fit_score': s['job_fit_score'],
+            'job_fit_score_sq': s['job_fit_score'] ** 2,
+        })
+        self.sums = self.sums.add(frame.groupby('role').sum(), fill_value=0)
+        categories = pd.crosstab(s['role'], s['category']).astype(np.float64)
+        self.categories = self.categories.add(categories, fill_value=0)
+
+    def table(self) -> pd.DataFrame:
+        sums = self.sums
+        n = sums['sessions']
+        table = pd.DataFrame({
+            'sessions': n.astype(np.int64),
+            'mean_items': sums['items'] / n,
+            'mean_raw_score': sums['raw_score'] / n,
+            'mean_skill_score': sums['skill_score'] / n,
+            'std_skill_score': np.sqrt(np.maximum(sums['skill_score_sq'] / n - (sums['skill_score'] / n) ** 2, 0)),
+            'mean_job_fit_score': sums['job_fit_score'] / n,
+            'std_job_fit_score': np.sqrt(np.maximum(sums['job_fit_score_sq'] / n - (sums['job_fit_score'] / n) ** 2, 0)),
+        })
+        table = table.join(self.categories.fillna(0).astype(np.int64))
+        table.index.name = 'Job_Role'
+        return table.sort_index()
+
+
+class ItemStatistics:
+    """Running per-question sums over every recorded response."""
+
+    SUMS = ('exposures', 'correct', 'position', 'skill', 'skill_sq', 'skill_correct')
+
+    def __init__(self):
+        self.sums = pd.DataFrame(columns=self.SUMS, dtype=np.float64)
+
+    def add(self, batch: ResultBatch) -> None:
+        if len(batch.q_ids) == 0:
+            return
+        skill = batch.sessions['skill_score'].to_numpy(dtype=np.float64)[batch.session_index]
+        correct = batch.correct.astype(np.float64)
+        keys, inverse = np.unique(batch.q_ids, return_inverse=True)
+
+        def total(weights):
+            return np.bincount(inverse, weights, minlength=len(keys))
+
+        frame = pd.DataFrame({
+            'exposures': np.bincount(inverse, minlength=len(keys)).astype(np.float64),
+            'correct': total(correct),
+            'position': total(batch.position.astype(np.float64)),
+            'skill': total(skill),
+            'skill_sq': total(skill ** 2),
+            'skill_correct': total(skill * correct),
+        }, index=pd.Index(keys, name='Q_ID'))
+        self.sums = self.sums.add(frame, fill_value=0)
+
+    def table(self) -> pd.DataFrame:
+        sums = self.sums
+        n = sums['exposures']
+        k = sums['correct']
+        p = k / n
+        std = np.sqrt(np.maximum(sums['skill_sq'] / n - (sums['skill'] / n) ** 2, 0))
+        mean_correct = sums['skill_correct'] / k
+        mean_wrong = (sums['skill'] - sums['skill_correct']) / (n - k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            point_biserial = (mean_correct - mean_wrong) / std * np.sqrt(p * (1 - p))
+        table = pd.DataFrame({
+            'exposures': n.astype(np.int64),
+            'p_correct': p,
+            'mean_position': sums['position'] / n,
+            'mean_skill_score': sums['skill'] / n,
+            'point_biserial': point_biserial.where((k > 0) & (k < n) & (std > 0)),
+        })
+        table.index = table.index.astype(np.int64)
+        table.index.name = 'Q_ID'
+        return table.sort_index()
+
+
+def write_responses(batch: ResultBatch, path: str, header: bool) -> int:
+    """Appends the responses of the batch's IRT-mode sessions to `path`; returns how many."""
+    irt = (batch.sessions['engine'] == IRTAdaptiveEngine.MODE).to_numpy()
+    keep = irt[batch.session_index]
+    ability = batch.sessions['ability'].to_numpy(dtype=np.float64)[batch.session_index][keep]
+    pd.DataFrame({'Q_ID': batch.q_ids[keep], 'Correctness': batch.correct[keep].astype(np.int8),
+                  'Ability': ability.round(4)}) \
+        .to_csv(path, mode='w' if header else 'a', header=header, index=False)
+    return int(keep.sum())
+
+
+def parse_since(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help="results database (sqlite) or Parquet directory, as a path or sink URL")
+    parser.add_argument('--out-dir', default='.', help="directory for role_stats.csv and item_stats.csv")
+    parser.add_argument('--responses-out', help="also write a train.py response log (Q_ID, Correctness, Ability) "
+                                                "of the IRT-mode sessions")
+    parser.add_argument('--since', type=parse_since, help="only results completed at or after this "
+                                                          "(ISO date/time or Unix timestamp)")
+    parser.add_argument('--batch-size', type=int, default=100_000, help="sessions per batch")
+    args = parser.parse_args()
+
+    roles = RoleStatistics()
+    items = ItemStatistics()
+    sessions = responses = exported = 0
+    for batch in read_results(args.source, args.batch_size, args.since):
+        if len(batch) == 0:
+            continue
+        roles.add(batch)
+        items.add(batch)
+        if args.responses_out:
+            exported += write_responses(batch, args.responses_out, header=sessions == 0)
+        sessions += len(batch)
+        responses += len(batch.q_ids)
+        print(f"INFO: {sessions:,} sessions, {responses:,} responses read.", end='\r')
+    print()
+
+    if sessions == 0:
+        print("WARNING: No results found; nothing written.")
+        return
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    role_table = roles.table()
+    role_table.to_csv(os.path.join(args.out_dir, 'role_stats.csv'))
+    items.table().to_csv(os.path.join(args.out_dir, 'item_stats.csv'))
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(role_table[['sessions', 'mean_items', 'mean_skill_score', 'mean_job_fit_score']].round(2))
+    print(f"Wrote role_stats.csv ({len(role_table)} roles) and item_stats.csv ({len(items.sums)} questions) "
+          f"to {args.out_dir}.")
+    if args.responses_out:
+        print(f"Wrote {exported:,} responses of IRT-mode sessions to {args.responses_out} "
+              f"({responses - exported:,} rule-mode responses left out).")
+
+
+if __name__ == '__main__':
+    main()
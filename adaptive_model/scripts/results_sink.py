@@ -0,0 +1,236 @@
+# results_sink.py
+"""
+Append-only sink for completed assessment results.
+
+`record()` only appends the finished session to an in-memory buffer, so the request
+path does no I/O. A background thread writes the buffer in batches, every
+`flush_seconds` or as soon as `batch_size` results are waiting. Each result is one row:
+
+    session_id, completed_at, role, version, engine, q_count,
+    q_ids (item sequence), correct (responses), raw_score, ability, se,
+    skill_score, job_fit_score, category
+
+Backends (RESULTS_SINK_URL):
+    sqlite:///path/results.db   one table, shared by every worker on the host (WAL mode);
+                                q_ids / correct are little-endian int64 / uint8 BLOBs
+    parquet:///path/dir         one results-<pid>-<time>-<seq>.parquet file per flush
+                                (requires the `pyarrow` package)
+
+Both are append-only. results_report.py reads either one as a stream.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from metrics import Counter, Histogram
+
+RESULTS_FLUSH_SECONDS = Histogram('hireledger_results_flush_seconds', 'Time to write one batch of results.',
+                                  ('backend',))
+RESULTS_WRITTEN = Counter('hireledger_results_written', 'Assessment results written to the sink.', ('backend',))
+RESULTS_DROPPED = Counter('hireledger_results_dropped', 'Results dropped because the sink buffer was full.')
+
+COLUMNS = ('session_id', 'completed_at', 'role', 'version', 'engine', 'q_count', 'q_ids', 'correct',
+           'raw_score', 'ability', 'se', 'skill_score', 'job_fit_score', 'category')
+
+
+class ResultsWriter:
+    """Interface for results backends: writes a batch of row dicts (see COLUMNS)."""
+
+    BACKEND = 'custom'
+
+    def write(self, rows: list) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteResultsWriter(ResultsWriter):
+    BACKEND = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        # Only the sink's flush thread writes, but it is not the thread that opens the writer
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " session_id TEXT, completed_at REAL, role TEXT, version TEXT, engine TEXT, q_count INTEGER,"
+            " q_ids BLOB, correct BLOB, raw_score REAL, ability REAL, se REAL,"
+            " skill_score REAL, job_fit_score REAL, category TEXT)"
+        )
+
+    def write(self, rows: list) -> None:
+        records = []
+        for row in rows:
+            record = dict(row, q_ids=row['q_ids'].astype('<i8').tobytes(),
+                          correct=row['correct'].astype(np.uint8).tobytes())
+            records.append(tuple(record[column] for column in COLUMNS))
+        placeholders = ', '.join('?' * len(COLUMNS))
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})", records)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ParquetResultsWriter(ResultsWriter):
+    BACKEND = 'parquet'
+
+    def __init__(self, directory: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("The parquet results sink requires the 'pyarrow' package.")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.directory = directory
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, rows: list) -> None:
+        columns = {column: [row[column] for row in rows] for column in COLUMNS}
+        columns['q_ids'] = [row['q_ids'].tolist() for row in rows]
+        columns['correct'] = [row['correct'].astype(bool).tolist() for row in rows]
+        table = self.pa.table(columns)
+        self._sequence += 1
+        name = f"results-{os.getpid()}-{time.time_ns()}-{self._sequence}.parquet"
+        # Written under a temporary name, so readers never see a partial file
+        tmp_path = os.path.join(self.directory, '.' + name + '.tmp')
+        self.pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+
+class ResultsSink:
+    """
+    Buffers completed results and writes them from a background thread.
+
+    At most `max_buffered` results wait at a time; beyond that new results are dropped
+    (and counted) rather than growing memory while the backend is unavailable.
+    """
+
+    def __init__(self, writer: ResultsWriter, flush_seconds: float = 1.0, batch_size: int = 1000,
+                 max_buffered: int = 100_000):
+        self.writer = writer
+        self.flush_seconds = flush_seconds
+        self.batch_size = max(int(batch_size), 1)
+        self.max_buffered = max_buffered
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flush_time = RESULTS_FLUSH_SECONDS.labels(writer.BACKEND)
+        self._written = RESULTS_WRITTEN.labels(writer.BACKEND)
+        self._thread = threading.Thread(target=self._run, name='results-sink', daemon=True)
+        self._thread.start()
+        # Results still buffered at interpreter exit are written, not lost
+        atexit.register(self.close)
+
+    # --- Public Methods ---
+    def record(self, session_id: str, state, bank, engine: str, result: dict) -> None:
+        """Queues the result of a completed session (`result`: the predictor's output)."""
+        entry = (session_id, time.time(), state, bank, engine, result)
+        with self._lock:
+            if len(self._buffer) >= self.max_buffered:
+                RESULTS_DROPPED.labels().inc()
+                return
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Writes everything buffered now; returns the number of results written."""
+        with self._write_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+            rows = [self._row(*entry) for entry in entries]
+            with self._flush_time.time():
+                self.writer.write(rows)
+        self._written.inc(len(rows))
+        return len(rows)
+
+    def close(self) -> None:
+        """Stops the background thread after writing what is buffered."""
+        if not self._closed:
+            self._closed = True
+            self._wake.set()
+            self._thread.join()
+            self.writer.close()
+
+    # --- Worker ---
+    @staticmethod
+    def _row(session_id: str, completed_at: float, state, bank, engine: str, result: dict) -> dict:
+        positions = np.fromiter((pos for pos, _ in state.responses), dtype=np.int64, count=len(state.responses))
+        return {
+            'session_id': session_id,
+            'completed_at': completed_at,
+            'role': state.role,
+            'version': state.version,
+            'engine': engine,
+            'q_count': state.q_count,
+            'q_ids': np.asarray(bank.q_ids)[positions].astype(np.int64),
+            'correct': np.fromiter((c for _, c in state.responses), dtype=bool, count=len(state.responses)),
+            'raw_score': float(state.raw_score),
+            'ability': float(state.ability),
+            'se': float(state.se) if state.se is not None else None,
+            'skill_score': float(result['SkillScore']),
+            'job_fit_score': float(result['JobFitScore']),
+            'category': result['Category'],
+        }
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"ERROR: Writing assessment results failed; they are dropped. Error: {e}")
+            if self._closed:
+                # Results recorded while the last flush ran
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"ERROR: Writing assessment results failed; they are dropped. Error: {e}")
+                return
+
+
+def create_results_sink(url: str, flush_seconds: float = 1.0, batch_size: int = 1000) -> ResultsSink | None:
+    """
+    Builds a sink from a URL, or returns None for an empty URL (results not recorded):
+        sqlite:///path/to/results.db
+        parquet:///path/to/results_dir      (requires the `pyarrow` package)
+    `?batch_size=` in the URL overrides `batch_size`.
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    options = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+    path = parsed.path if parsed.netloc == '' else parsed.netloc + parsed.path
+    batch_size = int(options.get('batch_size', batch_size))
+
+    if parsed.scheme == 'sqlite':
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer = SQLiteResultsWriter(path)
+    elif parsed.scheme == 'parquet':
+        writer = ParquetResultsWriter(path)
+    else:
+        raise ValueError(f"Unsupported results sink URL: {url}")
+    return ResultsSink(writer, flush_seconds=flush_seconds, batch_size=batch_size)
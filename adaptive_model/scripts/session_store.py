@@ -0,0 +1,362 @@
+# session_store.py
+"""
+Pluggable storage for assessment SessionState objects.
+
+Backends:
+    InMemorySessionStore  per-process LRU with sliding TTL (default)
+    SQLiteSessionStore    file-backed, shared by every worker on the host
+    RedisSessionStore     any redis-py compatible client (get / set(px=) / delete / getdel)
+
+The serialized backends keep only the minimal per-session state (role, answered
+questions, difficulty, raw score, ability, count) in a compact binary record, so any
+worker can serve any session.
+"""
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+import weakref
+from array import array
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from adaptive_logic import SessionState
+
+DEFAULT_TTL_SECONDS = 3600
+
+
+class SessionCodec:
+    """
+    Packs a SessionState into bytes and back.
+
+    Answered questions are stored as the ordered list of (bank position, correct) pairs:
+    4 bytes per position plus one bit per answer, 42 bytes for a 10-item session. States
+    without a response history store their administered set either as a bitset over the
+    role's own questions or as a plain list of bank positions, whichever is smaller.
+
+    Positions refer to the bank the session started on. With hot reloads, `resolve`
+    maps a session's artifact version to that bank (None: version no longer loaded);
+    without it every session uses `bank`.
+    """
+
+    FORMAT_VERSION = 3
+    # version, difficulty, q_count, raw_score, ability, ability SE, role length, artifact version length
+    HEADER = struct.Struct('<BbHdddHB')
+    BITSET, POSITIONS, RESPONSES = 0, 1, 2
+
+    def __init__(self, bank=None, resolve=None):
+        self.bank = bank
+        self.resolve = resolve
+        self._role_positions = weakref.WeakKeyDictionary()  # bank -> role -> positions
+
+    def bank_for(self, version: str | None):
+        return self.resolve(version) if self.resolve is not None else self.bank
+
+    def role_positions(self, role: str, bank=None) -> np.ndarray:
+        """Sorted bank positions of every question for `role` (cached per bank and role)."""
+        bank = bank if bank is not None else self.bank
+        cache = self._role_positions.setdefault(bank, {})
+        positions = cache.get(role)
+        if positions is None:
+            buckets = bank.buckets.get(role, {})
+            positions = np.sort(np.concatenate(list(buckets.values()))) if buckets else np.empty(0, dtype=np.int64)
+            cache[role] = positions
+        return positions
+
+    def encode(self, state: SessionState) -> bytes:
+        role = state.role.encode('utf-8')
+        version = (state.version or '').encode('utf-8')
+        se = state.se if state.se is not None else math.nan
+        header = self.HEADER.pack(self.FORMAT_VERSION, state.difficulty, state.q_count, state.raw_score,
+                                  state.ability, se, len(role), len(version))
+        prefix = header + role + version
+
+        if state.responses and len({pos for pos, _ in state.responses}) == len(state.administered):
+            positions = array('I', [pos for pos, _ in state.responses]).tobytes()
+            correct = np.packbits(np.array([c for _, c in state.responses], dtype=np.uint8), bitorder='little')
+            return (prefix + bytes([self.RESPONSES]) + struct.pack('<H', len(state.responses)) +
+                    positions + correct.tobytes())
+
+        administered = sorted(state.administered)
+        list_payload = array('I', administered).tobytes()
+
+        bank = self.bank_for(state.version)
+        role_positions = self.role_positions(state.role, bank) if bank is not None else ()
+        bitset_size = math.ceil(len(role_positions) / 8)
+        if len(role_positions) and bitset_size < len(list_payload):
+            local = np.searchsorted(role_positions, administered)
+            in_role = (local < len(role_positions)) & (role_positions[np.minimum(local, len(role_positions) - 1)] == administered)
+            if in_role.all():
+                bits = np.zeros(bitset_size * 8, dtype=np.uint8)
+                bits[local] = 1
+                return prefix + bytes([self.BITSET]) + np.packbits(bits, bitorder='little').tobytes()
+
+        return prefix + bytes([self.POSITIONS]) + list_payload
+
+    def decode(self, data: bytes) -> SessionState:
+        """
+        Rebuilds a SessionState. If its artifact version is no longer loaded, the state
+        comes back with that version but no administered questions; callers reject it.
+        """
+        if not data or data[0] != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported session record version: {data[0] if data else None} "
+                             f"(expected {self.FORMAT_VERSION})")
+        _, difficulty, q_count, raw_score, ability, se, role_len, version_len = self.HEADER.unpack_from(data)
+        offset = self.HEADER.size
+        role = data[offset:offset + role_len].decode('utf-8')
+        offset += role_len
+        version = data[offset:offset + version_len].decode('utf-8') or None
+        offset += version_len
+        encoding = data[offset]
+        payload = data[offset + 1:]
+
+        state = SessionState(role, difficulty, ability)
+        state.q_count = q_count
+        state.raw_score = raw_score
+        state.se = None if math.isnan(se) else se
+        state.version = version
+        bank = self.bank_for(version)
+        if bank is None:
+            return state
+
+        if encoding == self.RESPONSES:
+            (count,) = struct.unpack_from('<H', payload)
+            administered = array('I', payload[2:2 + 4 * count]).tolist()
+            correct = np.unpackbits(np.frombuffer(payload[2 + 4 * count:], dtype=np.uint8), bitorder='little')[:count]
+            state.responses = list(zip(administered, correct.astype(bool).tolist()))
+        elif encoding == self.BITSET:
+            role_positions = self.role_positions(role, bank)
+            bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), bitorder='little')[:len(role_positions)]
+            administered = role_positions[np.flatnonzero(bits)].tolist()
+        else:
+            administered = array('I', payload).tolist()
+
+        # Rebuild the per-difficulty "remaining" counters from the administered set
+        for pos in administered:
+            if pos in state.administered:
+                continue
+            state.administered.add(pos)
+            if bank.role_at(pos) == role:
+                diff = int(bank.difficulty[pos])
+                state.taken[diff] = state.taken.get(diff, 0) + 1
+        return state
+
+
+class SessionStore:
+    """Interface for session storage backends."""
+
+    # Name used as the `backend` label of the session store metrics
+    BACKEND = 'custom'
+
+    def get(self, session_id: str) -> SessionState | None:
+        """Returns the live state for `session_id`, or None if unknown or expired."""
+        raise NotImplementedError
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        """Creates or replaces a session; also refreshes its TTL."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def pop(self, session_id: str) -> SessionState | None:
+        """
+        Atomically removes and returns a live session, or None if unknown or expired. Of
+        concurrent pops of one session, exactly one gets the state.
+        """
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process store holding live SessionState objects.
+
+    Sessions are kept in least-recently-used order; every access refreshes the TTL, so
+    expired sessions always sit at the front and are evicted in O(1) amortized time.
+    """
+
+    BACKEND = 'memory'
+
+    def __init__(self, max_sessions: int = 100_000, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session_id -> (expires_at, state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+
+    def get(self, session_id: str) -> SessionState | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (now + self.ttl_seconds, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (now + self.ttl_seconds, state)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def pop(self, session_id: str) -> SessionState | None:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store shared by all worker processes on a host.
+
+    Uses WAL mode and one connection per thread; expired rows are purged every
+    `purge_every` writes.
+    """
+
+    BACKEND = 'sqlite'
+
+    def __init__(self, path: str, codec: SessionCodec, ttl_seconds: float = DEFAULT_TTL_SECONDS, purge_every: int = 1000):
+        self.path = path
+        self.codec = codec
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._writes = 0
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, state BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id: str) -> SessionState | None:
+        row = self._conn().execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return self.codec.decode(row[0]) if row else None
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+            (session_id, self.codec.encode(state), now + self.ttl_seconds)
+        )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id: str) -> None:
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def pop(self, session_id: str) -> SessionState | None:
+        conn = self._conn()
+        # The write lock taken by BEGIN IMMEDIATE serializes concurrent pops across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT state, expires_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None or row[1] <= time.time():
+            return None
+        return self.codec.decode(row[0])
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store backed by a Redis-protocol server; expiry is delegated to the server TTL.
+
+    `client` only needs redis-py's get / set(name, value, px=...) / delete / getdel
+    (Redis 6.2+), so a local stand-in with the same methods can replace a real server.
+    The TTL is sent in milliseconds, so sub-second TTLs still expire (whole seconds
+    would truncate them to 0, which Redis rejects).
+    """
+
+    BACKEND = 'redis'
+
+    def __init__(self, client, codec: SessionCodec, ttl_seconds: float = DEFAULT_TTL_SECONDS, prefix: str = 'assessment:'):
+        self.client = client
+        self.codec = codec
+        self.ttl_ms = max(1, math.ceil(ttl_seconds * 1000))
+        self.prefix = prefix
+
+    def get(self, session_id: str) -> SessionState | None:
+        data = self.client.get(self.prefix + session_id)
+        return self.codec.decode(data) if data is not None else None
+
+    def put(self, session_id: str, state: SessionState) -> None:
+        self.client.set(self.prefix + session_id, self.codec.encode(state), px=self.ttl_ms)
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self.prefix + session_id)
+
+    def pop(self, session_id: str) -> SessionState | None:
+        data = self.client.getdel(self.prefix + session_id)
+        return self.codec.decode(data) if data is not None else None
+
+
+def create_session_store(url: str, bank=None, ttl_seconds: float = DEFAULT_TTL_SECONDS, resolve=None) -> SessionStore:
+    """
+    Builds a store from a URL (`bank` / `resolve`: see SessionCodec):
+        memory://?max_sessions=100000
+        sqlite:///path/to/sessions.db
+        redis://host:6379/0      (requires the `redis` package)
+    """
+    parsed = urlparse(url)
+    options = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+    if parsed.scheme in ('', 'memory'):
+        return InMemorySessionStore(max_sessions=int(options.get('max_sessions', 100_000)), ttl_seconds=ttl_seconds)
+    if parsed.scheme == 'sqlite':
+        path = parsed.path if parsed.netloc == '' else parsed.netloc + parsed.path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return SQLiteSessionStore(path, SessionCodec(bank, resolve), ttl_seconds=ttl_seconds)
+    if parsed.scheme in ('redis', 'rediss'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis session store requires the 'redis' package.")
+        return RedisSessionStore(redis.Redis.from_url(url), SessionCodec(bank, resolve), ttl_seconds=ttl_seconds)
+    raise ValueError(f"Unsupported session store URL: {url}")
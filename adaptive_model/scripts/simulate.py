@@ -0,0 +1,437 @@
+# simulate.py
+"""
+Offline assessment simulator for calibration and capacity planning.
+
+Runs N virtual candidates through the adaptive policy of an engine (rule or IRT mode,
+with its early-stopping rules) in lockstep: all candidates of a role advance one
+question per step as NumPy arrays. Selection, correctness draws and scoring are batched,
+and SkillScores go through the engine's own scoring and JobFitPredictor.predict_fit_many.
+Candidates can be sharded across a process pool.
+
+Candidate abilities are drawn from N(--ability-mean, --ability-sd). Answers follow the
+3PL item model of irt_engine.py (item_parameters from the engine parameter file, or defaults
+from the difficulty level), whatever the engine mode.
+
+Usage:
+    python simulate.py --candidates 1000000
+    python simulate.py --candidates 1000000 --mode irt --workers 8 --out-dir sim_out
+    python simulate.py --bank ../data/assessment_data.bank --role "Cloud Engineer"
+
+With --out-dir, writes summary.json, score_distribution.csv (SkillScore by whole point
+and category) and exposure.csv (per question: times administered and exposure rate,
+i.e. the share of the role's candidates who saw it).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from adaptive_logic import AdaptiveEngine, EngineParameters, StoppingRules, engine_parameters_path
+from irt_engine import IRTAdaptiveEngine, ItemParameters, logistic
+from jobfit_predictor import JobFitPredictor
+from question_bank import QuestionBank
+
+DEFAULT_BANK = os.path.join(current_dir, '..', 'data', 'assessment_data.csv')
+DEFAULT_MODEL_DIR = os.path.join(current_dir, '..', 'models')
+# Vectorized rejection rounds before the few remaining collisions are resolved one by one
+MAX_REJECTION_ROUNDS = 16
+# Candidates of one role simulated together; bounds the per-step working arrays
+CANDIDATE_BATCH = 65536
+
+
+class LockstepSimulator:
+    """Runs batches of candidates of one role at a time through `engine`'s policy."""
+
+    def __init__(self, engine: AdaptiveEngine, rng: np.random.Generator):
+        self.engine = engine
+        self.bank = engine.bank
+        self.rng = rng
+        self.irt = isinstance(engine, IRTAdaptiveEngine)
+        # How candidates answer: the 3PL model, independent of the engine mode
+        self.response_items = engine.items if self.irt else ItemParameters.from_bank(
+            self.bank, engine.ITEM_PARAMETERS, engine.MIN_DIFFICULTY, engine.MAX_DIFFICULTY)
+
+        # Rule-mode SkillScore of every reachable raw score, computed by the engine itself
+        max_difficulty = max(engine.MAX_DIFFICULTY, int(np.max(self.bank.difficulty)) if len(self.bank) else 0)
+        max_raw = engine.MAX_QUESTIONS * 2 * max_difficulty
+        self.skill_of_raw = np.array([engine.get_final_skill_score(raw) for raw in range(max_raw + 1)])
+
+    def run_role(self, role: str, abilities: np.ndarray) -> dict:
+        """Simulates one candidate per entry of `abilities`; returns per-candidate results."""
+        n = len(abilities)
+        max_items = self.engine.MAX_QUESTIONS
+        administered = np.full((n, max(max_items, 1)), -1, dtype=np.int64)
+        q_count = np.zeros(n, dtype=np.int64)
+        active = np.ones(n, dtype=bool)
+
+        if self.irt:
+            estimate = self._run_irt(role, abilities, administered, q_count, active)
+            skill = np.array([self.engine.skill_score_of(theta) for theta in estimate.tolist()])
+        else:
+            raw = self._run_rule(role, abilities, administered, q_count, active)
+            skill = self.skill_of_raw[raw]
+
+        return {'skill': skill, 'items': q_count, 'administered': administered[administered >= 0]}
+
+    # --- Rule-based policy ---
+    def _run_rule(self, role, abilities, administered, q_count, active) -> np.ndarray:
+        engine = self.engine
+        buckets = self.bank.buckets.get(role, {})
+        n = len(abilities)
+        raw = np.zeros(n, dtype=np.int64)
+        if not buckets:
+            return raw
+
+        # Role items grouped by difficulty: bucket j holds items[start[j]:start[j] + size[j]]
+        diffs = sorted(buckets)
+        items = np.concatenate([buckets[d] for d in diffs]).astype(np.int64)
+        size = np.array([len(buckets[d]) for d in diffs], dtype=np.int64)
+        start = np.concatenate(([0], np.cumsum(size)[:-1]))
+        diff_values = np.array(diffs, dtype=np.int64)
+        index_of = np.full(max(diffs + [engine.MAX_DIFFICULTY]) + 2, -1, dtype=np.int64)
+        index_of[diff_values] = np.arange(len(diffs))
+
+        taken = np.zeros((n, len(diffs)), dtype=np.int64)
+        difficulty = np.full(n, engine.MIN_DIFFICULTY + 2, dtype=np.int64)
+        rows = np.arange(n)
+        rules = engine.stopping
+
+        while active.any():
+            idx = np.flatnonzero(active)
+            remaining = size - taken[idx]
+
+            # Same search order as AdaptiveEngine._select_next_position: the lowest of
+            # {d - 1, d, d + 1} (clipped) whose bucket still has questions
+            choice = np.full(len(idx), -1, dtype=np.int64)
+            for offset in (-1, 0, 1):
+                cand = index_of[np.clip(difficulty[idx] + offset, engine.MIN_DIFFICULTY, engine.MAX_DIFFICULTY)]
+                ok = (choice < 0) & (cand >= 0)
+                ok[ok] = remaining[np.flatnonzero(ok), cand[ok]] > 0
+                choice[ok] = cand[ok]
+
+            # Fallback: any remaining question of the role, uniformly
+            total = remaining.sum(axis=1)
+            fallback = np.flatnonzero((choice < 0) & (total > 0))
+            if len(fallback):
+                pick = self.rng.random(len(fallback)) * total[fallback]
+                choice[fallback] = (np.cumsum(remaining[fallback], axis=1) > pick[:, None]).argmax(axis=1)
+
+            exhausted = choice < 0
+            active[idx[exhausted]] = False
+            idx, choice = idx[~exhausted], choice[~exhausted]
+            if not len(idx):
+                break
+
+            pos = self._draw(items, start[choice], size[choice], administered, idx)
+            correct = self._answer(abilities[idx], pos)
+
+            administered[idx, q_count[idx]] = pos
+            q_count[idx] += 1
+            taken[idx, choice] += 1
+            raw[idx] += 2 * diff_values[choice] * correct
+            difficulty[idx] = np.where(correct, np.minimum(difficulty[idx] + 1, engine.MAX_DIFFICULTY),
+                                       np.maximum(difficulty[idx] - 1, engine.MIN_DIFFICULTY))
+
+            done = q_count[idx] >= engine.MAX_QUESTIONS
+            if rules is not None and rules.skill_cutpoints is not None:
+                # Stop once the remaining questions cannot change the category
+                left = np.minimum(engine.MAX_QUESTIONS - q_count[idx], (size - taken[idx]).sum(axis=1))
+                lowest = self.skill_of_raw[raw[idx]]
+                highest = self.skill_of_raw[np.minimum(raw[idx] + left * 2 * engine.MAX_DIFFICULTY,
+                                                       len(self.skill_of_raw) - 1)]
+                decided = (np.searchsorted(rules.skill_cutpoints, lowest, side='right') ==
+                           np.searchsorted(rules.skill_cutpoints, highest, side='right'))
+                done |= decided & (q_count[idx] >= rules.min_items)
+            active[idx[done]] = False
+        return raw
+
+    def _draw(self, items, bucket_start, bucket_size, administered, idx) -> np.ndarray:
+        """Uniformly draws one unadministered item per candidate from its chosen bucket."""
+        pos = np.empty(len(idx), dtype=np.int64)
+        pending = np.arange(len(idx))
+        for _ in range(MAX_REJECTION_ROUNDS):
+            offsets = (self.rng.random(len(pending)) * bucket_size[pending]).astype(np.int64)
+            pos[pending] = items[bucket_start[pending] + offsets]
+            collided = (administered[idx[pending]] == pos[pending, None]).any(axis=1)
+            pending = pending[collided]
+            if not len(pending):
+                return pos
+        # Nearly exhausted buckets: choose among the exact remaining items
+        for i in pending.tolist():
+            bucket = items[bucket_start[i]:bucket_start[i] + bucket_size[i]]
+            left = np.setdiff1d(bucket, administered[idx[i]], assume_unique=True)
+            pos[i] = left[int(self.rng.integers(len(left)))]
+        return pos
+
+    def _answer(self, abilities: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        items = self.response_items
+        a, b, c = items.a[pos], items.b[pos], items.c[pos]
+        p = c + (1.0 - c) * logistic(a * (abilities - b))
+        return self.rng.random(len(pos)) < p
+
+    # --- IRT policy ---
+    def _run_irt(self, role, abilities, administered, q_count, active) -> np.ndarray:
+        engine = self.engine
+        n = len(abilities)
+        grid = engine.THETA_GRID
+        log_post = np.tile(engine.log_prior, (n, 1))
+        estimate, se = self._summarize(log_post)
+        table = engine._information_table(role)
+        if table is None:
+            return estimate
+        rules = engine.stopping
+        tolerance = 1.0 - engine.INFO_TIE_TOLERANCE
+
+        while active.any():
+            idx = np.flatnonzero(active)
+            k = np.clip(np.rint((estimate[idx] - engine.INFO_BINS[0]) / engine._bin_step).astype(np.int64),
+                        0, len(engine.INFO_BINS) - 1)
+            rows = table.positions[k]
+            info = table.information[k]
+            free = ~(rows[:, :, None] == administered[idx][:, None, :]).any(axis=2)
+
+            # Most informative unadministered item; ties broken uniformly at random
+            masked = np.where(free, info, -np.inf)
+            best = masked.max(axis=1)
+            ties = free & (info >= best[:, None] * tolerance)
+            choice = np.argmax(np.where(ties, self.rng.random(rows.shape), -1.0), axis=1)
+            pos = rows[np.arange(len(idx)), choice]
+
+            # Rows whose top items are all administered fall back to the engine's full scan
+            for i in np.flatnonzero(~free.any(axis=1)).tolist():
+                state_like = _ScanState(set(administered[idx[i], :q_count[idx[i]]].tolist()), float(estimate[idx[i]]))
+                found = engine._select_exhaustive(state_like, table)
+                pos[i] = -1 if found is None else found
+            exhausted = pos < 0
+            active[idx[exhausted]] = False
+            idx, pos = idx[~exhausted], pos[~exhausted]
+            if not len(idx):
+                break
+
+            correct = self._answer(abilities[idx], pos)
+            administered[idx, q_count[idx]] = pos
+            q_count[idx] += 1
+
+            p = engine.items.clipped_probability(grid, pos)
+            log_post[idx] += np.where(correct[:, None], np.log(p), np.log1p(-p))
+            previous = estimate[idx]
+            estimate[idx], se[idx] = self._summarize(log_post[idx])
+
+            done = q_count[idx] >= engine.MAX_QUESTIONS
+            if rules is not None:
+                early = np.zeros(len(idx), dtype=bool)
+                if rules.se_threshold is not None:
+                    early |= se[idx] <= rules.se_threshold
+                if rules.delta_threshold is not None:
+                    early |= np.abs(estimate[idx] - previous) < rules.delta_threshold
+                if engine._grid_segments is not None:
+                    weights = np.exp(log_post[idx] - log_post[idx].max(axis=1, keepdims=True))
+                    segments = engine._grid_segments
+                    mass = np.stack([weights[:, segments == s].sum(axis=1) for s in range(segments.max() + 1)], axis=1)
+                    early |= mass.max(axis=1) / mass.sum(axis=1) >= rules.confidence
+                done |= early & (q_count[idx] >= rules.min_items)
+            active[idx[done]] = False
+        return estimate
+
+    def _summarize(self, log_post: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Row-wise EAP estimate and posterior SD, as IRTAdaptiveEngine._summarize."""
+        grid = self.engine.THETA_GRID
+        weights = np.exp(log_post - log_post.max(axis=1, keepdims=True))
+        weights /= weights.sum(axis=1, keepdims=True)
+        theta = weights @ grid
+        se = np.sqrt(np.einsum('ij,ij->i', weights, (grid[None, :] - theta[:, None]) ** 2))
+        return theta, se
+
+
+class _ScanState:
+    """The two SessionState fields IRTAdaptiveEngine._select_exhaustive reads."""
+
+    __slots__ = ('administered', 'ability')
+
+    def __init__(self, administered: set, ability: float):
+        self.administered = administered
+        self.ability = ability
+
+
+def build_engine(bank_path: str, mode: str, stopping: StoppingRules | None, params_path: str | None = None):
+    bank = QuestionBank.load(bank_path)
+    params = EngineParameters.load(params_path) if params_path else EngineParameters()
+    if mode == 'irt':
+        return IRTAdaptiveEngine(bank, params, stopping)
+    return AdaptiveEngine(bank, params, stopping)
+
+
+def simulate_shard(bank_path: str, mode: str, stopping: StoppingRules | None, params_path: str | None,
+                   candidates: int, roles: list | None, ability_mean: float, ability_sd: float,
+                   seed: int, shard: int) -> dict:
+    """Simulates `candidates` candidates spread uniformly over `roles` (all roles when None)."""
+    engine = build_engine(bank_path, mode, stopping, params_path)
+    rng = np.random.default_rng([seed, shard])
+    simulator = LockstepSimulator(engine, rng)
+
+    role_names = roles or engine.bank.roles
+    role_index = rng.integers(len(role_names), size=candidates)
+    abilities = rng.normal(ability_mean, ability_sd, size=candidates)
+
+    skill = np.empty(candidates)
+    items = np.empty(candidates, dtype=np.int64)
+    exposure = np.zeros(len(engine.bank), dtype=np.int64)
+    role_candidates = np.bincount(role_index, minlength=len(role_names))
+    for r, role in enumerate(role_names):
+        members = np.flatnonzero(role_index == r)
+        for batch_start in range(0, len(members), CANDIDATE_BATCH):
+            batch = members[batch_start:batch_start + CANDIDATE_BATCH]
+            result = simulator.run_role(role, abilities[batch])
+            skill[batch] = result['skill']
+            items[batch] = result['items']
+            exposure += np.bincount(result['administered'], minlength=len(engine.bank))
+    return {'skill': skill, 'items': items, 'role_index': role_index, 'role_names': list(role_names),
+            'role_candidates': role_candidates, 'exposure': exposure}
+
+
+def run(bank_path: str, candidates: int, mode: str = 'rule', stopping: StoppingRules | None = None,
+        params_path: str | None = None, roles: list | None = None, ability_mean: float = 0.0,
+        ability_sd: float = 1.0, workers: int = 1, seed: int = 0) -> dict:
+    """Runs the simulation, sharded over `workers` processes; returns the merged shard results."""
+    shards = max(1, min(workers, candidates))
+    sizes = [candidates // shards + (1 if i < candidates % shards else 0) for i in range(shards)]
+    args = [(bank_path, mode, stopping, params_path, size, roles, ability_mean, ability_sd, seed, i)
+            for i, size in enumerate(sizes)]
+    if shards == 1:
+        results = [simulate_shard(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=shards) as pool:
+            results = list(pool.map(simulate_shard, *zip(*args)))
+
+    role_names = results[0]['role_names']
+    return {
+        'skill': np.concatenate([r['skill'] for r in results]),
+        'items': np.concatenate([r['items'] for r in results]),
+        'role_index': np.concatenate([r['role_index'] for r in results]),
+        'role_names': role_names,
+        'role_candidates': sum(r['role_candidates'] for r in results),
+        'exposure': sum(r['exposure'] for r in results),
+    }
+
+
+def summarize(result: dict, predictor: JobFitPredictor, trust_score: float, elapsed: float) -> tuple[dict, dict]:
+    """Summary statistics, plus the columnar job-fit predictions of every candidate."""
+    skill = result['skill']
+    fit = predictor.predict_fit_many(skill, trust_score)
+    labels = predictor.CATEGORY_LABELS
+    categories = np.bincount(fit['CategoryCode'], minlength=len(labels))
+    exposure = result['exposure']
+    return {
+        'candidates': int(len(skill)),
+        'elapsed_s': elapsed,
+        'candidates_per_sec': len(skill) / elapsed if elapsed > 0 else None,
+        'items_per_assessment': float(result['items'].mean()),
+        'skill_score': {
+            'mean': float(skill.mean()),
+            'sd': float(skill.std()),
+            'p10': float(np.percentile(skill, 10)),
+            'p50': float(np.percentile(skill, 50)),
+            'p90': float(np.percentile(skill, 90)),
+        },
+        'job_fit_score_mean': float(fit['JobFitScore'].mean()),
+        'categories': {label: int(count) for label, count in zip(labels, categories.tolist())},
+        'items_administered': int(exposure.sum()),
+        'items_never_administered': int((exposure == 0).sum()),
+    }, fit
+
+
+def write_outputs(out_dir: str, bank: QuestionBank, result: dict, summary: dict, fit: dict, labels: tuple) -> None:
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    # SkillScore by whole point (100 joins 99) and job-fit category
+    bins = np.minimum(result['skill'].astype(np.int64), 99)
+    counts = np.zeros((100, len(labels)), dtype=np.int64)
+    np.add.at(counts, (bins, fit['CategoryCode']), 1)
+    distribution = pd.DataFrame(counts, columns=list(labels))
+    distribution.insert(0, 'SkillScore', np.arange(100))
+    distribution.to_csv(os.path.join(out_dir, 'score_distribution.csv'), index=False)
+
+    # Exposure rate: share of the role's candidates who were asked the question
+    role_codes = np.asarray(bank.role_codes)
+    candidates_by_name = dict(zip(result['role_names'], result['role_candidates'].tolist()))
+    role_totals = np.array([candidates_by_name.get(name, 0) for name in bank.role_names], dtype=np.float64)
+    per_item = role_totals[role_codes]
+    exposure = result['exposure']
+    pd.DataFrame({
+        'Q_ID': np.asarray(bank.q_ids),
+        'Job_Role': np.asarray(bank.role_names, dtype=object)[role_codes],
+        'Difficulty': np.asarray(bank.difficulty),
+        'Administered': exposure,
+        'Exposure_Rate': np.divide(exposure, per_item, out=np.zeros(len(exposure)), where=per_item > 0),
+    }).to_csv(os.path.join(out_dir, 'exposure.csv'), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bank', default=DEFAULT_BANK, help="Question bank CSV or compiled bank directory.")
+    parser.add_argument('--candidates', type=int, default=100_000)
+    parser.add_argument('--mode', choices=('rule', 'irt'), default='rule')
+    parser.add_argument('--role', action='append', help="Simulate only this role (repeatable).")
+    parser.add_argument('--ability-mean', type=float, default=0.0)
+    parser.add_argument('--ability-sd', type=float, default=1.0)
+    parser.add_argument('--trust-score', type=float, default=85)
+    parser.add_argument('--early-stop-confidence', type=float, default=None,
+                        help="Enable category-based early stopping (see EARLY_STOP_CONFIDENCE).")
+    parser.add_argument('--early-stop-se', type=float, default=None)
+    parser.add_argument('--early-stop-min-items', type=int, default=3)
+    parser.add_argument('--engine-params', default=engine_parameters_path(current_dir))
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR)
+    parser.add_argument('--workers', type=int, default=1, help="Processes to shard candidates over.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out-dir', default=None)
+    args = parser.parse_args()
+
+    predictor = JobFitPredictor(model_dir=args.model_dir, precompile=True)
+    stopping = None
+    if args.early_stop_confidence is not None or args.early_stop_se is not None:
+        stopping = StoppingRules(
+            min_items=args.early_stop_min_items,
+            se_threshold=args.early_stop_se,
+            skill_cutpoints=predictor.skill_cutpoints(args.trust_score) if args.early_stop_confidence is not None else None,
+            confidence=args.early_stop_confidence or 0.95,
+        )
+
+    bank = QuestionBank.load(args.bank)
+    unknown = [role for role in args.role or [] if role not in bank.buckets]
+    if unknown:
+        parser.error(f"unknown role(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    result = run(args.bank, args.candidates, args.mode, stopping, args.engine_params, args.role,
+                 args.ability_mean, args.ability_sd, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    summary, fit = summarize(result, predictor, args.trust_score, elapsed)
+
+    rate = summary['candidates_per_sec']
+    print(f"Simulated {summary['candidates']:,} candidates ({args.mode} mode) in {elapsed:.2f}s "
+          f"({rate:,.0f} candidates/sec), {summary['items_per_assessment']:.2f} items each")
+    s = summary['skill_score']
+    print(f"SkillScore mean {s['mean']:.2f} sd {s['sd']:.2f}  p10 {s['p10']:.2f}  p50 {s['p50']:.2f}  p90 {s['p90']:.2f}")
+    for label, count in summary['categories'].items():
+        print(f"  {label:<14}{count:>10,}  {count / summary['candidates']:6.1%}")
+    print(f"Questions never administered: {summary['items_never_administered']:,}")
+
+    if args.out_dir:
+        write_outputs(args.out_dir, bank, result, summary, fit, predictor.CATEGORY_LABELS)
+        print(f"Wrote summary.json, score_distribution.csv and exposure.csv to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# speculation.py
+"""
+Speculative precomputation of the next question.
+
+While a candidate reads a question there are only two possible answers, so after a
+question is served both outcomes (updated state, next question, new score) are computed
+on a background thread pool (AdaptiveEngine.speculate), outside the engine's selection
+and update timing metrics. The submit that follows takes the matching outcome instead
+of updating the score and selecting on the request path.
+
+Outcomes are kept per process, next to the session store: with a shared store and
+several workers, only submits that reach the worker that served the question hit.
+Counted per submit (hireledger_speculations{result}):
+    hit      the outcome was ready (its compute time is recorded as saved)
+    wait     it was being computed; the submit waited for it
+    miss     nothing was precomputed (cancelled while queued, evicted, other worker,
+             different question, or a failed precomputation); computed on the request path
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import SPECULATIONS, SPECULATION_SAVED_SECONDS, SPECULATION_SECONDS
+
+
+class Speculator:
+    """Precomputes both outcomes of the question each session is answering."""
+
+    def __init__(self, threads: int = 2, max_sessions: int = 10_000):
+        self.max_sessions = max_sessions
+        # Threads start on the first schedule(), so a Speculator can be created before a fork
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='speculation')
+        self._entries = OrderedDict()  # session_id -> (engine, q_id, q_count, future)
+        self._lock = threading.Lock()
+        self._results = {result: SPECULATIONS.labels(result) for result in ('hit', 'wait', 'miss')}
+        self._time = SPECULATION_SECONDS.labels()
+        self._saved = SPECULATION_SAVED_SECONDS.labels()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, session_id: str, engine, state, q_id: int) -> None:
+        """Starts precomputing both outcomes of answering `q_id` in `state`."""
+        # Copied now: the caller keeps using (and the in-memory store keeps) `state`
+        base = state.copy()
+        future = self._executor.submit(self._run, engine, base, q_id)
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            self._entries[session_id] = (engine, q_id, base.q_count, future)
+            evicted = self._entries.popitem(last=False) if len(self._entries) > self.max_sessions else None
+        for entry in (previous, evicted[1] if evicted else None):
+            if entry is not None:
+                entry[3].cancel()
+
+    def take(self, session_id: str, engine, state, q_id: int, is_correct: bool) -> tuple | None:
+        """
+        The precomputed (state, next position, new score) for this answer, or None when the
+        caller has to compute it. `state` is the session as loaded from the store.
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is None:
+            self._results['miss'].inc()
+            return None
+        spec_engine, spec_q_id, spec_q_count, future = entry
+        # A precomputation still queued is cancelled: computing inline is no slower
+        if spec_engine is not engine or spec_q_id != q_id or spec_q_count != state.q_count or future.cancel():
+            future.cancel()
+            self._results['miss'].inc()
+            return None
+
+        result = 'hit' if future.done() else 'wait'
+        try:
+            outcomes = future.result()
+        except Exception:
+            self._results['miss'].inc()
+            return None
+        branch, next_pos, new_score, seconds = outcomes[bool(is_correct)]
+        self._results[result].inc()
+        # Only a ready outcome took its whole computation off the submit
+        if result == 'hit':
+            self._saved.observe(seconds)
+        return branch, next_pos, new_score
+
+    def discard(self, session_id: str) -> None:
+        """Drops (and cancels) what was precomputed for a session that ended."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            entry[3].cancel()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._entries.clear()
+
+    def _run(self, engine, state, q_id: int) -> dict:
+        with self._time.time():
+            return engine.speculate(state, q_id)
@@ -0,0 +1,431 @@
+# train.py
+"""
+Training pipeline for the serving artifacts: per-question IRT parameters for the
+adaptive engine and the job-fit model, written in the artifact format of
+artifact_format.py (adaptive_engine.artifact, job_fit_model.artifact).
+
+Response logs are streamed in chunks. Each row needs Correctness, optionally Q_ID and
+Response_Time, and the candidate's ability: an 'Ability' column on the IRT scale or, as
+in assessment_data.csv, 'Candidate_Skill_Level' (1-5, centred on 3). Logs without a
+Q_ID column are read in bank layout (row i is question Q_ID i). Every chunk is reduced
+to sufficient statistics, i.e. responses and correct answers per (question, ability bin),
+so memory does not grow with the log. Answers faster than --min-response-time seconds are
+rapid guesses and are left out.
+
+Item discrimination and difficulty (2PL, c = 0) are fitted per role by MAP Fisher
+scoring with priors centred on the engine defaults (a = 1, b from the difficulty
+level), in parallel across --workers processes. training_manifest.json records a
+fingerprint of each role's statistics; roles whose fingerprint is unchanged keep
+their previous parameters.
+
+The job-fit model is retrained from --outcomes files: per-candidate rows with
+SkillScore, Trust_Score and a 0/1 Job_Fit label. Without outcomes, the existing pickled
+model (logistic regression or tree ensemble) is exported once, so servers memory-map it
+instead of unpickling it.
+
+Artifacts are replaced atomically; servers running with RELOAD_POLL_SECONDS pick them up.
+
+Usage:
+    python train.py
+    python train.py --responses ../data/assessment_data.csv --responses live_log.csv --workers 8
+    python train.py --outcomes ../data/job_fit_outcomes.csv --force
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from adaptive_logic import AdaptiveEngine, EngineParameters
+from bank_format import replace_file
+from irt_engine import logistic
+from artifact_format import write_artifact
+from jobfit_predictor import FitLookupTable, JobFitPredictor, LogisticFitModel, export_model, save_exported_model
+from question_bank import QuestionBank
+
+DEFAULT_BANK = os.path.join(current_dir, '..', 'data', 'assessment_data.csv')
+DEFAULT_MODEL_DIR = os.path.join(current_dir, '..', 'models')
+MANIFEST_FILE = 'training_manifest.json'
+MANIFEST_VERSION = 1
+
+RESPONSE_COLUMNS = ('Q_ID', 'Correctness', 'Response_Time', 'Ability', 'Candidate_Skill_Level')
+OUTCOME_COLUMNS = ('SkillScore', 'Trust_Score', 'TrustScore', 'Job_Fit')
+# Candidate_Skill_Level (1-5) maps to ability = level - SKILL_LEVEL_CENTER
+SKILL_LEVEL_CENTER = 3
+# Abilities are pooled in bins of this width over [-MAX_ABILITY, MAX_ABILITY]
+ABILITY_BIN_WIDTH = 0.25
+MAX_ABILITY = 4.0
+# Priors: log(a) ~ N(0, A_PRIOR_SD), b ~ N(difficulty default, B_PRIOR_SD)
+A_PRIOR_SD = 0.5
+B_PRIOR_SD = 1.0
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+# --- Response statistics ---
+class ResponseStatistics:
+    """Responses and correct answers per (bank position, ability bin), merged across chunks."""
+
+    N_BINS = int(round(2 * MAX_ABILITY / ABILITY_BIN_WIDTH)) + 1
+
+    def __init__(self):
+        self._parts = []
+        self.counts = {'rows': 0, 'used': 0, 'rapid_guesses': 0, 'unknown_q_id': 0, 'incomplete': 0}
+
+    def add_chunk(self, chunk: pd.DataFrame, q_ids: np.ndarray, bank: QuestionBank,
+                  min_response_time: float) -> None:
+        if 'Ability' in chunk.columns:
+            ability = chunk['Ability'].to_numpy(dtype=np.float64)
+        elif 'Candidate_Skill_Level' in chunk.columns:
+            ability = chunk['Candidate_Skill_Level'].to_numpy(dtype=np.float64) - SKILL_LEVEL_CENTER
+        else:
+            raise ValueError("response log needs an 'Ability' or 'Candidate_Skill_Level' column")
+        correct = chunk['Correctness'].to_numpy(dtype=np.float64)
+        positions = bank.positions(q_ids)
+
+        keep = ~np.isnan(ability) & ~np.isnan(correct)
+        self.counts['incomplete'] += int((~keep).sum())
+        if 'Response_Time' in chunk.columns:
+            rapid = keep & (chunk['Response_Time'].to_numpy(dtype=np.float64) < min_response_time)
+            self.counts['rapid_guesses'] += int(rapid.sum())
+            keep &= ~rapid
+        unknown = keep & (positions < 0)
+        self.counts['unknown_q_id'] += int(unknown.sum())
+        keep &= ~unknown
+        self.counts['rows'] += len(chunk)
+        self.counts['used'] += int(keep.sum())
+
+        bins = np.rint(np.clip(ability[keep], -MAX_ABILITY, MAX_ABILITY) / ABILITY_BIN_WIDTH).astype(np.int64)
+        keys = positions[keep] * self.N_BINS + bins + (self.N_BINS // 2)
+        self._parts.append(self._reduce(keys, np.ones(len(keys), dtype=np.int64), (correct[keep] > 0).astype(np.int64)))
+
+    @staticmethod
+    def _reduce(keys: np.ndarray, n: np.ndarray, k: np.ndarray) -> tuple:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        return unique, np.bincount(inverse, n, len(unique)).astype(np.int64), np.bincount(inverse, k, len(unique)).astype(np.int64)
+
+    def merged(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(positions, ability bin centres, responses, correct), sorted by position then bin."""
+        if self._parts:
+            keys, n, k = (np.concatenate(column) for column in zip(*self._parts))
+            keys, n, k = self._reduce(keys, n, k)
+        else:
+            keys = n = k = np.empty(0, dtype=np.int64)
+        self._parts = [(keys, n, k)]
+        theta = (keys % self.N_BINS - self.N_BINS // 2) * ABILITY_BIN_WIDTH
+        return keys // self.N_BINS, theta, n, k
+
+
+def stream_responses(paths: list, bank: QuestionBank, chunksize: int, min_response_time: float) -> ResponseStatistics:
+    """Reads the response logs chunk by chunk into ResponseStatistics."""
+    stats = ResponseStatistics()
+    for path in paths:
+        offset = 0
+        for chunk in pd.read_csv(path, usecols=lambda column: column in RESPONSE_COLUMNS, chunksize=chunksize):
+            if 'Q_ID' in chunk.columns:
+                q_ids = chunk['Q_ID'].to_numpy(dtype=np.int64)
+            else:
+                q_ids = np.arange(offset, offset + len(chunk), dtype=np.int64)
+            offset += len(chunk)
+            stats.add_chunk(chunk, q_ids, bank, min_response_time)
+        print(f"INFO: Read {offset:,} responses from {os.path.basename(path)}.")
+    return stats
+
+
+# --- Item calibration ---
+def fit_items(item: np.ndarray, theta: np.ndarray, n: np.ndarray, k: np.ndarray,
+              b_prior: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    MAP estimates of (a, b) for items 0..len(b_prior)-1 from binomial counts `n`, `k`
+    observed at abilities `theta` (`item` maps each observation to its item). All items
+    take Fisher-scoring steps together; the 2x2 systems are solved in closed form.
+    """
+    m = len(b_prior)
+    log_a = np.zeros(m)
+    b = np.asarray(b_prior, dtype=np.float64).copy()
+    n = n.astype(np.float64)
+    k = k.astype(np.float64)
+    for _ in range(MAX_ITERATIONS):
+        a_obs = np.exp(log_a)[item]
+        z = a_obs * (theta - b[item])
+        p = logistic(z)
+        residual = k - n * p
+        weight = n * p * (1.0 - p)
+
+        grad_log_a = np.bincount(item, residual * z, m) - log_a / A_PRIOR_SD ** 2
+        grad_b = np.bincount(item, -residual * a_obs, m) - (b - b_prior) / B_PRIOR_SD ** 2
+        info_aa = np.bincount(item, weight * z * z, m) + 1.0 / A_PRIOR_SD ** 2
+        info_ab = np.bincount(item, -weight * z * a_obs, m)
+        info_bb = np.bincount(item, weight * a_obs * a_obs, m) + 1.0 / B_PRIOR_SD ** 2
+        det = info_aa * info_bb - info_ab * info_ab
+
+        step_log_a = np.clip((info_bb * grad_log_a - info_ab * grad_b) / det, -1.0, 1.0)
+        step_b = np.clip((info_aa * grad_b - info_ab * grad_log_a) / det, -1.0, 1.0)
+        log_a += step_log_a
+        b = np.clip(b + step_b, -MAX_ABILITY, MAX_ABILITY)
+        if max(np.abs(step_log_a).max(initial=0.0), np.abs(step_b).max(initial=0.0)) < TOLERANCE:
+            break
+    return np.exp(log_a), b
+
+
+def fit_role(role: str, q_ids: np.ndarray, b_prior: np.ndarray, item: np.ndarray, theta: np.ndarray,
+             n: np.ndarray, k: np.ndarray) -> tuple[str, np.ndarray, np.ndarray, np.ndarray]:
+    """Process-pool task: fits one role's items; returns (role, Q_IDs, a, b)."""
+    a, b = fit_items(item, theta, n, k, b_prior)
+    return role, q_ids, a, b
+
+
+def role_fingerprint(q_ids: np.ndarray, b_prior: np.ndarray, theta: np.ndarray, n: np.ndarray,
+                     k: np.ndarray, item: np.ndarray) -> str:
+    """Hash of everything a role's fit depends on: its statistics and item priors."""
+    digest = hashlib.blake2b(digest_size=8)
+    for values in (q_ids, item, n, k):
+        digest.update(np.asarray(values, dtype=np.int64).tobytes())
+    for values in (b_prior, theta):
+        digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def role_tasks(bank: QuestionBank, stats: ResponseStatistics) -> dict:
+    """Splits the merged statistics by role: role -> (fingerprint, fit_role arguments)."""
+    positions, theta, n, k = stats.merged()
+    roles = bank.role_codes[positions]
+    order = np.argsort(roles, kind='stable')
+    positions, theta, n, k, roles = positions[order], theta[order], n[order], k[order], roles[order]
+    b_default = np.asarray(bank.difficulty, dtype=np.float64) - (AdaptiveEngine.MIN_DIFFICULTY + AdaptiveEngine.MAX_DIFFICULTY) / 2
+
+    tasks = {}
+    bounds = np.flatnonzero(np.diff(roles)) + 1
+    for rows in np.split(np.arange(len(roles)), bounds):
+        if not len(rows):
+            continue
+        role = bank.role_names[int(roles[rows[0]])]
+        item_positions, item = np.unique(positions[rows], return_inverse=True)
+        q_ids = np.asarray(bank.q_ids, dtype=np.int64)[item_positions]
+        b_prior = b_default[item_positions]
+        fingerprint = role_fingerprint(q_ids, b_prior, theta[rows], n[rows], k[rows], item)
+        tasks[role] = (fingerprint, (role, q_ids, b_prior, item, theta[rows], n[rows], k[rows]))
+    return tasks
+
+
+def load_manifest(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifest if manifest.get('format_version') == MANIFEST_VERSION else {}
+
+
+def training_config(min_response_time: float) -> dict:
+    """Settings that change every role's fit; a change invalidates all fingerprints."""
+    return {
+        'ability_bin_width': ABILITY_BIN_WIDTH,
+        'skill_level_center': SKILL_LEVEL_CENTER,
+        'a_prior_sd': A_PRIOR_SD,
+        'b_prior_sd': B_PRIOR_SD,
+        'min_response_time': min_response_time,
+    }
+
+
+def previous_parameters(params_path: str, bank: QuestionBank, roles: set) -> dict:
+    """Item parameters of `roles` from the previous adaptive_engine.artifact (columnar)."""
+    if not roles or not os.path.exists(params_path):
+        return {}
+    previous = EngineParameters.read_artifact(params_path, verify=True)['item_parameters']
+    positions = bank.positions(previous['Q_ID'])
+    role_codes = [bank.role_names.index(role) for role in roles]
+    keep = (positions >= 0) & np.isin(bank.role_codes[np.maximum(positions, 0)], role_codes)
+    return {name: values[keep] for name, values in previous.items()}
+
+
+def calibrate(bank: QuestionBank, stats: ResponseStatistics, out_dir: str, manifest: dict,
+              config: dict, workers: int, force: bool) -> dict:
+    """
+    Fits changed roles in parallel, reuses unchanged ones and writes adaptive_engine.artifact.
+    The artifact is left untouched when every role is unchanged.
+    """
+    params_path = os.path.join(out_dir, AdaptiveEngine.TRAINED_FILE_NAME)
+    tasks = role_tasks(bank, stats)
+    previous = manifest.get('roles', {}) if manifest.get('config') == config and not force else {}
+    unchanged = {role for role, (fingerprint, _) in tasks.items()
+                 if previous.get(role) == fingerprint} if os.path.exists(params_path) else set()
+    changed = [args for role, (_, args) in tasks.items() if role not in unchanged]
+    roles = {role: fingerprint for role, (fingerprint, _) in tasks.items()}
+
+    if not changed and set(previous) == set(tasks):
+        # Rewriting an identical file would only make servers watching it reload
+        items = len(EngineParameters.read_artifact(params_path)['item_parameters']['Q_ID'])
+        print(f"INFO: All {len(unchanged)} role(s) unchanged; {params_path} left as is.")
+        return {'roles': roles, 'fitted_roles': [], 'reused_roles': sorted(unchanged), 'items': items,
+                'fit_seconds': 0.0}
+
+    start = time.perf_counter()
+    if workers > 1 and len(changed) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(changed))) as pool:
+            fitted = list(pool.map(fit_role, *zip(*changed)))
+    else:
+        fitted = [fit_role(*args) for args in changed]
+    fit_seconds = time.perf_counter() - start
+
+    reused = previous_parameters(params_path, bank, unchanged)
+    columns = {
+        'Q_ID': [reused.get('Q_ID', np.empty(0, dtype=np.int64))] + [q_ids for _, q_ids, _, _ in fitted],
+        'a': [reused.get('a', np.empty(0))] + [a for _, _, a, _ in fitted],
+        'b': [reused.get('b', np.empty(0))] + [b for _, _, _, b in fitted],
+    }
+    item_parameters = {name: np.concatenate(values) for name, values in columns.items()}
+    item_parameters['Q_ID'] = item_parameters['Q_ID'].astype(np.int64)
+    item_parameters['c'] = np.zeros(len(item_parameters['Q_ID']))
+
+    defaults = EngineParameters()
+    if os.path.exists(params_path):
+        defaults = EngineParameters(EngineParameters.read_artifact(params_path, verify=True))
+    write_artifact(params_path, AdaptiveEngine.PARAMETERS_KIND, item_parameters, {
+        'max_questions': defaults.max_questions,
+        'initial_ability': defaults.initial_ability,
+    })
+
+    print(f"INFO: Calibrated {len(fitted)} role(s) in {fit_seconds:.2f}s, reused {len(unchanged)} unchanged; "
+          f"{len(item_parameters['Q_ID']):,} item(s) written to {params_path}.")
+    return {
+        'roles': roles,
+        'fitted_roles': sorted(role for role, _, _, _ in fitted),
+        'reused_roles': sorted(unchanged),
+        'items': int(len(item_parameters['Q_ID'])),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+
+
+# --- Job-fit model ---
+def stream_outcomes(paths: list, chunksize: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads labelled outcomes in chunks into counts per distinct (SkillScore, TrustScore,
+    Job_Fit), at the 0.01 resolution scores are served at: (features, labels, weights).
+    """
+    parts = []
+    for path in paths:
+        for chunk in pd.read_csv(path, usecols=lambda column: column in OUTCOME_COLUMNS, chunksize=chunksize):
+            trust_column = 'Trust_Score' if 'Trust_Score' in chunk.columns else 'TrustScore'
+            frame = pd.DataFrame({
+                'skill': np.rint(chunk['SkillScore'].to_numpy(dtype=np.float64) * 100),
+                'trust': np.rint(chunk[trust_column].to_numpy(dtype=np.float64) * 100),
+                'label': chunk['Job_Fit'].to_numpy(dtype=np.float64),
+            }).dropna()
+            parts.append(frame.groupby(['skill', 'trust', 'label']).size())
+    if not parts:
+        return np.empty((0, 2)), np.empty(0), np.empty(0)
+    counts = pd.concat(parts).groupby(level=[0, 1, 2]).sum()
+    index = counts.index.to_frame(index=False).to_numpy(dtype=np.float64)
+    return index[:, :2] / 100, (index[:, 2] > 0).astype(np.int64), counts.to_numpy(dtype=np.float64)
+
+
+def outcomes_fingerprint(features: np.ndarray, labels: np.ndarray, weights: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for values in (features, labels, weights):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def train_job_fit(outcome_paths: list, model_dir: str, manifest: dict, chunksize: int, force: bool) -> dict:
+    """Retrains the job-fit model from labelled outcomes, or exports the pickled one."""
+    export_path = os.path.join(model_dir, JobFitPredictor.MODEL_EXPORT_FILE)
+    if not outcome_paths:
+        if os.path.exists(export_path) and not force:
+            return manifest.get('job_fit', {'source': 'existing'})
+        try:
+            with open(os.path.join(model_dir, JobFitPredictor.MODEL_FILE), 'rb') as f:
+                estimator = pickle.load(f)
+        except FileNotFoundError:
+            print(f"WARNING: No {JobFitPredictor.MODEL_FILE} in {model_dir} and no --outcomes; job-fit model not exported.")
+            return {'source': 'none'}
+        model = export_model(estimator)
+        if model is None:
+            print(f"WARNING: {JobFitPredictor.MODEL_FILE} ({type(estimator).__name__}) has no artifact form; "
+                  f"leaving it in pickle form.")
+            return {'source': 'pickle'}
+        save_exported_model(model, export_path, FitLookupTable.build(estimator))
+        print(f"INFO: Exported {JobFitPredictor.MODEL_FILE} to {export_path}.")
+        return {'source': 'exported'}
+
+    from sklearn.linear_model import LogisticRegression
+
+    features, labels, weights = stream_outcomes(outcome_paths, chunksize)
+    fingerprint = outcomes_fingerprint(features, labels, weights)
+    previous = manifest.get('job_fit', {})
+    if previous.get('fingerprint') == fingerprint and os.path.exists(export_path) and not force:
+        print("INFO: Job-fit outcomes unchanged; keeping the current model.")
+        return previous
+    if len(np.unique(labels)) < 2:
+        raise ValueError("Job_Fit outcomes must contain both 0 and 1 labels")
+
+    start = time.perf_counter()
+    estimator = LogisticRegression().fit(features, labels, sample_weight=weights)
+    save_exported_model(LogisticFitModel.from_estimator(estimator), export_path, FitLookupTable.build(estimator))
+    fit_seconds = time.perf_counter() - start
+    print(f"INFO: Job-fit model trained on {int(weights.sum()):,} outcomes in {fit_seconds:.2f}s, "
+          f"written to {export_path}.")
+    return {'source': 'trained', 'fingerprint': fingerprint, 'outcomes': int(weights.sum()),
+            'fit_seconds': round(fit_seconds, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bank', default=DEFAULT_BANK, help="Question bank CSV or compiled bank directory.")
+    parser.add_argument('--responses', action='append',
+                        help="Response log CSV (repeatable); defaults to the bank CSV itself.")
+    parser.add_argument('--outcomes', action='append', default=[],
+                        help="Labelled job-fit outcomes CSV (repeatable).")
+    parser.add_argument('--out-dir', default=current_dir, help="Where adaptive_engine.artifact and the manifest go.")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Where job_fit_model.artifact goes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=500_000)
+    parser.add_argument('--min-response-time', type=float, default=2.0,
+                        help="Answers faster than this many seconds are treated as rapid guesses.")
+    parser.add_argument('--force', action='store_true', help="Refit every role and the job-fit model.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.out_dir, exist_ok=True)
+    os.makedirs(args.model_dir, exist_ok=True)
+    bank = QuestionBank.load(args.bank)
+    manifest = load_manifest(args.out_dir)
+    config = training_config(args.min_response_time)
+
+    stats = stream_responses(args.responses or [args.bank], bank, args.chunksize, args.min_response_time)
+    counts = stats.counts
+    print(f"INFO: {counts['used']:,} of {counts['rows']:,} responses used "
+          f"({counts['rapid_guesses']:,} rapid guesses, {counts['unknown_q_id']:,} unknown Q_IDs, "
+          f"{counts['incomplete']:,} incomplete).")
+
+    calibration = calibrate(bank, stats, args.out_dir, manifest, config, args.workers, args.force)
+    job_fit = train_job_fit(args.outcomes, args.model_dir, manifest, args.chunksize, args.force)
+
+    manifest = {
+        'format_version': MANIFEST_VERSION,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'bank_version': bank.version,
+        'config': config,
+        'responses': counts,
+        'roles': calibration['roles'],
+        'job_fit': job_fit,
+    }
+    replace_file(os.path.join(args.out_dir, MANIFEST_FILE),
+                 lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+    print(f"Training finished in {time.perf_counter() - start:.2f}s: "
+          f"{len(calibration['fitted_roles'])} role(s) fitted, {len(calibration['reused_roles'])} reused, "
+          f"job-fit model {job_fit.get('source')}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# conftest.py
+"""
+Shared fixtures. Puts scripts/ on sys.path, so tests import modules the way the scripts
+import each other.
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(TESTS_DIR, '..', 'scripts')
+DATA_CSV = os.path.join(TESTS_DIR, '..', 'data', 'assessment_data.csv')
+MODELS_DIR = os.path.join(TESTS_DIR, '..', 'models')
+
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def pytest_configure(config):
+    # jobfit_predictor silences this at import, but pytest resets the warning filters per test
+    config.addinivalue_line('filterwarnings', 'ignore:X does not have valid feature names:UserWarning')
+
+
+@pytest.fixture(scope='session')
+def bank():
+    """The bundled CSV bank."""
+    from question_bank import QuestionBank
+    return QuestionBank.load(DATA_CSV)
+
+
+@pytest.fixture(scope='session')
+def compiled_bank(tmp_path_factory):
+    """The bundled bank, compiled and memory-mapped."""
+    from bank_format import compile_csv
+    from question_bank import QuestionBank
+    out_dir = str(tmp_path_factory.mktemp('bank') / 'assessment_data.bank')
+    compile_csv(DATA_CSV, out_dir)
+    return QuestionBank.load(out_dir)
+
+
+@pytest.fixture(scope='session')
+def role(bank):
+    """The role with the most questions."""
+    return max(bank.roles, key=lambda r: sum(len(p) for p in bank.buckets[r].values()))
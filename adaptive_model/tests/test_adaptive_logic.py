@@ -0,0 +1,113 @@
+# test_adaptive_logic.py
+import random
+from bisect import bisect_right
+
+import pytest
+
+from adaptive_logic import AdaptiveEngine, StoppingRules
+from conftest import MODELS_DIR
+from jobfit_predictor import JobFitPredictor
+
+
+@pytest.fixture(scope='module')
+def engine(bank):
+    return AdaptiveEngine(bank)
+
+
+def run_session(engine, role: str, answer) -> list:
+    """Runs a session to the end; returns the positions asked, in order."""
+    state, pos = engine.start_position(role)
+    asked = []
+    while pos is not None:
+        asked.append(pos)
+        pos, _ = engine.advance_position(state, int(engine.bank.q_ids[pos]), answer(pos), state.raw_score)
+    return asked
+
+
+def test_sessions_stay_in_role_and_never_repeat_a_question(engine, bank):
+    random.seed(3)
+    for role in bank.roles:
+        role_size = sum(len(b) for b in bank.buckets[role].values())
+        for _ in range(20):
+            asked = run_session(engine, role, lambda pos: random.random() < 0.5)
+            assert all(bank.role_at(pos) == role for pos in asked)
+            assert len(set(asked)) == len(asked) == min(engine.MAX_QUESTIONS, role_size)
+
+
+def test_selection_draws_from_the_lowest_open_bucket_next_to_the_difficulty(engine, bank, role):
+    random.seed(4)
+    buckets = bank.buckets[role]
+    for diff in range(engine.MIN_DIFFICULTY, engine.MAX_DIFFICULTY + 1):
+        state = engine._new_state(role)
+        state.difficulty = diff
+        window = [d for d in (diff - 1, diff, diff + 1) if engine.MIN_DIFFICULTY <= d <= engine.MAX_DIFFICULTY]
+        while True:
+            open_buckets = [d for d in window if engine._remaining(state, d, buckets.get(d, ())) > 0]
+            if not open_buckets:
+                break
+            pos = engine._select_next_position(state)
+            assert bank.difficulty[pos] == min(open_buckets)
+            engine._mark_administered(state, pos)
+
+
+def test_selection_falls_back_to_the_rest_of_the_role_and_then_ends(engine, bank, role):
+    random.seed(6)
+    state = engine._new_state(role)
+    for diff in (state.difficulty - 1, state.difficulty, state.difficulty + 1):
+        for pos in bank.buckets[role].get(diff, []):
+            engine._mark_administered(state, int(pos))
+    role_size = sum(len(b) for b in bank.buckets[role].values())
+    while len(state.administered) < role_size:
+        pos = engine._select_next_position(state)
+        assert pos not in state.administered and bank.role_at(pos) == role
+        engine._mark_administered(state, pos)
+    assert engine._select_next_position(state) is None
+
+
+def test_unknown_role_has_no_questions(engine):
+    state, pos = engine.start_position('No Such Role')
+    assert pos is None
+
+
+# --- Early stopping ---
+@pytest.fixture(scope='module')
+def cutpoints():
+    return JobFitPredictor(model_dir=MODELS_DIR).skill_cutpoints(85)
+
+
+def category(engine, raw_score: float, cutpoints: list) -> int:
+    return bisect_right(cutpoints, engine.get_final_skill_score(raw_score))
+
+
+@pytest.mark.parametrize('pattern', ['right', 'wrong', 'random'])
+def test_early_stop_never_changes_the_category(bank, role, cutpoints, pattern):
+    random.seed(8)
+    stopping = StoppingRules(min_items=3, skill_cutpoints=cutpoints)
+    early, full = AdaptiveEngine(bank, stopping=stopping), AdaptiveEngine(bank)
+    answer = {'right': lambda: True, 'wrong': lambda: False, 'random': lambda: random.random() < 0.5}[pattern]
+    stopped_early = 0
+    for _ in range(20):
+        state, pos = early.start_position(role)
+        while pos is not None:
+            pos, _ = early.advance_position(state, int(bank.q_ids[pos]), answer(), state.raw_score)
+        assert state.q_count >= stopping.min_items
+        if state.q_count < early.MAX_QUESTIONS and early.stop_reason(state, state.ability) == 'classification':
+            stopped_early += 1
+            # Finishing the assessment without the rule ends in the same category
+            for _ in range(5):
+                rest = state.copy()
+                pos = full._select_next_position(rest)
+                while pos is not None:
+                    pos, _ = full.advance_position(rest, int(bank.q_ids[pos]), random.random() < 0.5, rest.raw_score)
+                assert category(full, rest.raw_score, cutpoints) == category(early, state.raw_score, cutpoints)
+    if pattern != 'random':
+        assert stopped_early > 0
+
+
+def test_no_rule_fires_before_min_items(bank, role):
+    engine = AdaptiveEngine(bank, stopping=StoppingRules(min_items=4, skill_cutpoints=[50.0]))
+    state = engine._new_state(role)
+    state.q_count, state.raw_score = 3, 60.0
+    assert engine.stop_reason(state, state.ability) is None
+    state.q_count = 4
+    assert engine.stop_reason(state, state.ability) == 'classification'
@@ -0,0 +1,77 @@
+# test_artifact_format.py
+import struct
+
+import numpy as np
+import pytest
+
+from artifact_format import ALIGNMENT, ArtifactError, is_artifact, open_artifact, write_artifact
+
+ARRAYS = {
+    'Q_ID': np.arange(7, dtype=np.int64),
+    'a': np.linspace(0.5, 2.0, 7),
+    'grid': np.arange(12, dtype=np.float32).reshape(3, 4),
+    'codes': np.array([1, 0, 2], dtype=np.int8),
+    'empty': np.empty(0),
+    'big_endian': np.arange(5, dtype='>i4'),
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'model.artifact')
+    write_artifact(path, 'test.kind', ARRAYS, {'max_questions': 10, 'note': 'ü'})
+    return path
+
+
+def test_round_trip(path):
+    artifact = open_artifact(path, 'test.kind', verify=True)
+    assert artifact.kind == 'test.kind' and artifact.metadata == {'max_questions': 10, 'note': 'ü'}
+    assert artifact.names == list(ARRAYS) and 'a' in artifact and 'b' not in artifact
+    for name, values in ARRAYS.items():
+        assert np.array_equal(artifact[name], values) and artifact[name].shape == values.shape
+        assert not artifact[name].flags.writeable
+        assert artifact[name].ctypes.data % ALIGNMENT == 0 or not values.size
+    assert is_artifact(path)
+
+
+def test_truncated_file_is_rejected_on_open(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    for size in (len(data) - 1, len(data) // 2, 10):
+        with open(path, 'wb') as f:
+            f.write(data[:size])
+        with pytest.raises(ArtifactError, match='truncated|not an artifact'):
+            open_artifact(path)
+
+
+def test_corrupt_payload_fails_only_the_checksum(path):
+    with open(path, 'r+b') as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    open_artifact(path)
+    with pytest.raises(ArtifactError, match='checksum'):
+        open_artifact(path, verify=True)
+
+
+def test_wrong_files_are_rejected(path, tmp_path):
+    with pytest.raises(ArtifactError, match="expected a 'other.kind'"):
+        open_artifact(path, 'other.kind')
+
+    pickled = tmp_path / 'model.pkl'
+    pickled.write_bytes(b'\x80\x04\x95' + b'\0' * 64)
+    assert not is_artifact(str(pickled)) and not is_artifact(str(tmp_path / 'missing'))
+    with pytest.raises(ArtifactError, match='not an artifact'):
+        open_artifact(str(pickled))
+
+    with open(path, 'r+b') as f:
+        f.seek(6)
+        f.write(struct.pack('<H', 99))
+    with pytest.raises(ArtifactError, match='version 99'):
+        open_artifact(path)
+
+
+def test_object_arrays_are_refused(tmp_path):
+    with pytest.raises(TypeError, match='object'):
+        write_artifact(str(tmp_path / 'x.artifact'), 'test.kind', {'names': np.array(['a', None], dtype=object)})
@@ -0,0 +1,123 @@
+# test_artifact_registry.py
+import threading
+
+import pytest
+
+from artifact_registry import ArtifactGeneration, ArtifactRegistry, file_digest, source_fingerprint
+from metrics import RELOADS
+
+
+class FakeBatcher:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def generation(version: str) -> ArtifactGeneration:
+    return ArtifactGeneration(version, f'bank {version}', None, None, FakeBatcher())
+
+
+class Loader:
+    """Returns a new generation of each version in `versions` in turn."""
+
+    def __init__(self, *versions):
+        self.versions = list(versions)
+        self.built = []
+
+    def __call__(self):
+        self.built.append(generation(self.versions.pop(0)))
+        return self.built[-1]
+
+
+def test_reload_publishes_and_keeps_superseded_versions():
+    registry = ArtifactRegistry(Loader('v1', 'v2'))
+    assert registry.reload()['status'] == 'reloaded'
+    first = registry.current
+    report = registry.reload()
+    assert (report['status'], report['version'], report['previous_version']) == ('reloaded', 'v2', 'v1')
+    assert registry.versions == ['v1', 'v2']
+    assert registry.get() is registry.current and registry.get('v1') is first
+    assert registry.bank_for('v1') == 'bank v1' and registry.bank_for('v0') is None
+
+
+def test_reloading_the_same_content_keeps_the_loaded_generation():
+    loader = Loader('v1', 'v1')
+    registry = ArtifactRegistry(loader)
+    registry.reload()
+    assert registry.reload()['status'] == 'unchanged'
+    assert registry.current is loader.built[0]
+    assert loader.built[1].batcher.closed and not loader.built[0].batcher.closed
+
+
+def test_prune_drops_versions_beyond_the_limit_and_closes_them():
+    loader = Loader('v1', 'v2', 'v3', 'v4')
+    registry = ArtifactRegistry(loader, max_generations=2)
+    for _ in range(4):
+        registry.reload()
+    assert registry.versions == ['v3', 'v4']
+    assert [g.batcher.closed for g in loader.built] == [True, True, False, False]
+
+
+def test_prune_drops_versions_retired_longer_than_the_session_ttl():
+    registry = ArtifactRegistry(Loader('v1', 'v2'), retain_seconds=60)
+    registry.reload()
+    registry.reload()
+    assert registry.prune() == []
+    registry.get('v1').retired_at -= 61
+    assert registry.prune() == ['v1']
+    assert registry.versions == ['v2']
+
+
+def test_failed_reload_keeps_the_current_version():
+    def broken():
+        raise OSError('model file is truncated')
+
+    registry = ArtifactRegistry(initial=generation('v1'))
+    registry.loader = broken
+    failed = RELOADS.labels('failed').value
+    with pytest.raises(OSError):
+        registry.reload()
+    assert registry.current.version == 'v1'
+    assert RELOADS.labels('failed').value == failed + 1
+
+
+def test_concurrent_reload_reports_busy():
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return generation('v2')
+
+    registry = ArtifactRegistry(slow, initial=generation('v1'))
+    reloading = threading.Thread(target=registry.reload)
+    reloading.start()
+    assert started.wait(5)
+    assert registry.reload() == {'status': 'busy', 'version': 'v1'}
+    release.set()
+    reloading.join()
+    assert registry.current.version == 'v2'
+
+
+def test_refresh_reloads_only_when_the_files_changed(tmp_path):
+    path = tmp_path / 'model.artifact'
+    path.write_bytes(b'one')
+    registry = ArtifactRegistry(lambda: generation(file_digest([str(path)])),
+                                fingerprint=lambda: source_fingerprint([str(path)]))
+    registry.reload()
+    assert registry.refresh() is False
+    path.write_bytes(b'second')
+    assert registry.refresh() is True
+    assert registry.current.version == file_digest([str(path)])
+    assert ArtifactRegistry(Loader('v1')).refresh() is False
+
+
+def test_file_digest_follows_content(tmp_path):
+    a, b = tmp_path / 'a', tmp_path / 'b'
+    a.write_bytes(b'x')
+    digest = file_digest([str(a), str(b)])
+    assert file_digest([str(a), str(b)]) == digest
+    b.write_bytes(b'')
+    assert file_digest([str(a), str(b)]) != digest
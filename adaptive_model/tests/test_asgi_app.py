@@ -0,0 +1,70 @@
+# test_asgi_app.py
+import asyncio
+import json
+
+import pytest
+
+import asgi_app
+
+
+def call(app, method: str, path: str, body: bytes = b'', headers: list | None = None) -> tuple[int, dict, bytes]:
+    """Sends one HTTP request through the ASGI interface; returns (status, headers, body)."""
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers or []}
+    asyncio.run(app(scope, receive, send))
+    start, response = sent
+    return start['status'], dict(start['headers']), response['body']
+
+
+def post(app, path: str, payload) -> tuple[int, dict]:
+    status, _, body = call(app, 'POST', path, json.dumps(payload).encode())
+    return status, json.loads(body)
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = asgi_app.AssessmentASGIApp(worker_threads=4, max_pending=8)
+    yield app
+    if app.service is not None:
+        app.service.close()
+    app.executor.shutdown()
+
+
+def test_runs_a_whole_assessment(app, bank, role):
+    status, started = post(app, '/start_assessment', {'role': role})
+    assert status == 200
+    session_id, question = started['session_id'], started['question']
+    for _ in range(100):
+        status, body = post(app, '/submit_answer', {'session_id': session_id, 'q_id': question['Q_ID'],
+                                                     'is_correct': True})
+        assert status == 200
+        if body.get('status') == 'complete':
+            break
+        question = body['question']
+    assert body['status'] == 'complete' and 0 <= body['SkillScore'] <= 100
+    assert post(app, '/submit_answer', {'session_id': session_id, 'q_id': question['Q_ID'],
+                                        'is_correct': True})[0] == 404
+
+
+def test_catalog_and_metrics_are_served_on_get(app):
+    status, headers, body = call(app, 'GET', '/roles')
+    assert status == 200 and json.loads(body)
+    status, headers, body = call(app, 'GET', '/metrics')
+    assert status == 200 and b'# TYPE' in body
+
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('GET', '/nowhere', b'', 404),
+    ('GET', '/start_assessment', b'', 405),
+    ('POST', '/start_assessment', b'not json', 400),
+    ('POST', '/start_assessment', b'{"role": "x"}' + b' ' * asgi_app.MAX_BODY_BYTES, 413),
+])
+def test_rejects_bad_requests(app, method, path, body, status):
+    assert call(app, method, path, body)[0] == status
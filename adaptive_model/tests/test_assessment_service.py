@@ -0,0 +1,123 @@
+# test_assessment_service.py
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+import assessment_service
+from conftest import DATA_CSV
+from session_store import create_session_store
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = assessment_service.AssessmentService.create()
+    yield service
+    service.close()
+
+
+def test_service_starts_with_the_default_configuration(service):
+    assert len(service.bank) > 0
+    assert service.bank.roles
+
+
+def test_assessment_runs_to_a_job_fit_result(service, role):
+    started, status = service.start_assessment({'role': role})
+    assert status == 200
+    started = json.loads(started)
+    session_id, question = started['session_id'], started['question']
+    expected_score, asked = 0, []
+    while True:
+        asked.append(question['Q_ID'])
+        correct = len(asked) % 2 == 1
+        expected_score += 2 * question['Difficulty'] if correct else 0
+        body, status = service.submit_answer({'session_id': session_id, 'q_id': question['Q_ID'],
+                                              'is_correct': correct})
+        assert status == 200
+        body = json.loads(body) if isinstance(body, bytes) else body
+        if body['status'] == 'complete':
+            break
+        assert body['new_raw_score'] == expected_score
+        question = body['question']
+
+    assert len(set(asked)) == len(asked)
+    assert {'JobFitScore', 'SkillScore', 'Category'} <= set(body)
+    assert service.sessions.get(session_id) is None
+    assert service.submit_answer({'session_id': session_id, 'q_id': asked[0], 'is_correct': True})[1] == 404
+
+
+def test_sessions_share_the_engine_but_not_their_state(service, role):
+    first = json.loads(service.start_assessment({'role': role})[0])
+    second = json.loads(service.start_assessment({'role': role})[0])
+    service.submit_answer({'session_id': first['session_id'], 'q_id': first['question']['Q_ID'],
+                           'is_correct': True})
+    assert service.sessions.get(first['session_id']).q_count == 1
+    assert service.sessions.get(second['session_id']).q_count == 0
+    assert service.sessions.get(second['session_id']).version == service.registry.current.version
+
+
+@pytest.mark.parametrize('endpoint, payload, status', [
+    ('start_assessment', ['not', 'a', 'dict'], 400),
+    ('start_assessment', {}, 400),
+    ('start_assessment', {'role': 'No Such Role'}, 404),
+    ('submit_answer', {'session_id': 'abc', 'q_id': 1}, 400),
+    ('submit_answer', {'session_id': 'abc', 'q_id': 1, 'is_correct': True}, 404),
+])
+def test_invalid_requests_are_rejected(service, endpoint, payload, status):
+    body, code = getattr(service, endpoint)(payload)
+    assert code == status and 'error' in body
+
+
+# --- Several workers sharing a session store ---
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    """Two services (as two workers would build them) sharing one SQLite store and bank file."""
+    csv_path = tmp_path / 'assessment_data.csv'
+    shutil.copy(DATA_CSV, csv_path)
+    monkeypatch.setattr(assessment_service, 'data_path', str(csv_path))
+    monkeypatch.setattr(assessment_service, 'bank_path', str(tmp_path / 'assessment_data.bank'))
+    services = []
+    for _ in range(2):
+        registry = assessment_service._new_registry()
+        registry.reload()
+        sessions = create_session_store(f'sqlite:///{tmp_path}/sessions.db', resolve=registry.bank_for)
+        services.append(assessment_service.AssessmentService(registry, sessions))
+    yield csv_path, services
+    for service in services:
+        service.close()
+
+
+def answer(service, session_id: str, question: dict) -> tuple[dict, int]:
+    return service.submit_answer({'session_id': session_id, 'q_id': question['Q_ID'], 'is_correct': True})
+
+
+def test_session_started_on_a_reloaded_worker_continues_on_another(workers, role):
+    csv_path, (a, b) = workers
+    df = pd.read_csv(csv_path)
+    df.loc[len(df)] = df.iloc[0].to_dict() | {'Question': 'A question added after the workers started?'}
+    df.to_csv(csv_path, index=False)
+    a.registry.reload()
+    assert a.registry.current.version != b.registry.current.version
+
+    started, status = a.start_assessment({'role': role})
+    started = json.loads(started)
+    body, status = answer(b, started['session_id'], started['question'])
+    assert status == 200
+    assert b.registry.current.version == a.registry.current.version
+    body = json.loads(body)
+    if body.get('status') != 'complete':
+        assert answer(a, started['session_id'], body['question'])[1] == 200
+
+
+def test_unknown_version_keeps_the_session(workers, role):
+    _, (a, b) = workers
+    started, _ = a.start_assessment({'role': role})
+    started = json.loads(started)
+    state = a.sessions.get(started['session_id'])
+    state.version = 'retired-version'
+    a.sessions.put(started['session_id'], state)
+
+    body, status = answer(b, started['session_id'], started['question'])
+    assert status == 409
+    assert b.sessions.get(started['session_id']) is not None
@@ -0,0 +1,121 @@
+# test_bank_format.py
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pytest
+
+from bank_format import open_compiled_bank, write_compiled_bank
+from conftest import DATA_CSV
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return pd.read_csv(DATA_CSV, quotechar='"')
+
+
+def version_dirs(out_dir: str) -> list:
+    parent, name = os.path.split(out_dir)
+    return sorted(entry for entry in os.listdir(parent) if entry.startswith(f'.{name}.'))
+
+
+def test_recompile_swaps_the_whole_bank(tmp_path, frame):
+    out_dir = str(tmp_path / 'assessment_data.bank')
+    write_compiled_bank(frame.head(10), out_dir)
+    old = open_compiled_bank(out_dir)
+
+    write_compiled_bank(frame.head(20), out_dir)
+    assert os.path.islink(out_dir)
+    assert len(open_compiled_bank(out_dir)['q_id']) == 20
+    # Mapped files of the old version are still readable
+    assert len(old['q_id']) == old['meta']['rows'] == 10
+    assert old['question'][9] == frame['Question'][9]
+
+    write_compiled_bank(frame.head(30), out_dir)
+    # The current and the previous version stay, older ones are removed
+    assert len(version_dirs(out_dir)) == 2
+    assert os.path.basename(os.path.realpath(out_dir)) in version_dirs(out_dir)
+
+
+def test_readers_never_see_a_mix_of_two_versions(tmp_path, frame):
+    out_dir = str(tmp_path / 'assessment_data.bank')
+    write_compiled_bank(frame.head(20), out_dir)
+    stop, mismatches, errors = threading.Event(), [], []
+
+    def read():
+        while not stop.is_set():
+            try:
+                data = open_compiled_bank(out_dir)
+            except Exception as e:
+                errors.append(e)
+                continue
+            rows = data['meta']['rows']
+            if not len(data['q_id']) == len(data['question']) == len(data['options']) == rows:
+                mismatches.append(rows)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for i in range(30):
+            write_compiled_bank(frame.head(20 + 10 * (i % 2)), out_dir)
+    finally:
+        stop.set()
+        reader.join()
+    assert mismatches == [] and errors == []
+
+
+def test_bank_compiled_into_a_plain_directory_is_replaced(tmp_path, frame):
+    out_dir = str(tmp_path / 'assessment_data.bank')
+    write_compiled_bank(frame.head(15), out_dir)
+    legacy = str(tmp_path / 'legacy')
+    shutil.copytree(out_dir, legacy)
+    os.remove(out_dir)
+    shutil.rmtree(os.path.join(tmp_path, version_dirs(out_dir)[0]))
+    os.replace(legacy, out_dir)
+
+    write_compiled_bank(frame.head(25), out_dir)
+    assert os.path.islink(out_dir)
+    assert len(open_compiled_bank(out_dir)['q_id']) == 25
+    assert len(version_dirs(out_dir)) == 2
+
+
+def test_strings_and_options_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'Q_ID': [7, 3, 11],
+        'Job_Role': ['Backend Developer', 'Développeur', 'Backend Developer'],
+        'Skill': ['HTTP', None, 'Unicode ✓'],
+        'Difficulty_Level': [1, 3, 2],
+        'Question': ['What is 2 + 2?', 'Qu’est-ce que ça « fait » ?', ''],
+        'Options': ['3;4;5', 'a;;b', 'only'],
+        'Answer': ['4', 'b', 'only'],
+    })
+    meta = write_compiled_bank(df, str(tmp_path / 'small.bank'))
+    data = open_compiled_bank(str(tmp_path / 'small.bank'))
+    assert meta == data['meta'] and meta['rows'] == 3
+    assert meta['roles'] == ['Backend Developer', 'Développeur']
+    assert data['question'].tolist() == df['Question'].tolist()
+    assert data['answer'].tolist() == df['Answer'].tolist()
+    assert [data['options'].split_at(i) for i in range(3)] == [['3', '4', '5'], ['a', '', 'b'], ['only']]
+    assert [data['options'][i] for i in range(3)] == df['Options'].tolist()
+    assert data['q_id_sorted'].tolist() == [3, 7, 11]
+    assert data['q_id'][data['q_id_order']].tolist() == [3, 7, 11]
+    assert data['bucket_order'].tolist() == [0, 2, 1]
+
+
+def test_invalid_banks_are_rejected(tmp_path, frame):
+    with pytest.raises(ValueError, match='unique'):
+        write_compiled_bank(frame.head(3).assign(Q_ID=1), str(tmp_path / 'dup.bank'))
+    with pytest.raises(ValueError, match='Difficulty'):
+        write_compiled_bank(frame.head(3).drop(columns='Difficulty_Level'), str(tmp_path / 'nodiff.bank'))
+    assert os.listdir(tmp_path) == []
+
+    out_dir = str(tmp_path / 'old.bank')
+    write_compiled_bank(frame.head(3), out_dir)
+    meta_path = os.path.join(out_dir, 'meta.json')
+    with open(meta_path) as f:
+        meta = f.read().replace('"format_version": 1', '"format_version": 99')
+    with open(meta_path, 'w') as f:
+        f.write(meta)
+    with pytest.raises(ValueError, match='format version'):
+        open_compiled_bank(out_dir)
@@ -0,0 +1,54 @@
+# test_bulk_score.py
+import pandas as pd
+import pytest
+
+from bulk_score import score_file
+from conftest import MODELS_DIR
+from jobfit_predictor import JobFitPredictor
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    return JobFitPredictor(model_dir=MODELS_DIR)
+
+
+@pytest.fixture
+def candidates(tmp_path):
+    df = pd.DataFrame({'candidate': [f'c{i}' for i in range(10)],
+                       'SkillScore': [0.0, 12.5, 33.3, 45.0, 50.0, 64.99, 65.0, 80.0, 99.5, 100.0],
+                       'TrustScore': [85.0, 50.0, 100.0, 0.0, 85.0, 85.0, 70.0, 85.0, 90.0, 85.0]})
+    path = tmp_path / 'candidates.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def expected(predictor, skill, trust) -> list:
+    return [(r['JobFitScore'], r['Category']) for r in map(predictor.predict_fit, skill, trust)]
+
+
+def test_chunks_are_scored_like_single_predictions(predictor, candidates, tmp_path):
+    df, path = candidates
+    out = str(tmp_path / 'scored.csv')
+    assert score_file(predictor, path, out, 'SkillScore', 'TrustScore', None, chunk_rows=3) == len(df)
+    scored = pd.read_csv(out)
+    assert scored['candidate'].tolist() == df['candidate'].tolist()
+    assert list(zip(scored['JobFitScore'], scored['Category'])) == \
+           expected(predictor, df['SkillScore'], df['TrustScore'])
+
+
+def test_fixed_trust_score_replaces_the_column(predictor, candidates, tmp_path):
+    df, path = candidates
+    out = str(tmp_path / 'scored.csv')
+    score_file(predictor, path, out, 'SkillScore', None, 85.0, chunk_rows=4)
+    scored = pd.read_csv(out)
+    assert list(zip(scored['JobFitScore'], scored['Category'])) == \
+           expected(predictor, df['SkillScore'], [85.0] * len(df))
+
+
+def test_parquet_output(predictor, candidates, tmp_path):
+    pytest.importorskip('pyarrow')
+    df, path = candidates
+    out = str(tmp_path / 'scored.parquet')
+    score_file(predictor, path, out, 'SkillScore', 'TrustScore', None, chunk_rows=3)
+    assert pd.read_parquet(out)['Category'].tolist() == \
+           [c for _, c in expected(predictor, df['SkillScore'], df['TrustScore'])]
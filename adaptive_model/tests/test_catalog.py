@@ -0,0 +1,62 @@
+# test_catalog.py
+import json
+
+import pandas as pd
+import pytest
+
+from artifact_registry import ArtifactGeneration, ArtifactRegistry
+from assessment_service import AssessmentService
+from conftest import DATA_CSV
+from question_bank import QuestionBank
+from session_store import InMemorySessionStore
+
+
+@pytest.fixture
+def service(bank):
+    service = AssessmentService(ArtifactRegistry(initial=ArtifactGeneration(bank.version, bank, None, None, None)),
+                                InMemorySessionStore())
+    yield service
+    service.close()
+
+
+def test_catalog_describes_the_bank(bank):
+    df = pd.read_csv(DATA_CSV)
+    catalog = bank.catalog
+    assert json.loads(catalog.roles_json) == {'roles': list(df['Job_Role'].unique())}
+    body = json.loads(catalog.catalog_json)
+    assert body['version'] == bank.version
+    for details in body['roles']:
+        rows = df[df['Job_Role'] == details['role']]
+        assert details['questions'] == len(rows)
+        assert details['by_difficulty'] == {str(d): int(n) for d, n in rows['Difficulty_Level'].value_counts().sort_index().items()}
+        assert details['skills'] == [s for s in rows['Skill'].dropna().unique() if s]
+    assert bank.catalog is catalog
+
+
+@pytest.mark.parametrize('if_none_match, status', [
+    (None, 200),
+    ('"other"', 200),
+    ('{etag}', 304),
+    ('W/{etag}', 304),
+    ('"other", {etag}', 304),
+    ('*', 304),
+])
+def test_conditional_requests(service, bank, if_none_match, status):
+    etag = bank.catalog.etag
+    for name, full_body in (('roles', bank.catalog.roles_json), ('catalog', bank.catalog.catalog_json)):
+        body, code, headers = service.catalog_response(name, if_none_match and if_none_match.format(etag=etag))
+        assert code == status
+        assert body == (full_body if status == 200 else b'')
+        assert headers['ETag'] == etag and headers['Cache-Control'].startswith('public, max-age=')
+
+
+def test_reloaded_bank_gets_a_new_catalog(service, bank):
+    old_etag = bank.catalog.etag
+    smaller = QuestionBank(pd.read_csv(DATA_CSV).head(10))
+    service.registry.loader = lambda: ArtifactGeneration(smaller.version, smaller, None, None, None)
+    assert service.registry.reload()['status'] == 'reloaded'
+
+    body, code, headers = service.catalog_response('catalog', old_etag)
+    assert code == 200 and headers['ETag'] != old_etag
+    assert sum(role['questions'] for role in json.loads(body)['roles']) == 10
+    assert service.catalog_response('catalog', headers['ETag'])[1] == 304
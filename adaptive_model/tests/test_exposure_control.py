@@ -0,0 +1,87 @@
+# test_exposure_control.py
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from adaptive_logic import SessionState
+from exposure_control import AliasTable, ExposureControl
+
+
+@pytest.mark.parametrize('weights', [
+    [1.0, 1.0, 1.0, 1.0],
+    [0.1, 0.2, 0.3, 0.4],
+    [5.0, 0.0, 1.0, 0.5, 0.0, 3.5],
+    [1e-6, 1.0],
+])
+def test_alias_table_draws_in_proportion_to_weights(weights):
+    random.seed(7)
+    table = AliasTable(np.array(weights))
+    draws = 100_000
+    counts = Counter(table.sample() for _ in range(draws))
+    expected = np.array(weights) / sum(weights)
+    observed = np.array([counts[i] for i in range(len(weights))]) / draws
+    assert observed == pytest.approx(expected, abs=0.01)
+    assert all(counts[i] == 0 for i, w in enumerate(weights) if w == 0)
+
+
+def test_alias_table_of_one_item():
+    assert AliasTable(np.array([2.5])).sample() == 0
+
+
+def test_weights_only_penalize_over_exposed_items(bank, role):
+    control = ExposureControl(bank, max_rate=0.25)
+    positions = np.sort(np.concatenate(list(bank.buckets[role].values())))
+    for _ in range(8):
+        control.start_session(role)
+    for _ in range(6):
+        control.record(int(positions[0]))
+    control.record(int(positions[1]))
+    weights = control.weights(role, positions[:3])
+    assert weights[0] < 0.01 and weights[1] == 1.0 and weights[2] == 1.0
+    assert (ExposureControl(bank).weights(role, positions) == 1.0).all()
+
+
+@pytest.mark.parametrize('content_balancing', [False, True])
+def test_draws_cover_a_bucket_without_repeats(bank, role, content_balancing):
+    random.seed(11)
+    control = ExposureControl(bank, max_rate=0.2, content_balancing=content_balancing)
+    for diff, bucket in bank.buckets[role].items():
+        for _ in range(20):
+            control.start_session(role)
+            state = SessionState(role, diff)
+            drawn = []
+            while (pos := control.draw(state, diff, bucket)) is not None:
+                assert pos not in state.administered
+                state.administered.add(pos)
+                control.record(pos)
+                drawn.append(pos)
+            assert sorted(drawn) == sorted(int(pos) for pos in bucket)
+
+
+def test_concurrent_draws_rebuild_once_per_interval(bank, role, monkeypatch):
+    control = ExposureControl(bank, max_rate=0.2)
+    diff, bucket = next(iter(bank.buckets[role].items()))
+    rebuilds = []
+    rebuild = control._rebuild
+
+    def slow_rebuild(role, group):
+        # Widens the window in which an unlocked counter would let other draws rebuild too
+        rebuilds.append(1)
+        time.sleep(0.001)
+        rebuild(role, group)
+
+    monkeypatch.setattr(control, '_rebuild', slow_rebuild)
+    control.start_session(role)
+
+    def draw_many(_):
+        for _ in range(400):
+            control.draw(SessionState(role, diff), diff, bucket)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(draw_many, range(8)))
+    interval = max(ExposureControl.MIN_REBUILD_DRAWS, int(len(bucket) * ExposureControl.REBUILD_FRACTION))
+    assert len(rebuilds) == -(-8 * 400 // interval)
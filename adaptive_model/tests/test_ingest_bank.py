@@ -0,0 +1,90 @@
+# test_ingest_bank.py
+import os
+
+import pandas as pd
+import pytest
+
+from ingest_bank import ingest
+from question_bank import QuestionBank
+
+QUESTION = "What does HTTP stand for in web development?"
+
+# (reason expected, or '' when accepted; row fields)
+ROWS = [
+    ('', dict(Q_ID='100', Question=QUESTION)),
+    ('missing_field', dict(Question='')),
+    ('invalid_difficulty', dict(Difficulty_Level='hard')),
+    ('invalid_difficulty', dict(Difficulty_Level='1.5')),
+    ('difficulty_out_of_range', dict(Difficulty_Level='7')),
+    ('invalid_q_id', dict(Q_ID='-3')),
+    ('invalid_q_id', dict(Q_ID='12abc')),
+    ('empty_option', dict(Options='HyperText Transfer Protocol;;FTP')),
+    ('too_few_options', dict(Options='HyperText Transfer Protocol', Answer='HyperText Transfer Protocol')),
+    ('duplicate_options', dict(Options='HyperText Transfer Protocol;FTP;FTP')),
+    ('answer_not_in_options', dict(Answer='POP3')),
+    ('duplicate', dict(Question="  what does HTTP stand   for in WEB development?")),
+    ('near_duplicate', dict(Question="What does HTTP stand for, in web development?!")),
+    ('', dict(Question=QUESTION, Job_Role='Backend Developer')),
+    ('duplicate_q_id', dict(Q_ID='100', Question="Which port does HTTPS use by default?")),
+    ('', dict(Question="Which HTTP method is idempotent and used to replace a resource?")),
+]
+
+
+def bank_row(**fields) -> dict:
+    row = dict(Q_ID='', Job_Role='Web Developer', Skill='HTTP', Question='Which protocol serves web pages?',
+               Options='HyperText Transfer Protocol;FTP;SMTP', Answer='HyperText Transfer Protocol',
+               Difficulty_Level='1')
+    row.update(fields)
+    return row
+
+
+def write_csv(path, rows: list) -> str:
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_ingest_reports_each_rejected_row_with_its_reason(tmp_path):
+    source = write_csv(tmp_path / 'bank.csv', [bank_row(**fields) for _, fields in ROWS])
+    rejects = str(tmp_path / 'rejects.csv')
+    # Small chunks: rows are validated per chunk but deduplicated across chunks
+    report = ingest([source], str(tmp_path / 'out.bank'), chunksize=4, rejects_path=rejects)
+
+    expected = {row: reason for row, (reason, _) in enumerate(ROWS, start=1) if reason}
+    rejected = pd.read_csv(rejects, keep_default_na=False)
+    assert dict(zip(rejected['row'], rejected['reason'])) == expected
+    assert report['rows'] == len(ROWS)
+    assert report['ingested'] == len(ROWS) - len(expected)
+    assert sum(report['dropped'].values()) == len(expected)
+
+    bank = QuestionBank.load(str(tmp_path / 'out.bank'))
+    assert len(bank) == report['ingested']
+    assert bank.position(100) is not None and bank.questions[bank.position(100)] == QUESTION
+
+
+def test_ingest_derives_stable_q_ids_from_the_content(tmp_path):
+    rows = [bank_row(Question=QUESTION), bank_row(Question="Which status code means Not Found?")]
+    q_ids = []
+    for name in ('first', 'second'):
+        ingest([write_csv(tmp_path / f'{name}.csv', rows)], str(tmp_path / f'{name}.bank'))
+        q_ids.append(QuestionBank.load(str(tmp_path / f'{name}.bank')).q_ids.tolist())
+        rows = rows[::-1] + [bank_row(Question="What does TLS add to HTTP?")]
+    assert set(q_ids[0]) < set(q_ids[1])
+
+
+def test_ingest_without_valid_rows_leaves_the_bank_untouched(tmp_path):
+    out_dir = str(tmp_path / 'out.bank')
+    ingest([write_csv(tmp_path / 'good.csv', [bank_row()])], out_dir)
+    before = {name: os.path.getmtime(os.path.join(out_dir, name)) for name in os.listdir(out_dir)}
+
+    bad = write_csv(tmp_path / 'bad.csv', [bank_row(Difficulty_Level='9'), bank_row(Answer='POP3')])
+    with pytest.raises(ValueError, match='No valid rows'):
+        ingest([bad], out_dir)
+    assert {name: os.path.getmtime(os.path.join(out_dir, name)) for name in os.listdir(out_dir)} == before
+    assert len(QuestionBank.load(out_dir)) == 1
+
+
+def test_ingest_into_a_new_directory_creates_nothing_without_valid_rows(tmp_path):
+    bad = write_csv(tmp_path / 'bad.csv', [bank_row(Options='a')])
+    with pytest.raises(ValueError):
+        ingest([bad], str(tmp_path / 'new.bank'))
+    assert sorted(os.listdir(tmp_path)) == ['bad.csv']
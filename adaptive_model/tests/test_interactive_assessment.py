@@ -0,0 +1,86 @@
+# test_interactive_assessment.py
+import threading
+import time
+
+import pytest
+
+tk = pytest.importorskip('tkinter')
+
+import interactive_assessment as app_module
+
+
+@pytest.fixture
+def components(monkeypatch):
+    # load_components sets module globals; put them back after each test
+    for name in ('bank', 'engine', 'predictor'):
+        monkeypatch.setattr(app_module, name, None)
+    return app_module
+
+
+def test_components_load_on_demand_with_progress(components):
+    assert components.bank is None
+    updates = []
+    assert components.load_components(lambda fraction, message: updates.append(fraction)) is None
+    assert updates == sorted(updates) and updates[0] == 0.0 and updates[-1] == 1.0
+    assert len(components.bank) > 0 and components.engine.bank is components.bank
+    assert components.predictor is not None
+    assert 'catalog' in vars(components.bank)   # built here, not later on the Tk thread
+
+
+def test_missing_dataset_falls_back_to_a_placeholder(components, monkeypatch, tmp_path):
+    monkeypatch.setattr(components, 'bank_path', str(tmp_path / 'missing.bank'))
+    monkeypatch.setattr(components, 'csv_path', str(tmp_path / 'missing.csv'))
+    error = components.load_components()
+    assert error.startswith("Dataset loading failed")
+    assert components.bank.catalog.roles == ['No Data']
+
+
+# --- Window (needs a display) ---
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    yield root
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass
+
+
+def pump(root, until, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not until():
+        assert time.monotonic() < deadline, "timed out waiting for the window"
+        root.update()
+        time.sleep(0.005)
+
+
+def test_assessment_runs_on_the_worker_thread(components, root, monkeypatch):
+    threads = set()
+    load = components.load_components
+
+    def recording_load(progress=None):
+        threads.add(threading.current_thread().name)
+        return load(progress)
+
+    monkeypatch.setattr(components, 'load_components', recording_load)
+    app = components.AdaptiveApp(root)
+    # The window is up and polling before anything has loaded
+    assert app._screen is app.loading_frame
+    pump(root, lambda: app._screen is app.start_frame)
+    assert threads == {'assessment_0'}
+    assert app.timings['interactive_s'] is not None
+
+    app.start_assessment()
+    pump(root, lambda: app._screen is app.question_frame)
+    while app._screen is app.question_frame:
+        answered = app.q_count
+        app.check_and_get_next()
+        assert app._busy
+        pump(root, lambda: not app._busy and (app.q_count > answered or app._screen is not app.question_frame))
+    pump(root, lambda: app._screen is app.result_frame)
+    assert app.count_label.cget('text') == f"Total Questions Answered: {app.q_count}"
+    assert len(app.timings['render_ms']) == len(app.timings['engine_ms']) == app.q_count
+    app.close()
@@ -0,0 +1,112 @@
+# test_irt_engine.py
+import math
+import random
+
+import numpy as np
+import pytest
+
+from adaptive_logic import StoppingRules
+from irt_engine import IRTAdaptiveEngine
+
+
+@pytest.fixture(scope='module')
+def engine(bank):
+    return IRTAdaptiveEngine(bank)
+
+
+def role_positions(bank, role: str) -> list:
+    return sorted(int(pos) for bucket in bank.buckets[role].values() for pos in bucket)
+
+
+def test_estimate_without_responses_is_the_prior(engine):
+    ability, se = engine.estimate_ability([])
+    assert ability == pytest.approx(engine.INITIAL_ABILITY, abs=1e-9)
+    assert se == pytest.approx(engine.PRIOR_SD, rel=0.01)
+
+
+def test_estimate_moves_with_the_answers(engine, bank, role):
+    positions = role_positions(bank, role)[:6]
+    prior_ability, prior_se = engine.estimate_ability([])
+    right, right_se = engine.estimate_ability([(pos, True) for pos in positions])
+    wrong, wrong_se = engine.estimate_ability([(pos, False) for pos in positions])
+    assert wrong < prior_ability < right
+    assert right_se < prior_se and wrong_se < prior_se
+
+    # One more correct answer never lowers the estimate
+    mixed = [(pos, i % 2 == 0) for i, pos in enumerate(positions)]
+    assert engine.estimate_ability(mixed[:-1] + [(positions[-1], True)])[0] >= engine.estimate_ability(mixed)[0]
+
+
+def test_incremental_update_matches_the_full_posterior(engine, bank, role):
+    random.seed(5)
+    state, pos = engine.start_position(role)
+    score = 0.0
+    while pos is not None:
+        score = engine.record_response(state, pos, random.random() < 0.6, score)
+        ability, se = engine.estimate_ability(state.responses)
+        assert state.ability == pytest.approx(ability, abs=1e-9)
+        assert state.se == pytest.approx(se, abs=1e-9)
+        pos = engine._select_next_position(state)
+    assert 0.0 <= engine.final_skill_score(state) <= 100.0
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_saturated_items_keep_the_estimate_finite(bank, role):
+    # Very discriminating items beyond the grid: P(correct) is exactly 0 or 1 at every theta in float64
+    positions = role_positions(bank, role)[:4]
+    item_parameters = {int(bank.q_ids[pos]): (80.0, 10.0 if i % 2 else -10.0) for i, pos in enumerate(positions)}
+    engine = IRTAdaptiveEngine(bank, item_parameters=item_parameters)
+    responses = [(pos, i % 2 == 1) for i, pos in enumerate(positions)]   # each answer contradicts its item
+    ability, se = engine.estimate_ability(responses)
+    assert math.isfinite(ability) and math.isfinite(se)
+    assert np.isfinite(engine.items.information(engine.THETA_GRID, np.array(positions))).all()
+
+    state = engine._new_state(role)
+    score = 0.0
+    for pos, is_correct in responses:
+        score = engine.record_response(state, pos, is_correct, score)
+    assert state.ability == pytest.approx(ability, abs=1e-9)
+
+
+# --- Early stopping ---
+def run_to_end(engine, role: str, answer) -> object:
+    state, pos = engine.start_position(role)
+    while pos is not None:
+        pos, _ = engine.advance_position(state, int(engine.bank.q_ids[pos]), answer(), state.raw_score)
+    return state
+
+
+def test_standard_error_rule_stops_at_min_items(bank, role):
+    random.seed(9)
+    stopping = StoppingRules(min_items=3, se_threshold=0.99 * IRTAdaptiveEngine.PRIOR_SD)
+    engine = IRTAdaptiveEngine(bank, stopping=stopping)
+    for _ in range(10):
+        state = run_to_end(engine, role, lambda: random.random() < 0.5)
+        assert state.q_count == 3 and state.se <= stopping.se_threshold
+
+
+@pytest.mark.parametrize('rules, se, delta, reason', [
+    (dict(se_threshold=0.5), 0.4, 1.0, 'standard_error'),
+    (dict(se_threshold=0.5), 0.6, 1.0, None),
+    (dict(delta_threshold=0.05), 0.6, 0.01, 'convergence'),
+    (dict(delta_threshold=0.05), 0.6, 0.2, None),
+    (dict(se_threshold=0.5, delta_threshold=0.05), 0.4, 0.01, 'standard_error'),
+])
+def test_stop_reason(bank, role, rules, se, delta, reason):
+    engine = IRTAdaptiveEngine(bank, stopping=StoppingRules(min_items=2, **rules))
+    state = engine._new_state(role)
+    state.q_count, state.se, state.ability = 2, se, 0.3
+    assert engine.stop_reason(state, 0.3 - delta) == reason
+    state.q_count = 1
+    assert engine.stop_reason(state, 0.3 - delta) is None
+
+
+def test_classification_rule_needs_a_confident_category(bank, role):
+    engine = IRTAdaptiveEngine(bank, stopping=StoppingRules(min_items=1, skill_cutpoints=[50.0], confidence=0.95))
+    positions = role_positions(bank, role)
+    state = engine._new_state(role)
+    state.q_count = 1
+    assert engine.stop_reason(state, state.ability) is None
+    state.responses = [(pos, True) for pos in positions] * 6
+    assert engine.category_confidence(state) >= 0.95
+    assert engine.stop_reason(state, state.ability) == 'classification'
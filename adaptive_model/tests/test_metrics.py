@@ -0,0 +1,99 @@
+# test_metrics.py
+import os
+import threading
+
+import pytest
+
+import metrics
+from metrics import NULL_SPAN, Counter, Gauge, Histogram, MetricsRegistry, RequestProfiler
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_exposition(registry):
+    histogram = Histogram('test_seconds', 'Test timings.', ('endpoint',), buckets=(0.5, 0.1, 1.0), registry=registry)
+    series = histogram.labels('start')
+    for value in (0.05, 0.1, 0.3, 2.0):
+        series.observe(value)
+    assert registry.render().decode('utf-8').splitlines() == [
+        '# HELP test_seconds Test timings.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{endpoint="start",le="0.1"} 2',
+        'test_seconds_bucket{endpoint="start",le="0.5"} 3',
+        'test_seconds_bucket{endpoint="start",le="1.0"} 3',
+        'test_seconds_bucket{endpoint="start",le="+Inf"} 4',
+        'test_seconds_sum{endpoint="start"} 2.45',
+        'test_seconds_count{endpoint="start"} 4',
+    ]
+
+
+def test_counter_and_gauge_exposition(registry):
+    counter = Counter('test_reloads', 'Reloads.', ('status',), registry=registry)
+    counter.labels('reloaded').inc()
+    counter.labels('failed').inc(2)
+    Gauge('test_versions', 'Versions.', registry=registry).labels().set(3)
+    assert registry.render().decode('utf-8').splitlines() == [
+        '# HELP test_reloads Reloads.',
+        '# TYPE test_reloads counter',
+        'test_reloads_total{status="failed"} 2.0',
+        'test_reloads_total{status="reloaded"} 1.0',
+        '# HELP test_versions Versions.',
+        '# TYPE test_versions gauge',
+        'test_versions 3',
+    ]
+
+
+def test_label_values_are_escaped_and_checked(registry):
+    counter = Counter('test_total_by_role', 'By role.', ('role',), registry=registry)
+    counter.labels('Say "hi"\\\n').inc()
+    assert 'test_total_by_role_total{role="Say \\"hi\\"\\\\\\n"} 1.0' in registry.render().decode('utf-8')
+    with pytest.raises(ValueError, match='expects labels'):
+        counter.labels()
+    assert counter.labels('a') is counter.labels('a')
+
+
+def test_spans_time_into_the_histogram(registry, monkeypatch):
+    series = Histogram('test_span_seconds', 'Spans.', registry=registry).labels()
+    with series.time():
+        pass
+    assert sum(series.counts) == 1 and 0 <= series.sum < 1
+
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', False)
+    assert series.time() is NULL_SPAN
+    with series.time():
+        pass
+    assert sum(series.counts) == 1
+
+
+def test_concurrent_observations_are_all_counted(registry):
+    series = Histogram('test_concurrent', 'Concurrent.', registry=registry).labels()
+
+    def observe():
+        for _ in range(2000):
+            series.observe(0.001)
+
+    threads = [threading.Thread(target=observe) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(series.counts) == 16000 and series.sum == pytest.approx(16.0)
+
+
+def test_request_profiler_writes_sampled_profiles(tmp_path):
+    with RequestProfiler(sample_rate=0, out_dir=str(tmp_path)).profile('start_assessment'):
+        pass
+    assert os.listdir(tmp_path) == []
+
+    profiler = RequestProfiler(sample_rate=1.0, out_dir=str(tmp_path))
+    with profiler.profile('submit_answer'):
+        # One request at a time is profiled; others run unprofiled
+        assert profiler.profile('submit_answer') is NULL_SPAN
+        sum(range(1000))
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith('submit_answer-') and files[0].endswith('.prof')
+    with profiler.profile('submit_answer') as span:
+        assert span is not NULL_SPAN
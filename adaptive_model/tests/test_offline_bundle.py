@@ -0,0 +1,158 @@
+# test_offline_bundle.py
+import json
+import random
+
+import pytest
+
+import assessment_service
+import offline_bundle
+from adaptive_logic import AdaptiveEngine
+from session_store import InMemorySessionStore
+
+SECRET = 'test-secret'
+
+
+def issued_bundle(bank, role: str, ttl_seconds: float = 60) -> tuple[dict, list]:
+    body, positions = offline_bundle.issue(AdaptiveEngine(bank), bank, role, 'session-1', 'v1', SECRET, ttl_seconds)
+    return json.loads(body), positions
+
+
+def answers_for(bundle: dict, bank, correct) -> list:
+    """One option per question: the bank's answer where `correct(q)` holds, another option otherwise."""
+    answers = []
+    for q, q_id in enumerate(bundle['q_ids']):
+        pos = bank.position(q_id)
+        right = bank.answers[pos]
+        wrong = next(o.strip() for o in bank.options[pos].split(';') if o.strip() != right)
+        answers.append(right if correct(q) else wrong)
+    return answers
+
+
+# --- Signing ---
+def test_bundle_ships_no_answers(bank, role):
+    data, positions = issued_bundle(bank, role)
+    bundle = data['bundle']
+    assert set(bundle) == {'session_id', 'role', 'version', 'expires_at', 'q_ids', 'nodes', 'signature', 'questions'}
+    assert [q['Q_ID'] for q in bundle['questions']] == bundle['q_ids']
+    assert all('Answer' not in q for q in bundle['questions'])
+
+
+def test_verify_accepts_the_issued_bundle(bank, role):
+    data, _ = issued_bundle(bank, role)
+    assert offline_bundle.verify(data['bundle'], SECRET) is data['bundle']
+
+
+@pytest.mark.parametrize('field, change', [
+    ('nodes', lambda nodes: [[q, correct, wrong] for q, wrong, correct in nodes]),
+    ('q_ids', lambda q_ids: q_ids[::-1]),
+    ('expires_at', lambda expires_at: expires_at + 3600),
+    ('session_id', lambda session_id: 'session-2'),
+])
+def test_verify_rejects_tampered_bundles(bank, role, field, change):
+    bundle, _ = issued_bundle(bank, role)
+    bundle = bundle['bundle']
+    bundle[field] = change(bundle[field])
+    with pytest.raises(offline_bundle.BundleError) as e:
+        offline_bundle.verify(bundle, SECRET)
+    assert e.value.status == 403
+
+
+def test_verify_rejects_other_keys_and_malformed_bundles(bank, role):
+    bundle = issued_bundle(bank, role)[0]['bundle']
+    with pytest.raises(offline_bundle.BundleError) as e:
+        offline_bundle.verify(bundle, 'other-secret')
+    assert e.value.status == 403
+    for malformed in (None, [], {k: v for k, v in bundle.items() if k != 'nodes'}):
+        with pytest.raises(offline_bundle.BundleError) as e:
+            offline_bundle.verify(malformed, SECRET)
+        assert e.value.status == 400
+
+
+def test_verify_rejects_expired_bundles(bank, role):
+    bundle = issued_bundle(bank, role, ttl_seconds=-1)[0]['bundle']
+    with pytest.raises(offline_bundle.BundleError) as e:
+        offline_bundle.verify(bundle, SECRET)
+    assert e.value.status == 410
+
+
+# --- Replay ---
+def test_replay_scores_the_path_the_answers_take(bank, role):
+    data, positions = issued_bundle(bank, role)
+    bundle = data['bundle']
+    random.seed(3)
+    flips = [random.random() < 0.5 for _ in positions]
+    responses = offline_bundle.replay(bundle, bank, answers_for(bundle, bank, lambda q: flips[q]))
+
+    # The path follows the graph edge of each outcome and ends where the graph does
+    node = 0
+    for pos, is_correct in responses:
+        q = bundle['nodes'][node][0]
+        assert pos == positions[q] and is_correct == flips[q]
+        node = bundle['nodes'][node][2 if is_correct else 1]
+    assert node == -1
+    role_size = sum(len(bucket) for bucket in bank.buckets[role].values())
+    assert len(responses) == min(AdaptiveEngine(bank).MAX_QUESTIONS, role_size)
+    assert len({pos for pos, _ in responses}) == len(responses)
+    assert all(bank.role_at(pos) == role for pos, _ in responses)
+
+    state = AdaptiveEngine(bank).score_responses(role, responses)
+    assert state.raw_score == sum(2 * int(bank.difficulty[pos]) for pos, c in responses if c)
+
+
+def test_replay_requires_one_answer_per_question(bank, role):
+    bundle = issued_bundle(bank, role)[0]['bundle']
+    answers = answers_for(bundle, bank, lambda q: True)
+    for bad in (answers[:-1], answers + ['x'], None, [1] * len(answers)):
+        with pytest.raises(offline_bundle.BundleError) as e:
+            offline_bundle.replay(bundle, bank, bad)
+        assert e.value.status == 400
+
+
+# --- Endpoints ---
+@pytest.fixture(scope='module')
+def service():
+    registry = assessment_service._new_registry()
+    registry.reload()
+    service = assessment_service.AssessmentService(registry, InMemorySessionStore())
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def bundle_secret(monkeypatch):
+    monkeypatch.setattr(assessment_service, 'BUNDLE_SECRET', SECRET)
+
+
+def start_bundle(service, role: str) -> dict:
+    body, status = service.assessment_bundle({'role': role})
+    assert status == 200
+    return json.loads(body)
+
+
+def test_submitted_bundle_is_single_use(service, bundle_secret, role):
+    data = start_bundle(service, role)
+    payload = {'session_id': data['session_id'], 'bundle': data['bundle'],
+               'answers': answers_for(data['bundle'], service.bank, lambda q: True)}
+    result, status = service.submit_bundle(payload)
+    assert status == 200 and result['status'] == 'complete'
+    assert service.submit_bundle(payload)[1] == 404
+
+
+def test_submit_rejects_tampered_and_expired_bundles(service, bundle_secret, role, monkeypatch):
+    data = start_bundle(service, role)
+    answers = answers_for(data['bundle'], service.bank, lambda q: True)
+    tampered = dict(data['bundle'], nodes=[[q, c, w] for q, w, c in data['bundle']['nodes']])
+    assert service.submit_bundle({'session_id': data['session_id'], 'bundle': tampered, 'answers': answers})[1] == 403
+    other = start_bundle(service, role)
+    assert service.submit_bundle({'session_id': other['session_id'], 'bundle': data['bundle'],
+                                  'answers': answers})[1] == 403
+
+    monkeypatch.setattr(offline_bundle.time, 'time', lambda: data['bundle']['expires_at'] + 1)
+    assert service.submit_bundle({'session_id': data['session_id'], 'bundle': data['bundle'],
+                                  'answers': answers})[1] == 410
+
+
+def test_bundle_endpoints_are_disabled_without_a_secret(service, role, monkeypatch):
+    monkeypatch.setattr(assessment_service, 'BUNDLE_SECRET', '')
+    assert service.assessment_bundle({'role': role})[1] == 403
+    assert service.submit_bundle({'session_id': 'x', 'bundle': {}, 'answers': []})[1] == 403
@@ -0,0 +1,51 @@
+# test_payloads.py
+import json
+import uuid
+
+import pytest
+
+import payloads
+from payloads import QuestionPayloads, dumps
+
+
+def client_question(bank, pos: int) -> dict:
+    question = bank.question_at(pos)
+    del question['Answer']
+    question['Options'] = question['Options'].split(';')
+    return question
+
+
+@pytest.mark.parametrize('bank_fixture', ['bank', 'compiled_bank'])
+def test_fragments_are_the_question_without_its_answer(request, bank_fixture):
+    bank = request.getfixturevalue(bank_fixture)
+    cache = QuestionPayloads(bank)
+    for pos in range(len(bank.q_ids)):
+        assert json.loads(cache.fragment(pos)) == client_question(bank, pos)
+    assert len(cache) == len(bank.q_ids)
+
+
+def test_fragments_are_serialized_once_per_bank(bank):
+    fragment = bank.payloads.fragment(3)
+    assert bank.payloads.fragment(3) is fragment
+    assert QuestionPayloads(bank).fragment(3) is not fragment
+
+
+def test_response_bodies(bank):
+    session_id = str(uuid.uuid4())
+    assert json.loads(bank.payloads.start_body(session_id, 5)) == \
+           {'session_id': session_id, 'question': client_question(bank, 5)}
+    assert json.loads(bank.payloads.progress_body(2.0 / 3.0, 7)) == \
+           {'status': 'in_progress', 'new_raw_score': 0.67, 'question': client_question(bank, 7)}
+
+
+@pytest.mark.parametrize('use_orjson', [False, True])
+def test_dumps_is_compact_utf8_json(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(payloads, 'orjson', None)
+    value = {'Question': 'Qu\'est-ce qu\'un café "noir"?', 'Options': ['a', 'b'], 'Score': 1.5}
+    encoded = dumps(value)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded.decode('utf-8')) == value
+    assert dumps({'a': [1, 2], 'b': None}) == b'{"a":[1,2],"b":null}'
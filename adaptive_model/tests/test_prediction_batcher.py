@@ -0,0 +1,62 @@
+# test_prediction_batcher.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from conftest import MODELS_DIR
+from jobfit_predictor import JobFitPredictor
+from metrics import PREDICTION_BATCH_SIZE, PREDICTION_QUEUE_WAIT_SECONDS
+from prediction_batcher import PredictionBatcher
+
+# On the lookup table's grid, between grid points, on category bounds and at the ends
+SKILL_SCORES = [0.0, 12.5, 33.33, 45.0, 50.005, 64.99, 65.0, 79.999, 80.0, 99.5, 100.0]
+TRUST_SCORES = [0.0, 50.0, 85.0, 85.123, 100.0]
+
+
+@pytest.fixture(scope='module', params=['model', 'lookup_table', 'simulation'])
+def predictor(request, tmp_path_factory):
+    if request.param == 'simulation':
+        predictor = JobFitPredictor(model_dir=str(tmp_path_factory.mktemp('no_model')))
+        assert predictor.model is None
+        return predictor
+    predictor = JobFitPredictor(model_dir=MODELS_DIR, precompile=request.param == 'lookup_table')
+    assert predictor.model is not None
+    return predictor
+
+
+def inputs() -> list:
+    return [(s, t) for s in SKILL_SCORES for t in TRUST_SCORES]
+
+
+def test_predict_fit_many_matches_predict_fit(predictor):
+    skill, trust = np.array(inputs()).T
+    many = predictor.predict_fit_many(skill, trust)
+    for i, (s, t) in enumerate(inputs()):
+        single = predictor.predict_fit(s, t)
+        assert {key: many[key][i] for key in single} == single
+        assert JobFitPredictor.CATEGORY_LABELS[many['CategoryCode'][i]] in single['Category']
+
+
+def test_batched_predictions_match_predict_fit(predictor):
+    batch_sizes, waits = PREDICTION_BATCH_SIZE.labels(), PREDICTION_QUEUE_WAIT_SECONDS.labels()
+    batches, items = sum(batch_sizes.counts), batch_sizes.sum
+    waited = sum(waits.counts)
+    batcher = PredictionBatcher(predictor, max_wait_ms=20, max_batch_size=16)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            batched = list(pool.map(lambda args: batcher.predict_fit(*args, timeout=10), inputs()))
+    finally:
+        batcher.close()
+    assert batched == [predictor.predict_fit(s, t) for s, t in inputs()]
+    assert sum(batch_sizes.counts) - batches < len(inputs())
+    assert batch_sizes.sum - items == len(inputs())
+    assert sum(waits.counts) - waited == len(inputs())
+
+
+def test_closed_batcher_predicts_synchronously(predictor):
+    batcher = PredictionBatcher(predictor)
+    assert batcher.predict_fit(70.0, 85.0) == predictor.predict_fit(70.0, 85.0)
+    batcher.close()
+    assert batcher.predict_fit(42.0, 85.0) == predictor.predict_fit(42.0, 85.0)
+    batcher.close()
@@ -0,0 +1,44 @@
+# test_question_bank.py
+import numpy as np
+import pytest
+
+
+@pytest.fixture(params=['csv', 'compiled'])
+def any_bank(request, bank, compiled_bank):
+    return bank if request.param == 'csv' else compiled_bank
+
+
+def test_buckets_hold_exactly_the_rows_of_their_role_and_difficulty(any_bank):
+    seen = []
+    for role, buckets in any_bank.buckets.items():
+        for diff, bucket in buckets.items():
+            assert all(any_bank.role_at(pos) == role and any_bank.difficulty[pos] == diff for pos in bucket)
+            seen.extend(int(pos) for pos in bucket)
+    assert sorted(seen) == list(range(len(any_bank)))
+
+
+def test_compiled_bank_matches_the_csv_bank(bank, compiled_bank):
+    assert compiled_bank.version == bank.version
+    assert compiled_bank.roles == bank.roles
+    for role, buckets in bank.buckets.items():
+        assert {d: b.tolist() for d, b in compiled_bank.buckets[role].items()} == {d: b.tolist() for d, b in buckets.items()}
+    assert [compiled_bank.question_at(pos) for pos in range(len(bank))] == \
+           [bank.question_at(pos) for pos in range(len(bank))]
+    assert [compiled_bank.options_at(pos) for pos in range(len(bank))] == \
+           [bank.options_at(pos) for pos in range(len(bank))]
+
+
+def test_position_looks_up_q_ids(any_bank):
+    for pos, q_id in enumerate(any_bank.q_ids.tolist()):
+        assert any_bank.position(q_id) == any_bank.position(str(q_id)) == pos
+    missing = int(max(any_bank.q_ids)) + 1
+    assert any_bank.position(missing) is None
+    assert any_bank.position('abc') is None
+    assert any_bank.position(None) is None
+
+
+def test_positions_is_position_vectorized(any_bank):
+    q_ids = any_bank.q_ids.tolist()[::-1] + [int(max(any_bank.q_ids)) + 1, -5]
+    expected = [any_bank.position(q_id) for q_id in q_ids]
+    assert any_bank.positions(q_ids).tolist() == [-1 if pos is None else pos for pos in expected]
+    assert any_bank.positions(np.array([], dtype=np.int64)).tolist() == []
@@ -0,0 +1,93 @@
+# test_results_report.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from results_report import ItemStatistics, RoleStatistics, parse_since, read_results, write_responses
+from results_sink import SQLiteResultsWriter
+
+# (role, engine, ability, skill, job fit, category, completed_at, [(Q_ID, correct), ...])
+SESSIONS = [
+    ('Analyst', 'irt', 0.8, 80.0, 75.0, 'Strong Fit', 100.0, [(1, True), (2, True), (3, False)]),
+    ('Analyst', 'irt', -0.5, 40.0, 35.0, 'Weak Fit', 200.0, [(2, False), (1, False), (4, True)]),
+    ('Analyst', 'rule', 0.0, 65.0, 60.0, 'Moderate Fit', 300.0, [(3, True), (1, True)]),
+    ('Engineer', 'irt', 0.2, 55.0, 70.0, 'Moderate Fit', 400.0, [(4, False), (2, True), (1, True), (3, False)]),
+    ('Engineer', 'rule', 0.0, 90.0, 85.0, 'Strong Fit', 500.0, [(1, True), (4, True)]),
+]
+
+
+@pytest.fixture
+def results_db(tmp_path):
+    path = str(tmp_path / 'results.db')
+    writer = SQLiteResultsWriter(path)
+    writer.write([{
+        'session_id': f's{i}', 'completed_at': completed_at, 'role': role, 'version': 'v1', 'engine': engine,
+        'q_count': len(responses), 'q_ids': np.array([q for q, _ in responses], dtype=np.int64),
+        'correct': np.array([c for _, c in responses], dtype=bool), 'raw_score': float(sum(c for _, c in responses)),
+        'ability': ability, 'se': 0.3, 'skill_score': skill, 'job_fit_score': job_fit, 'category': category,
+    } for i, (role, engine, ability, skill, job_fit, category, completed_at, responses) in enumerate(SESSIONS)])
+    writer.close()
+    return path
+
+
+def responses_frame() -> pd.DataFrame:
+    return pd.DataFrame([{'Q_ID': q, 'correct': c, 'position': position, 'skill': skill}
+                         for _, _, _, skill, _, _, _, responses in SESSIONS
+                         for position, (q, c) in enumerate(responses, 1)])
+
+
+def test_streamed_batches_match_the_whole_table(results_db):
+    roles, items = RoleStatistics(), ItemStatistics()
+    for batch in read_results(results_db, batch_size=2):
+        assert 1 <= len(batch) <= 2
+        roles.add(batch)
+        items.add(batch)
+
+    sessions = pd.DataFrame([{'role': s[0], 'skill': s[3], 'job_fit': s[4], 'items': len(s[7])} for s in SESSIONS])
+    by_role = sessions.groupby('role')
+    role_table = roles.table()
+    assert role_table['sessions'].to_dict() == {'Analyst': 3, 'Engineer': 2}
+    assert role_table['mean_items'].to_numpy() == pytest.approx(by_role['items'].mean().to_numpy())
+    assert role_table['mean_skill_score'].to_numpy() == pytest.approx(by_role['skill'].mean().to_numpy())
+    assert role_table['std_skill_score'].to_numpy() == pytest.approx(by_role['skill'].std(ddof=0).to_numpy())
+    assert role_table['std_job_fit_score'].to_numpy() == pytest.approx(by_role['job_fit'].std(ddof=0).to_numpy())
+    assert role_table.loc['Analyst', ['Strong Fit', 'Moderate Fit', 'Weak Fit']].tolist() == [1, 1, 1]
+    assert role_table.loc['Engineer', ['Strong Fit', 'Moderate Fit', 'Weak Fit']].tolist() == [1, 1, 0]
+
+    responses = responses_frame()
+    item_table = items.table()
+    by_item = responses.groupby('Q_ID')
+    assert item_table.index.tolist() == [1, 2, 3, 4]
+    assert item_table['exposures'].tolist() == by_item.size().tolist()
+    assert item_table['p_correct'].to_numpy() == pytest.approx(by_item['correct'].mean().to_numpy())
+    assert item_table['mean_position'].to_numpy() == pytest.approx(by_item['position'].mean().to_numpy())
+    assert item_table['mean_skill_score'].to_numpy() == pytest.approx(by_item['skill'].mean().to_numpy())
+    for q_id, group in by_item:
+        expected = np.corrcoef(group['correct'].astype(float), group['skill'])[0, 1]
+        assert item_table.loc[q_id, 'point_biserial'] == pytest.approx(expected)
+
+
+def test_point_biserial_is_undefined_when_everyone_agrees(results_db):
+    items = ItemStatistics()
+    batch = next(read_results(results_db, batch_size=1))
+    items.add(batch)
+    assert items.table()['point_biserial'].isna().all()
+
+
+def test_since_keeps_later_results(results_db):
+    batches = list(read_results(f'sqlite:///{results_db}', batch_size=10, since=parse_since('300')))
+    assert sum(len(batch) for batch in batches) == 3
+    assert batches[0].sessions['skill_score'].tolist() == [65.0, 55.0, 90.0]
+    assert parse_since('1970-01-01T00:05:00+00:00') == 300.0
+
+
+def test_response_log_holds_irt_sessions_only(results_db, tmp_path):
+    path = tmp_path / 'responses.csv'
+    exported = 0
+    for i, batch in enumerate(read_results(results_db, batch_size=2)):
+        exported += write_responses(batch, str(path), header=i == 0)
+    log = pd.read_csv(path)
+    expected = [(q, int(c), ability) for _, engine, ability, _, _, _, _, responses in SESSIONS
+                if engine == 'irt' for q, c in responses]
+    assert exported == len(expected) == 10
+    assert list(log.itertuples(index=False, name=None)) == expected
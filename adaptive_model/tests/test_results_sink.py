@@ -0,0 +1,98 @@
+# test_results_sink.py
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from adaptive_logic import AdaptiveEngine
+from results_report import read_results
+from results_sink import RESULTS_DROPPED, ResultsSink, ResultsWriter, create_results_sink
+
+RESULT = {'SkillScore': 71.5, 'JobFitScore': 80.25, 'Category': 'Strong Fit'}
+
+
+class ListWriter(ResultsWriter):
+    def __init__(self):
+        self.rows = []
+        self.written = threading.Event()
+
+    def write(self, rows: list) -> None:
+        self.rows.extend(rows)
+        self.written.set()
+
+
+def finished_session(engine, role: str):
+    state, pos = engine.start_position(role)
+    state.version = 'v1'
+    while pos is not None:
+        pos, _ = engine.advance_position(state, int(engine.bank.q_ids[pos]), random.random() < 0.5, state.raw_score)
+    return state
+
+
+def test_sqlite_sink_records_each_session(bank, role, tmp_path):
+    random.seed(10)
+    engine = AdaptiveEngine(bank)
+    sink = create_results_sink(f'sqlite:///{tmp_path}/results/results.db', flush_seconds=3600)
+    states = {f's{i}': finished_session(engine, role) for i in range(5)}
+    for session_id, state in states.items():
+        sink.record(session_id, state, bank, engine.MODE, RESULT)
+    sink.close()
+
+    batches = list(read_results(str(tmp_path / 'results' / 'results.db'), batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    sessions = [row for batch in batches for row in batch.sessions.to_dict('records')]
+    q_ids = np.concatenate([batch.q_ids for batch in batches]).tolist()
+    correct = np.concatenate([batch.correct for batch in batches]).tolist()
+    assert q_ids == [int(bank.q_ids[pos]) for state in states.values() for pos, _ in state.responses]
+    assert correct == [c for state in states.values() for _, c in state.responses]
+    for row, state in zip(sessions, states.values()):
+        assert (row['role'], row['engine'], row['q_count'], row['raw_score']) == \
+               (role, 'rule', state.q_count, state.raw_score)
+        assert (row['skill_score'], row['job_fit_score'], row['category']) == (71.5, 80.25, 'Strong Fit')
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval(bank, role):
+    writer = ListWriter()
+    sink = ResultsSink(writer, flush_seconds=3600, batch_size=3)
+    state = finished_session(AdaptiveEngine(bank), role)
+    for i in range(3):
+        sink.record(f's{i}', state, bank, 'rule', RESULT)
+    assert writer.written.wait(5)
+    sink.close()
+    assert [row['session_id'] for row in writer.rows] == ['s0', 's1', 's2']
+
+
+def test_results_beyond_the_buffer_limit_are_dropped(bank, role):
+    writer = ListWriter()
+    sink = ResultsSink(writer, flush_seconds=3600, batch_size=100, max_buffered=3)
+    state = finished_session(AdaptiveEngine(bank), role)
+    dropped = RESULTS_DROPPED.labels().value
+    for i in range(5):
+        sink.record(f's{i}', state, bank, 'rule', RESULT)
+    assert RESULTS_DROPPED.labels().value == dropped + 2
+    assert sink.flush() == 3
+    sink.close()
+    assert len(writer.rows) == 3
+
+
+def test_sink_urls(tmp_path):
+    assert create_results_sink('') is None
+    with pytest.raises(ValueError, match='Unsupported'):
+        create_results_sink('mysql://localhost/results')
+    sink = create_results_sink(f'sqlite:///{tmp_path}/r.db?batch_size=7')
+    assert sink.batch_size == 7
+    sink.close()
+
+
+def test_parquet_sink_round_trips(bank, role, tmp_path):
+    pytest.importorskip('pyarrow')
+    random.seed(12)
+    engine = AdaptiveEngine(bank)
+    sink = create_results_sink(f'parquet:///{tmp_path}/results', flush_seconds=3600)
+    state = finished_session(engine, role)
+    sink.record('s0', state, bank, engine.MODE, RESULT)
+    sink.close()
+    batch, = read_results(str(tmp_path / 'results'), batch_size=10)
+    assert batch.q_ids.tolist() == [int(bank.q_ids[pos]) for pos, _ in state.responses]
+    assert batch.correct.tolist() == [c for _, c in state.responses]
@@ -0,0 +1,131 @@
+# test_session_store.py
+import random
+
+import pytest
+
+from adaptive_logic import AdaptiveEngine, SessionState
+from session_store import InMemorySessionStore, RedisSessionStore, SessionCodec, SQLiteSessionStore
+
+FIELDS = ('role', 'difficulty', 'ability', 'se', 'q_count', 'raw_score', 'version', 'administered', 'taken',
+          'responses')
+
+
+def assert_same_state(decoded: SessionState, state: SessionState) -> None:
+    for name in FIELDS:
+        assert getattr(decoded, name) == getattr(state, name), name
+
+
+def encoding_of(data: bytes, state: SessionState) -> int:
+    return data[SessionCodec.HEADER.size + len(state.role.encode('utf-8')) + len((state.version or '').encode('utf-8'))]
+
+
+def answered_state(bank, role: str, answers: int) -> SessionState:
+    random.seed(1)
+    engine = AdaptiveEngine(bank)
+    state, pos = engine.start_position(role)
+    score = 0.0
+    for _ in range(answers):
+        score = engine.record_response(state, pos, random.random() < 0.5, score)
+        pos = engine._select_next_position(state)
+    state.version = 'v1'
+    return state
+
+
+# --- SessionCodec ---
+@pytest.mark.parametrize('banks', ['bank', 'compiled_bank'])
+def test_codec_round_trips_response_history(banks, role, request):
+    bank = request.getfixturevalue(banks)
+    codec = SessionCodec(bank)
+    state = answered_state(bank, role, 6)
+    data = codec.encode(state)
+    assert encoding_of(data, state) == SessionCodec.RESPONSES
+    assert_same_state(codec.decode(data), state)
+
+
+def test_codec_round_trips_administered_set_as_bitset(bank, role):
+    codec = SessionCodec(bank)
+    state = SessionState(role, 2, 0.5)
+    positions = codec.role_positions(role)
+    for pos in positions[::2].tolist():
+        state.administered.add(pos)
+        diff = int(bank.difficulty[pos])
+        state.taken[diff] = state.taken.get(diff, 0) + 1
+    state.q_count, state.raw_score = len(state.administered), 12.5
+    data = codec.encode(state)
+    assert encoding_of(data, state) == SessionCodec.BITSET
+    assert_same_state(codec.decode(data), state)
+
+
+def test_codec_round_trips_administered_set_as_positions(bank, role):
+    # A question of another role cannot be stored in the role's bitset
+    codec = SessionCodec(bank)
+    state = SessionState(role, 1)
+    other_role = next(r for r in bank.roles if r != role)
+    state.administered.add(int(codec.role_positions(other_role)[0]))
+    state.q_count = 1
+    data = codec.encode(state)
+    assert encoding_of(data, state) == SessionCodec.POSITIONS
+    assert_same_state(codec.decode(data), state)
+
+
+def test_codec_decodes_unloaded_version_without_questions(bank, role):
+    state = answered_state(bank, role, 3)
+    data = SessionCodec(bank).encode(state)
+    decoded = SessionCodec(resolve=lambda version: None).decode(data)
+    assert decoded.version == 'v1' and decoded.q_count == 3
+    assert not decoded.administered and not decoded.responses
+
+
+@pytest.mark.parametrize('record', [b'', b'\x02' + bytes(40), b'\x09' + bytes(40)])
+def test_codec_rejects_unknown_record_versions(bank, record):
+    with pytest.raises(ValueError, match='Unsupported session record version'):
+        SessionCodec(bank).decode(record)
+
+
+# --- Stores ---
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, bank, tmp_path):
+    if request.param == 'memory':
+        return InMemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'), SessionCodec(bank))
+
+
+def test_store_pop_claims_a_session_once(store, bank, role):
+    state = answered_state(bank, role, 2)
+    store.put('s1', state)
+    assert_same_state(store.pop('s1'), state)
+    assert store.pop('s1') is None
+    assert store.get('s1') is None
+
+
+class FakeRedis:
+    """The subset of redis-py RedisSessionStore uses, with expiry in milliseconds."""
+
+    def __init__(self):
+        self.data = {}
+        self.px = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, px=None):
+        assert px is not None and px >= 1
+        self.data[name] = value
+        self.px[name] = px
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+    def getdel(self, name):
+        return self.data.pop(name, None)
+
+
+@pytest.mark.parametrize('ttl_seconds, px', [(0.25, 250), (0.0001, 1), (3600, 3_600_000), (1.5, 1500)])
+def test_redis_store_keeps_sub_second_ttls(bank, role, ttl_seconds, px):
+    client = FakeRedis()
+    store = RedisSessionStore(client, SessionCodec(bank), ttl_seconds=ttl_seconds)
+    state = answered_state(bank, role, 2)
+    store.put('s1', state)
+    assert client.px['assessment:s1'] == px
+    assert_same_state(store.pop('s1'), state)
+    assert store.get('s1') is None
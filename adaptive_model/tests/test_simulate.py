@@ -0,0 +1,82 @@
+# test_simulate.py
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import simulate
+from adaptive_logic import AdaptiveEngine, EngineParameters, StoppingRules
+from conftest import DATA_CSV, MODELS_DIR
+from irt_engine import IRTAdaptiveEngine
+from jobfit_predictor import JobFitPredictor
+from simulate import LockstepSimulator
+
+
+@pytest.fixture(scope='module')
+def engine(bank):
+    return AdaptiveEngine(bank, EngineParameters())
+
+
+def engine_raw_score(engine, role: str, correct: bool) -> float:
+    state, pos = engine.start_position(role)
+    while pos is not None:
+        pos, _ = engine.advance_position(state, int(engine.bank.q_ids[pos]), correct, state.raw_score)
+    return state.raw_score
+
+
+@pytest.mark.parametrize('ability, correct', [(30.0, True), (-30.0, False)])
+def test_rule_policy_scores_like_the_engine(engine, bank, ability, correct):
+    # At extreme abilities every answer is certain, so the score only depends on the policy
+    simulator = LockstepSimulator(engine, np.random.default_rng(0))
+    for role in bank.roles:
+        result = simulator.run_role(role, np.full(50, ability))
+        expected = engine.get_final_skill_score(engine_raw_score(engine, role, correct))
+        assert result['skill'].tolist() == [expected] * 50
+
+
+@pytest.mark.parametrize('mode', ['rule', 'irt'])
+def test_candidates_get_distinct_questions_of_their_role(bank, mode):
+    engine = (IRTAdaptiveEngine if mode == 'irt' else AdaptiveEngine)(bank, EngineParameters())
+    simulator = LockstepSimulator(engine, np.random.default_rng(1))
+    for role in bank.roles:
+        role_size = sum(len(b) for b in bank.buckets[role].values())
+        n = 40
+        result = simulator.run_role(role, np.random.default_rng(2).normal(size=n))
+        assert result['items'].tolist() == [min(engine.MAX_QUESTIONS, role_size)] * n
+        asked = result['administered'].reshape(n, -1)
+        assert all(len(set(row)) == len(row) for row in asked.tolist())
+        assert {bank.role_at(pos) for pos in asked.ravel().tolist()} == {role}
+        assert ((result['skill'] >= 0) & (result['skill'] <= 100)).all()
+
+
+def test_early_stopping_shortens_simulated_assessments(bank):
+    cutpoints = JobFitPredictor(model_dir=MODELS_DIR).skill_cutpoints(85)
+    full = simulate.run(DATA_CSV, 600, seed=3)
+    early = simulate.run(DATA_CSV, 600, seed=3, stopping=StoppingRules(min_items=3, skill_cutpoints=cutpoints))
+    assert early['items'].mean() < full['items'].mean()
+    assert early['items'].min() >= 3
+
+
+def test_sharded_runs_merge_every_candidate(bank):
+    result = simulate.run(DATA_CSV, 301, workers=2, seed=4)
+    assert len(result['skill']) == len(result['items']) == len(result['role_index']) == 301
+    assert result['role_candidates'].sum() == 301
+    assert result['exposure'].sum() == result['items'].sum()
+    again = simulate.run(DATA_CSV, 301, workers=2, seed=4)
+    assert np.array_equal(again['skill'], result['skill'])
+
+
+def test_outputs(bank, tmp_path):
+    predictor = JobFitPredictor(model_dir=MODELS_DIR)
+    result = simulate.run(DATA_CSV, 200, seed=5)
+    summary, fit = simulate.summarize(result, predictor, 85, elapsed=1.0)
+    assert summary['candidates'] == 200 and sum(summary['categories'].values()) == 200
+    simulate.write_outputs(str(tmp_path), bank, result, summary, fit, predictor.CATEGORY_LABELS)
+
+    assert json.loads((tmp_path / 'summary.json').read_text()) == summary
+    distribution = pd.read_csv(tmp_path / 'score_distribution.csv')
+    assert distribution[list(predictor.CATEGORY_LABELS)].to_numpy().sum() == 200
+    exposure = pd.read_csv(tmp_path / 'exposure.csv')
+    assert exposure['Administered'].sum() == result['items'].sum()
+    assert ((exposure['Exposure_Rate'] >= 0) & (exposure['Exposure_Rate'] <= 1)).all()
@@ -0,0 +1,107 @@
+# test_speculation.py
+import threading
+
+import pytest
+
+from adaptive_logic import AdaptiveEngine, SessionState
+from metrics import (QUESTION_SELECTION_SECONDS, SCORE_UPDATE_SECONDS, SPECULATION_SAVED_SECONDS,
+                     SPECULATIONS)
+from speculation import Speculator
+
+
+def observations(series) -> int:
+    return sum(series.counts)
+
+
+class FakeEngine:
+    """Outcomes are fixed; `gate` (when set) holds speculate() until released."""
+
+    def __init__(self, gate: threading.Event | None = None):
+        self.gate = gate
+        self.started = threading.Event()
+
+    def speculate(self, state, q_id):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {True: (state, 1, 2.0, 0.5), False: (state, 2, 0.0, 0.5)}
+
+
+@pytest.fixture
+def speculator():
+    speculator = Speculator(threads=1)
+    yield speculator
+    speculator.close()
+
+
+def counts() -> tuple:
+    return (tuple(SPECULATIONS.labels(r).value for r in ('hit', 'wait', 'miss')),
+            observations(SPECULATION_SAVED_SECONDS.labels()))
+
+
+def test_speculate_leaves_the_engine_timings_alone(bank, role):
+    engine = AdaptiveEngine(bank)
+    state, pos = engine.start_position(role)
+    selection, update = QUESTION_SELECTION_SECONDS.labels(engine.MODE), SCORE_UPDATE_SECONDS.labels(engine.MODE)
+    before = observations(selection), observations(update)
+    outcomes = engine.speculate(state, int(bank.q_ids[pos]))
+    assert (observations(selection), observations(update)) == before
+    assert state.q_count == 0 and not state.administered
+
+    right, _, right_score, _ = outcomes[True]
+    wrong, _, wrong_score, _ = outcomes[False]
+    assert right.q_count == wrong.q_count == 1
+    assert right_score == 2 * int(bank.difficulty[pos]) and wrong_score == 0
+
+
+def test_ready_outcome_is_a_hit_and_counts_saved_time(speculator):
+    engine, state = FakeEngine(), SessionState('role', 1)
+    speculator.schedule('s1', engine, state, 7)
+    speculator._entries['s1'][3].result(5)
+    (hits, waits, misses), saved = counts()
+
+    branch, next_pos, new_score = speculator.take('s1', engine, state, 7, True)
+    assert (next_pos, new_score) == (1, 2.0)
+    assert counts() == ((hits + 1, waits, misses), saved + 1)
+    assert len(speculator) == 0
+
+
+def test_waiting_for_an_outcome_saves_nothing(speculator):
+    gate = threading.Event()
+    engine, state = FakeEngine(gate), SessionState('role', 1)
+    speculator.schedule('s1', engine, state, 7)
+    assert engine.started.wait(5)
+    (hits, waits, misses), saved = counts()
+
+    threading.Timer(0.05, gate.set).start()
+    assert speculator.take('s1', engine, state, 7, False)[1:] == (2, 0.0)
+    assert counts() == ((hits, waits + 1, misses), saved)
+
+
+@pytest.mark.parametrize('change', ['q_id', 'engine', 'q_count', 'unscheduled'])
+def test_outcomes_for_another_question_are_misses(speculator, change):
+    engine, state = FakeEngine(), SessionState('role', 1)
+    if change != 'unscheduled':
+        speculator.schedule('s1', engine, state, 7)
+        speculator._entries['s1'][3].result(5)
+    (hits, waits, misses), saved = counts()
+    q_id = 8 if change == 'q_id' else 7
+    if change == 'engine':
+        engine = FakeEngine()
+    if change == 'q_count':
+        state = state.copy()
+        state.q_count += 1
+    assert speculator.take('s1', engine, state, q_id, True) is None
+    assert counts() == ((hits, waits, misses + 1), saved)
+
+
+def test_discard_and_eviction_drop_outcomes():
+    speculator = Speculator(threads=1, max_sessions=2)
+    try:
+        for session_id in ('s1', 's2', 's3'):
+            speculator.schedule(session_id, FakeEngine(), SessionState('role', 1), 7)
+        assert list(speculator._entries) == ['s2', 's3']
+        speculator.discard('s2')
+        assert list(speculator._entries) == ['s3']
+    finally:
+        speculator.close()
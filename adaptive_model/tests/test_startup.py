@@ -0,0 +1,62 @@
+# test_startup.py
+"""
+The serving entry points must import without pulling in pandas or sklearn, and import
+and boot within a time budget. Each check runs in a fresh interpreter, since the test
+process has already imported everything.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+
+HEAVY_PACKAGES = ('pandas', 'sklearn')
+# About 5x a typical run (see benchmarks/bench_startup.py), so a budget catches an eager
+# import or a slower boot rather than machine noise
+IMPORT_BUDGET_S = 1.0
+BOOT_BUDGET_S = 10.0
+
+# Executed in a fresh interpreter: import one module, report which heavy packages it loaded
+IMPORT_CHILD = r"""
+import importlib, json, sys
+scripts_dir, name = sys.argv[1], sys.argv[2]
+sys.path.insert(0, scripts_dir)
+sys.path.insert(0, scripts_dir + '/..')
+importlib.import_module(name)
+print(json.dumps([p for p in sys.argv[3:] if p in sys.modules]))
+"""
+
+# Executed in a fresh interpreter: import the ASGI app, then boot the service on the bundled bank
+BOOT_CHILD = r"""
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import asgi_app, assessment_service
+t_import = time.perf_counter()
+service = assessment_service.AssessmentService.create() if sys.argv[2] == 'boot' else None
+t_boot = time.perf_counter()
+if service is not None:
+    service.close()
+print(json.dumps({'import_s': t_import - t0, 'boot_s': t_boot - t_import}))
+"""
+
+
+def run_child(code: str, *args) -> object:
+    out = subprocess.run([sys.executable, '-c', code, SCRIPTS_DIR, *args],
+                         check=True, capture_output=True, text=True, cwd=SCRIPTS_DIR, timeout=120).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', ['api_model', 'assessment_service', 'asgi_app', 'scripts'])
+def test_entry_point_does_not_import_heavy_packages(module):
+    assert run_child(IMPORT_CHILD, module, *HEAVY_PACKAGES) == []
+
+
+def test_cold_import_of_the_serving_entry_point_is_within_budget():
+    assert min(run_child(BOOT_CHILD, 'import')['import_s'] for _ in range(3)) < IMPORT_BUDGET_S
+
+
+def test_service_boots_within_budget():
+    assert run_child(BOOT_CHILD, 'boot')['boot_s'] < BOOT_BUDGET_S
@@ -0,0 +1,106 @@
+# test_train.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adaptive_logic import AdaptiveEngine, EngineParameters
+from irt_engine import logistic
+from jobfit_predictor import JobFitPredictor
+from train import ResponseStatistics, calibrate, fit_items, stream_responses, train_job_fit, training_config
+
+
+def response_log(bank, rng, per_item: int = 400, roles: list | None = None) -> pd.DataFrame:
+    """Synthetic responses to every question (of `roles`), from the engine's default 2PL items."""
+    positions = [pos for pos in range(len(bank)) if roles is None or bank.role_at(pos) in roles]
+    pos = np.repeat(positions, per_item)
+    ability = rng.normal(size=len(pos))
+    b = np.asarray(bank.difficulty, dtype=np.float64)[pos] - 2
+    return pd.DataFrame({
+        'Q_ID': np.asarray(bank.q_ids)[pos],
+        'Correctness': (rng.random(len(pos)) < logistic(ability - b)).astype(int),
+        'Ability': ability,
+        'Response_Time': rng.uniform(3, 30, size=len(pos)),
+    })
+
+
+def test_fit_items_recovers_known_parameters():
+    rng = np.random.default_rng(0)
+    a_true, b_true = np.array([0.6, 1.0, 1.8]), np.array([-1.0, 0.5, 1.5])
+    theta = np.repeat(np.linspace(-3, 3, 25), 3)
+    item = np.tile(np.arange(3), 25)
+    n = np.full(len(item), 4000)
+    k = rng.binomial(n, logistic(a_true[item] * (theta - b_true[item])))
+    a, b = fit_items(item, theta, n, k, b_prior=np.zeros(3))
+    assert a == pytest.approx(a_true, abs=0.1)
+    assert b == pytest.approx(b_true, abs=0.1)
+
+
+def test_statistics_drop_unusable_rows_and_merge_chunks(bank, tmp_path):
+    log = response_log(bank, np.random.default_rng(1), per_item=20)
+    log.loc[0, 'Response_Time'] = 0.5
+    log.loc[1, 'Ability'] = np.nan
+    log.loc[2, 'Q_ID'] = 10 ** 9
+    path = tmp_path / 'responses.csv'
+    log.to_csv(path, index=False)
+
+    chunked = stream_responses([str(path)], bank, chunksize=37, min_response_time=2.0)
+    whole = stream_responses([str(path)], bank, chunksize=10 ** 6, min_response_time=2.0)
+    assert chunked.counts == whole.counts == {'rows': len(log), 'used': len(log) - 3, 'rapid_guesses': 1,
+                                              'unknown_q_id': 1, 'incomplete': 1}
+    for merged_chunked, merged_whole in zip(chunked.merged(), whole.merged()):
+        assert np.array_equal(merged_chunked, merged_whole)
+    assert whole.merged()[2].sum() == len(log) - 3
+
+
+def test_calibration_refits_only_changed_roles(bank, tmp_path):
+    rng = np.random.default_rng(2)
+    config = training_config(2.0)
+    log = response_log(bank, rng)
+
+    def run(frame, manifest):
+        stats = ResponseStatistics()
+        stats.add_chunk(frame, frame['Q_ID'].to_numpy(), bank, 2.0)
+        return calibrate(bank, stats, str(tmp_path), manifest, config, workers=1, force=False)
+
+    first = run(log, {})
+    assert first['fitted_roles'] == sorted(bank.roles) and first['items'] == len(bank)
+    params_path = tmp_path / AdaptiveEngine.TRAINED_FILE_NAME
+    manifest = {'config': config, 'roles': first['roles']}
+    written = params_path.stat().st_mtime_ns
+    before = EngineParameters.read_artifact(str(params_path), verify=True)['item_parameters']
+
+    assert run(log, manifest)['fitted_roles'] == []
+    assert params_path.stat().st_mtime_ns == written
+
+    role = bank.roles[0]
+    changed = pd.concat([log, response_log(bank, rng, per_item=50, roles=[role])], ignore_index=True)
+    third = run(changed, manifest)
+    assert third['fitted_roles'] == [role] and third['reused_roles'] == sorted(set(bank.roles) - {role})
+    after = EngineParameters.read_artifact(str(params_path), verify=True)['item_parameters']
+    old = dict(zip(before['Q_ID'].tolist(), before['a'].tolist()))
+    new = dict(zip(after['Q_ID'].tolist(), after['a'].tolist()))
+    assert old.keys() == new.keys()
+    for q_id in old:
+        if bank.role_at(bank.position(q_id)) != role:
+            assert new[q_id] == old[q_id]
+
+
+def test_job_fit_model_is_retrained_from_outcomes(tmp_path):
+    rng = np.random.default_rng(3)
+    skill = rng.uniform(0, 100, 3000).round(2)
+    trust = rng.uniform(50, 100, 3000).round(2)
+    outcomes = tmp_path / 'outcomes.csv'
+    pd.DataFrame({'SkillScore': skill, 'Trust_Score': trust,
+                  'Job_Fit': (rng.random(3000) < logistic((skill - 60) / 8)).astype(int)}).to_csv(outcomes, index=False)
+
+    report = train_job_fit([str(outcomes)], str(tmp_path), {}, chunksize=1000, force=False)
+    assert report['source'] == 'trained' and report['outcomes'] == 3000
+    predictor = JobFitPredictor(model_dir=str(tmp_path))
+    assert predictor.predict_fit(95, 90)['JobFitScore'] > predictor.predict_fit(10, 90)['JobFitScore']
+    assert train_job_fit([str(outcomes)], str(tmp_path), {'job_fit': report}, 1000, False) == report
+
+    one_label = tmp_path / 'one_label.csv'
+    pd.DataFrame({'SkillScore': [50.0], 'Trust_Score': [85.0], 'Job_Fit': [1]}).to_csv(one_label, index=False)
+    with pytest.raises(ValueError, match='both 0 and 1'):
+        train_job_fit([str(one_label)], str(tmp_path / 'other'), {}, 1000, False)